@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+ALTER Coalescing Optimizer
+Groups the ALTER TABLE operations parsed by SQLDDLParser per table, cancels
+add-then-drop pairs and merges compatible clauses so that every table is
+rebuilt as few times as possible. Ordering constraints between tables
+(e.g. a FOREIGN KEY that needs the referenced table's index) are preserved.
+"""
+
+import re
+import sys
+from schema_model import strip_index_column
+from sql_ddl_parser import SQLDDLParser
+
+
+# Clause types that force InnoDB to rebuild the table (COPY / INPLACE with rebuild)
+REBUILD_TARGET_TYPES = ('COLUMN', 'PRIMARY_KEY', 'unknown')
+
+# Target types whose ADD can be cancelled by a later DROP of the same target
+CANCELLABLE_TARGET_TYPES = ('COLUMN', 'INDEX', 'FOREIGN_KEY')
+
+# Column clauses that act on an existing column; MySQL resolves them against the table as it was
+COLUMN_CHANGING_OPERATIONS = ('DROP', 'MODIFY', 'CHANGE')
+
+CHANGE_COLUMN_PATTERN = re.compile(r'CHANGE\s+(?:COLUMN\s+)?[`"]?(\w+)[`"]?\s*', re.IGNORECASE)
+AFTER_COLUMN_PATTERN = re.compile(r'\bAFTER\s+[`"]?(\w+)[`"]?\s*$', re.IGNORECASE)
+
+
+def statement_rebuilds_table(operations):
+    """Estimate whether an ALTER statement made of these clauses rebuilds the table."""
+    return any(op.get('target_type') in REBUILD_TARGET_TYPES for op in operations)
+
+
+def source_column(op):
+    """Existing column a DROP / MODIFY / CHANGE COLUMN clause acts on (the old name for CHANGE)."""
+    if op.get('operation') == 'CHANGE':
+        match = CHANGE_COLUMN_PATTERN.match(op.get('clause', ''))
+        if match:
+            return match.group(1).lower()
+    return str(op.get('target', '')).lower()
+
+
+def referenced_columns(op):
+    """Columns a clause reads: key columns and the AFTER position."""
+    columns = [strip_index_column(str(column)).lower() for column in op.get('details', {}).get('columns', [])]
+    after = AFTER_COLUMN_PATTERN.search(op.get('clause', ''))
+    if after:
+        columns.append(after.group(1).lower())
+    return columns
+
+
+def conflicts_with(ops, operation):
+    """
+    True if MySQL would reject `operation` in one ALTER together with `ops`:
+    a column clause on a column an earlier clause added, renamed or dropped
+    (error 1054 / 1091), a DROP or rename of a column an earlier key reads, a
+    key that reads a column already dropped or renamed away, or a DROP of a
+    key the batch adds.
+    """
+    target_type = operation.get('target_type')
+    target = str(operation.get('target', '')).lower()
+    column_ops = [op for op in ops if op.get('target_type') == 'COLUMN']
+
+    if target_type == 'COLUMN' and operation.get('operation') in COLUMN_CHANGING_OPERATIONS:
+        column = source_column(operation)
+        for op in column_ops:
+            touched = {str(op.get('target', '')).lower()}
+            if op.get('operation') in COLUMN_CHANGING_OPERATIONS:
+                touched.add(source_column(op))
+            if column in touched:
+                return True
+        renamed = operation.get('operation') == 'DROP' or column != target
+        if renamed and any(column in referenced_columns(op) for op in ops):
+            return True
+
+    removed = {
+        source_column(op) for op in column_ops
+        if op.get('operation') == 'DROP' or (op.get('operation') == 'CHANGE' and source_column(op) != str(op.get('target', '')).lower())
+    }
+    if removed & set(referenced_columns(operation)):
+        return True
+
+    if operation.get('operation') == 'DROP' and target_type in ('INDEX', 'FOREIGN_KEY'):
+        return any(
+            op.get('target_type') == target_type and op.get('operation') == 'ADD' and str(op.get('target', '')).lower() == target
+            for op in ops
+        )
+    return False
+
+
+class AlterOptimizer:
+    """Coalesces ALTER TABLE operations into one statement per table where it is safe."""
+
+    def __init__(self, operations):
+        self.operations = list(operations)
+        self.batches = []
+        self.cancelled = []
+
+    def group_statements(self):
+        """Group operations back into the statements they were parsed from."""
+        statements = []
+        by_position = {}
+
+        for op in self.operations:
+            key = (op.get('position'), op.get('full_statement'))
+            if key not in by_position:
+                by_position[key] = []
+                statements.append(by_position[key])
+            by_position[key].append(op)
+
+        return statements
+
+    def related_tables(self, operation, referencing):
+        """Return tables whose earlier changes this operation must stay ordered after."""
+        related = set(referencing.get(operation['table'], ()))
+
+        if operation.get('target_type') == 'FOREIGN_KEY' and operation.get('operation') == 'ADD':
+            referenced_table = operation.get('details', {}).get('referenced_table')
+            if referenced_table:
+                related.add(referenced_table)
+
+        related.discard(operation['table'])
+        return related
+
+    def record_references(self, statement, referencing):
+        """Track which tables hold foreign keys pointing at which other tables."""
+        for op in statement:
+            if op['command'] == 'CREATE_TABLE':
+                for referenced_table in re.findall(r'REFERENCES\s+[`"]?(\w+)[`"]?', op.get('full_statement', ''), re.IGNORECASE):
+                    referencing.setdefault(referenced_table, set()).add(op['table'])
+            elif op.get('target_type') == 'FOREIGN_KEY' and op.get('operation') == 'ADD':
+                referenced_table = op.get('details', {}).get('referenced_table')
+                if referenced_table:
+                    referencing.setdefault(referenced_table, set()).add(op['table'])
+
+    def merge_into(self, batch, operation):
+        """
+        Merge one clause into a table batch, cancelling or folding where possible.
+
+        Returns:
+            bool: False if the clause cannot share the batch's statement (see conflicts_with)
+        """
+        ops = batch['operations']
+        target_type = operation.get('target_type')
+        target = str(operation.get('target', '')).lower()
+
+        def same_target(op):
+            return op.get('target_type') == target_type and str(op.get('target', '')).lower() == target
+
+        added = [op for op in ops if same_target(op) and op.get('operation') == 'ADD']
+
+        # ADD x ... DROP x inside the same batch cancels out entirely
+        if operation.get('operation') == 'DROP' and target_type in CANCELLABLE_TARGET_TYPES and added:
+            dependents = [
+                op for op in ops
+                if not same_target(op) and target in [str(c).lower() for c in op.get('details', {}).get('columns', [])]
+            ]
+            if not dependents:
+                removed = [op for op in ops if same_target(op)]
+                batch['operations'] = [op for op in ops if not same_target(op)]
+                self.cancelled.extend(removed + [operation])
+                return True
+
+        # ADD COLUMN x ... MODIFY COLUMN x folds into a single ADD with the final definition
+        if operation.get('operation') == 'MODIFY' and target_type == 'COLUMN' and added:
+            column_def = re.sub(r'^MODIFY\s+(?:COLUMN\s+)?', '', operation['clause'], flags=re.IGNORECASE)
+            folded = dict(added[-1])
+            folded['clause'] = f"ADD COLUMN {column_def}"
+            folded['details'] = operation['details']
+            batch['operations'] = [folded if op is added[-1] else op for op in ops]
+            self.cancelled.append(operation)
+            return True
+
+        # ADD COLUMN x ... CHANGE COLUMN x y folds into ADD COLUMN y, unless another clause reads x
+        if operation.get('operation') == 'CHANGE' and target_type == 'COLUMN':
+            old_name = source_column(operation)
+            added = [op for op in ops if op.get('target_type') == 'COLUMN' and op.get('operation') == 'ADD'
+                     and str(op.get('target', '')).lower() == old_name]
+            readers = [op for op in ops if op not in added and old_name in referenced_columns(op)]
+            if added and not readers:
+                folded = dict(added[-1])
+                folded['clause'] = f"ADD COLUMN {CHANGE_COLUMN_PATTERN.sub('', operation['clause'], count=1)}"
+                folded['target'] = operation['target']
+                folded['details'] = operation['details']
+                batch['operations'] = [folded if op is added[-1] else op for op in ops]
+                self.cancelled.append(operation)
+                return True
+
+        if conflicts_with(ops, operation):
+            return False
+        ops.append(operation)
+        return True
+
+    def optimize(self):
+        """Build the optimized list of statements (batches) from the parsed operations."""
+        self.batches = []
+        self.cancelled = []
+        open_batch = {}
+        last_batch = {}
+        referencing = {}
+
+        for statement in self.group_statements():
+            first = statement[0]
+            table = first['table']
+            self.record_references(statement, referencing)
+
+            mergeable = first['command'] == 'ALTER_TABLE' and all(op.get('operation') != 'UNKNOWN' for op in statement)
+
+            if not mergeable:
+                # CREATE/DROP TABLE and ALTERs with unknown clauses act as barriers for the table
+                open_batch.pop(table, None)
+                self.batches.append({'table': table, 'operations': statement, 'passthrough': True})
+                last_batch[table] = len(self.batches) - 1
+                continue
+
+            for op in statement:
+                index = open_batch.get(table)
+                if index is not None:
+                    for related_table in self.related_tables(op, referencing):
+                        if last_batch.get(related_table, -1) > index:
+                            index = None
+                            break
+
+                if index is None or not self.merge_into(self.batches[index], op):
+                    # Clauses that depend on the open batch's changes start the next statement
+                    self.batches.append({'table': table, 'operations': [], 'passthrough': False})
+                    index = len(self.batches) - 1
+                    open_batch[table] = index
+                    self.merge_into(self.batches[index], op)
+
+                last_batch[table] = max(last_batch.get(table, -1), index)
+
+        # Batches whose clauses all cancelled out disappear
+        self.batches = [batch for batch in self.batches if batch['operations']]
+        return self.batches
+
+    def batch_to_sql(self, batch):
+        """Render a batch as a SQL statement."""
+        if batch['passthrough']:
+            return batch['operations'][0]['full_statement'].rstrip().rstrip(';') + ';'
+
+        clauses = ",\n  ".join(op['clause'] for op in batch['operations'])
+        return f"ALTER TABLE `{batch['table']}`\n  {clauses};"
+
+    def get_optimized_sql(self):
+        """Return the optimized migration as a list of SQL statements."""
+        if not self.batches:
+            self.optimize()
+        return [self.batch_to_sql(batch) for batch in self.batches]
+
+    def estimate_rebuilds(self):
+        """Estimate table rebuilds before and after optimization."""
+        before = sum(
+            1 for statement in self.group_statements()
+            if statement[0]['command'] == 'ALTER_TABLE' and statement_rebuilds_table(statement)
+        )
+        after = sum(
+            1 for batch in self.batches
+            if batch['operations'][0]['command'] == 'ALTER_TABLE' and statement_rebuilds_table(batch['operations'])
+        )
+        return before, after
+
+    def print_report(self):
+        """Print the optimized SQL together with statement and rebuild estimates."""
+        if not self.batches:
+            self.optimize()
+
+        alters_before = sum(1 for statement in self.group_statements() if statement[0]['command'] == 'ALTER_TABLE')
+        alters_after = sum(1 for batch in self.batches if batch['operations'][0]['command'] == 'ALTER_TABLE')
+        rebuilds_before, rebuilds_after = self.estimate_rebuilds()
+
+        print("\n🔧 ALTER Coalescing Report")
+        print("=" * 80)
+        print(f"ALTER statements:    {alters_before} -> {alters_after}")
+        print(f"Estimated rebuilds:  {rebuilds_before} -> {rebuilds_after}")
+        if self.cancelled:
+            print(f"Cancelled/folded:    {len(self.cancelled)} clauses")
+            for op in self.cancelled:
+                print(f"   • {op['table']}: {op['clause']}")
+
+        print("\n📝 Optimized SQL:")
+        print("-" * 80)
+        for sql in self.get_optimized_sql():
+            print(sql)
+            print()
+
+
+def main():
+    """Optimize the ALTER statements of a local migration file."""
+    if len(sys.argv) != 2:
+        print("Usage: python alter_optimizer.py MYSQL/<env>/<db>/V{n}__{name}.sql")
+        exit(1)
+
+    file_path = sys.argv[1]
+    with open(file_path) as f:
+        file_content = f.read()
+
+    parser = SQLDDLParser()
+    parser.parse_sql_file(file_content, file_path)
+
+    optimizer = AlterOptimizer(parser.get_operations())
+    optimizer.print_report()
+
+
+if __name__ == "__main__":
+    main()
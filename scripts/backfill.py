@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Throttled Online Backfill
+Populates a column added by a migration (e.g. iso_country_code) without a
+one-off UPDATE that locks the whole table:
+
+    UPDATE <table> SET <column> = <expression> WHERE <key range> [AND <where>]
+
+The table is walked in keyset-paginated chunks on its primary key (or a
+unique key whose columns are all NOT NULL), and every chunk is committed on
+its own, so row locks are only held for one chunk. The chunk size follows the
+observed rate to keep each UPDATE near BACKFILL_TARGET_SECONDS. Before each
+chunk the runner pauses while Threads_running is above
+BACKFILL_MAX_THREADS_RUNNING or any replica in BACKFILL_REPLICAS
+(host[:port],...) lags more than BACKFILL_MAX_REPLICA_LAG seconds. A chunk
+that hits a deadlock or lock wait timeout is rolled back and retried at half
+the size.
+
+Progress is saved to a checkpoint file after every commit. Running the same
+command again resumes after the last committed key. The checkpoint stores
+the table, column, expression and condition, and a checkpoint written for a
+different backfill is refused.
+
+Runs against staging by default, or against the local stand-in
+(get_local_config, LOCAL_DB_*) with --local.
+
+Usage: python backfill.py <database> <table> <column> "<expression>" [--where "<condition>"] [--local] [--checkpoint FILE]
+"""
+
+import os
+import sys
+import json
+import time
+import datetime
+from ddl_validator import DatabaseConnection, get_local_config, get_staging_config, mysql_connector
+from data_dumper import quote_identifier
+
+
+TARGET_SECONDS = float(os.getenv("BACKFILL_TARGET_SECONDS", "0.5"))
+MAX_THREADS_RUNNING = int(os.getenv("BACKFILL_MAX_THREADS_RUNNING", "25"))
+MAX_REPLICA_LAG = float(os.getenv("BACKFILL_MAX_REPLICA_LAG", "5"))
+REPLICAS = [replica for replica in os.getenv("BACKFILL_REPLICAS", "").split(',') if replica.strip()]
+
+INITIAL_CHUNK_ROWS = 1000
+MIN_CHUNK_ROWS = 10
+MAX_CHUNK_ROWS = 50000
+PAUSE_SECONDS = 2
+MAX_CHUNK_ATTEMPTS = 5
+# Deadlock, lock wait timeout
+RETRYABLE_ERRORS = (1213, 1205)
+
+
+def fetch_chunk_key(db, table_name):
+    """(index name, key columns) of the primary key, else of a unique key with only NOT NULL columns, or None."""
+    db.cursor.execute("""
+        SELECT s.index_name AS index_name, s.column_name AS column_name, c.is_nullable AS is_nullable,
+               s.sub_part AS sub_part
+        FROM information_schema.STATISTICS s
+        JOIN information_schema.COLUMNS c
+          ON c.table_schema = s.table_schema AND c.table_name = s.table_name AND c.column_name = s.column_name
+        WHERE s.table_schema = %s AND s.table_name = %s AND s.non_unique = 0
+        ORDER BY s.index_name = 'PRIMARY' DESC, s.index_name, s.seq_in_index
+    """, (db.database, table_name))
+    indexes = {}
+    for row in db.cursor.fetchall():
+        indexes.setdefault(row['index_name'], []).append(row)
+    for index_name, columns in indexes.items():
+        if all(column['is_nullable'] == 'NO' and column['sub_part'] is None for column in columns):
+            return index_name, [column['column_name'] for column in columns]
+    return None
+
+
+def key_comparison(key_columns, operator):
+    """`id` > %s, or (`a`, `b`) > (%s, %s) for a composite key."""
+    if len(key_columns) == 1:
+        return f"{quote_identifier(key_columns[0])} {operator} %s"
+    return (f"({', '.join(quote_identifier(column) for column in key_columns)}) {operator} "
+            f"({', '.join(['%s'] * len(key_columns))})")
+
+
+class Checkpoint:
+    """Progress of one backfill, saved as JSON after every committed chunk (kept in memory only without a path)."""
+
+    def __init__(self, path, identity):
+        self.path = path
+        self.identity = identity      # database, table, column, expression, where
+        self.last_key = None
+        self.rows_updated = 0
+        self.chunks = 0
+        self.chunk_rows = INITIAL_CHUNK_ROWS
+        self.completed = False
+
+    @classmethod
+    def load(cls, path, identity):
+        """The saved checkpoint for this backfill, a fresh one if there is none, or ValueError if it belongs to another."""
+        checkpoint = cls(path, identity)
+        if not os.path.exists(path):
+            return checkpoint
+        with open(path) as f:
+            data = json.load(f)
+        if data['identity'] != identity:
+            raise ValueError(f"{path} belongs to a different backfill: {data['identity']}")
+        checkpoint.last_key = tuple(data['last_key']) if data['last_key'] is not None else None
+        checkpoint.rows_updated = data['rows_updated']
+        checkpoint.chunks = data['chunks']
+        checkpoint.chunk_rows = data['chunk_rows']
+        checkpoint.completed = data['completed']
+        return checkpoint
+
+    def save(self):
+        if self.path is None:
+            return
+        data = {
+            'identity': self.identity,
+            'last_key': list(self.last_key) if self.last_key is not None else None,
+            'rows_updated': self.rows_updated,
+            'chunks': self.chunks,
+            'chunk_rows': self.chunk_rows,
+            'completed': self.completed,
+            'updated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+        }
+        # Key values such as DATETIME are stored as strings, which MySQL compares correctly
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(temporary_path, self.path)
+
+
+class Throttle:
+    """Waits while the server is busy or replicas lag behind."""
+
+    def __init__(self, db, replica_connections=(), max_threads_running=MAX_THREADS_RUNNING, max_replica_lag=MAX_REPLICA_LAG):
+        self.db = db
+        self.replica_connections = list(replica_connections)
+        self.max_threads_running = max_threads_running
+        self.max_replica_lag = max_replica_lag
+        self.paused_seconds = 0.0
+
+    def threads_running(self):
+        self.db.cursor.execute("SHOW GLOBAL STATUS LIKE 'Threads_running'")
+        row = self.db.cursor.fetchone()
+        return int(row['Value']) if row else 0
+
+    @staticmethod
+    def replica_lag(replica):
+        """Seconds behind the source, or None if replication is stopped or not configured."""
+        try:
+            replica.cursor.execute("SHOW REPLICA STATUS")
+        except mysql_connector.Error:
+            # Before 8.0.22
+            replica.cursor.execute("SHOW SLAVE STATUS")
+        row = replica.cursor.fetchone()
+        if not row:
+            return None
+        lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+        return float(lag) if lag is not None else None
+
+    def reasons(self):
+        """Why the backfill should pause now (empty when it may continue)."""
+        reasons = []
+        threads_running = self.threads_running()
+        if threads_running > self.max_threads_running:
+            reasons.append(f"Threads_running {threads_running} > {self.max_threads_running}")
+        for replica in self.replica_connections:
+            lag = self.replica_lag(replica)
+            if lag is None:
+                reasons.append(f"replica {replica.host} is not replicating")
+            elif lag > self.max_replica_lag:
+                reasons.append(f"replica {replica.host} lag {lag:.0f} s > {self.max_replica_lag:.0f} s")
+        return reasons
+
+    def wait(self):
+        while True:
+            reasons = self.reasons()
+            if not reasons:
+                return
+            print(f"   ⏸️  Paused: {'; '.join(reasons)}")
+            time.sleep(PAUSE_SECONDS)
+            self.paused_seconds += PAUSE_SECONDS
+
+
+class BackfillRunner:
+    """Runs one column backfill in committed keyset chunks."""
+
+    def __init__(self, db, table_name, column, expression, where=None, checkpoint=None, throttle=None,
+                 target_seconds=TARGET_SECONDS):
+        self.db = db
+        self.table_name = table_name
+        self.column = column
+        self.expression = expression
+        self.where = where
+        self.checkpoint = checkpoint or Checkpoint(None, {})
+        self.throttle = throttle
+        self.target_seconds = target_seconds
+        self.index_name = None
+        self.key_columns = None
+
+    def prepare(self):
+        """Check the column exists and pick the key to walk; raises ValueError if the table can't be backfilled."""
+        self.db.cursor.execute("""
+            SELECT COUNT(*) AS found FROM information_schema.COLUMNS
+            WHERE table_schema = %s AND table_name = %s AND column_name = %s
+        """, (self.db.database, self.table_name, self.column))
+        if not self.db.cursor.fetchone()['found']:
+            raise ValueError(f"Column {self.table_name}.{self.column} does not exist - run the ADD COLUMN migration first")
+
+        key = fetch_chunk_key(self.db, self.table_name)
+        if key is None:
+            raise ValueError(f"{self.table_name} has no primary key or NOT NULL unique key to walk")
+        self.index_name, self.key_columns = key
+
+    def next_boundary(self, chunk_rows):
+        """Key of the last row of the next chunk, or None if the rest of the table fits in it."""
+        key = ', '.join(quote_identifier(column) for column in self.key_columns)
+        condition, params = '1=1', []
+        if self.checkpoint.last_key is not None:
+            condition, params = key_comparison(self.key_columns, '>'), list(self.checkpoint.last_key)
+        self.db.cursor.execute(
+            f"SELECT {key} FROM {quote_identifier(self.table_name)} FORCE INDEX ({quote_identifier(self.index_name)}) "
+            f"WHERE {condition} ORDER BY {key} LIMIT %s, 1",
+            params + [chunk_rows - 1]
+        )
+        row = self.db.cursor.fetchone()
+        # Consume any unread result so the next statement can run
+        self.db.cursor.fetchall()
+        return tuple(row[column] for column in self.key_columns) if row else None
+
+    def update_chunk(self, upper):
+        """Update the rows after the checkpoint up to upper (None: to the end) and commit; returns rows changed."""
+        conditions, params = [], []
+        if self.checkpoint.last_key is not None:
+            conditions.append(key_comparison(self.key_columns, '>'))
+            params.extend(self.checkpoint.last_key)
+        if upper is not None:
+            conditions.append(key_comparison(self.key_columns, '<='))
+            params.extend(upper)
+        if self.where:
+            conditions.append(f"({self.where})")
+        self.db.cursor.execute(
+            f"UPDATE {quote_identifier(self.table_name)} SET {quote_identifier(self.column)} = {self.expression} "
+            f"WHERE {' AND '.join(conditions) or '1=1'}",
+            params
+        )
+        rows = self.db.cursor.rowcount
+        self.db.connection.commit()
+        return rows
+
+    def run(self):
+        """Backfill from the checkpoint to the end of the table; returns the checkpoint."""
+        if self.key_columns is None:
+            self.prepare()
+        checkpoint = self.checkpoint
+        if checkpoint.completed:
+            print(f"✅ Already completed: {checkpoint.rows_updated:,} rows in {checkpoint.chunks} chunks")
+            return checkpoint
+
+        start = time.perf_counter()
+        while True:
+            if self.throttle:
+                self.throttle.wait()
+
+            for attempt in range(1, MAX_CHUNK_ATTEMPTS + 1):
+                try:
+                    upper = self.next_boundary(checkpoint.chunk_rows)
+                    chunk_start = time.perf_counter()
+                    rows = self.update_chunk(upper)
+                    seconds = time.perf_counter() - chunk_start
+                    break
+                except mysql_connector.Error as e:
+                    self.db.connection.rollback()
+                    if e.errno not in RETRYABLE_ERRORS or attempt == MAX_CHUNK_ATTEMPTS:
+                        raise
+                    checkpoint.chunk_rows = max(MIN_CHUNK_ROWS, checkpoint.chunk_rows // 2)
+                    print(f"   ⚠️  {e.msg}; retrying with {checkpoint.chunk_rows:,} rows")
+                    time.sleep(PAUSE_SECONDS)
+
+            covered = checkpoint.chunk_rows
+            checkpoint.rows_updated += rows
+            checkpoint.chunks += 1
+            checkpoint.last_key = upper
+            checkpoint.completed = upper is None
+            # Aim for the target time, changing the size at most 2x per chunk
+            scale = self.target_seconds / max(seconds, 0.001)
+            checkpoint.chunk_rows = int(min(MAX_CHUNK_ROWS, max(MIN_CHUNK_ROWS, covered * min(2.0, max(0.5, scale)))))
+            checkpoint.save()
+
+            print(f"   ✅ chunk {checkpoint.chunks}: {rows:,} rows in {seconds:.2f} s, up to {upper if upper else 'the end'} "
+                  f"(next {checkpoint.chunk_rows:,})")
+            if checkpoint.completed:
+                break
+
+        elapsed = time.perf_counter() - start
+        paused = self.throttle.paused_seconds if self.throttle else 0
+        print("-" * 70)
+        print(f"✅ {self.table_name}.{self.column}: {checkpoint.rows_updated:,} rows in {checkpoint.chunks} chunks, "
+              f"{elapsed:.1f} s ({paused:.0f} s paused)")
+        return checkpoint
+
+
+def connect_replicas(connection_config):
+    """Connections to the BACKFILL_REPLICAS hosts with the primary's credentials."""
+    replicas = []
+    for replica in REPLICAS:
+        host, _, port = replica.strip().partition(':')
+        db = DatabaseConnection(host, connection_config['user'], connection_config['password'],
+                                connection_config['database'], int(port or connection_config['port']))
+        if not db.connect():
+            exit(1)
+        replicas.append(db)
+    return replicas
+
+
+def backfill(database_name, table_name, column, expression, where=None, local=False, checkpoint_path=None):
+    """Backfill one column on staging (or the local stand-in) with throttling and a resumable checkpoint."""
+    connection_config = get_local_config(database_name) if local else get_staging_config(database_name)
+    checkpoint_path = checkpoint_path or f"backfill-{database_name}.{table_name}.{column}.json"
+    identity = {'database': database_name, 'table': table_name, 'column': column, 'expression': expression, 'where': where}
+
+    print("🔁 Throttled Backfill")
+    print("=" * 60)
+    try:
+        checkpoint = Checkpoint.load(checkpoint_path, identity)
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+    if checkpoint.last_key is not None and not checkpoint.completed:
+        print(f"⏯️  Resuming after key {checkpoint.last_key} ({checkpoint.rows_updated:,} rows done)")
+
+    db = DatabaseConnection(**connection_config)
+    if not db.connect():
+        exit(1)
+    replicas = connect_replicas(connection_config)
+    try:
+        runner = BackfillRunner(db, table_name, column, expression, where, checkpoint, Throttle(db, replicas))
+        runner.prepare()
+        print(f"📋 {table_name}.{column} = {expression} by {runner.index_name} ({', '.join(runner.key_columns)}), "
+              f"checkpoint {checkpoint_path}")
+        return runner.run()
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+    except mysql_connector.Error as e:
+        print(f"❌ Backfill stopped: {e} (rerun to resume from {checkpoint_path})")
+        exit(1)
+    finally:
+        for replica in replicas:
+            replica.close()
+        db.close()
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for option in ('--where', '--checkpoint'):
+        if option in args:
+            position = args.index(option)
+            options[option] = args[position + 1]
+            del args[position:position + 2]
+    local = '--local' in args
+    args = [arg for arg in args if arg != '--local']
+
+    if len(args) != 4:
+        print('Usage: python backfill.py <database> <table> <column> "<expression>" [--where "<condition>"] [--local] [--checkpoint FILE]')
+        exit(1)
+
+    backfill(args[0], args[1], args[2], args[3], options.get('--where'), local, options.get('--checkpoint'))
+
+
+if __name__ == "__main__":
+    main()
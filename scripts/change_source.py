@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+PR Change Sources
+Provides the list of files changed by a PR, their patches and their pre-PR
+content. GitHubChangeSource uses the REST API (pulls/{n}/files and
+contents/); GitChangeSource computes the same data from the checked-out
+repository with `git diff base...head` and a single `git cat-file --batch`
+process, without any network access.
+
+Both return files_data in the shape of the GitHub PR files API, which is what
+MigrationFileValidator.validate expects.
+
+Select with CHANGE_SOURCE=github (default) or CHANGE_SOURCE=git; the git
+source reads the base/head commits from GIT_BASE_REF/GIT_HEAD_REF or the
+pull_request event payload.
+"""
+
+import os
+import re
+import json
+import subprocess
+
+
+GIT_STATUS_NAMES = {
+    'A': 'added',
+    'D': 'removed',
+    'M': 'modified',
+    'R': 'renamed',
+    'C': 'copied',
+    'T': 'changed'
+}
+
+
+def load_event_payload():
+    """Return the GitHub Actions event payload, or {} when not available."""
+    event_path = os.getenv("GITHUB_EVENT_PATH")
+    if not event_path or not os.path.exists(event_path):
+        return {}
+    with open(event_path) as f:
+        return json.load(f)
+
+
+class ChangeSource:
+    """Base class for the source of a PR's changed files."""
+
+    def get_files_data(self):
+        """Return the changed files as a list of GitHub-style file dicts."""
+        raise NotImplementedError
+
+    def get_base_contents(self, filenames):
+        """Return {filename: content before the PR, or None if the file did not exist}."""
+        raise NotImplementedError
+
+
+class GitHubChangeSource(ChangeSource):
+    """Changed files from the GitHub REST API."""
+
+    def __init__(self, repo_full, token, pr_number):
+        self.repo_full = repo_full
+        self.token = token
+        self.pr_number = pr_number
+        self.headers = {
+            "Accept": "application/vnd.github.v3+json",
+            "Authorization": f"token {token}"
+        }
+
+    @classmethod
+    def from_environment(cls):
+        """Build the source from GITHUB_REPOSITORY, GITHUB_TOKEN and the PR number."""
+        if os.getenv("GITHUB_ACTIONS") == "true":
+            print("🔄 Running in GitHub Actions environment")
+            event = load_event_payload()
+            if not event and not os.getenv("GITHUB_PR"):
+                print("❌ GITHUB_EVENT_PATH not found!")
+                raise ValueError("GITHUB_EVENT_PATH not found!")
+            # workflow_dispatch passes the PR number as an input; pull_request events carry it
+            pr_number = os.getenv("GITHUB_PR") or event.get("pull_request", {}).get("number")
+        else:
+            print("🔄 Running in local environment")
+            pr_number = os.getenv("GITHUB_PR_NUMBER")
+            if not pr_number:
+                print("❌ GITHUB_PR_NUMBER not found in config.env!")
+                raise ValueError("GITHUB_PR_NUMBER not found in config.env!")
+
+        repo_full = os.getenv("GITHUB_REPOSITORY")
+        token = os.getenv("GITHUB_TOKEN")
+
+        if not repo_full or not token:
+            print("❌ Missing GitHub configuration:")
+            if not repo_full:
+                print("  - GITHUB_REPOSITORY")
+            if not token:
+                print("  - GITHUB_TOKEN")
+            raise ValueError("Missing GitHub configuration")
+
+        print(f"Repository: {repo_full}")
+        print(f"PR Number: {pr_number}")
+        return cls(repo_full, token, pr_number)
+
+    def get_files_data(self):
+        import requests
+
+        files_url = f"https://api.github.com/repos/{self.repo_full}/pulls/{self.pr_number}/files"
+        files_response = requests.get(files_url, headers=self.headers)
+
+        if files_response.status_code != 200:
+            print(f"❌ Error fetching PR files: {files_response.status_code}")
+            raise ConnectionError(f"Error fetching PR files: {files_response.status_code}")
+
+        return files_response.json()
+
+    def get_base_contents(self, filenames):
+        import base64
+        import requests
+
+        contents = {}
+        for filename in filenames:
+            file_content_url = f"https://api.github.com/repos/{self.repo_full}/contents/{filename}"
+            file_response = requests.get(file_content_url, headers=self.headers)
+
+            if file_response.status_code == 200:
+                contents[filename] = base64.b64decode(file_response.json()['content']).decode('utf-8')
+            else:
+                print(f"⚠️  Could not fetch {filename} (Status: {file_response.status_code})")
+                contents[filename] = None
+        return contents
+
+
+class GitChangeSource(ChangeSource):
+    """Changed files computed from the local git checkout."""
+
+    def __init__(self, base, head='HEAD', repo_path='.'):
+        self.base = base
+        self.head = head
+        self.repo_path = repo_path
+        self._merge_base = None
+
+    @classmethod
+    def from_environment(cls):
+        """Build the source from GIT_BASE_REF/GIT_HEAD_REF or the pull_request event payload."""
+        pull_request = load_event_payload().get("pull_request", {})
+        base = os.getenv("GIT_BASE_REF") or pull_request.get("base", {}).get("sha")
+        head = os.getenv("GIT_HEAD_REF") or pull_request.get("head", {}).get("sha") or 'HEAD'
+
+        if not base:
+            print("❌ GIT_BASE_REF not set and no pull_request event payload found!")
+            raise ValueError("GIT_BASE_REF not set")
+
+        print("🔄 Reading PR changes from the local git checkout")
+        print(f"Comparing: {base}...{head}")
+        return cls(base, head)
+
+    def run_git(self, *args, input_data=None):
+        """Run a git command and return its stdout as bytes."""
+        completed = subprocess.run(
+            ['git', '-C', self.repo_path] + list(args),
+            input=input_data, capture_output=True
+        )
+        if completed.returncode != 0:
+            error = completed.stderr.decode('utf-8', 'replace').strip()
+            print(f"❌ git {args[0]} failed: {error}")
+            raise RuntimeError(f"git {args[0]} failed: {error}")
+        return completed.stdout
+
+    def get_merge_base(self):
+        """Return the commit `git diff base...head` compares against."""
+        if self._merge_base is None:
+            self._merge_base = self.run_git('merge-base', self.base, self.head).decode().strip()
+        return self._merge_base
+
+    def get_files_data(self):
+        range_spec = f"{self.base}...{self.head}"
+        diff_options = ['--no-color', '--no-ext-diff', '-M']
+
+        name_status = self.run_git('diff', '--name-status', '-z', *diff_options, range_spec)
+        numstat = self.run_git('diff', '--numstat', '-z', *diff_options, range_spec)
+        patches = self.run_git('diff', *diff_options, range_spec)
+
+        files_data = []
+        for status, filename, previous_filename in self.parse_name_status(name_status):
+            file_info = {'filename': filename, 'status': GIT_STATUS_NAMES.get(status[0], 'modified')}
+            if previous_filename:
+                file_info['previous_filename'] = previous_filename
+            files_data.append(file_info)
+
+        # All three commands walk the same diff queue, so their entries line up one to one
+        for file_info, (additions, deletions) in zip(files_data, self.parse_numstat(numstat)):
+            file_info['additions'] = additions
+            file_info['deletions'] = deletions
+            file_info['changes'] = additions + deletions
+
+        for file_info, patch in zip(files_data, self.split_patches(patches)):
+            # Like the API, binary files and pure renames have no patch
+            if patch:
+                file_info['patch'] = patch
+
+        return files_data
+
+    def get_base_contents(self, filenames):
+        merge_base = self.get_merge_base()
+        blobs = self.read_blobs([f"{merge_base}:{filename}" for filename in filenames])
+        return dict(zip(filenames, blobs))
+
+    def read_blobs(self, revisions):
+        """Read many blobs with one `git cat-file --batch`; missing blobs come back as None."""
+        if not revisions:
+            return []
+
+        output = self.run_git('cat-file', '--batch', input_data=''.join(f"{rev}\n" for rev in revisions).encode('utf-8'))
+
+        blobs = []
+        position = 0
+        for _ in revisions:
+            header_end = output.index(b'\n', position)
+            header = output[position:header_end].split()
+            position = header_end + 1
+
+            if len(header) != 3 or header[1] != b'blob':
+                # "<rev> missing" (file did not exist at that commit) or a non-blob object
+                blobs.append(None)
+                continue
+
+            size = int(header[2])
+            blobs.append(output[position:position + size].decode('utf-8', 'replace'))
+            position += size + 1  # content is followed by a newline
+
+        return blobs
+
+    @staticmethod
+    def parse_name_status(output):
+        """Parse `git diff --name-status -z` into (status, filename, previous_filename) tuples."""
+        tokens = output.decode('utf-8', 'replace').split('\0')
+        entries = []
+        i = 0
+        while i < len(tokens) and tokens[i]:
+            status = tokens[i]
+            if status[0] in 'RC':
+                entries.append((status, tokens[i + 2], tokens[i + 1]))
+                i += 3
+            else:
+                entries.append((status, tokens[i + 1], None))
+                i += 2
+        return entries
+
+    @staticmethod
+    def parse_numstat(output):
+        """Parse `git diff --numstat -z` into (additions, deletions) tuples."""
+        tokens = output.decode('utf-8', 'replace').split('\0')
+        counts = []
+        i = 0
+        while i < len(tokens) and tokens[i]:
+            additions, deletions, path = tokens[i].split('\t', 2)
+            # Binary files report "-" for both counts
+            counts.append((int(additions) if additions != '-' else 0, int(deletions) if deletions != '-' else 0))
+            # Renames/copies have an empty path followed by the old and new paths
+            i += 3 if path == '' else 1
+        return counts
+
+    @staticmethod
+    def split_patches(output):
+        """Split `git diff` output into per-file patches starting at the first hunk header."""
+        text = output.decode('utf-8', 'replace')
+        patches = []
+        for section in re.split(r'^diff --git ', text, flags=re.MULTILINE)[1:]:
+            hunk_start = re.search(r'^@@ ', section, re.MULTILINE)
+            patches.append(section[hunk_start.start():].rstrip('\n') if hunk_start else None)
+        return patches
+
+
+def get_change_source():
+    """Return the change source selected by CHANGE_SOURCE (github or git)."""
+    if os.getenv("GITHUB_ACTIONS") != "true":
+        from dotenv import load_dotenv
+        load_dotenv('config.env')
+
+    source_name = os.getenv("CHANGE_SOURCE", "github").lower()
+    if source_name == "git":
+        return GitChangeSource.from_environment()
+    if source_name == "github":
+        return GitHubChangeSource.from_environment()
+
+    print(f"❌ Unknown CHANGE_SOURCE: {source_name} (expected 'github' or 'git')")
+    raise ValueError(f"Unknown CHANGE_SOURCE: {source_name}")
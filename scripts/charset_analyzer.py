@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""
+Charset / Collation Migration Analyzer
+Finds character set and collation changes in a migration's parsed
+operations (CONVERT TO CHARACTER SET, table default changes, MODIFY/CHANGE
+COLUMN with a new charset, new tables) and works out what they cost:
+
+- indexes whose key grows past InnoDB's 3072-byte limit (767 bytes per key
+  part for COMPACT/REDUNDANT tables) once characters take more bytes
+- the size of the tables that must be rebuilt, from staging's
+  information_schema.TABLES DATA_LENGTH + INDEX_LENGTH (with --staging)
+- joins between tables (foreign keys, and same-named columns indexed in
+  both tables) whose collations differ after the change and can no longer
+  use an index
+
+The schema before the migration is read from the seed*.sql files next to it.
+--convert-to analyzes converting every table of a directory instead.
+
+Usage: python charset_analyzer.py <MYSQL/<env>/<db>/V{n}__name.sql> [--staging]
+       python charset_analyzer.py <MYSQL/<env>/<db>> --convert-to utf8mb4[:collation] [--staging]
+"""
+
+import os
+import re
+import sys
+import copy
+import glob
+from sql_ddl_parser import SQLDDLParser
+from seed_index import get_seed_index
+from schema_model import find_closing_paren
+
+
+MAX_KEY_BYTES = 3072
+MAX_COMPACT_KEY_PART_BYTES = 767
+
+CHARSET_MAX_BYTES = {
+    'ascii': 1, 'latin1': 1, 'binary': 1, 'ucs2': 2, 'utf8mb3': 3, 'utf8mb4': 4, 'utf16': 4, 'utf32': 4
+}
+
+DEFAULT_COLLATIONS = {
+    'ascii': 'ascii_general_ci',
+    'latin1': 'latin1_swedish_ci',
+    'binary': 'binary',
+    'utf8mb3': 'utf8mb3_general_ci',
+    'utf8mb4': 'utf8mb4_0900_ai_ci'
+}
+
+# Used when the seed files have no CREATE DATABASE (MySQL 8.0's character_set_server)
+SERVER_DEFAULT_CHARSET = ('utf8mb4', 'utf8mb4_0900_ai_ci')
+
+STRING_TYPES = ('char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext', 'enum', 'set')
+TEXT_TYPES = ('tinytext', 'text', 'mediumtext', 'longtext')
+
+FIXED_TYPE_BYTES = {
+    'tinyint': 1, 'smallint': 2, 'mediumint': 3, 'int': 4, 'integer': 4, 'bigint': 8,
+    'float': 4, 'double': 8, 'real': 8, 'date': 3, 'year': 1, 'enum': 2, 'set': 8, 'bit': 8,
+    # Temporal types with fractional seconds add (fsp + 1) // 2 bytes
+    'time': 3, 'datetime': 5, 'timestamp': 4
+}
+
+TABLE_CHARSET_PATTERN = re.compile(r'\b(?:CHARSET|CHARACTER\s+SET)\s*=?\s*(\w+)', re.IGNORECASE)
+TABLE_COLLATE_PATTERN = re.compile(r'\bCOLLATE\s*=?\s*(\w+)', re.IGNORECASE)
+ROW_FORMAT_PATTERN = re.compile(r'\bROW_FORMAT\s*=?\s*(\w+)', re.IGNORECASE)
+CONVERT_TO_PATTERN = re.compile(r'^CONVERT\s+TO\s+(?:CHARACTER\s+SET|CHARSET)\s*=?\s*(\w+)(?:\s+COLLATE\s*=?\s*(\w+))?', re.IGNORECASE)
+DEFAULT_CHARSET_PATTERN = re.compile(r'^(?:DEFAULT\s+)?(?:(?:CHARACTER\s+SET|CHARSET)\s*=?\s*(\w+))?\s*(?:COLLATE\s*=?\s*(\w+))?$', re.IGNORECASE)
+DATABASE_CHARSET_PATTERN = re.compile(
+    r'CREATE\s+(?:DATABASE|SCHEMA)\b[^;]*?\b(?:CHARACTER\s+SET|CHARSET)\s*=?\s*(\w+)(?:[^;]*?\bCOLLATE\s*=?\s*(\w+))?',
+    re.IGNORECASE
+)
+KEY_PART_PATTERN = re.compile(r'[`"]?(\w+)[`"]?\s*(?:\((\d+)\))?')
+
+
+def normalize_charset(charset):
+    charset = charset.lower()
+    return 'utf8mb3' if charset == 'utf8' else charset
+
+
+def normalize_collation(collation):
+    collation = collation.lower()
+    return 'utf8mb3' + collation[4:] if collation.startswith('utf8_') else collation
+
+
+def resolve_charset(charset=None, collation=None, default=None):
+    """Return (charset, collation) the way MySQL completes a partial specification."""
+    if collation:
+        collation = normalize_collation(collation)
+        return collation.split('_', 1)[0], collation
+    if charset:
+        charset = normalize_charset(charset)
+        return charset, DEFAULT_COLLATIONS.get(charset, f"{charset}_general_ci")
+    return default
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024.0
+
+
+class TableCharsets:
+    """Character sets, collations and key parts of one table."""
+
+    def __init__(self, name, charset=None, row_format=None):
+        self.name = name
+        self.charset = charset      # (charset, collation) table default
+        self.row_format = row_format
+        self.columns = {}           # lowercased name -> {'name', 'type', 'charset': (charset, collation) or None}
+        self.keys = {}              # lowercased name -> {'name', 'parts': [(column, prefix length or None)]}
+        self.foreign_keys = []      # [{'columns', 'referenced_table', 'referenced_columns'}]
+
+    @classmethod
+    def from_create_statement(cls, statement, parser=None, database_default=SERVER_DEFAULT_CHARSET):
+        """Tables without a CHARSET/COLLATE option get database_default, as MySQL does."""
+        parser = parser or SQLDDLParser()
+        name_match = re.search(r'CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?[`"]?(\w+)[`"]?', statement, re.IGNORECASE)
+        open_index = statement.find('(', name_match.end() if name_match else 0)
+        close_index = find_closing_paren(statement, open_index) if open_index >= 0 else -1
+        options = statement[close_index + 1:] if close_index >= 0 else ''
+
+        charset_match = TABLE_CHARSET_PATTERN.search(options)
+        collate_match = TABLE_COLLATE_PATTERN.search(options)
+        row_format_match = ROW_FORMAT_PATTERN.search(options)
+        table = cls(
+            name_match.group(1) if name_match else 'unknown_table',
+            resolve_charset(charset_match and charset_match.group(1), collate_match and collate_match.group(1), database_default),
+            row_format_match.group(1).upper() if row_format_match else None
+        )
+        if close_index < 0:
+            return table
+
+        columns, indexes, constraints = parser.parse_table_definition(statement[open_index + 1:close_index])
+        for column in columns:
+            table.set_column(column)
+        for index in indexes:
+            table.set_key(index['name'], index['columns'])
+        for constraint in constraints:
+            if constraint['type'] == 'PRIMARY_KEY':
+                table.set_key('PRIMARY', constraint['columns'])
+            elif constraint['type'] == 'UNIQUE':
+                table.set_key(constraint['name'], constraint['columns'])
+            elif constraint['type'] == 'FOREIGN_KEY':
+                table.foreign_keys.append({
+                    'columns': constraint['columns'],
+                    'referenced_table': constraint['referenced_table'],
+                    'referenced_columns': constraint['referenced_columns']
+                })
+        return table
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def set_column(self, attrs):
+        """Add or replace a column from SQLDDLParser.parse_column_definition attributes."""
+        column_type = attrs.get('COLUMN_TYPE', '')
+        charset = None
+        if column_type.split('(', 1)[0].lower() in STRING_TYPES:
+            charset = resolve_charset(attrs.get('CHARACTER_SET_NAME'), attrs.get('COLLATION_NAME'), self.charset)
+        self.columns[attrs['COLUMN_NAME'].lower()] = {'name': attrs['COLUMN_NAME'], 'type': column_type, 'charset': charset}
+
+    def set_key(self, name, columns):
+        parts = []
+        for column in columns:
+            match = KEY_PART_PATTERN.match(column.strip())
+            if match:
+                parts.append((match.group(1).lower(), int(match.group(2)) if match.group(2) else None))
+        self.keys[name.lower()] = {'name': name, 'parts': parts}
+
+    def convert_to(self, charset):
+        """CONVERT TO CHARACTER SET: every string column and the table default."""
+        self.charset = charset
+        for column in self.columns.values():
+            if column['charset'] is not None:
+                column['charset'] = charset
+
+    def key_part_bytes(self, column_name, prefix):
+        """Maximum bytes a key part takes, or None if it cannot be computed."""
+        column = self.columns.get(column_name)
+        if column is None:
+            return None
+        base = column['type'].split('(', 1)[0].lower()
+        length_match = re.search(r'\((\d+)', column['type'])
+        length = int(length_match.group(1)) if length_match else None
+
+        if base in ('char', 'varchar') or base in TEXT_TYPES:
+            characters = prefix or (length if base in ('char', 'varchar') else None)
+            return characters * CHARSET_MAX_BYTES.get(column['charset'][0], 4) if characters else None
+        if base in ('binary', 'varbinary', 'tinyblob', 'blob', 'mediumblob', 'longblob'):
+            return prefix or length
+        if base == 'decimal':
+            return (length or 10) // 2 + 1
+        if base in FIXED_TYPE_BYTES:
+            extra = (length + 1) // 2 if base in ('time', 'datetime', 'timestamp') and length else 0
+            return FIXED_TYPE_BYTES[base] + extra
+        return 8
+
+    def key_bytes(self, key):
+        """Return (total bytes, largest key part bytes) of a key."""
+        sizes = [self.key_part_bytes(column, prefix) or 0 for column, prefix in key['parts']]
+        return sum(sizes), max(sizes, default=0)
+
+    def key_limit(self):
+        """(total key limit, per-part limit) for the table's row format."""
+        if self.row_format in ('COMPACT', 'REDUNDANT'):
+            return MAX_KEY_BYTES, MAX_COMPACT_KEY_PART_BYTES
+        return MAX_KEY_BYTES, MAX_KEY_BYTES
+
+    def indexed_leading_columns(self):
+        return {key['parts'][0][0] for key in self.keys.values() if key['parts']}
+
+
+def database_charset(sql_content, default=SERVER_DEFAULT_CHARSET):
+    """(charset, collation) from the content's CREATE DATABASE (mysqldump puts it in a /*!40100 */ comment)."""
+    match = DATABASE_CHARSET_PATTERN.search(sql_content)
+    return resolve_charset(match.group(1), match.group(2)) if match else default
+
+
+def load_schema(seed_files):
+    """
+    Read the tables of the seed files.
+
+    Returns:
+        tuple: ({table name: TableCharsets}, database default (charset, collation))
+    """
+    contents = []
+    for seed_file in seed_files:
+        with open(seed_file, encoding='utf-8') as f:
+            contents.append(f.read())
+    database_default = next(filter(None, (database_charset(content, None) for content in contents)), SERVER_DEFAULT_CHARSET)
+
+    parser = SQLDDLParser()
+    tables = {}
+    for content in contents:
+        index = get_seed_index(content)
+        for table_name in index.table_names():
+            table = TableCharsets.from_create_statement(index.get_definition(table_name), parser, database_default)
+            tables[table.name] = table
+    return tables, database_default
+
+
+class CharsetAnalyzer:
+    """Simulates charset changes on a copy of the schema and reports their cost."""
+
+    def __init__(self, tables, database_default=SERVER_DEFAULT_CHARSET):
+        self.before = tables
+        self.database_default = database_default   # charset of tables created without one
+        self.after = dict(tables)
+        self.changes = []            # [{'table', 'scope', 'before', 'after'}]
+        self.rebuilt_tables = set()  # tables whose existing data is converted
+        self.touched_tables = set()
+
+    def table_for_update(self, table_name):
+        """Copy-on-write: tables are only copied once the migration changes them."""
+        table = self.after.get(table_name)
+        if table is None:
+            return None
+        if table is self.before.get(table_name):
+            table = self.after[table_name] = table.copy()
+        self.touched_tables.add(table_name)
+        return table
+
+    def apply_operations(self, operations):
+        for operation in operations:
+            self.apply_operation(operation)
+        return self.changes
+
+    def apply_operation(self, operation):
+        table_name = operation['table']
+        command = operation['command']
+
+        if command == 'CREATE_TABLE':
+            table = TableCharsets.from_create_statement(operation['full_statement'], database_default=self.database_default)
+            self.after[table_name] = table
+            self.touched_tables.add(table_name)
+            self.changes.append({'table': table_name, 'scope': 'new table', 'before': None, 'after': table.charset})
+            return
+        if command == 'DROP_TABLE':
+            self.after.pop(table_name, None)
+            self.touched_tables.discard(table_name)
+            return
+        if command != 'ALTER_TABLE':
+            return
+
+        table = self.table_for_update(table_name)
+        if table is None:
+            return
+        clause = operation.get('clause', '').strip()
+        target_type = operation.get('target_type')
+
+        if target_type == 'unknown':
+            convert_match = CONVERT_TO_PATTERN.match(clause)
+            default_match = DEFAULT_CHARSET_PATTERN.match(clause) if not convert_match else None
+            if convert_match:
+                charset = resolve_charset(convert_match.group(1), convert_match.group(2))
+                if charset != table.charset or any(column['charset'] not in (None, charset) for column in table.columns.values()):
+                    self.changes.append({'table': table_name, 'scope': 'CONVERT TO', 'before': table.charset, 'after': charset})
+                    self.rebuilt_tables.add(table_name)
+                table.convert_to(charset)
+            elif default_match and (default_match.group(1) or default_match.group(2)):
+                charset = resolve_charset(default_match.group(1), default_match.group(2))
+                if charset != table.charset:
+                    self.changes.append({'table': table_name, 'scope': 'table default', 'before': table.charset, 'after': charset})
+                table.charset = charset
+
+        elif target_type == 'COLUMN' and operation.get('operation') in ('ADD', 'MODIFY', 'CHANGE'):
+            details = operation.get('details', {})
+            if not details.get('COLUMN_NAME'):
+                return
+            old_name = operation['target']
+            if operation['operation'] == 'CHANGE':
+                old_name_match = re.match(r'CHANGE\s+(?:COLUMN\s+)?[`"]?(\w+)[`"]?', clause, re.IGNORECASE)
+                old_name = old_name_match.group(1) if old_name_match else old_name
+            old_column = table.columns.pop(old_name.lower(), None) if operation['operation'] != 'ADD' else None
+            table.set_column(details)
+            new_column = table.columns[details['COLUMN_NAME'].lower()]
+            if old_column and old_column['charset'] and new_column['charset'] and old_column['charset'] != new_column['charset']:
+                self.changes.append({
+                    'table': table_name, 'scope': f"column {new_column['name']}",
+                    'before': old_column['charset'], 'after': new_column['charset']
+                })
+                self.rebuilt_tables.add(table_name)
+
+        elif target_type == 'INDEX' and operation.get('operation') == 'ADD':
+            table.set_key(operation['target'], operation.get('details', {}).get('columns', []))
+        elif target_type == 'PRIMARY_KEY' and operation.get('operation') == 'ADD':
+            table.set_key('PRIMARY', operation.get('details', {}).get('columns', []))
+
+    def key_limit_problems(self):
+        """Keys of changed tables that exceed the key length limits after the migration."""
+        problems = []
+        for table_name in sorted(self.touched_tables):
+            table = self.after[table_name]
+            before_table = self.before.get(table_name)
+            total_limit, part_limit = table.key_limit()
+            for key in table.keys.values():
+                total, largest_part = table.key_bytes(key)
+                if total <= total_limit and largest_part <= part_limit:
+                    continue
+                before_total = before_table.key_bytes(key)[0] if before_table and key['name'].lower() in before_table.keys else None
+                problems.append({
+                    'table': table_name, 'key': key['name'], 'bytes': total, 'largest_part': largest_part,
+                    'before': before_total, 'limit': total_limit if total > total_limit else part_limit
+                })
+        return problems
+
+    def join_pairs(self, tables):
+        """Candidate join columns: foreign keys, and same-named string columns indexed in both tables."""
+        pairs = set()
+        for table in tables.values():
+            for foreign_key in table.foreign_keys:
+                if foreign_key['referenced_table'] in tables:
+                    for column, referenced_column in zip(foreign_key['columns'], foreign_key['referenced_columns']):
+                        pairs.add(tuple(sorted([(table.name, column.lower()), (foreign_key['referenced_table'], referenced_column.lower())])))
+
+        by_column = {}
+        for table in tables.values():
+            for key, column in table.columns.items():
+                if column['charset']:
+                    by_column.setdefault(key, []).append(table)
+        for column_name, column_tables in by_column.items():
+            for i, first in enumerate(column_tables):
+                for second in column_tables[i + 1:]:
+                    if column_name in first.indexed_leading_columns() and column_name in second.indexed_leading_columns():
+                        pairs.add(tuple(sorted([(first.name, column_name), (second.name, column_name)])))
+        return pairs
+
+    def join_mismatches(self):
+        """Join column pairs whose collations match before the migration and differ after it."""
+        mismatches = []
+        for (first_table, first_column), (second_table, second_column) in sorted(self.join_pairs(self.after)):
+            if first_table not in self.touched_tables and second_table not in self.touched_tables:
+                continue
+            first = self.after[first_table].columns.get(first_column)
+            second = self.after[second_table].columns.get(second_column)
+            if not first or not second or not first['charset'] or not second['charset'] or first['charset'] == second['charset']:
+                continue
+
+            before_first = self.before.get(first_table) and self.before[first_table].columns.get(first_column)
+            before_second = self.before.get(second_table) and self.before[second_table].columns.get(second_column)
+            if before_first and before_second and before_first['charset'] != before_second['charset']:
+                continue  # already mismatched before this migration
+
+            if first['charset'][0] == second['charset'][0]:
+                effect = "comparisons fail with 'Illegal mix of collations' unless one side is COLLATEd"
+            else:
+                # MySQL converts the column with the narrower charset, which disables its index
+                narrower = (first_table, first_column, first) if CHARSET_MAX_BYTES.get(first['charset'][0], 4) < CHARSET_MAX_BYTES.get(second['charset'][0], 4) else (second_table, second_column, second)
+                effect = f"{narrower[0]}.{narrower[1]} is converted to compare, so its index cannot be used"
+            mismatches.append({
+                'left': f"{first_table}.{first_column}", 'left_collation': first['charset'][1],
+                'right': f"{second_table}.{second_column}", 'right_collation': second['charset'][1],
+                'effect': effect
+            })
+        return mismatches
+
+
+def fetch_table_sizes(database_name, table_names):
+    """Return {table: (DATA_LENGTH, INDEX_LENGTH, TABLE_ROWS)} from staging's information_schema."""
+    from ddl_validator import DatabaseConnection, get_staging_config, mysql_connector
+
+    db = DatabaseConnection(**get_staging_config(database_name))
+    if not db.connect():
+        return {}
+    try:
+        placeholders = ', '.join(['%s'] * len(table_names))
+        db.cursor.execute(
+            f"SELECT table_name AS table_name, data_length AS data_length, index_length AS index_length, "
+            f"table_rows AS table_rows FROM information_schema.TABLES "
+            f"WHERE table_schema = %s AND table_name IN ({placeholders})",
+            [database_name] + list(table_names)
+        )
+        return {
+            row['table_name']: (int(row['data_length'] or 0), int(row['index_length'] or 0), int(row['table_rows'] or 0))
+            for row in db.cursor.fetchall()
+        }
+    except mysql_connector.Error as e:
+        print(f"❌ Could not read table sizes from staging: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+def print_report(analyzer, table_sizes=None):
+    def charset_label(charset):
+        return f"{charset[0]}/{charset[1]}" if charset else "-"
+
+    print(f"\n📋 Charset/collation changes: {len(analyzer.changes)}")
+    for change in analyzer.changes:
+        print(f"  {change['table']} ({change['scope']}): {charset_label(change['before'])} -> {charset_label(change['after'])}")
+
+    problems = analyzer.key_limit_problems()
+    print(f"\n🔑 Keys over the length limit: {len(problems)}")
+    for problem in problems:
+        before = f" (was {problem['before']} bytes)" if problem['before'] is not None else ""
+        print(f"  ❌ {problem['table']}.{problem['key']}: {problem['bytes']} bytes, largest part "
+              f"{problem['largest_part']} bytes, limit {problem['limit']}{before}")
+
+    print(f"\n🔄 Tables rebuilt to convert data: {len(analyzer.rebuilt_tables)}")
+    total = 0
+    for table_name in sorted(analyzer.rebuilt_tables):
+        if table_sizes and table_name in table_sizes:
+            data_length, index_length, rows = table_sizes[table_name]
+            total += data_length + index_length
+            print(f"  {table_name}: ~{rows:,} rows, data {format_bytes(data_length)} + indexes {format_bytes(index_length)}")
+        else:
+            print(f"  {table_name}: size unknown" + ("" if table_sizes is not None else " (use --staging)"))
+    if total:
+        print(f"  Total rewritten: {format_bytes(total)} (needs about as much free disk while each copy runs)")
+
+    mismatches = analyzer.join_mismatches()
+    print(f"\n🔗 Joins whose collations now differ: {len(mismatches)}")
+    for mismatch in mismatches:
+        print(f"  ⚠️  {mismatch['left']} ({mismatch['left_collation']}) = {mismatch['right']} ({mismatch['right_collation']}): {mismatch['effect']}")
+
+    return bool(problems)
+
+
+def analyze(path, convert_to=None, use_staging=False):
+    """Analyze a migration file (or a directory with convert_to); returns True if a key exceeds the limit."""
+    directory = path if os.path.isdir(path) else os.path.dirname(path)
+    database_name = os.path.basename(os.path.abspath(directory))
+
+    print("🔤 Charset/Collation Migration Analyzer")
+    print("=" * 60)
+    tables, database_default = load_schema(sorted(glob.glob(os.path.join(directory, 'seed*.sql'))))
+    print(f"Schema: {database_name} ({len(tables)} tables from seed files, default {database_default[1]})")
+
+    if convert_to:
+        charset_name, _, collation_name = convert_to.partition(':')
+        clause = f"CONVERT TO CHARACTER SET {charset_name}" + (f" COLLATE {collation_name}" if collation_name else "")
+        print(f"Plan: {clause} on every table")
+        operations = [
+            {'command': 'ALTER_TABLE', 'database': database_name, 'table': table_name, 'operation': 'UNKNOWN',
+             'target': 'unknown', 'target_type': 'unknown', 'details': {}, 'clause': clause}
+            for table_name in tables
+        ]
+    else:
+        parser = SQLDDLParser()
+        with open(path, encoding='utf-8') as f:
+            parser.parse_sql_file(f.read(), path)
+        operations = parser.get_operations()
+        print(f"Migration: {path} ({len(operations)} operations)")
+
+    analyzer = CharsetAnalyzer(tables, database_default)
+    analyzer.apply_operations(operations)
+
+    table_sizes = fetch_table_sizes(database_name, sorted(analyzer.rebuilt_tables)) if use_staging and analyzer.rebuilt_tables else None
+    return print_report(analyzer, table_sizes)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    convert_to = None
+    if '--convert-to' in sys.argv:
+        position = sys.argv.index('--convert-to')
+        convert_to = sys.argv[position + 1] if position + 1 < len(sys.argv) else None
+        args = [arg for arg in args if arg != convert_to]
+
+    if not args or ('--convert-to' in sys.argv and not convert_to):
+        print("Usage: python charset_analyzer.py <MYSQL/<env>/<db>/V{n}__name.sql> [--staging]")
+        print("       python charset_analyzer.py <MYSQL/<env>/<db>> --convert-to utf8mb4[:collation] [--staging]")
+        exit(1)
+
+    if analyze(args[0], convert_to, '--staging' in sys.argv):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+Cold-Row Archiver
+Moves rows older than a cutoff (order_events, supply_order_mapping, ...) out
+of a table into compressed local files before they are purged, and can load
+them back.
+
+Archive: rows with <column> < cutoff (sessions run in UTC, as in
+data_dumper.py, so --before is UTC for a TIMESTAMP column) are streamed
+through an unbuffered cursor in key order (the primary key, or a NOT NULL
+unique key). If an index starts with the column, the scan is bounded by the
+largest old key, which that index finds cheaply.
+They are written as multi-row INSERT statements into rotating
+<db>.<table>.<nnnnn>.sql.gz files, the data_dumper.py chunk format that
+seed_loader.py reads. The CRC32 of every row is computed by the server while
+streaming. When a file is complete it is fsynced and recorded in
+manifest.json with its row count, key range, BIT_XOR of the row CRCs and
+SHA-256. The source is then checksummed over the file's key range on a
+second connection. With --delete the range is deleted in small batches: each
+batch's key range is read with FOR UPDATE and deleted in the same transaction
+only if its row count and CRC still match what was archived.
+
+Restore: the manifest's SHA-256 sums are checked, the table is created from
+the archived CREATE TABLE if it is missing (--into loads into another table),
+and the files are bulk-loaded with seed_loader.SeedLoader. Each file's key
+range is then checksummed on the target against the manifest.
+
+Bench: creates a scratch table on the local stand-in (LOCAL_DB_*), fills it
+with --rows synthetic rows, then archives with --delete and restores it,
+reporting rows/s and MB/s for both.
+
+Usage:
+    python cold_archiver.py archive <database> <table> <output dir> (--days N | --before "YYYY-MM-DD hh:mm:ss") [--column C] [--delete] [--local]
+    python cold_archiver.py restore <output dir>/manifest.json [--into TABLE] [--workers N] [--local]
+    python cold_archiver.py bench [--rows N]
+"""
+
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import hashlib
+import datetime
+import tempfile
+from ddl_validator import DatabaseConnection, get_local_config, get_staging_config, mysql_connector
+from data_dumper import FETCH_BATCH_ROWS, MAX_STATEMENT_BYTES, quote_identifier, set_session, sql_literal
+from backfill import key_comparison
+from table_checksum import choose_chunk_key, row_checksum_expression
+from schema_model import TableModel
+from seed_loader import DEFAULT_WORKERS as LOAD_WORKERS, LoadUnit, SeedLoader
+
+
+DEFAULT_FILE_ROWS = int(os.getenv("ARCHIVE_FILE_ROWS", "500000"))
+DELETE_BATCH_ROWS = int(os.getenv("ARCHIVE_DELETE_BATCH_ROWS", "1000"))
+BENCH_ROWS = 200000
+BENCH_TABLE = 'cold_archive_bench'
+
+
+def fsync_directory(path):
+    """Make a rename or new file in the directory durable."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_manifest(path, manifest):
+    """Atomically and durably replace the manifest."""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+    fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def key_range_condition(key_columns, archive_file, column):
+    """WHERE condition and parameters for the rows of one archive file."""
+    condition = (f"{key_comparison(key_columns, '>=')} AND {key_comparison(key_columns, '<=')} "
+                 f"AND {quote_identifier(column)} < %s")
+    return condition, list(archive_file['first_key']) + list(archive_file['last_key'])
+
+
+class ArchiveFile:
+    """One rotating archive file being written, and what the manifest records about it."""
+
+    def __init__(self, directory, database, table_name, index, columns):
+        self.name = f"{database}.{table_name}.{index:05d}.sql.gz"
+        self.path = os.path.join(directory, self.name)
+        self.raw = open(self.path, 'wb')
+        self.gzip = gzip.GzipFile(fileobj=self.raw, mode='wb', compresslevel=6)
+        self.insert_prefix = f"INSERT INTO {quote_identifier(table_name)} ({', '.join(quote_identifier(column) for column in columns)}) VALUES\n"
+        self.statement = []
+        self.statement_bytes = 0
+        self.rows = 0
+        self.crc = 0
+        self.raw_bytes = 0
+        self.first_key = None
+        self.last_key = None
+        self.batches = []       # (last key, rows, crc) per DELETE_BATCH_ROWS rows, checked before deleting
+        self.batch_rows = 0
+        self.batch_crc = 0
+
+    def add(self, values, key, row_crc):
+        self.statement.append(values)
+        self.statement_bytes += len(values) + 2
+        self.rows += 1
+        self.crc ^= row_crc
+        if self.first_key is None:
+            self.first_key = key
+        self.last_key = key
+        self.batch_rows += 1
+        self.batch_crc ^= row_crc
+        if self.batch_rows == DELETE_BATCH_ROWS:
+            self.end_batch()
+        if self.statement_bytes >= MAX_STATEMENT_BYTES:
+            self.write_statement()
+
+    def end_batch(self):
+        self.batches.append((self.last_key, self.batch_rows, self.batch_crc))
+        self.batch_rows = 0
+        self.batch_crc = 0
+
+    def write_statement(self):
+        text = (self.insert_prefix + ',\n'.join(self.statement) + ';\n').encode('utf-8')
+        self.gzip.write(text)
+        self.raw_bytes += len(text)
+        self.statement = []
+        self.statement_bytes = 0
+
+    def close(self):
+        """Finish and fsync the file; returns its manifest entry."""
+        if self.statement:
+            self.write_statement()
+        if self.batch_rows:
+            self.end_batch()
+        self.gzip.close()
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        self.raw.close()
+        fsync_directory(os.path.dirname(os.path.abspath(self.path)))
+        return {
+            'file': self.name,
+            'rows': self.rows,
+            'first_key': list(self.first_key),
+            'last_key': list(self.last_key),
+            'crc': self.crc,
+            'raw_bytes': self.raw_bytes,
+            'bytes': os.path.getsize(self.path),
+            'sha256': file_sha256(self.path),
+            'verified': False,
+            'deleted': 0
+        }
+
+
+class ColdArchiver:
+    """Archives a table's old rows: streams on one connection, verifies and deletes on another."""
+
+    def __init__(self, reader, writer, table_name, column, output_directory, file_rows=DEFAULT_FILE_ROWS, delete=False):
+        self.reader = reader
+        self.writer = writer
+        self.table_name = table_name
+        self.column = column
+        self.output_directory = output_directory
+        self.file_rows = file_rows
+        self.delete = delete
+        self.manifest_path = os.path.join(output_directory, 'manifest.json')
+        self.manifest = None
+        self.key_columns = None
+        self.column_indexed = False
+        self.crc = None
+
+    def prepare(self, cutoff):
+        """Read the table structure and start the manifest; raises ValueError if the table can't be archived."""
+        create_statement = self.writer.get_show_create_table(self.table_name)
+        if not create_statement:
+            raise ValueError(f"Table {self.table_name} not found")
+        table = TableModel.from_create_statement(create_statement)
+        if self.column.lower() not in table.columns:
+            raise ValueError(f"Column {self.table_name}.{self.column} not found")
+        key = choose_chunk_key(table)
+        if key is None:
+            raise ValueError(f"{self.table_name} has no primary key or NOT NULL unique key to archive by")
+
+        self.index_name, self.key_columns = key
+        leading_columns = [index['columns'][0] for index in table.indexes.values()] + table.primary_key[:1]
+        self.column_indexed = self.column.lower() in [column.lower() for column in leading_columns]
+        self.columns = [column['COLUMN_NAME'] for column in table.columns.values()]
+        self.crc = row_checksum_expression(table)
+        self.manifest = {
+            'database': self.writer.database,
+            'table': self.table_name,
+            'column': self.column,
+            'cutoff': cutoff,
+            'key_columns': self.key_columns,
+            'create_table': create_statement,
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'files': []
+        }
+
+    def verify_source(self, entry):
+        """True if the source still holds exactly the file's rows in its key range."""
+        condition, params = key_range_condition(self.key_columns, entry, self.column)
+        self.writer.cursor.execute(
+            f"SELECT COUNT(*) AS row_count, BIT_XOR({self.crc}) AS crc FROM {quote_identifier(self.table_name)} WHERE {condition}",
+            params + [self.manifest['cutoff']]
+        )
+        row = self.writer.cursor.fetchone()
+        self.writer.connection.commit()
+        return (row['row_count'], int(row['crc'])) == (entry['rows'], entry['crc'])
+
+    def delete_range(self, entry, batches):
+        """
+        Delete the file's rows from the source batch by batch. Each batch's key range is
+        locked and checked against the archived rows in the transaction that deletes it;
+        stops at the first batch that changed.
+
+        Returns:
+            int: rows deleted
+        """
+        name = quote_identifier(self.table_name)
+        deleted = 0
+        lower, lower_operator = entry['first_key'], '>='
+        for last_key, rows, crc in batches:
+            condition = (f"{key_comparison(self.key_columns, lower_operator)} AND {key_comparison(self.key_columns, '<=')} "
+                         f"AND {quote_identifier(self.column)} < %s")
+            params = list(lower) + list(last_key) + [self.manifest['cutoff']]
+            self.writer.cursor.execute(
+                f"SELECT COUNT(*) AS row_count, BIT_XOR({self.crc}) AS crc FROM {name} WHERE {condition} FOR UPDATE", params
+            )
+            row = self.writer.cursor.fetchone()
+            if (row['row_count'], int(row['crc'])) != (rows, crc):
+                self.writer.connection.rollback()
+                return deleted
+            self.writer.cursor.execute(f"DELETE FROM {name} WHERE {condition}", params)
+            deleted += self.writer.cursor.rowcount
+            self.writer.connection.commit()
+            lower, lower_operator = last_key, '>'
+        return deleted
+
+    def finish_file(self, archive_file, totals, start):
+        entry = archive_file.close()
+        self.manifest['files'].append(entry)
+        write_manifest(self.manifest_path, self.manifest)
+
+        entry['verified'] = self.verify_source(entry)
+        if not entry['verified']:
+            print(f"   ❌ {entry['file']}: source rows changed since they were streamed; keeping them")
+        elif self.delete:
+            entry['deleted'] = self.delete_range(entry, archive_file.batches)
+            if entry['deleted'] != entry['rows']:
+                print(f"   ⚠️  {entry['file']}: deleted {entry['deleted']:,} rows, archived {entry['rows']:,}")
+        write_manifest(self.manifest_path, self.manifest)
+
+        totals['rows'] += entry['rows']
+        totals['raw_bytes'] += entry['raw_bytes']
+        totals['bytes'] += entry['bytes']
+        elapsed = time.perf_counter() - start
+        deleted = f", {entry['deleted']:,} deleted" if self.delete and entry['verified'] else ''
+        print(f"   {'✅' if entry['verified'] else '❌'} {entry['file']}: {entry['rows']:,} rows, "
+              f"{entry['bytes'] / 1e6:,.1f} MB{deleted} ({totals['rows'] / elapsed:,.0f} rows/s)")
+
+    def archive(self):
+        """Stream the old rows into archive files; returns the manifest."""
+        cutoff = self.manifest['cutoff']
+        name = quote_identifier(self.table_name)
+        column = quote_identifier(self.column)
+
+        # Old rows have the smaller keys in an append-only table: bound the key scan by the
+        # largest old key, which the column's index (it holds the primary key) finds cheaply.
+        # Without such an index MAX() would read the whole table, so the scan runs to the end
+        first_key = quote_identifier(self.key_columns[0])
+        totals = {'rows': 0, 'raw_bytes': 0, 'bytes': 0}
+        bound_condition, parameters = '', (cutoff,)
+        if self.column_indexed:
+            self.writer.cursor.execute(f"SELECT MAX({first_key}) AS bound FROM {name} WHERE {column} < %s", (cutoff,))
+            bound = self.writer.cursor.fetchone()['bound']
+            self.writer.connection.commit()
+            if bound is None:
+                write_manifest(self.manifest_path, self.manifest)
+                return self.manifest, totals
+            bound_condition, parameters = f" AND {first_key} <= %s", (cutoff, bound)
+
+        order = ', '.join(quote_identifier(key_column) for key_column in self.key_columns)
+        key_positions = [[column_name.lower() for column_name in self.columns].index(key_column.lower()) for key_column in self.key_columns]
+        query = (f"SELECT {', '.join(quote_identifier(column_name) for column_name in self.columns)}, {self.crc} AS row_crc "
+                 f"FROM {name} FORCE INDEX ({quote_identifier(self.index_name)}) "
+                 f"WHERE {column} < %s{bound_condition} ORDER BY {order}")
+
+        start = time.perf_counter()
+        cursor = self.reader.connection.cursor(buffered=False)
+        archive_file = None
+        try:
+            cursor.execute(query, parameters)
+            while True:
+                rows = cursor.fetchmany(FETCH_BATCH_ROWS)
+                if not rows:
+                    break
+                for row in rows:
+                    if archive_file is None:
+                        archive_file = ArchiveFile(self.output_directory, self.writer.database, self.table_name,
+                                                   len(self.manifest['files']) + 1, self.columns)
+                    archive_file.add('(' + ','.join(sql_literal(value) for value in row[:-1]) + ')',
+                                     tuple(row[position] for position in key_positions), int(row[-1]))
+                    if archive_file.rows >= self.file_rows:
+                        self.finish_file(archive_file, totals, start)
+                        archive_file = None
+            if archive_file is not None:
+                self.finish_file(archive_file, totals, start)
+        finally:
+            cursor.close()
+        if not self.manifest['files']:
+            write_manifest(self.manifest_path, self.manifest)
+
+        totals['seconds'] = time.perf_counter() - start
+        return self.manifest, totals
+
+
+class RenamedLoadUnit(LoadUnit):
+    """An archive file's INSERTs, loaded into another table than the one they were archived from."""
+
+    __slots__ = ('source_table',)
+
+    def __init__(self, path, source_table, table_name):
+        super().__init__(path, table_name)
+        self.source_table = source_table
+
+    def iter_statements(self):
+        for statement in super().iter_statements():
+            yield statement.replace(quote_identifier(self.source_table), quote_identifier(self.table), 1)
+
+
+def print_archive_summary(totals, action):
+    seconds = totals.get('seconds', 0)
+    print("-" * 70)
+    print(f"✅ {action} {totals['rows']:,} rows, {totals['raw_bytes'] / 1e6:,.1f} MB "
+          f"({totals['bytes'] / 1e6:,.1f} MB compressed) in {seconds:.1f} s: "
+          f"{totals['rows'] / seconds if seconds else 0:,.0f} rows/s, {totals['raw_bytes'] / 1e6 / seconds if seconds else 0:,.1f} MB/s")
+
+
+def archive_table(database_name, table_name, output_directory, days=None, before=None, column='created_at',
+                  delete=False, local=False, file_rows=DEFAULT_FILE_ROWS):
+    """Archive (and with delete=True remove) a table's rows older than the cutoff; returns (manifest, totals)."""
+    if os.path.exists(os.path.join(output_directory, 'manifest.json')):
+        print(f"❌ {output_directory} already holds an archive")
+        exit(1)
+    os.makedirs(output_directory, exist_ok=True)
+    connection_config = get_local_config(database_name) if local else get_staging_config(database_name)
+
+    print(f"🧊 Cold-Row Archive{' and delete' if delete else ''}")
+    print("=" * 60)
+    reader = DatabaseConnection(**connection_config)
+    writer = DatabaseConnection(**connection_config)
+    if not (reader.connect() and writer.connect()):
+        exit(1)
+    try:
+        # Both sessions see TIMESTAMPs in UTC, so the streamed literals and both CRCs agree
+        set_session(reader)
+        set_session(writer)
+        if before is None:
+            writer.cursor.execute("SELECT NOW() - INTERVAL %s DAY AS cutoff", (days,))
+            before = writer.cursor.fetchone()['cutoff']
+        archiver = ColdArchiver(reader, writer, table_name, column, output_directory, file_rows, delete)
+        archiver.prepare(str(before))
+        print(f"📋 {table_name}: {column} < {before}, by {archiver.index_name} ({', '.join(archiver.key_columns)})")
+        manifest, totals = archiver.archive()
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+    except mysql_connector.Error as e:
+        print(f"❌ Archive stopped: {e} (files completed so far are in {output_directory}/manifest.json)")
+        exit(1)
+    finally:
+        reader.close()
+        writer.close()
+
+    print_archive_summary(totals, 'Archived')
+    unverified = [entry['file'] for entry in manifest['files'] if not entry['verified']]
+    if unverified:
+        print(f"❌ Not verified (source rows kept): {', '.join(unverified)}")
+    return manifest, totals
+
+
+def restore_archive(manifest_path, into=None, local=False, workers=None):
+    """Load an archive back into its table (or `into`) and verify it; returns totals."""
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    directory = os.path.dirname(os.path.abspath(manifest_path))
+    table_name = into or manifest['table']
+    entries = [entry for entry in manifest['files'] if entry['rows']]
+
+    print("♻️  Cold-Row Restore")
+    print("=" * 60)
+    for entry in entries:
+        if file_sha256(os.path.join(directory, entry['file'])) != entry['sha256']:
+            print(f"❌ {entry['file']} does not match its SHA-256 in the manifest")
+            exit(1)
+    print(f"🔒 {len(entries)} archive file(s) match the manifest checksums")
+
+    connection_config = get_local_config(manifest['database']) if local else get_staging_config(manifest['database'])
+    db = DatabaseConnection(**connection_config)
+    if not db.connect():
+        exit(1)
+    try:
+        # Checksum in the session the files were archived and are loaded in
+        set_session(db)
+        db.cursor.execute("""
+            SELECT COUNT(*) AS found FROM information_schema.TABLES WHERE table_schema = %s AND table_name = %s
+        """, (db.database, table_name))
+        if not db.cursor.fetchone()['found']:
+            create_statement = re.sub(r'^CREATE TABLE\s+`[^`]+`', f"CREATE TABLE {quote_identifier(table_name)}", manifest['create_table'])
+            db.cursor.execute(create_statement)
+            print(f"🏗️  Created {table_name}")
+
+        units = [
+            RenamedLoadUnit(os.path.join(directory, entry['file']), manifest['table'], into) if into
+            else LoadUnit(os.path.join(directory, entry['file']), manifest['table'])
+            for entry in entries
+        ]
+        start = time.perf_counter()
+        loader = SeedLoader(connection_config, workers or LOAD_WORKERS)
+        try:
+            loader.load([], units)
+        finally:
+            loader.close()
+        seconds = time.perf_counter() - start
+
+        crc = row_checksum_expression(TableModel.from_create_statement(manifest['create_table']))
+        mismatched = []
+        for entry in entries:
+            condition, params = key_range_condition(manifest['key_columns'], entry, manifest['column'])
+            db.cursor.execute(
+                f"SELECT COUNT(*) AS row_count, BIT_XOR({crc}) AS crc FROM {quote_identifier(table_name)} WHERE {condition}",
+                params + [manifest['cutoff']]
+            )
+            row = db.cursor.fetchone()
+            if (row['row_count'], int(row['crc'])) != (entry['rows'], entry['crc']):
+                mismatched.append(entry['file'])
+    except mysql_connector.Error as e:
+        print(f"❌ Restore failed: {e}")
+        exit(1)
+    finally:
+        db.close()
+
+    totals = {
+        'rows': sum(entry['rows'] for entry in entries),
+        'raw_bytes': sum(entry['raw_bytes'] for entry in entries),
+        'bytes': sum(entry['bytes'] for entry in entries),
+        'seconds': seconds
+    }
+    print_archive_summary(totals, f"Restored into {table_name}")
+    if mismatched:
+        print(f"❌ Restored rows differ from the archive: {', '.join(mismatched)}")
+        exit(1)
+    print("🔒 Row counts and checksums match the manifest")
+    return totals
+
+
+def benchmark(rows=BENCH_ROWS):
+    """Archive-with-delete and restore throughput on a scratch table in the local stand-in."""
+    from mysql_query import MySQLQueryTool
+
+    database_name = os.getenv('LOCAL_DB_NAME', 'cold_archive_bench')
+    connection_config = get_local_config(database_name)
+    server = MySQLQueryTool(connection_config['host'], connection_config['user'], connection_config['password'], connection_config['port'])
+    if not server.connect():
+        exit(1)
+    try:
+        server.cursor.execute(f"CREATE DATABASE IF NOT EXISTS {quote_identifier(database_name)}")
+    finally:
+        server.close()
+
+    db = DatabaseConnection(**connection_config)
+    if not db.connect():
+        exit(1)
+    try:
+        db.cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        db.cursor.execute(f"""
+            CREATE TABLE {BENCH_TABLE} (
+              `id` bigint NOT NULL AUTO_INCREMENT,
+              `order_num` varchar(64) NOT NULL,
+              `status` varchar(20) NOT NULL,
+              `record` json NOT NULL,
+              `note` varchar(255) DEFAULT NULL,
+              `created_at` datetime NOT NULL,
+              PRIMARY KEY (`id`),
+              KEY `idx_created_at` (`created_at`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+        base = datetime.datetime(2024, 1, 1)
+        for offset in range(0, rows, 5000):
+            db.cursor.executemany(
+                f"INSERT INTO {BENCH_TABLE} (order_num, status, record, note, created_at) VALUES (%s, %s, %s, %s, %s)",
+                [(f"ORD{i:010d}", ('PLACED', 'SHIPPED', 'DELIVERED')[i % 3], json.dumps({'items': i % 7, 'sku': f"S{i}"}),
+                  None if i % 5 else f"note {i}", base + datetime.timedelta(minutes=i))
+                 for i in range(offset, min(rows, offset + 5000))]
+            )
+            db.connection.commit()
+    finally:
+        db.close()
+    # Archive the oldest 90%
+    cutoff = str(base + datetime.timedelta(minutes=rows * 9 // 10))
+
+    with tempfile.TemporaryDirectory() as directory:
+        _, archived = archive_table(database_name, BENCH_TABLE, directory, before=cutoff, delete=True, local=True,
+                                    file_rows=max(1, rows // 4))
+        restored = restore_archive(os.path.join(directory, 'manifest.json'), local=True)
+
+    db = DatabaseConnection(**connection_config)
+    if db.connect():
+        db.cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        db.close()
+
+    print("=" * 60)
+    print("⏱️  Cold archive benchmark")
+    for label, totals in (('archive + delete', archived), ('restore + verify', restored)):
+        seconds = totals['seconds'] or 1e-9
+        print(f"   {label:<18} {totals['rows']:>10,} rows in {seconds:6.1f} s: {totals['rows'] / seconds:>10,.0f} rows/s, "
+              f"{totals['raw_bytes'] / 1e6 / seconds:6.1f} MB/s")
+    return archived, restored
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for option in ('--days', '--before', '--column', '--into', '--workers', '--rows'):
+        if option in args:
+            position = args.index(option)
+            options[option] = args[position + 1]
+            del args[position:position + 2]
+    delete = '--delete' in args
+    local = '--local' in args
+    args = [arg for arg in args if not arg.startswith('--')]
+
+    action = args[0] if args else None
+    if action == 'archive' and len(args) == 4 and ('--days' in options or '--before' in options):
+        archive_table(args[1], args[2], args[3], int(options['--days']) if '--days' in options else None,
+                      options.get('--before'), options.get('--column', 'created_at'), delete, local)
+    elif action == 'restore' and len(args) == 2:
+        restore_archive(args[1], options.get('--into'), local, int(options['--workers']) if '--workers' in options else None)
+    elif action == 'bench':
+        benchmark(int(options.get('--rows', BENCH_ROWS)))
+    else:
+        print('Usage: python cold_archiver.py archive <database> <table> <output dir> (--days N | --before "YYYY-MM-DD hh:mm:ss") [--column C] [--delete] [--local]')
+        print('       python cold_archiver.py restore <output dir>/manifest.json [--into TABLE] [--workers N] [--local]')
+        print('       python cold_archiver.py bench [--rows N]')
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Consistent Parallel Data Dumper
+Dumps the rows of a staging database into gzip-compressed INSERT chunk files
+so migrations can be tested locally on realistic volumes.
+
+N worker connections (DatabaseConnection) each run START TRANSACTION WITH
+CONSISTENT SNAPSHOT, all at the same point in time:
+
+- with the RELOAD privilege, a coordinator holds FLUSH TABLES WITH READ LOCK
+  while the snapshots start, then releases it
+- otherwise @@GLOBAL.gtid_executed is read before the first and after the
+  last snapshot started; if nothing committed in between, the snapshots are
+  identical (retried a few times, then dumped with a warning)
+
+Tables with a single-column integer primary key are split into PK-range
+chunks of about --chunk-rows rows, computed inside the snapshot; other tables
+are one chunk. Workers take chunks from a shared queue largest table first,
+stream the rows with an unbuffered cursor in batches, and write each chunk as
+multi-row INSERT statements straight into its own .sql.gz file, so a worker
+holds one batch and one statement in memory at a time. metadata.json records
+the snapshot, the chunk files and their row counts.
+
+Usage: python data_dumper.py <database> <output dir> [<table> ...] [--workers N] [--chunk-rows N]
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import queue
+import threading
+import datetime
+from decimal import Decimal
+from ddl_validator import DatabaseConnection, get_staging_config, mysql_connector
+
+
+DEFAULT_WORKERS = int(os.getenv("DATA_DUMP_WORKERS", "4"))
+DEFAULT_CHUNK_ROWS = int(os.getenv("DATA_DUMP_CHUNK_ROWS", "500000"))
+
+# Rows fetched from the server per round trip, and the size at which an INSERT statement is cut
+FETCH_BATCH_ROWS = 1000
+MAX_STATEMENT_BYTES = 1024 * 1024
+
+SNAPSHOT_ATTEMPTS = 5
+INTEGER_TYPES = ('tinyint', 'smallint', 'mediumint', 'int', 'bigint')
+
+# Rows are read as utf8mb4 with TIMESTAMPs in UTC, the session seed_loader.py loads them back in
+SESSION_SETUP = [
+    "SET NAMES utf8mb4",
+    "SET time_zone = '+00:00'",
+]
+
+
+def sql_literal(value):
+    """Render a Python value fetched by mysql.connector as a SQL literal."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return "X'" + bytes(value).hex() + "'" if value else "''"
+    if isinstance(value, datetime.timedelta):
+        # TIME columns come back as timedelta
+        seconds = int(value.total_seconds())
+        sign = '-' if seconds < 0 else ''
+        seconds = abs(seconds)
+        return f"'{sign}{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}'"
+    if isinstance(value, set):
+        value = ','.join(sorted(value))
+    text = str(value)
+    return "'" + text.replace('\\', '\\\\').replace("'", "\\'").replace('\0', '\\0').replace('\n', '\\n').replace('\r', '\\r').replace('\x1a', '\\Z') + "'"
+
+
+def quote_identifier(name):
+    return '`' + name.replace('`', '``') + '`'
+
+
+def set_session(db):
+    """Prepare a connection whose rows are written out as SQL literals."""
+    for statement in SESSION_SETUP:
+        db.cursor.execute(statement)
+
+
+class DumpChunk:
+    """One PK range of a table (or the whole table), written to one file."""
+
+    __slots__ = ('table', 'index', 'primary_key', 'lower', 'upper', 'path', 'rows', 'raw_bytes', 'file_bytes', 'seconds')
+
+    def __init__(self, table, index, primary_key=None, lower=None, upper=None):
+        self.table = table
+        self.index = index
+        self.primary_key = primary_key
+        self.lower = lower      # inclusive
+        self.upper = upper      # exclusive
+        self.path = None
+        self.rows = 0
+        self.raw_bytes = 0
+        self.file_bytes = 0
+        self.seconds = 0.0
+
+    def query(self):
+        query = f"SELECT * FROM {quote_identifier(self.table)}"
+        if self.primary_key is None:
+            return query, ()
+        key = quote_identifier(self.primary_key)
+        return f"{query} WHERE {key} >= %s AND {key} < %s ORDER BY {key}", (self.lower, self.upper)
+
+    def to_dict(self):
+        return {'file': os.path.basename(self.path) if self.path else None, 'lower': self.lower, 'upper': self.upper,
+                'rows': self.rows, 'bytes': self.raw_bytes, 'compressed_bytes': self.file_bytes}
+
+
+def plan_table_chunks(db, table_name, primary_key, estimated_rows, chunk_rows):
+    """
+    Split a table into PK ranges of about chunk_rows rows from its MIN/MAX primary key.
+    Run inside the snapshot so the ranges cover exactly the rows that will be dumped.
+    """
+    if primary_key is None or not estimated_rows or estimated_rows <= chunk_rows:
+        return [DumpChunk(table_name, 0)]
+
+    key = quote_identifier(primary_key)
+    db.cursor.execute(f"SELECT MIN({key}) AS low, MAX({key}) AS high FROM {quote_identifier(table_name)}")
+    bounds = db.cursor.fetchone()
+    if bounds['low'] is None:
+        return [DumpChunk(table_name, 0)]
+
+    low, high = int(bounds['low']), int(bounds['high'])
+    # Assume keys are spread evenly over [low, high]; gaps only make chunks smaller
+    step = max(1, (high - low + 1) * chunk_rows // estimated_rows)
+    return [
+        DumpChunk(table_name, index, primary_key, lower, min(lower + step, high + 1))
+        for index, lower in enumerate(range(low, high + 1, step))
+    ]
+
+
+def fetch_table_layout(db, tables=None):
+    """
+    Return {table: (chunkable primary key column or None, estimated rows)} for the
+    database's base tables with two bulk queries.
+    """
+    db.cursor.execute("""
+        SELECT table_name AS table_name, table_rows AS table_rows
+        FROM information_schema.TABLES
+        WHERE table_schema = %s AND table_type = 'BASE TABLE'
+        ORDER BY table_name
+    """, (db.database,))
+    rows = {row['table_name']: int(row['table_rows'] or 0) for row in db.cursor.fetchall()}
+
+    db.cursor.execute("""
+        SELECT k.table_name AS table_name, k.column_name AS column_name, c.data_type AS data_type
+        FROM information_schema.KEY_COLUMN_USAGE k
+        JOIN information_schema.COLUMNS c
+          ON c.table_schema = k.table_schema AND c.table_name = k.table_name AND c.column_name = k.column_name
+        WHERE k.table_schema = %s AND k.constraint_name = 'PRIMARY'
+    """, (db.database,))
+    key_columns = {}
+    for row in db.cursor.fetchall():
+        key_columns.setdefault(row['table_name'], []).append((row['column_name'], row['data_type'].lower()))
+
+    layout = {}
+    for table_name, estimated_rows in rows.items():
+        if tables and table_name not in tables:
+            continue
+        columns = key_columns.get(table_name, [])
+        primary_key = columns[0][0] if len(columns) == 1 and columns[0][1] in INTEGER_TYPES else None
+        layout[table_name] = (primary_key, estimated_rows)
+    return layout
+
+
+def open_snapshot(staging_config, workers):
+    """
+    Connect the workers and start their transactions on the same snapshot.
+
+    Returns:
+        tuple: (connections, {'method': 'ftwrl'|'gtid'|'none', 'gtid_executed': ...})
+    """
+    coordinator = DatabaseConnection(**staging_config)
+    if not coordinator.connect():
+        exit(1)
+    connections = []
+    try:
+        for _ in range(workers):
+            db = DatabaseConnection(**staging_config)
+            if not db.connect():
+                exit(1)
+            set_session(db)
+            db.cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            connections.append(db)
+
+        def start_all():
+            for db in connections:
+                db.cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+
+        def gtid_executed():
+            coordinator.cursor.execute("SELECT @@GLOBAL.gtid_executed AS gtid_executed")
+            return coordinator.cursor.fetchone()['gtid_executed']
+
+        try:
+            coordinator.cursor.execute("FLUSH TABLES WITH READ LOCK")
+            locked = True
+        except mysql_connector.Error as e:
+            print(f"ℹ️  FLUSH TABLES WITH READ LOCK not available ({e.msg}); synchronizing snapshots on GTIDs")
+            locked = False
+
+        if locked:
+            try:
+                start_all()
+                return connections, {'method': 'ftwrl', 'gtid_executed': gtid_executed()}
+            finally:
+                coordinator.cursor.execute("UNLOCK TABLES")
+
+        for attempt in range(1, SNAPSHOT_ATTEMPTS + 1):
+            before = gtid_executed()
+            start_all()
+            after = gtid_executed()
+            if not before:
+                print("⚠️  GTIDs are disabled; worker snapshots may differ if staging is written to during the dump")
+                return connections, {'method': 'none', 'gtid_executed': None}
+            if before == after:
+                return connections, {'method': 'gtid', 'gtid_executed': after}
+            for db in connections:
+                db.connection.rollback()
+            print(f"🔄 Transactions committed while the snapshots started (attempt {attempt}); retrying")
+
+        print("⚠️  Could not start all snapshots between two commits; worker snapshots may differ")
+        start_all()
+        return connections, {'method': 'none', 'gtid_executed': None}
+    finally:
+        coordinator.close()
+
+
+def write_chunk(db, chunk, output_directory):
+    """Stream one chunk's rows into a gzip file of multi-row INSERT statements."""
+    start = time.perf_counter()
+    chunk.path = os.path.join(output_directory, f"{db.database}.{chunk.table}.{chunk.index:05d}.sql.gz")
+    query, parameters = chunk.query()
+
+    # An unbuffered tuple cursor streams rows from the server instead of loading the result
+    cursor = db.connection.cursor(buffered=False)
+    try:
+        cursor.execute(query, parameters)
+        insert_prefix = f"INSERT INTO {quote_identifier(chunk.table)} ({', '.join(quote_identifier(name) for name in cursor.column_names)}) VALUES\n"
+
+        with gzip.open(chunk.path, 'wt', encoding='utf-8', compresslevel=1) as f:
+            statement = []
+            statement_bytes = 0
+            while True:
+                rows = cursor.fetchmany(FETCH_BATCH_ROWS)
+                if not rows:
+                    break
+                for row in rows:
+                    values = '(' + ','.join(sql_literal(value) for value in row) + ')'
+                    statement.append(values)
+                    statement_bytes += len(values) + 2
+                    if statement_bytes >= MAX_STATEMENT_BYTES:
+                        text = insert_prefix + ',\n'.join(statement) + ';\n'
+                        f.write(text)
+                        chunk.raw_bytes += len(text)
+                        statement = []
+                        statement_bytes = 0
+                chunk.rows += len(rows)
+            if statement:
+                text = insert_prefix + ',\n'.join(statement) + ';\n'
+                f.write(text)
+                chunk.raw_bytes += len(text)
+    finally:
+        cursor.close()
+
+    chunk.file_bytes = os.path.getsize(chunk.path)
+    chunk.seconds = time.perf_counter() - start
+    return chunk
+
+
+def dump_database(database_name, output_directory, tables=None, workers=DEFAULT_WORKERS, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Dump the database's tables (default: all base tables) into chunk files.
+
+    Returns:
+        dict: the metadata written to metadata.json
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    staging_config = get_staging_config(database_name)
+
+    print("📦 Consistent Data Dump")
+    print("=" * 60)
+    connections, snapshot = open_snapshot(staging_config, workers)
+    print(f"📸 {len(connections)} worker snapshots started ({snapshot['method']})")
+
+    try:
+        planner = connections[0]
+        layout = fetch_table_layout(planner, tables)
+        missing = sorted(set(tables or []) - set(layout))
+        if missing:
+            print(f"❌ Tables not found: {', '.join(missing)}")
+            exit(1)
+
+        chunks = []
+        for table_name, (primary_key, estimated_rows) in sorted(layout.items(), key=lambda item: item[1][1], reverse=True):
+            chunks.extend(plan_table_chunks(planner, table_name, primary_key, estimated_rows, chunk_rows))
+        print(f"📋 {len(layout)} tables in {len(chunks)} chunks")
+
+        pending = queue.Queue()
+        for chunk in chunks:
+            pending.put(chunk)
+        errors = []
+        progress_lock = threading.Lock()
+        totals = {'rows': 0, 'bytes': 0, 'chunks': 0}
+        start = time.perf_counter()
+
+        def work(db):
+            while not errors:
+                try:
+                    chunk = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    write_chunk(db, chunk, output_directory)
+                except (mysql_connector.Error, OSError) as e:
+                    errors.append(f"{chunk.table} chunk {chunk.index}: {e}")
+                    return
+                with progress_lock:
+                    totals['rows'] += chunk.rows
+                    totals['bytes'] += chunk.raw_bytes
+                    totals['chunks'] += 1
+                    elapsed = time.perf_counter() - start
+                    print(f"   ✅ {chunk.table}[{chunk.index}] {chunk.rows:,} rows in {chunk.seconds:.1f} s "
+                          f"({totals['chunks']}/{len(chunks)}, {totals['rows'] / elapsed:,.0f} rows/s)")
+
+        threads = [threading.Thread(target=work, args=(db,)) for db in connections]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        for db in connections:
+            db.close()
+
+    if errors:
+        for error in errors:
+            print(f"❌ {error}")
+        exit(1)
+
+    metadata = {
+        'database': database_name,
+        'snapshot': snapshot,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'tables': {
+            table_name: {
+                'primary_key': layout[table_name][0],
+                'chunks': [chunk.to_dict() for chunk in chunks if chunk.table == table_name]
+            }
+            for table_name in sorted(layout)
+        }
+    }
+    with open(os.path.join(output_directory, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    compressed = sum(chunk.file_bytes for chunk in chunks)
+    print("-" * 70)
+    print(f"✅ {totals['rows']:,} rows, {totals['bytes'] / 1e6:,.1f} MB ({compressed / 1e6:,.1f} MB compressed) in {elapsed:.1f} s")
+    print(f"   {totals['rows'] / elapsed if elapsed else 0:,.0f} rows/s, {totals['bytes'] / 1e6 / elapsed if elapsed else 0:,.1f} MB/s "
+          f"with {len(connections)} worker(s)")
+    return metadata
+
+
+def main():
+    args = sys.argv[1:]
+    options = {'--workers': DEFAULT_WORKERS, '--chunk-rows': DEFAULT_CHUNK_ROWS}
+    for option in options:
+        if option in args:
+            position = args.index(option)
+            options[option] = int(args[position + 1])
+            del args[position:position + 2]
+
+    if len(args) < 2:
+        print("Usage: python data_dumper.py <database> <output dir> [<table> ...] [--workers N] [--chunk-rows N]")
+        exit(1)
+
+    dump_database(args[0], args[1], args[2:] or None, options['--workers'], options['--chunk-rows'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Typed DDL Operation Model
+Slot-based dataclasses for the operations produced by SQLDDLParser. Every
+clause of a multi-clause ALTER shares its parent Statement by reference and
+identifiers are interned, so replaying long migration histories does not pay
+for one dict plus one copy of the statement text per clause.
+to_dict() returns the legacy dict layout consumed by the validators.
+"""
+
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import ClassVar
+
+
+@dataclass(slots=True, eq=False)
+class Statement:
+    """A parsed SQL statement, shared by all operations it produced."""
+    sql: str
+    position: int = 0
+
+
+@dataclass(slots=True)
+class Operation:
+    """Base class for a DDL operation on one table."""
+    TYPE: ClassVar[str] = ''
+    COMMAND: ClassVar[str] = ''
+
+    database: str
+    table: str
+    statement: Statement
+
+    def __post_init__(self):
+        self.database = sys.intern(self.database)
+        self.table = sys.intern(self.table)
+
+    @property
+    def full_statement(self):
+        return self.statement.sql
+
+    @property
+    def position(self):
+        return self.statement.position
+
+    def to_dict(self):
+        """Return the legacy dict representation of this operation."""
+        return {
+            'type': self.TYPE,
+            'command': self.COMMAND,
+            'database': self.database,
+            'table': self.table,
+            'full_statement': self.statement.sql,
+            'position': self.statement.position
+        }
+
+
+@dataclass(slots=True)
+class CreateTable(Operation):
+    TYPE: ClassVar[str] = 'CREATE'
+    COMMAND: ClassVar[str] = 'CREATE_TABLE'
+
+
+@dataclass(slots=True)
+class DropTable(Operation):
+    TYPE: ClassVar[str] = 'DROP'
+    COMMAND: ClassVar[str] = 'DROP_TABLE'
+
+
+@dataclass(slots=True)
+class CreateIndex(Operation):
+    TYPE: ClassVar[str] = 'CREATE'
+    COMMAND: ClassVar[str] = 'CREATE_INDEX'
+
+    index_name: str = ''
+    columns: tuple = ()
+
+    def __post_init__(self):
+        Operation.__post_init__(self)
+        self.index_name = sys.intern(self.index_name)
+        self.columns = tuple(sys.intern(column) for column in self.columns)
+
+    def to_dict(self):
+        operation = Operation.to_dict(self)
+        operation['index_name'] = self.index_name
+        operation['columns'] = list(self.columns)
+        return operation
+
+
+@dataclass(slots=True)
+class AlterTableOperation(Operation):
+    """One clause of an ALTER TABLE statement."""
+    TYPE: ClassVar[str] = 'ALTER'
+    COMMAND: ClassVar[str] = 'ALTER_TABLE'
+    TARGET_TYPE: ClassVar[str] = 'unknown'
+
+    operation: str = 'UNKNOWN'
+    target: str = 'unknown'
+    details: dict = None
+    clause: str = ''
+
+    def __post_init__(self):
+        Operation.__post_init__(self)
+        self.operation = sys.intern(self.operation)
+        self.target = sys.intern(self.target)
+        if self.details is None:
+            self.details = {}
+
+    @property
+    def target_type(self):
+        return self.TARGET_TYPE
+
+    def to_dict(self):
+        return {
+            'type': self.TYPE,
+            'command': self.COMMAND,
+            'database': self.database,
+            'table': self.table,
+            'operation': self.operation,
+            'target': self.target,
+            'target_type': self.TARGET_TYPE,
+            'details': self.details,
+            'clause': self.clause,
+            'full_statement': self.statement.sql,
+            'position': self.statement.position
+        }
+
+
+@dataclass(slots=True)
+class AlterColumn(AlterTableOperation):
+    TARGET_TYPE: ClassVar[str] = 'COLUMN'
+
+
+@dataclass(slots=True)
+class AddIndex(AlterTableOperation):
+    TARGET_TYPE: ClassVar[str] = 'INDEX'
+
+
+@dataclass(slots=True)
+class DropIndex(AlterTableOperation):
+    TARGET_TYPE: ClassVar[str] = 'INDEX'
+
+
+@dataclass(slots=True)
+class AddPrimaryKey(AlterTableOperation):
+    TARGET_TYPE: ClassVar[str] = 'PRIMARY_KEY'
+
+
+@dataclass(slots=True)
+class DropPrimaryKey(AlterTableOperation):
+    TARGET_TYPE: ClassVar[str] = 'PRIMARY_KEY'
+
+
+@dataclass(slots=True)
+class AddForeignKey(AlterTableOperation):
+    TARGET_TYPE: ClassVar[str] = 'FOREIGN_KEY'
+
+
+@dataclass(slots=True)
+class DropForeignKey(AlterTableOperation):
+    TARGET_TYPE: ClassVar[str] = 'FOREIGN_KEY'
+
+
+# (target_type, operation) -> class; column operations share one class
+ALTER_OPERATION_CLASSES = {
+    ('INDEX', 'ADD'): AddIndex,
+    ('INDEX', 'DROP'): DropIndex,
+    ('PRIMARY_KEY', 'ADD'): AddPrimaryKey,
+    ('PRIMARY_KEY', 'DROP'): DropPrimaryKey,
+    ('FOREIGN_KEY', 'ADD'): AddForeignKey,
+    ('FOREIGN_KEY', 'DROP'): DropForeignKey,
+}
+
+
+def make_alter_operation(database, table, statement, alter_op):
+    """Build a typed ALTER operation from the dict returned by parse_alter_operations."""
+    target_type = alter_op['target_type']
+    if target_type == 'COLUMN':
+        operation_class = AlterColumn
+    else:
+        operation_class = ALTER_OPERATION_CLASSES.get((target_type, alter_op['operation']), AlterTableOperation)
+
+    return operation_class(
+        database, table, statement,
+        operation=alter_op['operation'],
+        target=alter_op['target'],
+        details=alter_op['details'],
+        clause=alter_op.get('clause', '')
+    )
+
+
+def build_synthetic_history(statement_count):
+    """Build a migration history of ALTER statements with three clauses each."""
+    lines = []
+    for i in range(statement_count):
+        table = f"table_{i % 500}"
+        lines.append(
+            f"ALTER TABLE `{table}` ADD COLUMN `col_{i}` varchar(64) NOT NULL DEFAULT '' COMMENT 'replayed column {i}', "
+            f"ADD INDEX `idx_col_{i}` (`col_{i}`), "
+            f"MODIFY COLUMN `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;"
+        )
+    return '\n'.join(lines)
+
+
+def measure_allocations(build):
+    """Return (result, bytes still allocated, seconds) for a builder function."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def run_memory_benchmark(statement_count=100000):
+    """Compare memory held by typed operations vs the legacy per-clause dicts."""
+    from sql_ddl_parser import SQLDDLParser
+
+    print(f"🧪 Replaying {statement_count} synthetic ALTER statements (3 clauses each)")
+    sql_content = build_synthetic_history(statement_count)
+
+    parser = SQLDDLParser()
+    typed_operations, typed_bytes, parse_seconds = measure_allocations(
+        lambda: parser.parse_sql_file(sql_content, 'MYSQL/bench/db/V1__bench.sql') or parser.get_typed_operations()
+    )
+
+    def build_legacy():
+        # Legacy layout: one dict per clause, each with its own copy of the statement and identifiers
+        legacy = []
+        for op in typed_operations:
+            operation = op.to_dict()
+            operation['full_statement'] = (op.statement.sql + ' ')[:-1]
+            operation['table'] = (op.table + ' ')[:-1]
+            operation['database'] = (op.database + ' ')[:-1]
+            operation['target'] = (op.target + ' ')[:-1]
+            operation['details'] = dict(op.details)
+            legacy.append(operation)
+        return legacy
+
+    legacy_operations, legacy_bytes, _ = measure_allocations(build_legacy)
+
+    print(f"   Operations:         {len(typed_operations)}")
+    print(f"   Parse time:         {parse_seconds:.2f} s")
+    print(f"   Typed operations:   {typed_bytes / 1024 / 1024:8.1f} MiB (including parser intermediates still referenced)")
+    print(f"   Legacy dicts:       {legacy_bytes / 1024 / 1024:8.1f} MiB (same clauses, legacy layout)")
+    print(f"   Per clause:         typed {typed_bytes / len(typed_operations):.0f} B vs legacy {legacy_bytes / len(legacy_operations):.0f} B")
+    return typed_bytes, legacy_bytes
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        run_memory_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
+    else:
+        print("Usage: python ddl_operations.py --benchmark [statement_count]")
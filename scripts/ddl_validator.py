@@ -5,13 +5,18 @@ Validates that migration DDL operations have already been applied to staging dat
 before allowing production deployment. This ensures staging-production synchronization.
 """
 
-import mysql.connector
-from mysql.connector import Error
+import io
 import os
 import sys
 import re
-from dotenv import load_dotenv
-from sql_ddl_parser import SQLDDLParser, MigrationFileValidator, extract_file_content_from_patch, fetch_github_files_data
+import threading
+from contextlib import contextmanager
+from lazy_imports import lazy_import
+from sql_ddl_parser import SQLDDLParser, MigrationFileValidator, extract_file_content_from_patch
+from change_source import get_change_source
+
+# Loaded on first use so that importing this module stays cheap
+mysql_connector = lazy_import('mysql.connector')
 
 
 class DatabaseConnection:
@@ -32,7 +37,7 @@ class DatabaseConnection:
     def connect(self):
         """Connect to the database."""
         try:
-            self.connection = mysql.connector.connect(
+            self.connection = mysql_connector.connect(
                 host=self.host,
                 user=self.user,
                 password=self.password,
@@ -42,7 +47,7 @@ class DatabaseConnection:
             self.cursor = self.connection.cursor(dictionary=True)
             print(f"✅ Connected to staging database: {self.database} at {self.host}")
             return True
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"❌ Error connecting to staging database: {e}")
             return False
     
@@ -62,7 +67,7 @@ class DatabaseConnection:
             if result:
                 return result['Create Table']
             return None
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error getting SHOW CREATE TABLE: {e}")
             return None
 
@@ -79,10 +84,26 @@ class DatabaseConnection:
             self.cursor.execute(query, (self.database, table_name))
             result = self.cursor.fetchone()
             return result['count'] > 0
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error checking table existence: {e}")
             return False
-    
+
+    def get_table_names(self):
+        """Get the names of all base tables in the database."""
+        try:
+            query = """
+                SELECT table_name as table_name
+                FROM information_schema.tables
+                WHERE table_schema = %s AND table_type = 'BASE TABLE'
+                ORDER BY table_name
+            """
+            self.cursor.execute(query, (self.database,))
+            result = self.cursor.fetchall()
+            return [row['table_name'] for row in result]
+        except mysql_connector.Error as e:
+            print(f"Error listing tables: {e}")
+            return []
+
     def column_exists(self, table_name, column_name):
         """Check if a column exists in a table."""
         try:
@@ -94,7 +115,7 @@ class DatabaseConnection:
             self.cursor.execute(query, (self.database, table_name, column_name))
             result = self.cursor.fetchone()
             return result['count'] > 0
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error checking column existence: {e}")
             return False
     
@@ -109,7 +130,7 @@ class DatabaseConnection:
             self.cursor.execute(query, (self.database, table_name, column_name))
             result = self.cursor.fetchone()
             return result
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error getting column definition: {e}")
             return None
     
@@ -124,7 +145,7 @@ class DatabaseConnection:
             self.cursor.execute(query, (self.database, table_name, index_name))
             result = self.cursor.fetchone()
             return result['count'] > 0
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error checking index existence: {e}")
             return False
         
@@ -139,7 +160,7 @@ class DatabaseConnection:
             self.cursor.execute(query, (self.database, table_name))
             result = self.cursor.fetchall()
             return [row['column_name'] for row in result]
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error getting primary key columns: {e}")
     
 
@@ -493,6 +514,29 @@ class DDLValidator:
         
         return True
     
+class ThreadLocalOutput:
+    """sys.stdout replacement that captures what each worker thread prints."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer if buffer is not None else self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    @contextmanager
+    def capture(self):
+        self.local.buffer = io.StringIO()
+        try:
+            yield self.local.buffer
+        finally:
+            self.local.buffer = None
+
+
 def get_staging_config(database_name):
     """Get staging database configuration from environment variables or github secrets."""
 
@@ -531,6 +575,7 @@ def get_staging_config(database_name):
         print("🔐 Using config.env for database credentials")
         
         # Load from config.env file for local development
+        from dotenv import load_dotenv
         load_dotenv('config.env')
         
         # get staging config from config.env file
@@ -559,16 +604,145 @@ def get_staging_config(database_name):
     return staging_config
 
 
-def main():
-    """Main function to validate that DDL operations have already been applied to staging database."""
-    
-    print("🔍 DDL Validator - Staging-Production Synchronization Check")
-    print("=" * 60)
-    print("Verifying that all migration changes have been pre-applied to staging...")
+def get_local_config(database_name):
+    """
+    Get the configuration of a local MySQL stand-in (for loading dumps and testing
+    migrations) from LOCAL_DB_* environment variables or config.env. Pass
+    database_name=None for a server-level connection.
+    """
+    if os.getenv("GITHUB_ACTIONS") != "true":
+        from dotenv import load_dotenv
+        load_dotenv('config.env')
 
-    
-    #fetch github files data from new PR on github
-    files_data = fetch_github_files_data()
+    local_config = {
+        'host': os.getenv('LOCAL_DB_HOST', '127.0.0.1'),
+        'user': os.getenv('LOCAL_DB_USER', 'root'),
+        'password': os.getenv('LOCAL_DB_PASSWORD', ''),
+        'port': int(os.getenv('LOCAL_DB_PORT', '3306')),
+        'database': database_name
+    }
+    print(f"Local Database: {local_config['database'] or '(server)'} at {local_config['host']}:{local_config['port']}")
+    return local_config
+
+
+def validate_operations(ddl_validator, operations):
+    """Validate each parsed operation against staging and return the validation summary."""
+    validation_summary = []
+    for operation in operations:
+        op_type = operation['command']
+        if op_type == 'CREATE_TABLE':
+            result = ddl_validator.validate_create_table(operation)
+        elif op_type == 'ALTER_TABLE':
+            result = ddl_validator.validate_alter_table(operation)
+        elif op_type == 'DROP_TABLE':
+            result = ddl_validator.validate_drop_table(operation)
+        else:
+            print(f"⚠️  Unknown operation: {op_type}")
+            result = False
+
+        summary_entry = {
+            "operation": op_type,
+            "table": operation.get('table'),
+            "target": operation.get('target', None),
+            "status": "PASSED" if result else "FAILED"
+        }
+        validation_summary.append(summary_entry)
+
+    return validation_summary
+
+
+def check_foreign_key_order(operations, file_content, graph=None):
+    """
+    Check that CREATE/DROP TABLE statements appear in an order MySQL can run
+    with foreign key checks on; returns FAILED summary entries for violations.
+    """
+    from fk_graph import ForeignKeyCycleError, check_operation_order, order_table_operations, sets_foreign_key_checks_off
+
+    if sets_foreign_key_checks_off(file_content):
+        print("ℹ️  Migration sets FOREIGN_KEY_CHECKS=0; skipping foreign key order check")
+        return []
+
+    problems = check_operation_order(operations, graph)
+    if not problems:
+        return []
+
+    print("\n❌ Statements are not in foreign key order:")
+    for _, _, message in problems:
+        print(f"  - {message}")
+    try:
+        suggested = order_table_operations(operations, graph)
+        print("Suggested order:")
+        for operation in suggested:
+            if operation['command'] in ('CREATE_TABLE', 'DROP_TABLE'):
+                print(f"  {operation['command']} {operation['table']}")
+    except ForeignKeyCycleError as e:
+        print(f"  {e}: create the tables first, then add the foreign keys with ALTER TABLE")
+
+    return [
+        {"operation": "FOREIGN_KEY_ORDER", "table": table_name, "target": related_table, "status": "FAILED"}
+        for table_name, related_table, _ in problems
+    ]
+
+
+def validate_operation_groups(staging_config, groups, max_workers=4):
+    """
+    Validate groups of operations concurrently, each on its own staging connection.
+    Groups come from fk_graph.group_operations, so tables linked by foreign keys are
+    validated together; each group's log is printed when it finishes.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    output = ThreadLocalOutput(sys.stdout)
+
+    def validate_group(group):
+        with output.capture() as log:
+            db = DatabaseConnection(**staging_config)
+            if not db.connect():
+                summary = [
+                    {"operation": operation['command'], "table": operation.get('table'),
+                     "target": operation.get('target', None), "status": "FAILED"}
+                    for operation in group
+                ]
+            else:
+                try:
+                    summary = validate_operations(DDLValidator(db), group)
+                finally:
+                    db.close()
+        return log.getvalue(), summary
+
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(validate_group, groups))
+    finally:
+        sys.stdout = output.stream
+
+    summaries = {}
+    for group, (log, summary) in zip(groups, results):
+        output.stream.write(log)
+        for operation, entry in zip(group, summary):
+            summaries[id(operation)] = entry
+    return summaries
+
+
+def print_validation_summary(validation_summary):
+    """Print the validation summary built by validate_operations."""
+    print("\n===== DDL Validation Summary =====")
+    for entry in validation_summary:
+        op = entry["operation"]
+        table = entry.get("table")
+        target = entry.get("target")
+        status = entry["status"]
+        if target:
+            print(f"{op} on {table} ({target}): {status}")
+        else:
+            print(f"{op} on {table}: {status}")
+
+
+def load_pr_migration():
+    """Fetch the PR's changed files, check the migration pair and return (migration filename, file content)."""
+    # fetch the PR's changed files (GitHub API or local git checkout, see CHANGE_SOURCE)
+    files_data = get_change_source().get_files_data()
     
     # Validate migration file pairs
     validator = MigrationFileValidator()
@@ -588,20 +762,81 @@ def main():
     if not file_content:
         print("❌ Could not extract file content from patch")
         exit(1)
+
+    return migration['filename'], file_content
+
+
+def validate_with_server(server_address, filename, file_content):
+    """
+    Send the migration to a running validation server (see validation_server.py).
+
+    Returns:
+        dict: The server's result, or None if the server could not be reached
+    """
+    from validation_server import request_validation
+
+    print(f"🔌 Using validation server at {server_address}")
+    try:
+        result = request_validation(server_address, filename, file_content)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Validation server unavailable ({e}); validating directly against staging")
+        return None
+
+    if result.get('log'):
+        print(result['log'], end='')
+    if result.get('error'):
+        print(f"❌ {result['error']}")
+    return result
+
+
+def main():
+    """Main function to validate that DDL operations have already been applied to staging database."""
+    
+    print("🔍 DDL Validator - Staging-Production Synchronization Check")
+    print("=" * 60)
+    print("Verifying that all migration changes have been pre-applied to staging...")
+
+    filename, file_content = load_pr_migration()
+
+    # A long-running validation server keeps warm connections and schema snapshots
+    server_address = os.getenv("DDL_VALIDATOR_SERVER")
+    if server_address:
+        result = validate_with_server(server_address, filename, file_content)
+        if result is not None:
+            print_validation_summary(result.get('summary', []))
+            if result.get('status') != 'PASSED':
+                exit(1)
+            return
     
     # Parse DDL operations
     parser = SQLDDLParser()
-    parser.parse_sql_file(file_content, migration['filename'])
+    parser.parse_sql_file(file_content, filename)
     operations = parser.get_operations()
     print(f"\n🔍 Found {len(operations)} DDL operations to verify against staging")
 
     # Extract database name from migration file path
-    database_name = parser.extract_database_name(migration['filename'])
+    database_name = parser.extract_database_name(filename)
     print(f"📁 Extracted database name from file path: {database_name}")
     
     # get staging config from environment variables
     staging_config = get_staging_config(database_name)
-    
+
+    # Tables not linked by foreign keys can be checked independently
+    from fk_graph import ForeignKeyGraph, group_operations
+    graph = ForeignKeyGraph.from_operations(operations)
+    order_summary = check_foreign_key_order(operations, file_content, graph)
+    groups = group_operations(operations, graph)
+    max_workers = int(os.getenv("DDL_VALIDATOR_WORKERS", "4"))
+
+    if len(groups) > 1 and max_workers > 1:
+        print(f"Checking {len(groups)} independent table groups concurrently ({min(max_workers, len(groups))} connections)...")
+        summaries = validate_operation_groups(staging_config, groups, max_workers)
+        validation_summary = [summaries[id(operation)] for operation in operations] + order_summary
+        print_validation_summary(validation_summary)
+        if any(entry["status"] == "FAILED" for entry in validation_summary):
+            exit(1)
+        return
+
     # connect to staging database
     db = DatabaseConnection(**staging_config)
     if not db.connect():
@@ -611,39 +846,10 @@ def main():
         print("Checking if each operation has already been applied to staging database...")
         
         # Validate each operation
-        ddl_validator = DDLValidator(db)
-        validation_summary = []
-        for operation in operations:
-            op_type = operation['command']
-            if op_type == 'CREATE_TABLE':
-                result = ddl_validator.validate_create_table(operation)
-            elif op_type == 'ALTER_TABLE':
-                result = ddl_validator.validate_alter_table(operation)
-            elif op_type == 'DROP_TABLE':
-                result = ddl_validator.validate_drop_table(operation)
-            else:
-                print(f"⚠️  Unknown operation: {op_type}")
-                result = False
-
-            summary_entry = {
-                "operation": op_type,
-                "table": operation.get('table'),
-                "target": operation.get('target', None),
-                "status": "PASSED" if result else "FAILED"
-            }
-            validation_summary.append(summary_entry)
+        validation_summary = validate_operations(DDLValidator(db), operations) + order_summary
 
         # print validation summary
-        print("\n===== DDL Validation Summary =====")
-        for entry in validation_summary:
-            op = entry["operation"]
-            table = entry.get("table")
-            target = entry.get("target")
-            status = entry["status"]
-            if target:
-                print(f"{op} on {table} ({target}): {status}")
-            else:
-                print(f"{op} on {table}: {status}")
+        print_validation_summary(validation_summary)
         
         if any(entry["status"] == "FAILED" for entry in validation_summary):
             exit(1)
@@ -654,4 +860,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -5,17 +5,17 @@ Validates that migration DDL operations have already been applied to staging dat
 before allowing production deployment. This ensures staging-production synchronization.
 """
 
-import mysql.connector
-from mysql.connector import Error
 import os
 import sys
 import re
-from dotenv import load_dotenv
+from lazy_imports import lazy_import
 from sql_ddl_parser_extended import SQLDDLParser, MigrationFileValidator, extract_file_content_from_patch
-import requests
 import json
 import base64
 
+# Loaded on first use so that importing this module stays cheap
+mysql_connector = lazy_import('mysql.connector')
+
 class DatabaseConnection:
     """Handles MySQL database connections and queries."""
     
@@ -31,7 +31,7 @@ class DatabaseConnection:
     def connect(self):
         """Connect to the database."""
         try:
-            self.connection = mysql.connector.connect(
+            self.connection = mysql_connector.connect(
                 host=self.host,
                 user=self.user,
                 password=self.password,
@@ -41,7 +41,7 @@ class DatabaseConnection:
             self.cursor = self.connection.cursor(dictionary=True)
             print(f"✅ Connected to staging database: {self.database} at {self.host}")
             return True
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"❌ Error connecting to staging database: {e}")
             return False
     
@@ -61,7 +61,7 @@ class DatabaseConnection:
             if result:
                 return result['Create Table']
             return None
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error getting SHOW CREATE TABLE: {e}")
             return None
 
@@ -78,7 +78,7 @@ class DatabaseConnection:
             self.cursor.execute(query, (self.database, table_name))
             result = self.cursor.fetchone()
             return result['count'] > 0
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error checking table existence: {e}")
             return False
     
@@ -93,7 +93,7 @@ class DatabaseConnection:
             self.cursor.execute(query, (self.database, table_name, column_name))
             result = self.cursor.fetchone()
             return result['count'] > 0
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error checking column existence: {e}")
             return False
     
@@ -108,7 +108,7 @@ class DatabaseConnection:
             self.cursor.execute(query, (self.database, table_name, column_name))
             result = self.cursor.fetchone()
             return result
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error getting column definition: {e}")
             return None
     
@@ -123,7 +123,7 @@ class DatabaseConnection:
             self.cursor.execute(query, (self.database, table_name, index_name))
             result = self.cursor.fetchone()
             return result['count'] > 0
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error checking index existence: {e}")
             return False
         
@@ -138,7 +138,7 @@ class DatabaseConnection:
             self.cursor.execute(query, (self.database, table_name))
             result = self.cursor.fetchall()
             return [row['column_name'] for row in result]
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"Error getting primary key columns: {e}")
     
 
@@ -637,6 +637,7 @@ class DDLValidator:
 
 def main():
     """Main function to validate that DDL operations have already been applied to staging database."""
+    import requests
     
     print("🔍 DDL Validator - Staging-Production Synchronization Check")
     print("=" * 60)
@@ -673,6 +674,7 @@ def main():
         print("🔐 Using config.env for database credentials")
         
         # Load from config.env file for local development
+        from dotenv import load_dotenv
         load_dotenv('config.env')
         
         staging_config = {
@@ -0,0 +1,6 @@
+"""
+ddltool
+Single command-line entry point for the DDL tooling in scripts/.
+Heavy dependencies (mysql.connector, requests, dotenv) are only imported
+inside the subcommands that need them, so offline commands start fast.
+"""
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Entry point for `python scripts/ddltool <command>` (or `python -m ddltool` from scripts/).
+"""
+
+import os
+import sys
+
+# The tool modules live next to this package in scripts/ and import each other by bare name
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from ddltool.cli import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+ddltool startup benchmark / regression guard.
+
+Runs `ddltool parse` on a small migration under `python -X importtime` and
+fails if a heavy dependency gets imported or if the import cost grows past a
+fraction of what the eager mysql.connector/requests/dotenv imports cost.
+
+Usage: python scripts/ddltool/bench_import.py [--max-ratio 0.5]
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+DDLTOOL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must never be loaded by `ddltool parse`
+HEAVY_MODULES = ('mysql.connector', 'requests', 'dotenv')
+
+SAMPLE_MIGRATION = """
+CREATE TABLE `bench_table` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `name` varchar(64) NOT NULL,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+ALTER TABLE `bench_table` ADD COLUMN `created_at` datetime DEFAULT NULL, ADD INDEX `idx_name` (`name`);
+"""
+
+
+def run_with_importtime(command):
+    """
+    Run a Python command with -X importtime.
+
+    Returns:
+        tuple: (imported module names, import microseconds after interpreter startup, wall seconds)
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + command,
+        capture_output=True, text=True, cwd=os.path.dirname(DDLTOOL_DIR)
+    )
+    wall_seconds = time.perf_counter() - start
+    if completed.returncode != 0:
+        print(completed.stdout)
+        print(completed.stderr)
+        raise RuntimeError(f"Command failed: {' '.join(command)}")
+
+    modules = []
+    import_us = 0
+    after_startup = False
+    for line in completed.stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)', line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        modules.append(name)
+        # Top-level entries have a single space of indentation; skip the interpreter's own startup
+        if indent == 1:
+            if after_startup:
+                import_us += cumulative
+            elif name == 'site':
+                after_startup = True
+
+    return modules, import_us, wall_seconds
+
+
+def main():
+    max_ratio = 0.5
+    if '--max-ratio' in sys.argv:
+        max_ratio = float(sys.argv[sys.argv.index('--max-ratio') + 1])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        migration_dir = os.path.join(tmp_dir, 'MYSQL', 'bench', 'bench_db')
+        os.makedirs(migration_dir)
+        migration_path = os.path.join(migration_dir, 'V1__bench.sql')
+        with open(migration_path, 'w') as f:
+            f.write(SAMPLE_MIGRATION)
+
+        modules, parse_us, parse_wall = run_with_importtime([DDLTOOL_DIR, 'parse', migration_path])
+
+    _, heavy_us, heavy_wall = run_with_importtime(['-c', 'import mysql.connector, requests, dotenv'])
+
+    print("⏱️  ddltool startup benchmark")
+    print(f"   ddltool parse:            imports {parse_us / 1000:7.1f} ms, wall {parse_wall * 1000:7.1f} ms")
+    print(f"   eager heavy dependencies: imports {heavy_us / 1000:7.1f} ms, wall {heavy_wall * 1000:7.1f} ms")
+
+    failures = []
+    loaded_heavy = sorted({name for name in modules for heavy in HEAVY_MODULES if name == heavy or name.startswith(heavy + '.')})
+    if loaded_heavy:
+        failures.append(f"heavy modules imported by `ddltool parse`: {', '.join(loaded_heavy)}")
+
+    ratio = parse_us / heavy_us if heavy_us else 0
+    print(f"   ratio: {ratio:.2f} (limit {max_ratio:.2f})")
+    if ratio > max_ratio:
+        failures.append(f"`ddltool parse` import time is {ratio:.2f}x the eager dependency imports (limit {max_ratio:.2f})")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+
+    print("✅ ddltool startup within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
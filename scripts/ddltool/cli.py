@@ -0,0 +1,539 @@
+"""
+ddltool command-line interface.
+
+Subcommands:
+    parse      Parse local SQL files and print the DDL operations
+    validate   Validate the PR's migration against the staging database
+    diff       Compare the CREATE TABLE definitions of two SQL files
+    drift      Compare a seed file against the live staging schema
+    pr-report  Print the complete table definitions touched by a PR's seed files
+    serve      Run the validation server with warm staging connections
+    watch      Revalidate migrations locally on every save
+    fk-graph   Print the foreign key graph and a safe CREATE/DROP order
+    lint       Lint a migration file with the rule engine
+    charset    Estimate the cost of charset/collation changes
+    index-usage  Check whether indexes a migration drops are still in use
+    index-report Rank unused, low-selectivity and redundant indexes
+    advise     Suggest indexes from a slow or general query log
+    export     Regenerate seed dumps from the staging server
+    dump-data  Dump staging rows into compressed chunk files from one snapshot
+    load       Load seed dumps and chunk files into a local MySQL stand-in
+    checksum   Compare table data between staging and the local copy by chunk checksums
+    backfill   Populate a new column in throttled, committed, resumable chunks
+    purge      Delete rows past their retention period, by batches or DROP PARTITION
+    archive    Stream rows older than a cutoff into verified compressed files
+    restore    Load an archive back into its table and verify it
+    history-build  Replay a database's migrations into a versioned schema history file
+    history    Show a table or the whole schema at any version from a history file
+    generate   Turn an edited seed file into a V/U migration pair against staging
+
+Each handler imports what it needs itself; keep module-level imports to the stdlib.
+"""
+
+import argparse
+import json
+import os
+
+
+def load_create_tables(file_path):
+    """Return {table_name: CREATE TABLE statement} for a local SQL file."""
+    from sql_ddl_parser import SQLDDLParser
+
+    with open(file_path) as f:
+        file_content = f.read()
+
+    parser = SQLDDLParser()
+    parser.parse_create_table(file_content, parser.extract_database_name(file_path))
+    return {op.table: op.full_statement for op in parser.get_typed_operations()}
+
+
+def compare_create_tables(expected_tables, actual_tables, expected_label, actual_label, include_auto_increment=False):
+    """Print structural differences between two {table: CREATE TABLE} maps; return the count."""
+    from ddl_validator_extended import DDLValidator
+
+    validator = DDLValidator(None)
+    difference_count = 0
+
+    for table_name in sorted(set(expected_tables) | set(actual_tables)):
+        if table_name not in actual_tables:
+            print(f"❌ Table '{table_name}' missing in {actual_label}")
+            difference_count += 1
+            continue
+        if table_name not in expected_tables:
+            print(f"❌ Table '{table_name}' missing in {expected_label}")
+            difference_count += 1
+            continue
+
+        parsed_expected = validator.parse_create_table_sql(expected_tables[table_name])
+        parsed_actual = validator.parse_create_table_sql(actual_tables[table_name])
+        if not include_auto_increment:
+            parsed_expected['auto_increment'] = parsed_actual['auto_increment'] = None
+
+        comparison = validator.compare_parsed_create_table(parsed_expected, parsed_actual)
+        if not comparison['equal']:
+            print(f"\n📝 {table_name}:")
+            for i, diff in enumerate(comparison['differences'], 1):
+                print(f"   {i}. {diff}")
+            difference_count += 1
+
+    return difference_count
+
+
+def cmd_parse(args):
+    """Parse local SQL files and print their DDL operations."""
+    from sql_ddl_parser import SQLDDLParser
+
+    all_operations = []
+    for file_path in args.files:
+        with open(file_path) as f:
+            file_content = f.read()
+        parser = SQLDDLParser()
+        parser.parse_sql_file(file_content, file_path)
+
+        if args.json:
+            all_operations.extend(parser.get_operations())
+        else:
+            print(f"\n📄 {file_path}")
+            parser.print_operations_summary()
+
+    if args.json:
+        print(json.dumps(all_operations, indent=2))
+    return 0
+
+
+def use_git_change_source(args):
+    """Read PR changes from the local checkout instead of the GitHub API when --git-base is given."""
+    if args.git_base:
+        os.environ['CHANGE_SOURCE'] = 'git'
+        os.environ['GIT_BASE_REF'] = args.git_base
+        os.environ['GIT_HEAD_REF'] = args.git_head
+
+
+def cmd_validate(args):
+    """Validate the PR's migration file against staging (same as ddl_validator.py)."""
+    import ddl_validator
+
+    use_git_change_source(args)
+    if args.server:
+        os.environ['DDL_VALIDATOR_SERVER'] = args.server
+
+    ddl_validator.main()
+    return 0
+
+
+def cmd_diff(args):
+    """Compare CREATE TABLE definitions between two SQL files."""
+    expected_tables = load_create_tables(args.expected)
+    actual_tables = load_create_tables(args.actual)
+
+    print(f"🔍 Comparing {len(expected_tables)} tables in {args.expected} with {len(actual_tables)} tables in {args.actual}")
+    difference_count = compare_create_tables(
+        expected_tables, actual_tables, args.expected, args.actual, args.include_auto_increment
+    )
+
+    if difference_count:
+        print(f"\n❌ {difference_count} table(s) differ")
+        return 1
+    print("✅ No structural differences")
+    return 0
+
+
+def cmd_drift(args):
+    """Compare a seed file against the tables that currently exist in staging."""
+    from sql_ddl_parser import SQLDDLParser
+    from ddl_validator import DatabaseConnection, get_staging_config
+
+    seed_tables = load_create_tables(args.seed_file)
+    database_name = args.database or SQLDDLParser().extract_database_name(args.seed_file)
+
+    db = DatabaseConnection(**get_staging_config(database_name))
+    if not db.connect():
+        return 1
+
+    try:
+        staging_tables = {}
+        for table_name in db.get_table_names():
+            staging_tables[table_name] = db.get_show_create_table(table_name)
+    finally:
+        db.close()
+
+    print(f"🔍 Comparing {args.seed_file} with staging database {database_name}")
+    difference_count = compare_create_tables(
+        seed_tables, staging_tables, args.seed_file, f"staging {database_name}", args.include_auto_increment
+    )
+
+    if difference_count:
+        print(f"\n❌ {difference_count} table(s) drifted from {args.seed_file}")
+        return 1
+    print("✅ Staging matches the seed file")
+    return 0
+
+
+def cmd_pr_report(args):
+    """Print the complete table definitions touched by a PR's seed files."""
+    import process_pr
+
+    use_git_change_source(args)
+    process_pr.main()
+    return 0
+
+
+def add_git_source_arguments(subparser):
+    """Add the options that select the local-git change source."""
+    subparser.add_argument('--git-base', help='Read changes from `git diff GIT_BASE...GIT_HEAD` instead of the GitHub API')
+    subparser.add_argument('--git-head', default='HEAD', help='Head commit for --git-base (default: HEAD)')
+
+
+def cmd_serve(args):
+    """Run the long-lived validation server."""
+    from validation_server import serve
+
+    serve(args.host, args.port, args.socket, args.poll_interval)
+    return 0
+
+
+def cmd_watch(args):
+    """Watch migration directories and revalidate them against the simulated schema."""
+    from watch_migrations import watch
+
+    watch(args.directories, use_polling=args.poll, run_once=args.once)
+    return 0
+
+
+def cmd_fk_graph(args):
+    """Print the foreign key dependency graph of SQL files."""
+    from fk_graph import print_graph_report
+
+    print_graph_report(args.files)
+    return 0
+
+
+def cmd_lint(args):
+    """Lint a migration file."""
+    from ddl_lint import lint_file, print_findings
+
+    findings = lint_file(args.migration, args.rollback)
+    print_findings(findings)
+    return 1 if any(finding.severity == 'error' for finding in findings) else 0
+
+
+def cmd_charset(args):
+    """Analyze charset/collation changes of a migration or a planned conversion."""
+    from charset_analyzer import analyze
+
+    return 1 if analyze(args.path, args.convert_to, args.staging) else 0
+
+
+def cmd_index_usage(args):
+    """Check a migration's DROP INDEX operations against performance_schema usage."""
+    from index_usage import capture_fixture, check_migration
+
+    if args.capture:
+        capture_fixture(args.target, args.capture)
+        return 0
+    results = check_migration(args.target, args.fixture, args.top)
+    return 1 if any(result['verdict'] == 'UNSAFE' for result in results) else 0
+
+
+def cmd_index_report(args):
+    """Rank the indexes whose removal saves the most write amplification."""
+    from index_report import capture_fixture, report
+
+    if args.capture:
+        capture_fixture(args.paths, args.capture)
+    else:
+        report(args.paths, args.staging, args.fixture, args.emit, args.top)
+    return 0
+
+
+def cmd_advise(args):
+    """Suggest composite/covering indexes for the queries of a query log."""
+    from slow_log_advisor import advise
+
+    advise(args.log, args.directory, args.top, args.emit)
+    return 0
+
+
+def cmd_export(args):
+    """Regenerate the seed files of an MYSQL/<env> directory from staging."""
+    from schema_exporter import export_environment
+
+    export_environment(args.environment, args.schemas, args.no_auto_increment, args.workers)
+    return 0
+
+
+def cmd_dump_data(args):
+    """Dump a staging database's rows into chunk files from one consistent snapshot."""
+    from data_dumper import DEFAULT_CHUNK_ROWS, DEFAULT_WORKERS, dump_database
+
+    dump_database(args.database, args.output, args.tables or None,
+                  args.workers or DEFAULT_WORKERS, args.chunk_rows or DEFAULT_CHUNK_ROWS)
+    return 0
+
+
+def cmd_load(args):
+    """Load seed files and chunk files into the local database."""
+    from seed_loader import DEFAULT_WORKERS, load_files
+
+    load_files(args.paths, args.database, args.workers or DEFAULT_WORKERS, args.keep_checks)
+    return 0
+
+
+def cmd_checksum(args):
+    """Compare a database's tables between staging and the local copy."""
+    from table_checksum import DEFAULT_WORKERS, checksum_database
+
+    results = checksum_database(args.directory, args.tables or None, args.workers or DEFAULT_WORKERS)
+    return 1 if any(result['different_rows'] for result in results) else 0
+
+
+def cmd_backfill(args):
+    """Backfill one column in keyset chunks."""
+    from backfill import backfill
+
+    backfill(args.database, args.table, args.column, args.expression, args.where, args.local, args.checkpoint)
+    return 0
+
+
+def cmd_purge(args):
+    """Apply a retention policy file."""
+    from retention_purge import purge
+
+    purge(args.policy, args.tables or None, args.dry_run, args.local, args.metrics)
+    return 0
+
+
+def cmd_archive(args):
+    """Archive a table's old rows, deleting them with --delete once verified."""
+    from cold_archiver import archive_table
+
+    manifest, _ = archive_table(args.database, args.table, args.output, args.days, args.before, args.column,
+                                args.delete, args.local)
+    return 0 if all(entry['verified'] for entry in manifest['files']) else 1
+
+
+def cmd_restore(args):
+    """Load an archive back and verify it against its manifest."""
+    from cold_archiver import restore_archive
+
+    restore_archive(args.manifest, args.into, args.local, args.workers)
+    return 0
+
+
+def cmd_history_build(args):
+    """Build a schema history file from a database directory's migrations."""
+    from schema_history import build_history
+
+    build_history(args.directory, args.output, args.from_seed)
+    return 0
+
+
+def cmd_history(args):
+    """Print a table (or the table list) at a version, or a table's change log."""
+    from schema_history import SchemaHistory, render_table
+
+    try:
+        with SchemaHistory(args.file) as history:
+            if args.table and args.log:
+                for number, name, table in history.table_log(args.table):
+                    print(f"V{number:<6} {name:<50} {'dropped' if table is None else f'{len(table.columns)} columns'}")
+            elif args.table:
+                table = history.table_at(args.table, args.version)
+                if table is None:
+                    print(f"❌ {args.table} does not exist at that version")
+                    return 1
+                print(render_table(table) + ';')
+            else:
+                schema = history.schema_at(args.version)
+                for table_name in sorted(schema.tables):
+                    print(f"{table_name:<45} {len(schema.tables[table_name].columns):>4} columns")
+    except (ValueError, KeyError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+def cmd_generate(args):
+    """Generate the ALTER statements (and rollbacks) that bring staging to the edited seed files."""
+    from migration_generator import generate_migration
+
+    result = generate_migration(args.directory, args.current, args.name, args.drop_tables, args.dry_run, args.force)
+    return 1 if result is None else 0
+
+
+def build_parser():
+    """Build the argument parser with all subcommands."""
+    parser = argparse.ArgumentParser(prog='ddltool', description='DDL migration tooling')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parse_parser = subparsers.add_parser('parse', help='Parse local SQL files and print DDL operations')
+    parse_parser.add_argument('files', nargs='+', help='SQL files (MYSQL/<env>/<db>/...)')
+    parse_parser.add_argument('--json', action='store_true', help='Print operations as JSON')
+    parse_parser.set_defaults(handler=cmd_parse)
+
+    validate_parser = subparsers.add_parser('validate', help="Validate the PR's migration against staging")
+    add_git_source_arguments(validate_parser)
+    validate_parser.add_argument('--server', help='Validation server address (http://host:port or unix:/path)')
+    validate_parser.set_defaults(handler=cmd_validate)
+
+    diff_parser = subparsers.add_parser('diff', help='Compare CREATE TABLE definitions of two SQL files')
+    diff_parser.add_argument('expected', help='Expected schema SQL file')
+    diff_parser.add_argument('actual', help='Actual schema SQL file')
+    diff_parser.add_argument('--include-auto-increment', action='store_true', help='Also compare AUTO_INCREMENT counters')
+    diff_parser.set_defaults(handler=cmd_diff)
+
+    drift_parser = subparsers.add_parser('drift', help='Compare a seed file against the staging schema')
+    drift_parser.add_argument('seed_file', help='Seed file, e.g. MYSQL/<env>/<db>/seed.sql')
+    drift_parser.add_argument('--database', help='Staging database name (default: directory of the seed file)')
+    drift_parser.add_argument('--include-auto-increment', action='store_true', help='Also compare AUTO_INCREMENT counters')
+    drift_parser.set_defaults(handler=cmd_drift)
+
+    pr_report_parser = subparsers.add_parser('pr-report', help="Print table definitions touched by the PR's seed files")
+    add_git_source_arguments(pr_report_parser)
+    pr_report_parser.set_defaults(handler=cmd_pr_report)
+
+    serve_parser = subparsers.add_parser('serve', help='Run the validation server with warm staging connections')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='HTTP host (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=8765, help='HTTP port (default: 8765)')
+    serve_parser.add_argument('--socket', help='Listen on this Unix socket instead of HTTP')
+    serve_parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between staging schema change checks')
+    serve_parser.set_defaults(handler=cmd_serve)
+
+    watch_parser = subparsers.add_parser('watch', help='Revalidate migrations locally on every save')
+    watch_parser.add_argument('directories', nargs='+', help='MYSQL/<env>/<db> directories (or their parents)')
+    watch_parser.add_argument('--poll', action='store_true', help='Poll modification times instead of using inotify')
+    watch_parser.add_argument('--once', action='store_true', help='Validate once and exit')
+    watch_parser.set_defaults(handler=cmd_watch)
+
+    fk_graph_parser = subparsers.add_parser('fk-graph', help='Print the foreign key graph and a safe CREATE/DROP order')
+    fk_graph_parser.add_argument('files', nargs='+', help='SQL files to read')
+    fk_graph_parser.set_defaults(handler=cmd_fk_graph)
+
+    lint_parser = subparsers.add_parser('lint', help='Lint a migration file with the rule engine')
+    lint_parser.add_argument('migration', help='V{n}__name.sql migration file')
+    lint_parser.add_argument('rollback', nargs='?', help='Rollback file (default: the matching U{n}__*-rollback.sql)')
+    lint_parser.set_defaults(handler=cmd_lint)
+
+    charset_parser = subparsers.add_parser('charset', help='Estimate the cost of charset/collation changes')
+    charset_parser.add_argument('path', help='Migration file, or a MYSQL/<env>/<db> directory with --convert-to')
+    charset_parser.add_argument('--convert-to', help='Analyze converting every table to CHARSET[:COLLATION]')
+    charset_parser.add_argument('--staging', action='store_true', help='Read table sizes from staging')
+    charset_parser.set_defaults(handler=cmd_charset)
+
+    index_usage_parser = subparsers.add_parser('index-usage', help='Check whether indexes a migration drops are still in use')
+    index_usage_parser.add_argument('target', help='Migration file, or the database name with --capture')
+    index_usage_parser.add_argument('--fixture', help='Read counters from a captured JSON fixture instead of staging')
+    index_usage_parser.add_argument('--capture', metavar='FILE', help="Save the database's counters to FILE")
+    index_usage_parser.add_argument('--top', type=int, default=5, help='Query digests to show per index (default: 5)')
+    index_usage_parser.set_defaults(handler=cmd_index_usage)
+
+    index_report_parser = subparsers.add_parser('index-report', help='Rank unused, low-selectivity and redundant indexes')
+    index_report_parser.add_argument('paths', nargs='+', help='MYSQL/<env>/<db> directories or their parents; database names with --capture')
+    index_report_parser.add_argument('--staging', action='store_true', help='Read statistics from staging')
+    index_report_parser.add_argument('--fixture', help='Read statistics from a captured JSON fixture')
+    index_report_parser.add_argument('--capture', metavar='FILE', help="Save the databases' statistics to FILE")
+    index_report_parser.add_argument('--emit', action='store_true', help='Write a V/U migration pair dropping the candidates')
+    index_report_parser.add_argument('--top', type=int, help='Candidates to list per database')
+    index_report_parser.set_defaults(handler=cmd_index_report)
+
+    advise_parser = subparsers.add_parser('advise', help='Suggest indexes from a slow or general query log')
+    advise_parser.add_argument('log', help='Slow query log or general query log (.gz allowed)')
+    advise_parser.add_argument('directory', help='MYSQL/<env>/<db> directory with the seed files')
+    advise_parser.add_argument('--top', type=int, default=10, help='Digests and proposals to show (default: 10)')
+    advise_parser.add_argument('--emit', action='store_true', help='Write the proposals as a V/U migration pair')
+    advise_parser.set_defaults(handler=cmd_advise)
+
+    export_parser = subparsers.add_parser('export', help='Regenerate seed dumps from the staging server')
+    export_parser.add_argument('environment', help='MYSQL/<env> directory')
+    export_parser.add_argument('schemas', nargs='*', help='Schemas to export (default: every <db> directory present)')
+    export_parser.add_argument('--no-auto-increment', action='store_true', help='Drop table AUTO_INCREMENT=n counters')
+    export_parser.add_argument('--workers', type=int, help='Concurrent connections (default: SCHEMA_EXPORT_WORKERS or 8)')
+    export_parser.set_defaults(handler=cmd_export)
+
+    dump_parser = subparsers.add_parser('dump-data', help='Dump staging rows into compressed chunk files from one snapshot')
+    dump_parser.add_argument('database', help='Staging database name')
+    dump_parser.add_argument('output', help='Output directory for the chunk files and metadata.json')
+    dump_parser.add_argument('tables', nargs='*', help='Tables to dump (default: all base tables)')
+    dump_parser.add_argument('--workers', type=int, help='Worker connections (default: DATA_DUMP_WORKERS or 4)')
+    dump_parser.add_argument('--chunk-rows', type=int, help='Approximate rows per chunk (default: DATA_DUMP_CHUNK_ROWS or 500000)')
+    dump_parser.set_defaults(handler=cmd_dump_data)
+
+    load_parser = subparsers.add_parser('load', help='Load seed dumps and chunk files into a local MySQL stand-in')
+    load_parser.add_argument('paths', nargs='+', help='Seed files, chunk files, or directories of them')
+    load_parser.add_argument('--database', help='Target database (default: from metadata.json, chunk names or the directory)')
+    load_parser.add_argument('--workers', type=int, help='Worker connections (default: SEED_LOAD_WORKERS or 4)')
+    load_parser.add_argument('--keep-checks', action='store_true', help='Leave UNIQUE_CHECKS and FOREIGN_KEY_CHECKS on')
+    load_parser.set_defaults(handler=cmd_load)
+
+    checksum_parser = subparsers.add_parser('checksum', help='Compare table data between staging and the local copy by chunk checksums')
+    checksum_parser.add_argument('directory', help='MYSQL/<env>/<db> directory whose seed files define the tables')
+    checksum_parser.add_argument('tables', nargs='*', help='Tables to compare (default: all in the seed files)')
+    checksum_parser.add_argument('--workers', type=int, help='Tables compared at once (default: TABLE_CHECKSUM_WORKERS or 4)')
+    checksum_parser.set_defaults(handler=cmd_checksum)
+
+    backfill_parser = subparsers.add_parser('backfill', help='Populate a new column in throttled, committed, resumable chunks')
+    backfill_parser.add_argument('database', help='Database name')
+    backfill_parser.add_argument('table', help='Table to backfill')
+    backfill_parser.add_argument('column', help='Column to set')
+    backfill_parser.add_argument('expression', help="SQL expression for the new value, e.g. \"'IN'\"")
+    backfill_parser.add_argument('--where', help='Extra condition rows must match, e.g. "iso_country_code IS NULL"')
+    backfill_parser.add_argument('--local', action='store_true', help='Run against the local stand-in instead of staging')
+    backfill_parser.add_argument('--checkpoint', help='Checkpoint file (default: backfill-<db>.<table>.<column>.json)')
+    backfill_parser.set_defaults(handler=cmd_backfill)
+
+    purge_parser = subparsers.add_parser('purge', help='Delete rows past their retention period, by batches or DROP PARTITION')
+    purge_parser.add_argument('policy', help='Retention policy JSON file')
+    purge_parser.add_argument('tables', nargs='*', help='Databases or db.table entries to purge (default: the whole policy)')
+    purge_parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted or dropped')
+    purge_parser.add_argument('--local', action='store_true', help='Run against the local stand-in instead of staging')
+    purge_parser.add_argument('--metrics', help='Append per-batch metrics as JSON lines to this file')
+    purge_parser.set_defaults(handler=cmd_purge)
+
+    archive_parser = subparsers.add_parser('archive', help='Stream rows older than a cutoff into verified compressed files')
+    archive_parser.add_argument('database', help='Database name')
+    archive_parser.add_argument('table', help='Table to archive')
+    archive_parser.add_argument('output', help='Directory for the archive files and manifest.json')
+    cutoff_group = archive_parser.add_mutually_exclusive_group(required=True)
+    cutoff_group.add_argument('--days', type=int, help='Archive rows older than this many days')
+    cutoff_group.add_argument('--before', help='Archive rows before this timestamp')
+    archive_parser.add_argument('--column', default='created_at', help='Timestamp column compared with the cutoff (default: created_at)')
+    archive_parser.add_argument('--delete', action='store_true', help='Delete the source rows of every verified file')
+    archive_parser.add_argument('--local', action='store_true', help='Run against the local stand-in instead of staging')
+    archive_parser.set_defaults(handler=cmd_archive)
+
+    restore_parser = subparsers.add_parser('restore', help='Load an archive back into its table and verify it')
+    restore_parser.add_argument('manifest', help="The archive's manifest.json")
+    restore_parser.add_argument('--into', help='Load into this table instead (created from the archived CREATE TABLE if missing)')
+    restore_parser.add_argument('--workers', type=int, help='Loader connections (default: SEED_LOAD_WORKERS or 4)')
+    restore_parser.add_argument('--local', action='store_true', help='Restore into the local stand-in instead of staging')
+    restore_parser.set_defaults(handler=cmd_restore)
+
+    history_build_parser = subparsers.add_parser('history-build', help="Replay a database's migrations into a versioned schema history file")
+    history_build_parser.add_argument('directory', help='MYSQL/<env>/<db> directory with V{n}__*.sql files')
+    history_build_parser.add_argument('--output', help='History file (default: <db>.schema-history)')
+    history_build_parser.add_argument('--from-seed', action='store_true', help='Start from the seed files instead of an empty schema')
+    history_build_parser.set_defaults(handler=cmd_history_build)
+
+    history_parser = subparsers.add_parser('history', help='Show a table or the whole schema at any version from a history file')
+    history_parser.add_argument('file', help='History file written by history-build')
+    history_parser.add_argument('table', nargs='?', help='Table to show (default: list all tables)')
+    history_parser.add_argument('--version', type=int, help='Migration version (default: the latest)')
+    history_parser.add_argument('--log', action='store_true', help="List the versions that changed the table")
+    history_parser.set_defaults(handler=cmd_history)
+
+    generate_parser = subparsers.add_parser('generate', help='Turn an edited seed file into a V/U migration pair against staging')
+    generate_parser.add_argument('directory', help='MYSQL/<env>/<db> directory with the desired seed*.sql files')
+    generate_parser.add_argument('--current', help='SQL file with the current schema (default: staging)')
+    generate_parser.add_argument('--name', default='apply_seed_changes', help='Migration name (default: apply_seed_changes)')
+    generate_parser.add_argument('--drop-tables', action='store_true', help='Drop tables that are not in the seed files')
+    generate_parser.add_argument('--dry-run', action='store_true', help='Print the statements instead of writing the files')
+    generate_parser.add_argument('--force', action='store_true', help='Write the files even if the replay reports problems')
+    generate_parser.set_defaults(handler=cmd_generate)
+
+    return parser
+
+
+def main(argv=None):
+    """Run the ddltool CLI."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
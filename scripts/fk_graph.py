@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Foreign Key Dependency Graph
+Builds the graph of FOREIGN KEY references between tables from parsed DDL
+operations: CREATE TABLE statements are read with the extended
+DDLValidator.parse_create_table_sql, ALTER TABLE ... ADD FOREIGN KEY clauses
+come from SQLDDLParser's operation details.
+
+From the graph it can detect reference cycles, order CREATE TABLE operations
+so referenced tables are created first (and DROP TABLE operations so they are
+dropped last), and split operations into groups of tables that are not linked
+by any foreign key, which can be validated independently. Every walk is
+O(tables + foreign keys).
+
+Usage: python fk_graph.py <file.sql> [<file.sql> ...]
+"""
+
+import re
+import sys
+from collections import deque
+
+
+# A SET statement (or mysqldump's /*!40014 SET ... */) turning the checks off
+FOREIGN_KEY_CHECKS_OFF_PATTERN = re.compile(
+    r'^(?:/\*!\d*\s*)?SET\b[^;]*?\bFOREIGN_KEY_CHECKS\s*=\s*(?:0|OFF)\b', re.IGNORECASE
+)
+
+
+def sets_foreign_key_checks_off(sql_content):
+    """True if a statement of the content sets FOREIGN_KEY_CHECKS=0; plain comments and string literals don't count."""
+    from sql_ddl_parser import split_sql_statements
+
+    return any(FOREIGN_KEY_CHECKS_OFF_PATTERN.search(statement) for statement in split_sql_statements(sql_content))
+
+
+class ForeignKeyCycleError(ValueError):
+    """Raised when tables cannot be ordered because their foreign keys form a cycle."""
+
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__(f"Foreign key cycle: {' -> '.join(cycle)}")
+
+
+class ForeignKeyGraph:
+    """Tables and the tables their foreign keys reference."""
+
+    def __init__(self):
+        # Dicts used as insertion-ordered sets, so orderings are deterministic
+        self.references = {}      # table -> {referenced table: None}
+        self.referenced_by = {}   # table -> {referencing table: None}
+
+    def add_table(self, table_name):
+        if table_name not in self.references:
+            self.references[table_name] = {}
+            self.referenced_by[table_name] = {}
+
+    def add_reference(self, table_name, referenced_table):
+        self.add_table(table_name)
+        self.add_table(referenced_table)
+        # A self-referencing foreign key never constrains the order of statements
+        if referenced_table != table_name:
+            self.references[table_name][referenced_table] = None
+            self.referenced_by[referenced_table][table_name] = None
+
+    @classmethod
+    def from_operations(cls, operations):
+        """Build the graph from SQLDDLParser operations."""
+        from ddl_validator_extended import DDLValidator
+
+        ddl_validator = DDLValidator(None)
+        graph = cls()
+        for operation in operations:
+            graph.add_table(operation['table'])
+            if operation['command'] == 'CREATE_TABLE':
+                parsed = ddl_validator.parse_create_table_sql(operation['full_statement'])
+                for foreign_key in parsed['foreign_keys']:
+                    graph.add_reference(operation['table'], foreign_key['referenced_table'])
+            elif (operation['command'] == 'ALTER_TABLE' and operation.get('target_type') == 'FOREIGN_KEY'
+                  and operation.get('operation') == 'ADD' and operation['details'].get('referenced_table')):
+                graph.add_reference(operation['table'], operation['details']['referenced_table'])
+        return graph
+
+    def find_cycle(self, tables=None):
+        """Return one foreign key cycle among the given tables (default: all) as [a, b, ..., a], or None."""
+        tables = list(self.references) if tables is None else list(tables)
+        members = set(tables)
+        state = {}  # table -> 1 while on the DFS stack, 2 when finished
+
+        for root in tables:
+            if root in state:
+                continue
+            state[root] = 1
+            path = [root]
+            stack = [iter([table for table in self.references[root] if table in members])]
+            while stack:
+                referenced_table = next(stack[-1], None)
+                if referenced_table is None:
+                    state[path.pop()] = 2
+                    stack.pop()
+                elif state.get(referenced_table) == 1:
+                    return path[path.index(referenced_table):] + [referenced_table]
+                elif referenced_table not in state:
+                    state[referenced_table] = 1
+                    path.append(referenced_table)
+                    stack.append(iter([table for table in self.references[referenced_table] if table in members]))
+        return None
+
+    def topological_order(self, tables=None, dependents_first=False):
+        """
+        Order tables so every table comes after the tables it references
+        (Kahn's algorithm over the subgraph of the given tables).
+
+        Args:
+            tables: Tables to order (default: all); ties keep this order
+            dependents_first: Reverse the dependency direction (order for DROP TABLE)
+
+        Raises:
+            ForeignKeyCycleError: If the tables' foreign keys form a cycle
+        """
+        tables = list(dict.fromkeys(self.references if tables is None else tables))
+        members = set(tables)
+        dependencies = self.referenced_by if dependents_first else self.references
+        dependents = self.references if dependents_first else self.referenced_by
+
+        waiting = {table: sum(1 for dependency in dependencies.get(table, ()) if dependency in members) for table in tables}
+        ready = deque(table for table in tables if waiting[table] == 0)
+        order = []
+        while ready:
+            table = ready.popleft()
+            order.append(table)
+            for dependent in dependents.get(table, ()):
+                if dependent in waiting:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        ready.append(dependent)
+
+        if len(order) < len(tables):
+            raise ForeignKeyCycleError(self.find_cycle([table for table in tables if waiting[table] > 0]))
+        return order
+
+    def components(self, tables=None):
+        """Split tables into groups that are not linked by foreign keys among them."""
+        tables = list(dict.fromkeys(self.references if tables is None else tables))
+        members = set(tables)
+        seen = set()
+        groups = []
+        for root in tables:
+            if root in seen:
+                continue
+            seen.add(root)
+            group = []
+            queue = deque([root])
+            while queue:
+                table = queue.popleft()
+                group.append(table)
+                for neighbour in (*self.references.get(table, ()), *self.referenced_by.get(table, ())):
+                    if neighbour in members and neighbour not in seen:
+                        seen.add(neighbour)
+                        queue.append(neighbour)
+            groups.append(group)
+        return groups
+
+
+def order_table_operations(operations, graph=None):
+    """
+    Return the operations (given in file order) with CREATE TABLE statements in referenced-first
+    order and DROP TABLE statements in referencing-first order. The reordered
+    statements take the slots their command already occupied, so every other
+    operation keeps its position.
+
+    Raises:
+        ForeignKeyCycleError: If the created or dropped tables form a cycle
+    """
+    graph = graph or ForeignKeyGraph.from_operations(operations)
+    ordered = list(operations)
+
+    for command, dependents_first in (('CREATE_TABLE', False), ('DROP_TABLE', True)):
+        slots = [index for index, operation in enumerate(operations) if operation['command'] == command]
+        by_table = {}
+        for index in slots:
+            by_table.setdefault(operations[index]['table'], []).append(operations[index])
+
+        reordered = [
+            operation
+            for table_name in graph.topological_order(by_table, dependents_first=dependents_first)
+            for operation in by_table[table_name]
+        ]
+        for index, operation in zip(slots, reordered):
+            ordered[index] = operation
+
+    return ordered
+
+
+def group_operations(operations, graph=None):
+    """Split operations into lists (in their original order) whose tables are not linked by foreign keys."""
+    graph = graph or ForeignKeyGraph.from_operations(operations)
+    group_of_table = {}
+    for index, tables in enumerate(graph.components([operation['table'] for operation in operations])):
+        for table_name in tables:
+            group_of_table[table_name] = index
+
+    groups = {}
+    for operation in operations:
+        groups.setdefault(group_of_table[operation['table']], []).append(operation)
+    return list(groups.values())
+
+
+def check_operation_order(operations, graph=None):
+    """
+    Find CREATE/DROP TABLE statements that would fail because of the order
+    they appear in: a table created before a table it references, or dropped
+    before a table that references it.
+
+    Args:
+        operations: Parsed operations in file order (as SQLDDLParser.get_operations() returns them)
+
+    Returns:
+        list: (table, related table, message) tuples; a cycle is reported once
+    """
+    graph = graph or ForeignKeyGraph.from_operations(operations)
+    problems = []
+
+    for command, dependents_first in (('CREATE_TABLE', False), ('DROP_TABLE', True)):
+        positions = {}
+        for index, operation in enumerate(operations):
+            if operation['command'] == command:
+                positions.setdefault(operation['table'], index)
+
+        cycle = graph.find_cycle(positions)
+        if cycle:
+            problems.append((cycle[0], cycle[1], f"{command} statements form a foreign key cycle: {' -> '.join(cycle)}"))
+            continue
+
+        for table_name, position in positions.items():
+            related_tables = graph.referenced_by[table_name] if dependents_first else graph.references[table_name]
+            for related_table in related_tables:
+                if positions.get(related_table, -1) > position:
+                    if dependents_first:
+                        message = f"'{table_name}' is dropped before '{related_table}', which references it"
+                    else:
+                        message = f"'{table_name}' is created before '{related_table}', which it references"
+                    problems.append((table_name, related_table, message))
+
+    return problems
+
+
+def print_graph_report(file_paths):
+    """Print the foreign key graph, creation order and order problems of the given SQL files."""
+    from sql_ddl_parser import SQLDDLParser
+
+    operations = []
+    foreign_key_checks_off = False
+    for file_path in file_paths:
+        parser = SQLDDLParser()
+        with open(file_path, encoding='utf-8') as f:
+            file_content = f.read()
+        parser.parse_sql_file(file_content, file_path)
+        foreign_key_checks_off = foreign_key_checks_off or sets_foreign_key_checks_off(file_content)
+        operations.extend(parser.get_operations())
+
+    graph = ForeignKeyGraph.from_operations(operations)
+    print("🔗 Foreign Key Dependency Graph")
+    print("=" * 60)
+    print(f"{len(graph.references)} tables, {sum(len(referenced) for referenced in graph.references.values())} foreign key references")
+
+    cycle = graph.find_cycle()
+    if cycle:
+        print(f"❌ Foreign key cycle: {' -> '.join(cycle)}")
+        exit(1)
+
+    print("\n📋 Creation order (referenced tables first):")
+    for table_name in graph.topological_order():
+        referenced = graph.references[table_name]
+        print(f"  {table_name}" + (f"  -> {', '.join(sorted(referenced))}" if referenced else ""))
+
+    groups = graph.components()
+    print(f"\n📦 {len(groups)} independent group(s):")
+    for group in groups:
+        print(f"  {', '.join(group)}")
+
+    problems = check_operation_order(operations, graph)
+    if problems:
+        print("\n⚠️  Statement order problems:")
+        for _, _, message in problems:
+            print(f"  - {message}")
+        if foreign_key_checks_off:
+            print("ℹ️  The input sets FOREIGN_KEY_CHECKS=0, so MySQL will not enforce this order")
+    else:
+        print("\n✅ Statements are already in a valid foreign key order")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python fk_graph.py <file.sql> [<file.sql> ...]")
+        exit(1)
+
+    print_graph_report(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Unused and Low-Selectivity Index Report
+Every secondary index is maintained on every INSERT and DELETE (and on the
+UPDATEs that touch its columns), so indexes that no query needs are pure
+write amplification. For each MYSQL/<env>/<db>/ directory this combines the
+index definitions parsed from the seed*.sql files with, fetched in bulk per
+schema (one query each, not one per table):
+
+- information_schema.STATISTICS.CARDINALITY (selectivity = cardinality / rows)
+- sys.schema_unused_indexes (no reads since the server started)
+- information_schema.TABLES.TABLE_ROWS and performance_schema write counters
+- mysql.innodb_index_stats index sizes
+
+Indexes that are unused, low-selectivity, or redundant (a prefix of another
+index) are ranked by the index maintenance their removal would save. Unique
+indexes and indexes a foreign key still needs are never proposed. With
+--emit, a V{n}/U{n} migration pair dropping the candidates (and restoring
+them on rollback) is written to each database directory.
+
+Without --staging or --fixture only redundant indexes can be found.
+
+Usage: python index_report.py MYSQL/<env>[/<db>] [...] [--staging | --fixture stats.json] [--emit] [--top N]
+       python index_report.py --capture stats.json <database> [<database> ...]
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+from schema_model import SchemaModel
+from sql_ddl_parser import MigrationFileValidator
+
+
+# Indexes whose cardinality is below this fraction of the table's rows filter too little to be worth keeping
+LOW_SELECTIVITY = float(os.getenv("INDEX_REPORT_LOW_SELECTIVITY", "0.01"))
+
+PREFIX_LENGTH_PATTERN = re.compile(r'\((\d+)\)')
+
+
+def prefix_length(part):
+    """`name`(10) -> 10; a full-column key part -> None"""
+    match = PREFIX_LENGTH_PATTERN.search(part)
+    return int(match.group(1)) if match else None
+
+
+def quote_key_part(part):
+    """name(10) DESC -> `name`(10) DESC"""
+    part = part.strip()
+    match = re.match(r'^[`"]?(\w+)[`"]?(.*)$', part)
+    return f"`{match.group(1)}`{match.group(2)}" if match else part
+
+
+class SchemaIndexStats:
+    """Index and table statistics of one schema, fetched in bulk."""
+
+    def __init__(self, schema, cardinality=None, unused=None, table_rows=None, table_writes=None, index_sizes=None):
+        self.schema = schema
+        self.cardinality = cardinality or {}     # (table, index) -> cardinality of the whole key
+        self.unused = unused                     # set of (table, index), or None if sys is not readable
+        self.table_rows = table_rows or {}       # table -> TABLE_ROWS
+        self.table_writes = table_writes or {}   # table -> rows inserted, updated or deleted since startup
+        self.index_sizes = index_sizes or {}     # (table, index) -> bytes
+
+    @classmethod
+    def from_staging(cls, db):
+        """Read the statistics of db.database with one query per source."""
+        from ddl_validator import mysql_connector
+
+        def fetch(query):
+            try:
+                db.cursor.execute(query, (db.database,))
+                return db.cursor.fetchall()
+            except mysql_connector.Error as e:
+                print(f"⚠️  Skipping a statistics source: {e}")
+                return None
+
+        stats = cls(db.database)
+
+        # CARDINALITY of the last key part is the cardinality of the whole index
+        for row in fetch("""
+            SELECT table_name AS table_name, index_name AS index_name, MAX(cardinality) AS cardinality
+            FROM information_schema.STATISTICS
+            WHERE table_schema = %s
+            GROUP BY table_name, index_name
+        """) or []:
+            stats.cardinality[(row['table_name'], row['index_name'])] = int(row['cardinality'] or 0)
+
+        unused_rows = fetch("""
+            SELECT object_name AS table_name, index_name AS index_name
+            FROM sys.schema_unused_indexes
+            WHERE object_schema = %s
+        """)
+        if unused_rows is not None:
+            stats.unused = {(row['table_name'], row['index_name']) for row in unused_rows}
+
+        for row in fetch("""
+            SELECT table_name AS table_name, table_rows AS table_rows
+            FROM information_schema.TABLES
+            WHERE table_schema = %s AND table_type = 'BASE TABLE'
+        """) or []:
+            stats.table_rows[row['table_name']] = int(row['table_rows'] or 0)
+
+        for row in fetch("""
+            SELECT object_name AS table_name, count_write AS count_write
+            FROM performance_schema.table_io_waits_summary_by_table
+            WHERE object_schema = %s
+        """) or []:
+            stats.table_writes[row['table_name']] = int(row['count_write'] or 0)
+
+        for row in fetch("""
+            SELECT table_name AS table_name, index_name AS index_name, stat_value * @@innodb_page_size AS size
+            FROM mysql.innodb_index_stats
+            WHERE database_name = %s AND stat_name = 'size'
+        """) or []:
+            stats.index_sizes[(row['table_name'], row['index_name'])] = int(row['size'] or 0)
+
+        return stats
+
+    @classmethod
+    def from_dict(cls, data):
+        def pairs(entries):
+            return {(entry['table'], entry['index']): entry['value'] for entry in entries}
+
+        return cls(
+            data['schema'],
+            pairs(data.get('cardinality', [])),
+            {(entry['table'], entry['index']) for entry in data['unused']} if data.get('unused') is not None else None,
+            data.get('table_rows', {}),
+            data.get('table_writes', {}),
+            pairs(data.get('index_sizes', []))
+        )
+
+    def to_dict(self):
+        def entries(pairs):
+            return [{'table': table, 'index': index, 'value': value} for (table, index), value in sorted(pairs.items())]
+
+        return {
+            'schema': self.schema,
+            'cardinality': entries(self.cardinality),
+            'unused': [{'table': table, 'index': index} for table, index in sorted(self.unused)] if self.unused is not None else None,
+            'table_rows': self.table_rows,
+            'table_writes': self.table_writes,
+            'index_sizes': entries(self.index_sizes)
+        }
+
+    def selectivity(self, table_name, index_name):
+        rows = self.table_rows.get(table_name)
+        cardinality = self.cardinality.get((table_name, index_name))
+        if not rows or cardinality is None:
+            return None
+        return min(cardinality / rows, 1.0)
+
+
+def load_fixture(path):
+    """Read a --capture fixture: {schema: statistics}."""
+    with open(path) as f:
+        return {schema: SchemaIndexStats.from_dict(data) for schema, data in json.load(f).items()}
+
+
+def find_covering_index(table, index_name):
+    """
+    Return the name of the primary key or another index that makes index_name
+    redundant: it starts with the same key parts, with prefixes at least as
+    long. Of two identical indexes only the later one is redundant.
+    """
+    index = table.indexes[index_name.lower()]
+    wanted = list(zip(index['columns'], index['parts']))
+    names = list(table.indexes)
+    candidates = [('PRIMARY', table.primary_key, table.primary_key)] + [
+        (other['name'], other['columns'], other['parts'])
+        for key, other in table.indexes.items()
+        if key != index_name.lower() and (len(other['columns']) > len(wanted) or names.index(key) < names.index(index_name.lower()))
+    ]
+
+    for name, columns, parts in candidates:
+        if len(columns) < len(wanted):
+            continue
+        covered = True
+        for (column, part), other_column, other_part in zip(wanted, columns, parts):
+            other_prefix = prefix_length(other_part)
+            if column.lower() != other_column.lower() or (other_prefix is not None and other_prefix < (prefix_length(part) or other_prefix + 1)):
+                covered = False
+                break
+        if covered:
+            return name
+    return None
+
+
+def foreign_key_needing(schema, table, index_name):
+    """Return a description of the foreign key that would be left without an index, or None."""
+    for foreign_key in table.foreign_keys.values():
+        if not table.index_covers(foreign_key['columns'], exclude=index_name):
+            return f"foreign key {foreign_key['name']}"
+    for referencing_table, foreign_key in schema.referencing_foreign_keys(table.name):
+        if foreign_key['referenced_columns'] and not table.index_covers(foreign_key['referenced_columns'], exclude=index_name):
+            return f"foreign key {referencing_table}.{foreign_key['name']}"
+    return None
+
+
+def find_candidates(schema, stats=None, low_selectivity=LOW_SELECTIVITY):
+    """
+    Rank the secondary indexes that could be dropped.
+
+    Returns:
+        tuple: (candidates ranked by maintenance saved, [(table, index, reason kept)])
+    """
+    stats = stats or SchemaIndexStats(schema.database)
+    found = []
+    kept = []
+
+    for table in schema.tables.values():
+        rows = stats.table_rows.get(table.name)
+        writes = stats.table_writes.get(table.name)
+        for index in table.indexes.values():
+            if index['unique']:
+                continue
+            reasons = []
+            if stats.unused is not None and (table.name, index['name']) in stats.unused:
+                reasons.append("unused since server start")
+            selectivity = stats.selectivity(table.name, index['name'])
+            if selectivity is not None and selectivity < low_selectivity:
+                reasons.append(f"low selectivity ({stats.cardinality[(table.name, index['name'])]:,} distinct in {rows:,} rows)")
+            covering_index = find_covering_index(table, index['name'])
+            if covering_index:
+                reasons.append(f"redundant with {covering_index}")
+            if not reasons:
+                continue
+            found.append({
+                'table': table.name, 'index': index['name'], 'columns': index['columns'], 'parts': index['parts'],
+                'reasons': reasons, 'redundant_with': covering_index, 'selectivity': selectivity,
+                'rows': rows, 'writes': writes, 'size': stats.index_sizes.get((table.name, index['name'])),
+                # Every written row maintains the index once; without write counters, fall back to table size
+                'score': writes if writes is not None else (rows or 0)
+            })
+
+    found.sort(key=lambda candidate: (candidate['score'], candidate['size'] or 0), reverse=True)
+
+    # Accept drops in rank order against a working copy, so two indexes never justify each other's removal
+    working = schema.copy()
+    candidates = []
+    for candidate in found:
+        table = working.tables[candidate['table']]
+        needing = foreign_key_needing(working, table, candidate['index'])
+        if needing:
+            kept.append((candidate['table'], candidate['index'], f"needed by {needing}"))
+            continue
+        if candidate['redundant_with'] and len(candidate['reasons']) == 1 and not find_covering_index(table, candidate['index']):
+            kept.append((candidate['table'], candidate['index'], f"{candidate['redundant_with']} is dropped as well"))
+            continue
+        del table.indexes[candidate['index'].lower()]
+        candidates.append(candidate)
+
+    return candidates, kept
+
+
+def render_migration_pair(candidates):
+    """Return (migration statements, rollback statements) dropping and restoring the candidates."""
+    by_table = {}
+    for candidate in candidates:
+        by_table.setdefault(candidate['table'], []).append(candidate)
+
+    migration = []
+    rollback = []
+    for table_name, table_candidates in by_table.items():
+        drops = ",\n  ".join(f"DROP INDEX `{candidate['index']}`" for candidate in table_candidates)
+        adds = ",\n  ".join(
+            f"ADD INDEX `{candidate['index']}` ({', '.join(quote_key_part(part) for part in candidate['parts'])})"
+            for candidate in table_candidates
+        )
+        migration.append(f"ALTER TABLE `{table_name}`\n  {drops};")
+        rollback.append(f"ALTER TABLE `{table_name}`\n  {adds};")
+    return migration, rollback
+
+
+def next_migration_version(directory):
+    """One more than the highest V{n} migration version in the directory."""
+    validator = MigrationFileValidator()
+    versions = [
+        int(match.group(1)) for match in (validator.migration_pattern.match(os.path.basename(path)) for path in glob.glob(os.path.join(directory, '*.sql')))
+        if match
+    ]
+    return max(versions, default=0) + 1
+
+
+def write_migration_pair(directory, name, migration_statements, rollback_statements):
+    """
+    Write V{n}__{name}.sql and U{n}__{name}-rollback.sql with the next free version.
+
+    Returns:
+        tuple: (migration path, rollback path)
+    """
+    validator = MigrationFileValidator()
+    version = next_migration_version(directory)
+    migration_path = os.path.join(directory, f"V{version}__{name}.sql")
+    rollback_path = os.path.join(directory, f"U{version}__{name}-rollback.sql")
+    if not (validator.migration_pattern.match(os.path.basename(migration_path))
+            and validator.rollback_pattern.match(os.path.basename(rollback_path))):
+        raise ValueError(f"'{name}' does not make a valid migration file name")
+
+    with open(migration_path, 'w', encoding='utf-8') as f:
+        f.write("\n\n".join(migration_statements) + "\n")
+    with open(rollback_path, 'w', encoding='utf-8') as f:
+        f.write("\n\n".join(rollback_statements) + "\n")
+    return migration_path, rollback_path
+
+
+def format_count(value):
+    return f"{value:,}" if value is not None else "?"
+
+
+def print_report(database, candidates, kept, stats_source, top=None):
+    from charset_analyzer import format_bytes
+
+    print(f"\n📁 {database} ({stats_source})")
+    print("-" * 70)
+    if not candidates:
+        print("   ✅ No index removal candidates")
+    for rank, candidate in enumerate(candidates[:top] if top else candidates, 1):
+        size = format_bytes(candidate['size']) if candidate['size'] is not None else "size ?"
+        print(f"   {rank:>2}. {candidate['table']}.{candidate['index']} ({', '.join(candidate['columns'])})")
+        print(f"       writes {format_count(candidate['writes'])}, rows {format_count(candidate['rows'])}, {size}")
+        print(f"       {'; '.join(candidate['reasons'])}")
+    if top and len(candidates) > top:
+        print(f"   ... {len(candidates) - top} more")
+    for table_name, index_name, reason in kept:
+        print(f"   ℹ️  Keeping {table_name}.{index_name}: {reason}")
+
+
+def fetch_stats(database_name):
+    """Connect to the database's staging server and read its statistics."""
+    from ddl_validator import DatabaseConnection, get_staging_config
+
+    db = DatabaseConnection(**get_staging_config(database_name))
+    if not db.connect():
+        return None
+    try:
+        return SchemaIndexStats.from_staging(db)
+    finally:
+        db.close()
+
+
+def report(paths, use_staging=False, fixture_path=None, emit=False, top=None):
+    """
+    Print the index removal candidates of each database directory.
+
+    Returns:
+        dict: database -> candidates
+    """
+    from watch_migrations import expand_directories
+
+    directories = expand_directories(paths)
+    if not directories:
+        print("❌ No directories with .sql files found")
+        exit(1)
+
+    fixture = load_fixture(fixture_path) if fixture_path else {}
+    print("🗂️  Index Removal Report")
+    print("=" * 60)
+
+    results = {}
+    for directory in directories:
+        database_name = os.path.basename(directory)
+        seed_files = sorted(glob.glob(os.path.join(directory, 'seed*.sql')))
+        schema = SchemaModel.from_files(seed_files, database_name)
+
+        stats = None
+        stats_source = "definitions only"
+        if fixture_path:
+            stats = fixture.get(database_name)
+            stats_source = f"fixture {os.path.basename(fixture_path)}" if stats else "definitions only, not in fixture"
+        elif use_staging:
+            stats = fetch_stats(database_name)
+            stats_source = "staging" if stats else "definitions only, staging unavailable"
+
+        candidates, kept = find_candidates(schema, stats)
+        results[database_name] = candidates
+        print_report(database_name, candidates, kept, stats_source, top)
+
+        if emit and candidates:
+            migration, rollback = render_migration_pair(candidates)
+            migration_path, rollback_path = write_migration_pair(directory, 'drop_unneeded_indexes', migration, rollback)
+            print(f"   📝 Wrote {os.path.basename(migration_path)} and {os.path.basename(rollback_path)}")
+
+    return results
+
+
+def capture_fixture(database_names, path):
+    """Save the statistics of the given databases to a JSON fixture."""
+    fixture = {}
+    for database_name in database_names:
+        stats = fetch_stats(database_name)
+        if stats is None:
+            exit(1)
+        fixture[database_name] = stats.to_dict()
+    with open(path, 'w') as f:
+        json.dump(fixture, f, indent=2)
+    print(f"✅ Saved index statistics of {len(fixture)} database(s) to {path}")
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for option in ('--fixture', '--top', '--capture'):
+        if option in args:
+            position = args.index(option)
+            options[option] = args[position + 1] if position + 1 < len(args) else None
+            del args[position:position + 2]
+    flags = {arg for arg in args if arg.startswith('--')}
+    args = [arg for arg in args if not arg.startswith('--')]
+
+    if '--capture' in options:
+        if not options['--capture'] or not args:
+            print("Usage: python index_report.py --capture stats.json <database> [<database> ...]")
+            exit(1)
+        capture_fixture(args, options['--capture'])
+        return
+
+    if not args:
+        print("Usage: python index_report.py MYSQL/<env>[/<db>] [...] [--staging | --fixture stats.json] [--emit] [--top N]")
+        exit(1)
+
+    report(args, '--staging' in flags, options.get('--fixture'), '--emit' in flags, int(options['--top']) if options.get('--top') else None)
+
+
+if __name__ == "__main__":
+    main()
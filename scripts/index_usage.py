@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+DROP INDEX Usage Check
+DDLValidator.validate_index_operation only confirms a dropped index is gone
+from staging; this checks whether queries still depend on it. For every
+DROP INDEX in a migration it reports, from performance_schema:
+
+- the reads the index served (table_io_waits_summary_by_index_usage) and
+  their share of all reads on the table
+- the statement digests (events_statements_summary_by_digest) that filter,
+  join or sort on the index's leading column, ranked by total latency
+- for the top digests with a query sample, whether EXPLAIN picks the index;
+  all EXPLAINs run as one batch on a single connection
+
+The counters come from staging, or from a JSON fixture captured elsewhere
+(e.g. a production replica) with --capture.
+
+Usage: python index_usage.py <MYSQL/<env>/<db>/V{n}__name.sql> [--fixture usage.json] [--top N]
+       python index_usage.py --capture usage.json <database>
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+from schema_model import SchemaModel
+from sql_ddl_parser import SQLDDLParser
+
+
+# An index serving more reads than this since the counters were reset is in use
+READ_THRESHOLD = int(os.getenv("INDEX_USAGE_READ_THRESHOLD", "1000"))
+
+EXPLAINABLE_PATTERN = re.compile(r'^\s*(?:SELECT|UPDATE|DELETE|INSERT|REPLACE|WITH)\b', re.IGNORECASE)
+PREDICATE_START_PATTERN = re.compile(r'\b(?:WHERE|ON(?!\s+DUPLICATE\b)|ORDER\s+BY|GROUP\s+BY|USING)\b', re.IGNORECASE)
+
+PICOSECONDS_PER_MS = 1e9
+
+
+class IndexUsageData:
+    """Index I/O counters and statement digests of one schema."""
+
+    def __init__(self, schema, index_usage, digests, uptime_seconds=None, explains=None):
+        self.schema = schema
+        self.index_usage = index_usage      # [{'table', 'index', 'count_read', 'count_fetch', 'sum_timer_read'}]
+        self.digests = digests              # [{'digest', 'digest_text', 'query_sample_text', 'count_star', ...}]
+        self.uptime_seconds = uptime_seconds
+        self.explains = explains or {}      # digest -> {'key', 'possible_keys', 'error'}
+        self._usage_by_index = {(row['table'].lower(), (row['index'] or '').lower()): row for row in index_usage}
+        self._reads_by_table = {}
+        for row in index_usage:
+            table_key = row['table'].lower()
+            self._reads_by_table[table_key] = self._reads_by_table.get(table_key, 0) + int(row['count_read'] or 0)
+
+    @classmethod
+    def from_staging(cls, db):
+        """Load the schema's counters with three queries on a connected DatabaseConnection."""
+        db.cursor.execute("""
+            SELECT object_name AS `table`, index_name AS `index`, count_read AS count_read,
+                   count_fetch AS count_fetch, sum_timer_read AS sum_timer_read
+            FROM performance_schema.table_io_waits_summary_by_index_usage
+            WHERE object_schema = %s
+        """, (db.database,))
+        index_usage = [dict(row) for row in db.cursor.fetchall()]
+
+        db.cursor.execute("""
+            SELECT digest AS digest, digest_text AS digest_text, query_sample_text AS query_sample_text,
+                   count_star AS count_star, sum_timer_wait AS sum_timer_wait,
+                   sum_rows_examined AS sum_rows_examined, sum_no_index_used AS sum_no_index_used
+            FROM performance_schema.events_statements_summary_by_digest
+            WHERE schema_name = %s AND digest_text IS NOT NULL
+        """, (db.database,))
+        digests = [dict(row) for row in db.cursor.fetchall()]
+
+        db.cursor.execute("SHOW GLOBAL STATUS LIKE 'Uptime'")
+        uptime = db.cursor.fetchone()
+        uptime_seconds = int(list(uptime.values())[1]) if uptime else None
+
+        # Counters are integers (Decimal from the driver); keep them JSON-serialisable
+        for row in index_usage + digests:
+            for key, value in row.items():
+                if value is not None and not isinstance(value, str):
+                    row[key] = int(value)
+        return cls(db.database, index_usage, digests, uptime_seconds)
+
+    @classmethod
+    def from_fixture(cls, path):
+        with open(path) as f:
+            fixture = json.load(f)
+        return cls(
+            fixture['schema'], fixture['index_usage'], fixture['digests'],
+            fixture.get('uptime_seconds'), fixture.get('explains')
+        )
+
+    def to_fixture(self, path):
+        with open(path, 'w') as f:
+            json.dump({
+                'schema': self.schema,
+                'uptime_seconds': self.uptime_seconds,
+                'index_usage': self.index_usage,
+                'digests': self.digests,
+                'explains': self.explains
+            }, f, indent=2, default=str)
+
+    def usage_for(self, table_name, index_name):
+        return self._usage_by_index.get((table_name.lower(), index_name.lower()))
+
+    def table_reads(self, table_name):
+        return self._reads_by_table.get(table_name.lower(), 0)
+
+    def digests_using(self, table_name, column_name):
+        """Digests that mention the table and use the column in a predicate, join or sort."""
+        table_pattern = re.compile(rf'`?\b{re.escape(table_name)}\b`?', re.IGNORECASE)
+        column_pattern = re.compile(rf'`?\b{re.escape(column_name)}\b`?', re.IGNORECASE)
+        matches = []
+        for digest in self.digests:
+            text = digest.get('digest_text') or ''
+            if not table_pattern.search(text):
+                continue
+            predicate_start = PREDICATE_START_PATTERN.search(text)
+            if predicate_start and column_pattern.search(text, predicate_start.start()):
+                matches.append(digest)
+        return sorted(matches, key=lambda digest: digest.get('sum_timer_wait') or 0, reverse=True)
+
+
+def find_key_in_plan(plan, index_name):
+    """Return (used as key, listed in possible_keys) for an EXPLAIN FORMAT=JSON plan."""
+    used = False
+    possible = False
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if str(node.get('key', '')).lower() == index_name.lower():
+                used = True
+            if index_name.lower() in [str(key).lower() for key in node.get('possible_keys', [])]:
+                possible = True
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return used, possible
+
+
+def explain_digests(db, digests):
+    """
+    Run EXPLAIN FORMAT=JSON for each digest's query sample on one connection.
+
+    Returns:
+        dict: digest -> {'plan'} or {'error'}
+    """
+    from ddl_validator import mysql_connector
+
+    explains = {}
+    for digest in digests:
+        sample = digest.get('query_sample_text') or ''
+        if not EXPLAINABLE_PATTERN.match(sample):
+            explains[digest['digest']] = {'error': 'no explainable query sample'}
+            continue
+        try:
+            db.cursor.execute(f"EXPLAIN FORMAT=JSON {sample}")
+            row = db.cursor.fetchone()
+            explains[digest['digest']] = {'plan': json.loads(list(row.values())[0])}
+        except (mysql_connector.Error, ValueError) as e:
+            # Samples are truncated at performance_schema_max_sql_text_length and may not parse
+            explains[digest['digest']] = {'error': str(e)}
+    return explains
+
+
+class DropIndexChecker:
+    """Decides whether the DROP INDEX operations of a migration are safe to run."""
+
+    def __init__(self, usage, schema=None, top=5, read_threshold=READ_THRESHOLD):
+        self.usage = usage
+        self.schema = schema or SchemaModel()
+        self.top = top
+        self.read_threshold = read_threshold
+
+    @staticmethod
+    def drop_index_operations(operations):
+        return [
+            operation for operation in operations
+            if operation['command'] == 'ALTER_TABLE' and operation.get('target_type') == 'INDEX'
+            and operation.get('operation') == 'DROP'
+        ]
+
+    def index_columns(self, table_name, index_name):
+        table = self.schema.tables.get(table_name)
+        index = table.indexes.get(index_name.lower()) if table else None
+        return index['columns'] if index else []
+
+    def check(self, operations, db=None):
+        """
+        Check every DROP INDEX. With a staging connection, sampled EXPLAINs are
+        run for the top digests of indexes that still exist there.
+
+        Returns:
+            list: one result dict per DROP INDEX
+        """
+        results = []
+        to_explain = {}
+        for operation in self.drop_index_operations(operations):
+            table_name, index_name = operation['table'], operation['target']
+            columns = self.index_columns(table_name, index_name)
+            usage = self.usage.usage_for(table_name, index_name)
+            reads = int(usage['count_read'] or 0) if usage else 0
+            table_reads = self.usage.table_reads(table_name)
+            digests = self.usage.digests_using(table_name, columns[0])[:self.top] if columns else []
+
+            result = {
+                'table': table_name, 'index': index_name, 'columns': columns,
+                'tracked': usage is not None, 'reads': reads,
+                'read_share': reads / table_reads if table_reads else 0.0,
+                'digests': digests, 'explained': {}
+            }
+            results.append(result)
+
+            if db is not None and digests and db.index_exists(table_name, index_name):
+                for digest in digests:
+                    to_explain.setdefault(digest['digest'], digest)
+
+        # One batch of EXPLAINs for all indexes, on the one connection
+        if to_explain:
+            self.usage.explains.update(explain_digests(db, to_explain.values()))
+
+        for result in results:
+            for digest in result['digests']:
+                explain = self.usage.explains.get(digest['digest'])
+                if explain and 'plan' in explain:
+                    result['explained'][digest['digest']] = find_key_in_plan(explain['plan'], result['index'])
+            result['verdict'] = self.verdict(result)
+        return results
+
+    def verdict(self, result):
+        if any(used for used, _ in result['explained'].values()):
+            return 'UNSAFE'
+        if result['reads'] >= self.read_threshold:
+            return 'UNSAFE'
+        # Without counters for the index there is no evidence either way
+        if result['digests'] or result['reads'] > 0 or not result['tracked']:
+            return 'REVIEW'
+        return 'SAFE'
+
+
+def print_results(results, usage):
+    if usage.uptime_seconds:
+        print(f"Counters cover {usage.uptime_seconds / 3600:.1f} h since the server started (or since they were last reset)")
+
+    for result in results:
+        icon = {'SAFE': '✅', 'REVIEW': '⚠️ ', 'UNSAFE': '❌'}[result['verdict']]
+        columns = ', '.join(result['columns']) or 'columns unknown'
+        print(f"\n{icon} DROP INDEX {result['table']}.{result['index']} ({columns}): {result['verdict']}")
+        print("-" * 70)
+        if result['tracked']:
+            print(f"   Reads served: {result['reads']:,} ({result['read_share']:.1%} of reads on {result['table']})")
+        else:
+            print("   No index I/O counters (index absent where the counters were collected, or never opened)")
+
+        if not result['digests']:
+            print("   No statement digests use the leading column")
+        for digest in result['digests']:
+            total_ms = (digest.get('sum_timer_wait') or 0) / PICOSECONDS_PER_MS
+            calls = digest.get('count_star') or 0
+            explained = result['explained'].get(digest['digest'])
+            if explained is None:
+                plan_note = "not explained"
+            elif explained[0]:
+                plan_note = "EXPLAIN uses this index"
+            elif explained[1]:
+                plan_note = "EXPLAIN lists it as a possible key"
+            else:
+                plan_note = "EXPLAIN does not use it"
+            print(f"   {calls:>10,} calls {total_ms:>12,.1f} ms total  [{plan_note}]")
+            print(f"      {(digest.get('digest_text') or '')[:120]}")
+
+
+def check_migration(migration_path, fixture_path=None, top=5):
+    """Check a migration's DROP INDEX operations; returns the results."""
+    directory = os.path.dirname(migration_path)
+    database_name = os.path.basename(os.path.abspath(directory))
+
+    parser = SQLDDLParser()
+    with open(migration_path, encoding='utf-8') as f:
+        parser.parse_sql_file(f.read(), migration_path)
+    operations = parser.get_operations()
+    schema = SchemaModel.from_files(sorted(glob.glob(os.path.join(directory, 'seed*.sql'))), database_name)
+
+    print("📉 DROP INDEX Usage Check")
+    print("=" * 60)
+    if not DropIndexChecker.drop_index_operations(operations):
+        print("✅ Migration drops no indexes")
+        return []
+
+    if fixture_path:
+        print(f"Using captured counters from {fixture_path}")
+        usage = IndexUsageData.from_fixture(fixture_path)
+        results = DropIndexChecker(usage, schema, top).check(operations)
+        print_results(results, usage)
+        return results
+
+    from ddl_validator import DatabaseConnection, get_staging_config
+
+    db = DatabaseConnection(**get_staging_config(database_name))
+    if not db.connect():
+        exit(1)
+    try:
+        usage = IndexUsageData.from_staging(db)
+        results = DropIndexChecker(usage, schema, top).check(operations, db)
+    finally:
+        db.close()
+    print_results(results, usage)
+    return results
+
+
+def capture_fixture(database_name, path):
+    """Save a schema's performance_schema counters to a JSON fixture."""
+    from ddl_validator import DatabaseConnection, get_staging_config
+
+    db = DatabaseConnection(**get_staging_config(database_name))
+    if not db.connect():
+        exit(1)
+    try:
+        usage = IndexUsageData.from_staging(db)
+    finally:
+        db.close()
+    usage.to_fixture(path)
+    print(f"✅ Saved {len(usage.index_usage)} index counters and {len(usage.digests)} digests to {path}")
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for option in ('--fixture', '--top', '--capture'):
+        if option in args:
+            position = args.index(option)
+            options[option] = args[position + 1] if position + 1 < len(args) else None
+            del args[position:position + 2]
+
+    if '--capture' in options:
+        if not options['--capture'] or not args:
+            print("Usage: python index_usage.py --capture usage.json <database>")
+            exit(1)
+        capture_fixture(args[0], options['--capture'])
+        return
+
+    if not args:
+        print("Usage: python index_usage.py <MYSQL/<env>/<db>/V{n}__name.sql> [--fixture usage.json] [--top N]")
+        exit(1)
+
+    results = check_migration(args[0], options.get('--fixture'), int(options.get('--top') or 5))
+    if any(result['verdict'] == 'UNSAFE' for result in results):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
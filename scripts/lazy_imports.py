@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Lazy Imports
+Defers loading of heavy third-party modules (mysql.connector, requests, ...)
+until they are first used, so commands that never touch the database or the
+network start fast and work even where those packages are not installed.
+"""
+
+import sys
+import importlib.util
+
+
+class MissingModule:
+    """Stand-in for a module that is not installed; fails only when used."""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        raise ModuleNotFoundError(
+            f"'{self._name}' is required for this command. Install it with: pip install -r requirements.txt"
+        )
+
+
+def lazy_import(name):
+    """
+    Return a module whose execution is deferred until first attribute access.
+
+    Returns:
+        module: The lazily loaded module, or a MissingModule if it is not installed
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    try:
+        spec = importlib.util.find_spec(name)
+    except ModuleNotFoundError:
+        spec = None
+    if spec is None:
+        return MissingModule(name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
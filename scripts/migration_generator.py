@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Desired-State Migration Generator
+DDLValidator.compare_parsed_create_table() tells how two CREATE TABLE
+statements differ; this turns that difference into DDL. The desired state is
+a database directory's (edited) seed*.sql files, the current state is the
+staging schema (or another SQL file with --current). Every table that
+differs gets a single ALTER TABLE carrying all of its clauses, so it is
+rebuilt once, and the rollback gets the ALTER that undoes it:
+
+- DROP FOREIGN KEY / CHECK / INDEX / PRIMARY KEY, then DROP COLUMN
+- ADD / MODIFY COLUMN in the desired column order (AFTER / FIRST)
+- ADD PRIMARY KEY / INDEX / CHECK, then ADD CONSTRAINT ... FOREIGN KEY
+- changed table options (ENGINE, DEFAULT CHARSET, COLLATE, ROW_FORMAT, ...)
+
+Columns, keys and constraints are compared by their full definition text,
+not by the parsed attributes, which drop UNSIGNED, COLLATE and index prefix
+lengths. New tables get their CREATE TABLE; tables missing from the seed are
+only dropped with --drop-tables. Statements are ordered so that every foreign
+key is added after what it references and dropped before it. A renamed column
+looks like a DROP COLUMN plus an ADD COLUMN, so review the drops before
+applying. Both files are replayed on the simulated schema, then written as a
+V{n}__{name}.sql / U{n}__{name}-rollback.sql pair; if either replay reports
+problems nothing is written unless --force is given.
+
+Usage: python migration_generator.py MYSQL/<env>/<db> [--current current.sql] [--name NAME] [--drop-tables] [--dry-run] [--force]
+"""
+
+import os
+import re
+import sys
+import glob
+from data_dumper import quote_identifier
+from fk_graph import ForeignKeyGraph, ForeignKeyCycleError
+from schema_exporter import strip_auto_increment
+from schema_model import SchemaModel, find_closing_paren
+from seed_index import get_seed_index
+from sql_ddl_parser import SQLDDLParser
+
+DEFAULT_MIGRATION_NAME = "apply_seed_changes"
+
+CREATE_TABLE_PATTERN = re.compile(r'CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?[`"]?(\w+)[`"]?', re.IGNORECASE)
+PARTITION_PATTERN = re.compile(r'(?:/\*!\d+\s+)?PARTITION\s+BY\b', re.IGNORECASE)
+TABLE_OPTION_PATTERN = re.compile(
+    r"(DEFAULT\s+CHARSET|DEFAULT\s+CHARACTER\s+SET|CHARACTER\s+SET|CHARSET|DEFAULT\s+COLLATE|COLLATE|\w+)"
+    r"\s*=\s*('(?:[^'\\]|\\.|'')*'|[^\s,;]+)",
+    re.IGNORECASE
+)
+REFERENCES_PATTERN = re.compile(r'\bREFERENCES\s+[`"]?(\w+)[`"]?', re.IGNORECASE)
+
+NAME = r'[`"]?(\w+)[`"]?'
+PRIMARY_KEY_PATTERN = re.compile(r'PRIMARY\s+KEY\b', re.IGNORECASE)
+FOREIGN_KEY_PATTERN = re.compile(r'CONSTRAINT\s+' + NAME + r'\s+FOREIGN\s+KEY\b', re.IGNORECASE)
+CHECK_PATTERN = re.compile(r'CONSTRAINT\s+' + NAME + r'\s+CHECK\b', re.IGNORECASE)
+INDEX_PATTERN = re.compile(r'(?:CONSTRAINT\s+[`"]?\w+[`"]?\s+)?(?:(?:UNIQUE|FULLTEXT|SPATIAL)\s+)?(?:KEY|INDEX)\s+' + NAME, re.IGNORECASE)
+UNNAMED_KEY_PATTERN = re.compile(r'(?:UNIQUE|FULLTEXT|SPATIAL|KEY|INDEX|FOREIGN\s+KEY|CHECK|CONSTRAINT)\b', re.IGNORECASE)
+COLUMN_PATTERN = re.compile(NAME + r'\s')
+
+# Keys are dropped before columns and added after them; foreign keys go last in and first out
+KEY_DROP_ORDER = ('foreign', 'check', 'index', 'primary')
+KEY_ADD_ORDER = ('primary', 'index', 'check', 'foreign')
+
+# What an option the desired table no longer sets is reset to (ENGINE and CHARSET are always set)
+OPTION_RESETS = {
+    'COMMENT': "''",
+    'ROW_FORMAT': 'DEFAULT',
+    'KEY_BLOCK_SIZE': '0',
+    'STATS_PERSISTENT': 'DEFAULT',
+    'STATS_AUTO_RECALC': 'DEFAULT',
+    'STATS_SAMPLE_PAGES': 'DEFAULT'
+}
+CHARSET_OPTIONS = ('DEFAULT CHARSET', 'COLLATE')
+
+
+def normalize_definition(text):
+    return ' '.join(text.split())
+
+
+def option_name(name):
+    """Canonical name of a table option: CHARACTER SET / CHARSET -> DEFAULT CHARSET, DEFAULT COLLATE -> COLLATE."""
+    name = ' '.join(name.upper().split())
+    if 'CHARSET' in name or 'CHARACTER SET' in name:
+        return 'DEFAULT CHARSET'
+    if 'COLLATE' in name:
+        return 'COLLATE'
+    return name
+
+
+class TableDefinition:
+    """The column, key and constraint definitions of one CREATE TABLE, as written."""
+
+    def __init__(self, name, statement):
+        self.name = name
+        self.statement = statement
+        self.columns = {}        # lowercased name -> (name, definition), in table order
+        self.keys = {}           # (kind, lowercased name) -> (name, definition); kind: primary/index/check/foreign
+        self.options = {}        # canonical option name -> value, without AUTO_INCREMENT
+        self.partitioning = ''
+
+    @classmethod
+    def from_create_statement(cls, statement, parser=None):
+        """
+        Build a table definition from a CREATE TABLE statement.
+
+        Raises:
+            ValueError: If a key or constraint has no name (it could not be dropped by name)
+        """
+        parser = parser or SQLDDLParser()
+        statement = strip_auto_increment(statement.strip().rstrip(';').rstrip())
+        name_match = CREATE_TABLE_PATTERN.search(statement)
+        if not name_match:
+            raise ValueError(f"Not a CREATE TABLE statement: {statement[:60]}")
+        table = cls(name_match.group(1), statement)
+
+        open_index = statement.find('(', name_match.end())
+        close_index = find_closing_paren(statement, open_index) if open_index >= 0 else -1
+        if close_index < 0:
+            raise ValueError(f"Unbalanced column list in CREATE TABLE `{table.name}`")
+
+        for part in parser.split_table_definition(statement[open_index + 1:close_index]):
+            table.add_definition(normalize_definition(part))
+
+        options = statement[close_index + 1:]
+        partition_match = PARTITION_PATTERN.search(options)
+        if partition_match:
+            table.partitioning = normalize_definition(options[partition_match.start():])
+            options = options[:partition_match.start()]
+        for name, value in TABLE_OPTION_PATTERN.findall(options):
+            name = option_name(name)
+            if name != 'AUTO_INCREMENT':
+                table.options[name] = value
+        return table
+
+    def add_definition(self, definition):
+        if PRIMARY_KEY_PATTERN.match(definition):
+            self.keys[('primary', 'primary')] = ('PRIMARY', definition)
+            return
+        for kind, pattern in (('foreign', FOREIGN_KEY_PATTERN), ('check', CHECK_PATTERN), ('index', INDEX_PATTERN)):
+            match = pattern.match(definition)
+            if match:
+                self.keys[(kind, match.group(1).lower())] = (match.group(1), definition)
+                return
+        if UNNAMED_KEY_PATTERN.match(definition):
+            raise ValueError(f"Unnamed key in `{self.name}`: {definition} (name it so it can be dropped)")
+
+        column_match = COLUMN_PATTERN.match(definition)
+        if column_match:
+            self.columns[column_match.group(1).lower()] = (column_match.group(1), definition)
+
+    def foreign_key_targets(self, keys=None):
+        """Tables referenced by the given foreign keys (default: all of them), other than this one."""
+        targets = []
+        for key in (self.keys if keys is None else keys):
+            if key[0] == 'foreign':
+                match = REFERENCES_PATTERN.search(self.keys[key][1])
+                if match and match.group(1) != self.name and match.group(1) not in targets:
+                    targets.append(match.group(1))
+        return targets
+
+
+def load_table_definitions(statements):
+    """{table: CREATE TABLE statement} -> {table: TableDefinition}"""
+    parser = SQLDDLParser()
+    return {name: TableDefinition.from_create_statement(statement, parser) for name, statement in statements.items()}
+
+
+def load_create_statements(file_paths):
+    """Return {table: CREATE TABLE statement} for the tables of one or more SQL files, in file order."""
+    statements = {}
+    for file_path in file_paths:
+        with open(file_path, encoding='utf-8') as f:
+            index = get_seed_index(f.read())
+        for table_name in index.table_names():
+            statements[table_name] = index.get_definition(table_name)
+    return statements
+
+
+def fetch_staging_statements(database_name):
+    """Return {table: SHOW CREATE TABLE} for every base table of a staging database, or None."""
+    from ddl_validator import DatabaseConnection, get_staging_config
+
+    db = DatabaseConnection(**get_staging_config(database_name))
+    if not db.connect():
+        return None
+    try:
+        return {table_name: db.get_show_create_table(table_name) for table_name in db.get_table_names()}
+    finally:
+        db.close()
+
+
+def longest_ordered_run(columns, positions):
+    """Largest subset of `columns` (desired order) whose `positions` (current order) already increase."""
+    best = []   # best[i]: longest increasing run ending at columns[i]
+    for i, column in enumerate(columns):
+        candidates = [best[j] for j in range(i) if positions[columns[j]] < positions[column]]
+        best.append(max(candidates, key=len, default=[]) + [column])
+    return set(max(best, key=len, default=[]))
+
+
+def column_clauses(current, desired):
+    """
+    ADD / MODIFY COLUMN clauses in desired column order. Columns outside the
+    longest run that is already in order are moved with AFTER / FIRST; MySQL
+    applies the positions clause by clause, so each one lands after a column
+    that is already in place.
+    """
+    kept = [column for column in desired.columns if column in current.columns]
+    positions = {column: position for position, column in enumerate(column for column in current.columns if column in desired.columns)}
+    in_place = longest_ordered_run(kept, positions)
+
+    clauses = []
+    previous = None
+    for column, (_, definition) in desired.columns.items():
+        position = f" AFTER {quote_identifier(desired.columns[previous][0])}" if previous else " FIRST"
+        if column not in current.columns:
+            clauses.append(f"ADD COLUMN {definition}{position}")
+        elif column not in in_place:
+            clauses.append(f"MODIFY COLUMN {definition}{position}")
+        elif current.columns[column][1] != definition:
+            clauses.append(f"MODIFY COLUMN {definition}")
+        previous = column
+    return clauses
+
+
+def drop_key_clause(kind, name):
+    if kind == 'primary':
+        return "DROP PRIMARY KEY"
+    keyword = {'foreign': 'FOREIGN KEY', 'check': 'CHECK', 'index': 'INDEX'}[kind]
+    return f"DROP {keyword} {quote_identifier(name)}"
+
+
+def table_options_clause(current, desired):
+    """Changed table options as one clause, in the desired table's order (CHARSET before COLLATE)."""
+    changed = {option for option, value in desired.options.items() if current.options.get(option) != value}
+    if changed & set(CHARSET_OPTIONS):
+        # Setting only one of them makes MySQL derive the other
+        changed |= set(CHARSET_OPTIONS) & set(desired.options)
+    options = [f"{option}={value}" for option, value in desired.options.items() if option in changed]
+    options += [f"{option}={OPTION_RESETS[option]}" for option in current.options
+                if option not in desired.options and option in OPTION_RESETS]
+    return ' '.join(options)
+
+
+def changed_keys(current, desired):
+    """(keys to drop, keys to add): a redefined key is dropped and added again."""
+    dropped = [key for key in current.keys if key not in desired.keys or desired.keys[key][1] != current.keys[key][1]]
+    added = [key for key in desired.keys if key not in current.keys or current.keys[key][1] != desired.keys[key][1]]
+    return dropped, added
+
+
+def alter_clauses(current, desired, foreign_key_drops=True):
+    """Return the ALTER TABLE clauses that turn one definition of a table into another."""
+    dropped, added = changed_keys(current, desired)
+    drop_kinds = KEY_DROP_ORDER if foreign_key_drops else KEY_DROP_ORDER[1:]
+
+    clauses = [drop_key_clause(kind, current.keys[key][0]) for kind in drop_kinds for key in dropped if key[0] == kind]
+    clauses += [f"DROP COLUMN {quote_identifier(name)}" for column, (name, _) in current.columns.items() if column not in desired.columns]
+    clauses += column_clauses(current, desired)
+    clauses += [f"ADD {desired.keys[key][1]}" for kind in KEY_ADD_ORDER for key in added if key[0] == kind]
+
+    options = table_options_clause(current, desired)
+    if options:
+        clauses.append(options)
+    return clauses
+
+
+def render_alter(table_name, clauses):
+    return f"ALTER TABLE {quote_identifier(table_name)}\n  " + ",\n  ".join(clauses) + ";"
+
+
+def collect_statements(current_tables, desired_tables, foreign_key_drops=True):
+    """
+    Return ({table: CREATE / ALTER / DROP TABLE statement}, {table: action},
+    graph) for the tables that differ. The graph puts a table after the tables
+    its new foreign keys reference and (unless foreign_key_drops is False)
+    before the tables its dropped ones referenced.
+    """
+    statements = {}
+    actions = {}
+    graph = ForeignKeyGraph()
+
+    for table_name, desired in desired_tables.items():
+        current = current_tables.get(table_name)
+        if current is None:
+            statements[table_name] = desired.statement + ";"
+            actions[table_name] = 'create'
+            added_targets, dropped_targets = desired.foreign_key_targets(), []
+        else:
+            clauses = alter_clauses(current, desired, foreign_key_drops)
+            if not clauses:
+                continue
+            statements[table_name] = render_alter(table_name, clauses)
+            actions[table_name] = 'alter'
+            dropped, added = changed_keys(current, desired)
+            added_targets, dropped_targets = desired.foreign_key_targets(added), current.foreign_key_targets(dropped)
+
+        graph.add_table(table_name)
+        for referenced_table in added_targets:
+            graph.add_reference(table_name, referenced_table)
+        for referenced_table in (dropped_targets if foreign_key_drops else []):
+            graph.add_reference(referenced_table, table_name)
+
+    for table_name, current in current_tables.items():
+        if table_name not in desired_tables:
+            statements[table_name] = f"DROP TABLE {quote_identifier(table_name)};"
+            actions[table_name] = 'drop'
+            graph.add_table(table_name)
+            for referenced_table in (current.foreign_key_targets() if foreign_key_drops else []):
+                graph.add_reference(referenced_table, table_name)
+
+    return statements, actions, graph
+
+
+def plan_statements(current_tables, desired_tables, label='migration'):
+    """
+    Return the statements turning current_tables into desired_tables
+    ({table: TableDefinition} each), one per table that differs.
+
+    When the foreign keys that are added and dropped need conflicting table
+    orders, the drops move into leading ALTERs of their own (DROP FOREIGN KEY
+    is a metadata change, it does not rebuild the table); if the added foreign
+    keys alone form a cycle, the statements run with FOREIGN_KEY_CHECKS=0.
+
+    Returns:
+        tuple: (statements, {table: 'create' / 'alter' / 'drop'})
+    """
+    statements, actions, graph = collect_statements(current_tables, desired_tables)
+    try:
+        return [statements[table_name] for table_name in graph.topological_order(list(statements))], actions
+    except ForeignKeyCycleError as e:
+        print(f"⚠️  {label}: {e}; dropping the foreign keys in separate ALTERs first")
+
+    leading = []
+    for table_name, current in current_tables.items():
+        desired = desired_tables.get(table_name)
+        dropped = list(current.keys) if desired is None else changed_keys(current, desired)[0]
+        clauses = [drop_key_clause('foreign', current.keys[key][0]) for key in dropped if key[0] == 'foreign']
+        if clauses:
+            leading.append(render_alter(table_name, clauses))
+
+    statements, actions, graph = collect_statements(current_tables, desired_tables, foreign_key_drops=False)
+    for table_name in current_tables:
+        if table_name in desired_tables and table_name not in actions and changed_keys(current_tables[table_name], desired_tables[table_name])[0]:
+            actions[table_name] = 'alter'
+    try:
+        return leading + [statements[table_name] for table_name in graph.topological_order(list(statements))], actions
+    except ForeignKeyCycleError as e:
+        print(f"⚠️  {label}: {e} among the new foreign keys; the statements run with FOREIGN_KEY_CHECKS=0")
+    return ["SET FOREIGN_KEY_CHECKS=0;"] + leading + list(statements.values()) + ["SET FOREIGN_KEY_CHECKS=1;"], actions
+
+
+def table_shape(table):
+    """What the simulation tracks of a TableModel, for comparing two of them."""
+    return (
+        sorted(table.columns),
+        [column.lower() for column in table.primary_key],
+        sorted((key, tuple(column.lower() for column in index['columns']), index['unique']) for key, index in table.indexes.items()),
+        sorted((key, tuple(foreign_key['columns']), foreign_key['referenced_table']) for key, foreign_key in table.foreign_keys.items())
+    )
+
+
+def replay(statements, start_tables, expected_tables, database_name):
+    """
+    Apply the statements to a simulated schema of start_tables and compare the
+    result with expected_tables.
+
+    Returns:
+        list: Problems (empty if the statements apply cleanly and reach the expected schema)
+    """
+    start = SchemaModel.from_sql("\n\n".join(table.statement + ";" for table in start_tables.values()), database_name)
+    expected = SchemaModel.from_sql("\n\n".join(table.statement + ";" for table in expected_tables.values()), database_name)
+
+    parser = SQLDDLParser()
+    parser.parse_sql_file("\n\n".join(statements), f"{database_name}/generated.sql")
+    operations = parser.get_operations()
+
+    problems = [problem for _, operation_problems in start.apply_operations(operations) for problem in operation_problems]
+    for table_name in sorted(set(start.tables) | set(expected.tables)):
+        if table_name not in start.tables or table_name not in expected.tables:
+            problems.append(f"Table '{table_name}' exists on one side only after the replay")
+        elif table_shape(start.tables[table_name]) != table_shape(expected.tables[table_name]):
+            problems.append(f"Table '{table_name}' does not match after the replay")
+    return problems
+
+
+def print_table_changes(current_tables, desired_tables, actions):
+    """Describe each changed table; ALTERs with compare_parsed_create_table's wording."""
+    from ddl_validator_extended import DDLValidator
+
+    validator = DDLValidator(None)
+    for table_name, action in actions.items():
+        if action == 'create':
+            print(f"➕ {table_name}: CREATE TABLE")
+            continue
+        if action == 'drop':
+            print(f"➖ {table_name}: DROP TABLE")
+            continue
+
+        clauses = alter_clauses(current_tables[table_name], desired_tables[table_name])
+        print(f"📝 {table_name}: ALTER TABLE with {len(clauses)} clause(s)")
+        expected = validator.parse_create_table_sql(desired_tables[table_name].statement)
+        actual = validator.parse_create_table_sql(current_tables[table_name].statement)
+        expected['auto_increment'] = actual['auto_increment'] = None
+        differences = validator.compare_parsed_create_table(expected, actual)['differences']
+        # The parsed comparison misses UNSIGNED / COLLATE / prefix changes; show the clauses then
+        for i, line in enumerate(differences or clauses, 1):
+            print(f"   {i}. {line}")
+
+
+def generate_migration(directory, current_path=None, name=DEFAULT_MIGRATION_NAME, drop_tables=False, dry_run=False,
+                       force=False):
+    """
+    Generate the migration pair that brings the current schema to a database
+    directory's seed files.
+
+    Args:
+        directory: MYSQL/<env>/<db> directory with the desired seed*.sql files
+        current_path: SQL file with the current CREATE TABLEs (default: staging)
+        name: Migration name, V{n}__{name}.sql
+        drop_tables: Drop tables that the seed files no longer have
+        dry_run: Print the statements instead of writing the files
+        force: Write the files even if the replay reports problems
+
+    Returns:
+        tuple: (migration statements, rollback statements), or None on error
+    """
+    from index_report import write_migration_pair
+
+    database_name = os.path.basename(os.path.normpath(directory))
+    seed_files = sorted(glob.glob(os.path.join(directory, 'seed*.sql')))
+    if not seed_files:
+        print(f"❌ No seed*.sql files in {directory}")
+        return None
+
+    print("🛠️  Desired-State Migration Generator")
+    print("=" * 60)
+    print(f"📂 Desired: {', '.join(os.path.basename(path) for path in seed_files)} in {directory}")
+
+    if current_path:
+        current_statements = load_create_statements([current_path])
+        print(f"🗄️  Current: {current_path}")
+    else:
+        current_statements = fetch_staging_statements(database_name)
+        if current_statements is None:
+            return None
+        print(f"🗄️  Current: staging {database_name}")
+
+    try:
+        desired_tables = load_table_definitions(load_create_statements(seed_files))
+        current_tables = load_table_definitions(current_statements)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return None
+
+    untracked = [table_name for table_name in current_tables if table_name not in desired_tables]
+    if untracked and not drop_tables:
+        print(f"⚠️  Not in the seed files, left alone (use --drop-tables): {', '.join(untracked)}")
+        current_tables = {table_name: table for table_name, table in current_tables.items() if table_name in desired_tables}
+    for table_name, desired in desired_tables.items():
+        current = current_tables.get(table_name)
+        if current is not None and current.partitioning != desired.partitioning:
+            print(f"⚠️  {table_name}: partitioning differs; not generated, write that change by hand")
+
+    migration, actions = plan_statements(current_tables, desired_tables)
+    rollback, _ = plan_statements(desired_tables, current_tables, 'rollback')
+    print("-" * 60)
+    if not migration:
+        print("✅ Current schema already matches the seed files")
+        return [], []
+    print_table_changes(current_tables, desired_tables, actions)
+
+    problems = replay(migration, current_tables, desired_tables, database_name)
+    problems += [f"rollback: {problem}" for problem in replay(rollback, desired_tables, current_tables, database_name)]
+    print("-" * 60)
+    for problem in problems:
+        print(f"⚠️  {problem}")
+    if not problems:
+        print("✅ Migration and rollback replay cleanly on the simulated schema")
+
+    if dry_run:
+        print(f"\n-- V?__{name}.sql\n" + "\n\n".join(migration))
+        print(f"\n-- U?__{name}-rollback.sql\n" + "\n\n".join(rollback))
+    elif problems and not force:
+        print("❌ Not written: the replay does not reach the desired schema (review the problems, or use --force)")
+        return None
+    else:
+        try:
+            migration_path, rollback_path = write_migration_pair(directory, name, migration, rollback)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return None
+        print(f"📝 Wrote {os.path.basename(migration_path)} and {os.path.basename(rollback_path)}")
+    return migration, rollback
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for option in ('--current', '--name'):
+        if option in args:
+            position = args.index(option)
+            options[option] = args[position + 1] if position + 1 < len(args) else None
+            del args[position:position + 2]
+    flags = {arg for arg in args if arg.startswith('--')}
+    args = [arg for arg in args if not arg.startswith('--')]
+
+    if len(args) != 1 or None in options.values():
+        print("Usage: python migration_generator.py MYSQL/<env>/<db> [--current current.sql] [--name NAME] [--drop-tables] [--dry-run] [--force]")
+        exit(1)
+
+    result = generate_migration(
+        args[0], options.get('--current'), options.get('--name') or DEFAULT_MIGRATION_NAME,
+        '--drop-tables' in flags, '--dry-run' in flags, '--force' in flags
+    )
+    if result is None:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
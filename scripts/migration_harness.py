@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Migration Dry-Run Harness
+Executes a V/U migration pair against a scratch schema on a local MySQL
+(a stand-in instance or a dedicated local server) before it reaches staging:
+loads the seed*.sql DDL, applies the migration, snapshots the tables, applies
+the rollback and diffs the result against the pre-migration snapshot.
+Several pairs can be dry-run concurrently, each in its own isolated schema.
+"""
+
+import os
+import re
+import sys
+import time
+import uuid
+import glob
+import difflib
+from concurrent.futures import ThreadPoolExecutor
+from ddl_validator import DatabaseConnection, get_local_config
+from sql_ddl_parser import SQLDDLParser, split_sql_statements
+
+
+def find_seed_files(migration_path):
+    """Find the seed*.sql files that live next to a migration file."""
+    return sorted(glob.glob(os.path.join(os.path.dirname(migration_path), 'seed*.sql')))
+
+
+def normalize_create_table(create_sql):
+    """Drop AUTO_INCREMENT counters so snapshots only differ on real structure."""
+    return re.sub(r'\s+AUTO_INCREMENT=\d+', '', create_sql or '')
+
+
+def take_snapshot(db):
+    """Return {table_name: normalized SHOW CREATE TABLE} for every table in the schema."""
+    snapshot = {}
+    for table_name in db.get_table_names():
+        snapshot[table_name] = normalize_create_table(db.get_show_create_table(table_name))
+    return snapshot
+
+
+def diff_snapshots(before, after):
+    """Return a list of unified-diff strings, one per table that differs."""
+    differences = []
+    for table_name in sorted(set(before) | set(after)):
+        if table_name not in after:
+            differences.append(f"Table '{table_name}' missing after rollback")
+        elif table_name not in before:
+            differences.append(f"Table '{table_name}' left behind after rollback")
+        elif before[table_name] != after[table_name]:
+            diff = difflib.unified_diff(
+                before[table_name].splitlines(),
+                after[table_name].splitlines(),
+                fromfile=f"{table_name} (before)",
+                tofile=f"{table_name} (after rollback)",
+                lineterm=''
+            )
+            differences.append('\n'.join(diff))
+    return differences
+
+
+class MigrationDryRun:
+    """Runs one migration/rollback pair in an isolated scratch schema."""
+
+    def __init__(self, local_config, migration_path, rollback_path, seed_files=None, keep_schema=False):
+        self.local_config = local_config
+        self.migration_path = migration_path
+        self.rollback_path = rollback_path
+        self.seed_files = seed_files if seed_files is not None else find_seed_files(migration_path)
+        self.keep_schema = keep_schema
+
+        database_name = SQLDDLParser().extract_database_name(migration_path)
+        # Database names are limited to 64 characters
+        self.scratch_database = f"dryrun_{re.sub(r'[^0-9A-Za-z_]', '_', database_name)[:40]}_{uuid.uuid4().hex[:12]}"
+
+        self.timings = []
+        self.result = {
+            'migration': migration_path,
+            'rollback': rollback_path,
+            'scratch_database': self.scratch_database,
+            'status': 'PENDING',
+            'error': None,
+            'changed_tables': [],
+            'rollback_differences': [],
+            'timings': self.timings
+        }
+
+    def run_statements(self, db, phase, statements):
+        """Execute statements one by one, recording the time each one takes."""
+        for statement in statements:
+            # The seed dump creates and switches to the real database; stay in the scratch one
+            if re.match(r'(CREATE\s+DATABASE|USE)\b', statement, re.IGNORECASE):
+                continue
+
+            start = time.perf_counter()
+            try:
+                db.cursor.execute(statement)
+                if db.cursor.with_rows:
+                    db.cursor.fetchall()
+            except Exception as e:
+                self.timings.append({'phase': phase, 'statement': statement, 'seconds': time.perf_counter() - start, 'error': str(e)})
+                raise RuntimeError(f"{phase} failed on statement: {statement[:120]}... ({e})")
+
+            self.timings.append({'phase': phase, 'statement': statement, 'seconds': time.perf_counter() - start, 'error': None})
+
+    def read_statements(self, path):
+        """Read and split a SQL file into statements."""
+        with open(path) as f:
+            return split_sql_statements(f.read())
+
+    def run(self):
+        """Execute the dry run and return the result summary."""
+        admin = DatabaseConnection(**dict(self.local_config, database=None))
+        if not admin.connect():
+            self.result['status'] = 'FAILED'
+            self.result['error'] = 'Could not connect to local MySQL server'
+            return self.result
+
+        db = None
+        try:
+            admin.cursor.execute(f"CREATE DATABASE `{self.scratch_database}`")
+
+            db = DatabaseConnection(**dict(self.local_config, database=self.scratch_database))
+            if not db.connect():
+                raise RuntimeError(f"Could not connect to scratch database {self.scratch_database}")
+
+            for seed_file in self.seed_files:
+                self.run_statements(db, 'seed', self.read_statements(seed_file))
+            baseline = take_snapshot(db)
+
+            self.run_statements(db, 'migration', self.read_statements(self.migration_path))
+            migrated = take_snapshot(db)
+            self.result['changed_tables'] = sorted(
+                table for table in set(baseline) | set(migrated) if baseline.get(table) != migrated.get(table)
+            )
+
+            self.run_statements(db, 'rollback', self.read_statements(self.rollback_path))
+            rolled_back = take_snapshot(db)
+            self.result['rollback_differences'] = diff_snapshots(baseline, rolled_back)
+
+            self.result['status'] = 'FAILED' if self.result['rollback_differences'] else 'PASSED'
+
+        except Exception as e:
+            self.result['status'] = 'FAILED'
+            self.result['error'] = str(e)
+
+        finally:
+            if db:
+                db.close()
+            if not self.keep_schema:
+                try:
+                    admin.cursor.execute(f"DROP DATABASE IF EXISTS `{self.scratch_database}`")
+                except Exception as e:
+                    print(f"⚠️  Could not drop scratch database {self.scratch_database}: {e}")
+            admin.close()
+
+        return self.result
+
+
+def run_batch(local_config, pairs, max_workers=4, keep_schema=False):
+    """Dry-run several (migration_path, rollback_path) pairs concurrently."""
+    runs = [MigrationDryRun(local_config, migration, rollback, keep_schema=keep_schema) for migration, rollback in pairs]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda dry_run: dry_run.run(), runs))
+
+
+def print_result(result):
+    """Print a dry-run result with per-statement timings."""
+    status_icon = "✅" if result['status'] == 'PASSED' else "❌"
+    print(f"\n{status_icon} {result['migration']} -> {result['status']}")
+    print(f"   Scratch schema: {result['scratch_database']}")
+    if result['error']:
+        print(f"   Error: {result['error']}")
+
+    phase_totals = {}
+    for timing in result['timings']:
+        phase_totals[timing['phase']] = phase_totals.get(timing['phase'], 0.0) + timing['seconds']
+    for phase, seconds in phase_totals.items():
+        print(f"   ⏱️  {phase}: {seconds * 1000:.1f} ms")
+
+    for timing in result['timings']:
+        if timing['phase'] != 'seed':
+            first_line = timing['statement'].splitlines()[0][:80]
+            print(f"      {timing['seconds'] * 1000:8.1f} ms  [{timing['phase']}] {first_line}")
+
+    if result['changed_tables']:
+        print(f"   📋 Tables changed by migration: {', '.join(result['changed_tables'])}")
+    for diff in result['rollback_differences']:
+        print("   📝 Rollback did not restore structure:")
+        for line in diff.splitlines():
+            print(f"      {line}")
+
+
+def main():
+    """Dry-run one or more migration/rollback pairs given on the command line."""
+    args = sys.argv[1:]
+    if not args or len(args) % 2 != 0:
+        print("Usage: python migration_harness.py V{n}__{name}.sql U{n}__{name}-rollback.sql [V... U...]")
+        exit(1)
+
+    print("🧪 Migration Dry-Run Harness")
+    print("=" * 60)
+
+    # Server-level: each dry run creates its own scratch database
+    local_config = get_local_config(None)
+    pairs = list(zip(args[0::2], args[1::2]))
+    results = run_batch(local_config, pairs)
+
+    for result in results:
+        print_result(result)
+
+    if any(result['status'] != 'PASSED' for result in results):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
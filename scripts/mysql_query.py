@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 """
 MySQL Query Script
-Connects to MySQL server and runs SHOW CREATE TABLE ab.audiences
+Connects to MySQL server and runs SHOW CREATE TABLE ab.audiences. The
+listing and SHOW CREATE helpers are also used by schema_exporter.py.
 """
 
-import mysql.connector
-from mysql.connector import Error
 import sys
+from lazy_imports import lazy_import
+
+# Loaded on first use so that importing this module stays cheap
+mysql_connector = lazy_import('mysql.connector')
 
 
 class MySQLQueryTool:
@@ -22,7 +25,7 @@ class MySQLQueryTool:
     def connect(self) -> bool:
         """Establish connection to MySQL server."""
         try:
-            self.connection = mysql.connector.connect(
+            self.connection = mysql_connector.connect(
                 host=self.host,
                 user=self.user,
                 password=self.password,
@@ -31,7 +34,7 @@ class MySQLQueryTool:
             self.cursor = self.connection.cursor()
             print(f"✅ Successfully connected to MySQL server at {self.host}:{self.port}")
             return True
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"❌ Error connecting to MySQL: {e}")
             return False
 
@@ -59,9 +62,38 @@ class MySQLQueryTool:
             while self.cursor.nextset():
                 pass
                 
-        except Error as e:
+        except mysql_connector.Error as e:
             print(f"❌ Error executing query: {e}")
 
+    def get_server_version(self) -> str:
+        """Return the server version string (e.g. 8.0.32-google)."""
+        self.cursor.execute("SELECT VERSION()")
+        return self.cursor.fetchone()[0]
+
+    def list_tables(self, schemas: list) -> dict:
+        """Return {schema: [base table names]} for the given schemas with one query, names sorted."""
+        placeholders = ', '.join(['%s'] * len(schemas))
+        self.cursor.execute(
+            f"SELECT table_schema, table_name FROM information_schema.TABLES "
+            f"WHERE table_schema IN ({placeholders}) AND table_type = 'BASE TABLE' "
+            f"ORDER BY table_schema, table_name",
+            list(schemas)
+        )
+        tables = {schema: [] for schema in schemas}
+        for schema, table_name in self.cursor.fetchall():
+            tables[schema].append(table_name)
+        return tables
+
+    def fetch_create_database(self, schema: str) -> str:
+        """Return the SHOW CREATE DATABASE statement of a schema."""
+        self.cursor.execute(f"SHOW CREATE DATABASE `{schema}`")
+        return self.cursor.fetchone()[1]
+
+    def fetch_create_table(self, schema: str, table_name: str) -> str:
+        """Return the SHOW CREATE TABLE statement of schema.table_name."""
+        self.cursor.execute(f"SHOW CREATE TABLE `{schema}`.`{table_name}`")
+        return self.cursor.fetchone()[1]
+
     def close(self) -> None:
         """Close the database connection."""
         if self.cursor:
@@ -1,303 +1,190 @@
-import requests
-import os
-import json
-
-from dotenv import load_dotenv
+import sys
 import re
+from unified_diff import parse_hunks, apply_patch
+from seed_index import get_seed_index
+from change_source import get_change_source
 
-def extract_table_details(patch):
-    """Extract detailed table changes from SQL patch content."""
-    table_changes = {}
-    current_table = None
-    
-    # Process each line in the patch
-    for line in patch.split('\n'):
-        original_line = line
-        content = line.strip()
-        
-        if content:
-            # Check what type of line this is
-            line_type = "context"
-            if line.startswith('@@'):
-                line_type = "header"
-            elif line.startswith('+'):
-                line_type = "added"
-                content = line[1:].strip()
-            elif line.startswith('-'):
-                line_type = "removed"
-                content = line[1:].strip()
-            elif line.startswith(' '):
-                line_type = "context"
-                content = line[1:].strip()
-            
-            # Check for CREATE TABLE statements to identify current table
-            create_table_match = re.search(r'CREATE TABLE\s+[`"]?([a-zA-Z_][a-zA-Z0-9_]*)[`"]?', content, re.IGNORECASE)
-            if create_table_match:
-                current_table = create_table_match.group(1)
-                if current_table not in table_changes:
-                    table_changes[current_table] = {
-                        'operation': 'CREATE/MODIFY',
-                        'all_columns': [],
-                        'changes': []
-                    }
-            
-            # Check for DROP TABLE statements
-            drop_table_match = re.search(r'DROP TABLE\s+(?:IF EXISTS\s+)?[`"]?([a-zA-Z_][a-zA-Z0-9_]*)[`"]?', content, re.IGNORECASE)
-            if drop_table_match:
-                table_name = drop_table_match.group(1)
-                table_changes[table_name] = {
-                    'operation': 'DROP',
-                    'all_columns': [],
-                    'changes': [{'type': 'drop_table', 'line': original_line}]
-                }
-            
-            # If we're inside a table definition, look for ALL column definitions (including context)
-            if current_table and line_type in ['added', 'removed', 'context']:
-                # Check for column definitions
-                column_match = re.search(r'[`"]?([a-zA-Z_][a-zA-Z0-9_]*)[`"]?\s+([a-zA-Z]+(?:\([^)]+\))?)', content)
-                if column_match and not content.upper().startswith(('PRIMARY', 'UNIQUE', 'KEY', 'INDEX', 'CONSTRAINT', 'ENGINE', ')')):
-                    column_name = column_match.group(1)
-                    
-                    # Extract full column definition
-                    full_def_match = re.search(r'[`"]?' + re.escape(column_name) + r'[`"]?\s+(.+?)(?:,\s*$|$)', content)
-                    full_definition = full_def_match.group(1) if full_def_match else column_match.group(2)
-                    
-                    # Parse data type
-                    data_type_match = re.search(r'([a-zA-Z]+(?:\([^)]+\))?)', full_definition)
-                    data_type = data_type_match.group(1) if data_type_match else "unknown"
-                    
-                    # Check for constraints
-                    constraints = []
-                    if 'NOT NULL' in full_definition.upper():
-                        constraints.append('NOT NULL')
-                    if 'AUTO_INCREMENT' in full_definition.upper():
-                        constraints.append('AUTO_INCREMENT')
-                    if 'DEFAULT' in full_definition.upper():
-                        default_match = re.search(r'DEFAULT\s+([^,\s]+(?:\s+[^,]*)?)', full_definition, re.IGNORECASE)
-                        if default_match:
-                            default_value = default_match.group(1)
-                            # Handle complex default values
-                            if 'ON UPDATE' in full_definition.upper():
-                                on_update_match = re.search(r'ON UPDATE\s+([^,\s]+)', full_definition, re.IGNORECASE)
-                                if on_update_match:
-                                    default_value += f' ON UPDATE {on_update_match.group(1)}'
-                            constraints.append(f'DEFAULT {default_value}')
-                    if 'COMMENT' in full_definition.upper():
-                        comment_match = re.search(r'COMMENT\s+[\'"]([^\'\"]*)[\'"]', full_definition, re.IGNORECASE)
-                        if comment_match:
-                            constraints.append(f'COMMENT: {comment_match.group(1)[:50]}{"..." if len(comment_match.group(1)) > 50 else ""}')
-                    
-                    column_info = {
-                        'column': column_name,
-                        'data_type': data_type,
-                        'constraints': constraints,
-                        'full_definition': full_definition.strip().rstrip(','),
-                        'line_type': line_type,
-                        'original_line': original_line
-                    }
-                    
-                    # Add to all columns list
-                    table_changes[current_table]['all_columns'].append(column_info)
-                    
-                    # If it's a changed line, also add to changes
-                    if line_type in ['added', 'removed']:
-                        change_detail = {
-                            'type': 'column_change',
-                            'action': line_type,
-                            'column': column_name,
-                            'data_type': data_type,
-                            'full_line': content,
-                            'original_line': original_line
-                        }
-                        table_changes[current_table]['changes'].append(change_detail)
-    
-    return table_changes
+LINE_TYPES = {' ': 'context', '+': 'added', '-': 'removed'}
 
-def extract_complete_table_definition(file_content, table_name):
-    """Extract the complete CREATE TABLE statement for a specific table from file content."""
-    lines = file_content.split('\n')
-    table_def_lines = []
-    in_table = False
-    found_closing = False
-    
-    for i, line in enumerate(lines):
-        # Look for CREATE TABLE statement
-        if re.search(rf'CREATE TABLE\s+[`"]?{re.escape(table_name)}[`"]?', line, re.IGNORECASE):
-            in_table = True
-            table_def_lines.append(line)
-            
-            # If the line has opening parenthesis, we're starting column definitions
-            if '(' in line:
-                continue
-        
-        if in_table:
-            table_def_lines.append(line)
-            
-            # Look for the end pattern: ) followed by optional ENGINE, CHARSET, etc.
-            stripped_line = line.strip()
-            if (stripped_line.startswith(')') and 
-                ('ENGINE=' in stripped_line or 'DEFAULT CHARSET=' in stripped_line or 
-                 stripped_line == ')' or stripped_line.endswith(';'))):
-                found_closing = True
-                
-                # Continue to capture ENGINE and other table options
-                if not (stripped_line == ')' or stripped_line.endswith(';')):
-                    # Look ahead for more table options on next lines
-                    for j in range(i + 1, min(i + 5, len(lines))):
-                        next_line = lines[j].strip()
-                        if next_line and not next_line.startswith('--'):
-                            if (';' in next_line or 
-                                next_line.startswith('CREATE') or 
-                                next_line.startswith('DROP') or
-                                next_line.startswith('INSERT')):
-                                if ';' in next_line:
-                                    table_def_lines.append(lines[j])
-                                break
-                            else:
-                                table_def_lines.append(lines[j])
-                break
-                
-            # Also break if we hit another CREATE or significant SQL statement
-            if (stripped_line.startswith('CREATE TABLE') and 
-                not re.search(rf'CREATE TABLE\s+[`"]?{re.escape(table_name)}[`"]?', line, re.IGNORECASE)):
-                table_def_lines.pop()  # Remove this line as it's for another table
-                break
-    
-    if table_def_lines and found_closing:
-        return '\n'.join(table_def_lines)
-    else:
-        return None
+CREATE_TABLE_REGEX = r'CREATE\s+TABLE\s+[`"]?(?P<create_table>[a-zA-Z_][a-zA-Z0-9_]*)[`"]?'
+DROP_TABLE_REGEX = r'DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?[`"]?(?P<drop_table>[a-zA-Z_][a-zA-Z0-9_]*)[`"]?'
+COLUMN_REGEX = r'[`"]?(?P<column>[a-zA-Z_][a-zA-Z0-9_]*)[`"]?\s+(?P<definition>(?P<data_type>[a-zA-Z]+(?:\([^)]+\))?).*?)(?:,\s*$|$)'
 
-def apply_patch_to_table_definition(table_definition, patch_content):
-    """Apply patch changes to the table definition to show the updated state."""
-    if not table_definition or not patch_content:
-        return table_definition
-    
-    # Split table definition into lines
-    lines = table_definition.split('\n')
-    
-    # Process patch to identify changes
-    patch_lines = patch_content.split('\n')
-    
-    # Find lines that are being removed (-) and added (+)
-    lines_to_remove = []
-    lines_to_add = []
-    
-    for patch_line in patch_lines:
-        if patch_line.startswith('-') and not patch_line.startswith('---'):
-            # Line being removed
-            removed_content = patch_line[1:].strip()
-            lines_to_remove.append(removed_content)
-        elif patch_line.startswith('+') and not patch_line.startswith('+++'):
-            # Line being added
-            added_content = patch_line[1:].strip()
-            lines_to_add.append(added_content)
-    
-    # Apply changes to table definition
-    updated_lines = []
-    for line in lines:
-        line_content = line.strip()
-        line_modified = False
-        
-        # Check if this line needs to be replaced
-        for i, removed_line in enumerate(lines_to_remove):
-            if removed_line and removed_line in line_content:
-                # Find corresponding added line
-                if i < len(lines_to_add):
-                    added_line = lines_to_add[i]
-                    # Replace the content
-                    updated_line = line.replace(removed_line, added_line)
-                    updated_lines.append(updated_line)
-                    line_modified = True
-                    break
-        
-        if not line_modified:
-            updated_lines.append(line)
-    
-    return '\n'.join(updated_lines)
+# One alternation classifies a patch line; the leftmost match decides its kind
+LINE_PATTERN = re.compile('|'.join([CREATE_TABLE_REGEX, DROP_TABLE_REGEX, COLUMN_REGEX]), re.IGNORECASE)
+# Hunk headers carry git's function context (usually the enclosing CREATE TABLE line)
+HEADER_TABLE_PATTERN = re.compile('|'.join([CREATE_TABLE_REGEX, DROP_TABLE_REGEX]), re.IGNORECASE)
+NON_COLUMN_PREFIX_PATTERN = re.compile(r'(?:PRIMARY|UNIQUE|KEY|INDEX|CONSTRAINT|ENGINE|\))', re.IGNORECASE)
+DEFAULT_PATTERN = re.compile(r'DEFAULT\s+([^,\s]+(?:\s+[^,]*)?)', re.IGNORECASE)
+ON_UPDATE_PATTERN = re.compile(r'ON UPDATE\s+([^,\s]+)', re.IGNORECASE)
+COMMENT_PATTERN = re.compile(r'COMMENT\s+[\'"]([^\'\"]*)[\'"]', re.IGNORECASE)
 
-# Load PR metadata from event payload
-try:
-    # Check if running in GitHub Actions environment
-    github_actions = os.getenv("GITHUB_ACTIONS")
-    if github_actions == "true":
-        print("🔄 Running in GitHub Actions environment")
-        # Continue with GitHub Actions specific logic
-        event_path = os.getenv("GITHUB_EVENT_PATH")
-        if not event_path or not os.path.exists(event_path):
-            print("❌ GITHUB_EVENT_PATH not found or file doesn't exist!")
-            print("This script is designed to run in GitHub Actions environment.")
-            exit(1)
-        
-        with open(event_path) as f:
-            event = json.load(f)
-            pr_number = event["pull_request"]["number"]
-    else:
-        print("🔄 Running in local environment")
-        # Load from config.env for local development
-        load_dotenv('config.env')
-        
-        # Set default values for local development
-        pr_number = os.getenv("GITHUB_PR_NUMBER")
-        
-    
 
-    repo_full = os.getenv("GITHUB_REPOSITORY")  # e.g., "owner/repo"
-    token = os.getenv("GITHUB_TOKEN")
-    
-    print(f"Repository: {repo_full}")
-    print(f"PR Number: {pr_number}")
-        
-except Exception as e:
-    print(f"❌ Error reading GitHub event payload: {e}")
-    print("This script is designed to run in GitHub Actions environment.")
-    exit(1)
+class PatchLineRecord:
+    """Classification of one patch line: a CREATE TABLE, DROP TABLE, column definition or other line."""
+    __slots__ = ('kind', 'name', 'definition', 'data_type')
+
+    CREATE_TABLE = 'create_table'
+    DROP_TABLE = 'drop_table'
+    COLUMN = 'column'
+    OTHER = 'other'
+
+    def __init__(self, kind, name=None, definition=None, data_type=None):
+        self.kind = kind
+        self.name = name
+        self.definition = definition
+        self.data_type = data_type
 
-if not repo_full:
-    print("❌ GITHUB_REPOSITORY environment variable not found!")
-    exit(1)
 
-if not token:
-    print("❌ GITHUB_TOKEN environment variable not found!")
-    exit(1)
+OTHER_LINE = PatchLineRecord(PatchLineRecord.OTHER)
 
-# Headers for authentication
-headers = {
-    "Accept": "application/vnd.github.v3+json",
-    "Authorization": f"token {token}"
-}
 
-# # Fetch PR details
-# api_url = f"https://api.github.com/repos/{repo_full}/pulls/{pr_number}"
-# print(f"Fetching: {api_url}")
+def classify_line(content, is_header=False):
+    """Classify a stripped patch line with a single precompiled match."""
+    match = (HEADER_TABLE_PATTERN if is_header else LINE_PATTERN).search(content)
+    if not match:
+        return OTHER_LINE
 
-# pr_response = requests.get(api_url, headers=headers)
-# print(f"Status Code: {pr_response.status_code}")
+    # lastgroup is the outermost named group of the branch that matched
+    kind = match.lastgroup
+    if kind == 'create_table':
+        return PatchLineRecord(PatchLineRecord.CREATE_TABLE, match.group('create_table'))
+    if kind == 'drop_table':
+        return PatchLineRecord(PatchLineRecord.DROP_TABLE, match.group('drop_table'))
+    if NON_COLUMN_PREFIX_PATTERN.match(content):
+        return OTHER_LINE
+    column, definition, data_type = match.group('column', 'definition', 'data_type')
+    return PatchLineRecord(PatchLineRecord.COLUMN, column, definition, data_type)
 
-# if pr_response.status_code != 200:
-#     print(f"Error: {pr_response.status_code}")
-#     print(f"Response: {pr_response.text}")
-#     if pr_response.status_code == 401:
-#         print("❌ Authentication failed - check your token!")
-#     elif pr_response.status_code == 404:
-#         print("❌ Repository or PR not found!")
-#     exit(1)
 
-# pr_data = pr_response.json()
-# title = pr_data.get("title")
-# description = pr_data.get("body")
+def parse_column_constraints(full_definition):
+    """Parse NOT NULL, AUTO_INCREMENT, DEFAULT [ON UPDATE] and COMMENT from a column definition."""
+    upper_definition = full_definition.upper()
+    constraints = []
+    if 'NOT NULL' in upper_definition:
+        constraints.append('NOT NULL')
+    if 'AUTO_INCREMENT' in upper_definition:
+        constraints.append('AUTO_INCREMENT')
+    if 'DEFAULT' in upper_definition:
+        default_match = DEFAULT_PATTERN.search(full_definition)
+        if default_match:
+            default_value = default_match.group(1)
+            # Handle complex default values
+            if 'ON UPDATE' in upper_definition:
+                on_update_match = ON_UPDATE_PATTERN.search(full_definition)
+                if on_update_match:
+                    default_value += f' ON UPDATE {on_update_match.group(1)}'
+            constraints.append(f'DEFAULT {default_value}')
+    if 'COMMENT' in upper_definition:
+        comment_match = COMMENT_PATTERN.search(full_definition)
+        if comment_match:
+            constraints.append(f'COMMENT: {comment_match.group(1)[:50]}{"..." if len(comment_match.group(1)) > 50 else ""}')
+    return constraints
 
-# print(f"Title: {title}\n")
-# print(f"Description:\n{description}\n")
 
-# Fetch files changed in the PR
-files_url = f"https://api.github.com/repos/{repo_full}/pulls/{pr_number}/files"
-print(f"Fetching changed files...")
+def iter_patch_lines(patch):
+    """Yield (line_type, original_line, new_line_number) for every hunk header and hunk line."""
+    for hunk in parse_hunks(patch):
+        yield 'header', hunk.header, hunk.new_start
+        next_new_line = hunk.new_start
+        for patch_line in hunk.lines:
+            if patch_line.new_line is not None:
+                next_new_line = patch_line.new_line + 1
+                yield LINE_TYPES[patch_line.tag], patch_line.original_line, patch_line.new_line
+            else:
+                # Removed lines sit just before the next line of the new file
+                yield LINE_TYPES[patch_line.tag], patch_line.original_line, next_new_line
+
+def extract_table_details(patch):
+    """
+    Extract detailed table changes from SQL patch content.
+    
+    Constraints are only parsed for added/removed column lines; context columns
+    carry 'constraints': None (use parse_column_constraints on their full_definition).
+    """
+    table_changes = {}
+    current_table = None
+    
+    # Process each hunk line with its position in the patched file
+    for line_type, original_line, new_line in iter_patch_lines(patch):
+        is_header = line_type == "header"
+        content = original_line.strip() if is_header else original_line[1:].strip()
+        
+        if is_header:
+            # Each hunk is positioned independently; only its own header/lines name its table
+            current_table = None
+        
+        if not content:
+            continue
+        
+        record = classify_line(content, is_header)
+        
+        # CREATE TABLE identifies the current table
+        if record.kind == PatchLineRecord.CREATE_TABLE:
+            current_table = record.name
+            if current_table not in table_changes:
+                table_changes[current_table] = {
+                    'operation': 'CREATE/MODIFY',
+                    'all_columns': [],
+                    'changes': []
+                }
+        
+        # DROP TABLE statements changed by the patch (mysqldump context lines
+        # such as "DROP TABLE IF EXISTS" before every CREATE TABLE are not drops)
+        elif record.kind == PatchLineRecord.DROP_TABLE and line_type in ["added", "removed"]:
+            table_changes[record.name] = {
+                'operation': 'DROP',
+                'all_columns': [],
+                'changes': [{'type': 'drop_table', 'line': original_line}]
+            }
+        
+        if not current_table:
+            continue
+        
+        # Inside a table definition, record ALL column definitions (including context)
+        if record.kind == PatchLineRecord.COLUMN:
+            is_change = line_type in ['added', 'removed']
+            full_definition = record.definition.strip().rstrip(',')
+            
+            table_changes[current_table]['all_columns'].append({
+                'column': record.name,
+                'data_type': record.data_type,
+                'constraints': parse_column_constraints(full_definition) if is_change else None,
+                'full_definition': full_definition,
+                'line_type': line_type,
+                'original_line': original_line,
+                'new_line': new_line
+            })
+            
+            # If it's a changed line, also add to changes
+            if is_change:
+                table_changes[current_table]['changes'].append({
+                    'type': 'column_change',
+                    'action': line_type,
+                    'column': record.name,
+                    'data_type': record.data_type,
+                    'full_line': content,
+                    'original_line': original_line,
+                    'new_line': new_line
+                })
+    
+    return table_changes
 
-files_response = requests.get(files_url, headers=headers)
+def extract_complete_table_definition(file_content, table_name):
+    """Extract the complete CREATE TABLE statement for a specific table from file content."""
+    # The index is built once per file content and shared by every table lookup
+    return get_seed_index(file_content).get_definition(table_name)
 
-if files_response.status_code == 200:
-    files_data = files_response.json()
+def main():
+    """Fetch the seed files changed in a PR and print their complete table definitions."""
+    # The PR's changed files come from the GitHub API or the local git checkout (see CHANGE_SOURCE)
+    try:
+        change_source = get_change_source()
+        print(f"Fetching changed files...")
+        files_data = change_source.get_files_data()
+    except (ValueError, ConnectionError, RuntimeError) as e:
+        print(f"❌ Error fetching PR files: {e}")
+        exit(1)
 
     if files_data:
         # Filter files that have "seed" as prefix
@@ -308,22 +195,28 @@ if files_response.status_code == 200:
             basename = filename.split('/')[-1]  # Get just the filename part
             if basename.lower().startswith('seed'):
                 seed_files.append(file_info)
-        
+    
         print(f"\n📁 All Changed Files: {len(files_data)}")
         print(f"📁 Seed Files Found: {len(seed_files)}")
         print("-" * 50)
-        
+    
         if seed_files:
+            # Read the pre-PR content of every changed seed file at once
+            base_contents = change_source.get_base_contents([
+                file_info.get("filename") for file_info in seed_files
+                if file_info.get("patch") and file_info.get("filename", "").lower().endswith('.sql')
+            ])
+        
             for file_info in seed_files:
                 filename = file_info.get("filename")
                 status = file_info.get("status")
                 additions = file_info.get("additions", 0)
                 deletions = file_info.get("deletions", 0)
                 patch = file_info.get("patch", "")
-                
+            
                 print(f"• {filename} ({status})")
                 print(f"  +{additions} -{deletions}")
-                
+            
                 # Show the actual code changes
                 if patch:
                     print(f"\n  📝 Code Changes:")
@@ -338,41 +231,43 @@ if files_response.status_code == 200:
                         elif line.startswith(' '):
                             print(f"     {line}")
                     print("  " + "=" * 60)
-                    
+                
                     # Extract detailed table changes if it's a SQL file
                     if filename.lower().endswith('.sql'):
                         # First, get table names from the patch
                         table_changes = extract_table_details(patch)
-                        
+                    
                         if table_changes:
-                            # Fetch the complete file content to get full table definitions
-                            file_content_url = f"https://api.github.com/repos/{repo_full}/contents/{filename}"
-                            file_response = requests.get(file_content_url, headers=headers)
+                            file_content = base_contents.get(filename)
+                            if file_content is None and status == "added":
+                                # New file: the patch holds all of its content
+                                file_content = ""
+                        
+                            if file_content is not None:
+                                # Rebuild the post-PR file so definitions show the updated state
+                                try:
+                                    updated_content = apply_patch(file_content, patch)
+                                except ValueError as e:
+                                    print(f"\n  ⚠️  Could not apply patch to the fetched file ({e}); showing its current state")
+                                    updated_content = file_content
                             
-                            if file_response.status_code == 200:
-                                import base64
-                                file_data = file_response.json()
-                                file_content = base64.b64decode(file_data['content']).decode('utf-8')
-                                
                                 print(f"\n  🗂️  Complete Table Definitions:")
-                                
+                            
                                 # Extract complete table definitions from the full file
                                 for table_name in table_changes.keys():
-                                    complete_table_def = extract_complete_table_definition(file_content, table_name)
+                                    updated_table_def = extract_complete_table_definition(updated_content, table_name)
+                                
+                                    if updated_table_def:
                                     
-                                    if complete_table_def:
-                                        # Apply patch changes to show the updated state
-                                        updated_table_def = apply_patch_to_table_definition(complete_table_def, patch)
-                                        
                                         print(f"\n    📋 Table: {table_name}")
                                         print(f"    🔧 Complete Definition from File:")
                                         print()
-                                        
+                                    
                                         # Print the updated table definition with proper indentation
                                         for line in updated_table_def.split('\n'):
                                             if line.strip():
                                                 print(f"    {line}")
-                                        
+                                    
                                         # Show what changed in this table
                                         if table_changes[table_name]['changes']:
                                             print(f"\n    📝 Changes in this PR:")
@@ -384,7 +279,7 @@ if files_response.status_code == 200:
                                     else:
                                         print(f"\n    ❌ Could not find complete definition for table: {table_name}")
                             else:
-                                print(f"\n  ❌ Could not fetch complete file content (Status: {file_response.status_code})")
+                                print("\n  ❌ Could not fetch complete file content")
                                 # Fallback to patch-based analysis
                                 print(f"\n  🗂️  Table Definitions (from patch only):")
                                 for table_name, details in table_changes.items():
@@ -393,12 +288,67 @@ if files_response.status_code == 200:
                             print(f"\n  ℹ️  No specific table operations detected")
                 else:
                     print(f"  ℹ️  No patch data available (binary file or large change)")
-                
+            
                 print()
         else:
             print("🔍 No files with 'seed' prefix found in this PR.")
     else:
         print("No files changed in this PR.")
-else:
-    print(f"Error fetching files: {files_response.status_code}")
 
+
+def build_synthetic_patch(line_count):
+    """Build a mysqldump-style seed patch of roughly line_count lines (one hunk per table)."""
+    hunks = []
+    total = 0
+    table_number = 0
+    while total < line_count:
+        table_number += 1
+        lines = [f" CREATE TABLE `bench_table_{table_number}` ("]
+        for column_number in range(12):
+            column = f"  `column_{column_number}` varchar(64) NOT NULL DEFAULT '' COMMENT 'synthetic column {column_number}',"
+            if column_number % 4 == 1:
+                lines.append('-' + column)
+                lines.append('+' + column.replace('varchar(64)', 'varchar(128)'))
+            else:
+                lines.append(' ' + column)
+        lines.append("   `updated_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,")
+        lines.append("   PRIMARY KEY (`column_0`),")
+        lines.append("   KEY `idx_column_1` (`column_1`)")
+        lines.append(" ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;")
+
+        old_count = sum(1 for line in lines if line[0] != '+')
+        new_count = sum(1 for line in lines if line[0] != '-')
+        start = table_number * 100
+        hunks.append(f"@@ -{start},{old_count} +{start},{new_count} @@ DROP TABLE IF EXISTS `bench_table_{table_number}`;")
+        hunks.extend(lines)
+        total += len(lines) + 1
+    return '\n'.join(hunks)
+
+
+def run_classifier_benchmark(line_count=100000, repeat=3):
+    """Time extract_table_details on a synthetic patch of line_count lines."""
+    import time
+
+    patch = build_synthetic_patch(line_count)
+    patch_lines = patch.count('\n') + 1
+    print(f"🧪 extract_table_details on a synthetic {patch_lines}-line patch (best of {repeat})")
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        table_changes = extract_table_details(patch)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    change_count = sum(len(details['changes']) for details in table_changes.values())
+    print(f"   Tables:      {len(table_changes)}")
+    print(f"   Changes:     {change_count}")
+    print(f"   Time:        {best * 1000:.1f} ms ({patch_lines / best:,.0f} lines/s)")
+    return best
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        run_classifier_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
+    else:
+        main()
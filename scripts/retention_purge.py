@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Retention Purge
+Deletes rows older than a retention period from outbox and log tables
+(kafka_events, kafka_events_v2, audience_change_log, ...). The tables and
+periods come from a JSON policy file:
+
+    {
+      "order_service": {
+        "kafka_events": {"days": 30},
+        "kafka_events_v3": {"days": 90},
+        "order_dead_jobs": {"days": 60, "batch_rows": 500, "sleep_ms": 250}
+      },
+      "ab": {
+        "audience_change_log": {"days": 365, "column": "created_timestamp"}
+      }
+    }
+
+Each entry can set the following (defaults in brackets):
+
+- column [created_at]
+- batch_rows [PURGE_BATCH_ROWS or 1000]
+- sleep_ms between batches [PURGE_SLEEP_MS or 100]
+
+The cutoff is NOW() - INTERVAL days DAY on the server.
+
+Row deletes run in small batches as `DELETE ... WHERE column < cutoff ORDER BY
+column LIMIT n`, which walks the column's index (idx_created_at) from the
+oldest row. Each batch is committed, then the purge sleeps. The session's
+innodb_lock_wait_timeout is lowered to PURGE_LOCK_WAIT_TIMEOUT so a purge
+gives way to application traffic. A batch that hits a lock wait timeout or a
+deadlock is rolled back and retried at half the size after a growing pause.
+Every batch's rows, time, size and lock waits are printed, and are appended
+as JSON lines to --metrics FILE if given.
+
+Tables partitioned by RANGE (or RANGE COLUMNS) on an expression that grows
+with the column, such as kafka_events_v3's
+PARTITION BY RANGE (extract(year_month from created_at)), are purged with
+ALTER TABLE ... DROP PARTITION for every partition that lies entirely before
+the cutoff. Rows in the partition that straddles the cutoff stay until that
+partition expires as a whole.
+
+Usage: python retention_purge.py <policy.json> [<db>[.<table>] ...] [--dry-run] [--local] [--metrics FILE]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+from ddl_validator import DatabaseConnection, get_local_config, get_staging_config, mysql_connector
+from data_dumper import quote_identifier
+from backfill import RETRYABLE_ERRORS
+
+
+DEFAULT_BATCH_ROWS = int(os.getenv("PURGE_BATCH_ROWS", "1000"))
+DEFAULT_SLEEP_MS = int(os.getenv("PURGE_SLEEP_MS", "100"))
+LOCK_WAIT_TIMEOUT = int(os.getenv("PURGE_LOCK_WAIT_TIMEOUT", "5"))
+
+MIN_BATCH_ROWS = 10
+MAX_LOCK_RETRIES = 5
+
+# Partition expressions that never decrease as the column grows; others can't be compared with the cutoff
+MONOTONIC_PARTITION_FUNCTION = re.compile(
+    r'^(?:to_days|to_seconds|unix_timestamp|year|extract\s*\(\s*(?:year_month|year)\s+from)\s*\(?', re.IGNORECASE
+)
+
+
+def load_policy(path, selection=None):
+    """
+    Read a policy file into a list of entries with defaults filled in.
+    selection: optional ["db", "db.table", ...] to purge a subset.
+    """
+    with open(path) as f:
+        policy = json.load(f)
+
+    entries = []
+    for database_name, tables in policy.items():
+        for table_name, settings in tables.items():
+            if selection and database_name not in selection and f"{database_name}.{table_name}" not in selection:
+                continue
+            if not isinstance(settings.get('days'), int) or settings['days'] < 1:
+                raise ValueError(f"{database_name}.{table_name}: 'days' must be a positive integer")
+            batch_rows = settings.get('batch_rows', DEFAULT_BATCH_ROWS)
+            if not isinstance(batch_rows, int) or batch_rows < 1:
+                raise ValueError(f"{database_name}.{table_name}: 'batch_rows' must be a positive integer")
+            sleep_ms = settings.get('sleep_ms', DEFAULT_SLEEP_MS)
+            if not isinstance(sleep_ms, int) or sleep_ms < 0:
+                raise ValueError(f"{database_name}.{table_name}: 'sleep_ms' must be a non-negative integer")
+            entries.append({
+                'database': database_name,
+                'table': table_name,
+                'days': settings['days'],
+                'column': settings.get('column', 'created_at'),
+                'batch_rows': batch_rows,
+                'sleep_ms': sleep_ms
+            })
+    return entries
+
+
+def partition_cutoff_expression(expression, column):
+    """The partition expression with the column replaced by a cutoff parameter, or None if it isn't monotonic."""
+    expression = expression.strip()
+    column_pattern = rf'`?\b{re.escape(column)}\b`?'
+    if re.fullmatch(column_pattern, expression, re.IGNORECASE):
+        return 'CAST(%s AS DATETIME)'
+    if MONOTONIC_PARTITION_FUNCTION.match(expression) and re.search(column_pattern, expression, re.IGNORECASE):
+        return re.sub(column_pattern, 'CAST(%s AS DATETIME)', expression, flags=re.IGNORECASE)
+    return None
+
+
+class RetentionPurger:
+    """Purges one table according to its policy entry."""
+
+    def __init__(self, db, entry, dry_run=False, metrics_file=None):
+        self.db = db
+        self.entry = entry
+        self.dry_run = dry_run
+        self.metrics_file = metrics_file
+        self.name = quote_identifier(entry['table'])
+        self.column = quote_identifier(entry['column'])
+
+    def record(self, metrics):
+        metrics = {'database': self.entry['database'], 'table': self.entry['table'], **metrics}
+        if self.metrics_file:
+            self.metrics_file.write(json.dumps(metrics, default=str) + "\n")
+            self.metrics_file.flush()
+        return metrics
+
+    def cutoff(self):
+        self.db.cursor.execute("SELECT NOW() - INTERVAL %s DAY AS cutoff", (self.entry['days'],))
+        return self.db.cursor.fetchone()['cutoff']
+
+    def expired_partitions(self, cutoff):
+        """
+        Partitions that hold only rows older than cutoff, oldest first; None if the table
+        isn't partitioned in a way that allows dropping partitions.
+        """
+        self.db.cursor.execute("""
+            SELECT partition_name AS partition_name, partition_method AS partition_method,
+                   partition_expression AS partition_expression, partition_description AS partition_description,
+                   table_rows AS table_rows
+            FROM information_schema.PARTITIONS
+            WHERE table_schema = %s AND table_name = %s AND partition_name IS NOT NULL
+            ORDER BY partition_ordinal_position
+        """, (self.db.database, self.entry['table']))
+        partitions = self.db.cursor.fetchall()
+        if not partitions:
+            return None
+        method = partitions[0]['partition_method']
+        cutoff_expression = partition_cutoff_expression(partitions[0]['partition_expression'] or '', self.entry['column'])
+        if method not in ('RANGE', 'RANGE COLUMNS') or cutoff_expression is None:
+            print(f"   ℹ️  Partitioned by {method} ({partitions[0]['partition_expression']}); using row deletes")
+            return None
+
+        # Every partition but the last may go (a table keeps at least one); MAXVALUE never expires
+        candidates = [partition for partition in partitions[:-1] if partition['partition_description'] != 'MAXVALUE']
+        if not candidates:
+            return []
+        # A partition is expired if its upper bound is at or below the cutoff's partition value
+        comparisons = ', '.join(
+            f"({partition['partition_description']}) <= ({cutoff_expression}) AS p{position}"
+            for position, partition in enumerate(candidates)
+        )
+        self.db.cursor.execute(f"SELECT {comparisons}", [cutoff] * (len(candidates) * cutoff_expression.count('%s')))
+        expired = self.db.cursor.fetchone()
+
+        result = []
+        for position, partition in enumerate(candidates):
+            if not expired[f'p{position}']:
+                break
+            result.append(partition)
+        return result
+
+    def drop_partitions(self, partitions):
+        names = [partition['partition_name'] for partition in partitions]
+        rows = sum(int(partition['table_rows'] or 0) for partition in partitions)
+        if self.dry_run:
+            print(f"   🔍 Would drop {len(names)} partition(s) ({', '.join(names)}), about {rows:,} rows")
+            return {'method': 'drop_partition', 'rows': rows, 'batches': 0, 'lock_waits': 0}
+
+        start = time.perf_counter()
+        for name in names:
+            # One partition per statement, so an interruption leaves whole partitions dropped
+            partition_start = time.perf_counter()
+            self.db.cursor.execute(f"ALTER TABLE {self.name} DROP PARTITION {quote_identifier(name)}")
+            self.record({'method': 'drop_partition', 'partition': name, 'seconds': round(time.perf_counter() - partition_start, 3)})
+            print(f"   🗑️  Dropped partition {name}")
+        print(f"   ✅ {len(names)} partition(s), about {rows:,} rows, in {time.perf_counter() - start:.1f} s")
+        return {'method': 'drop_partition', 'rows': rows, 'batches': len(names), 'lock_waits': 0}
+
+    def has_index(self):
+        self.db.cursor.execute("""
+            SELECT COUNT(*) AS found FROM information_schema.STATISTICS
+            WHERE table_schema = %s AND table_name = %s AND column_name = %s AND seq_in_index = 1
+        """, (self.db.database, self.entry['table'], self.entry['column']))
+        return bool(self.db.cursor.fetchone()['found'])
+
+    def delete_rows(self, cutoff):
+        if self.dry_run:
+            self.db.cursor.execute(f"SELECT COUNT(*) AS expired FROM {self.name} WHERE {self.column} < %s", (cutoff,))
+            rows = self.db.cursor.fetchone()['expired']
+            print(f"   🔍 Would delete {rows:,} rows in batches of {self.entry['batch_rows']:,}")
+            return {'method': 'delete', 'rows': rows, 'batches': 0, 'lock_waits': 0}
+
+        # Without an index ORDER BY would sort the whole table per batch; the scan in
+        # primary key order reaches the old rows of an append-only table first anyway
+        order = f" ORDER BY {self.column}" if self.has_index() else ''
+        if not order:
+            print(f"   ⚠️  No index starts with {self.entry['column']}; batches scan in primary key order")
+        self.db.cursor.execute("SET SESSION innodb_lock_wait_timeout = %s", (LOCK_WAIT_TIMEOUT,))
+
+        batch_rows = self.entry['batch_rows']
+        totals = {'method': 'delete', 'rows': 0, 'batches': 0, 'lock_waits': 0}
+        start = time.perf_counter()
+        while True:
+            for attempt in range(1, MAX_LOCK_RETRIES + 1):
+                batch_start = time.perf_counter()
+                try:
+                    self.db.cursor.execute(
+                        f"DELETE FROM {self.name} WHERE {self.column} < %s{order} LIMIT %s", (cutoff, batch_rows)
+                    )
+                    rows = self.db.cursor.rowcount
+                    self.db.connection.commit()
+                    break
+                except mysql_connector.Error as e:
+                    self.db.connection.rollback()
+                    if e.errno not in RETRYABLE_ERRORS or attempt == MAX_LOCK_RETRIES:
+                        raise
+                    totals['lock_waits'] += 1
+                    batch_rows = max(MIN_BATCH_ROWS, batch_rows // 2)
+                    print(f"   ⚠️  {e.msg}; retrying with {batch_rows:,} rows after {attempt * 2} s")
+                    time.sleep(attempt * 2)
+
+            seconds = time.perf_counter() - batch_start
+            totals['rows'] += rows
+            totals['batches'] += 1
+            self.record({'method': 'delete', 'batch': totals['batches'], 'rows': rows, 'batch_rows': batch_rows,
+                         'seconds': round(seconds, 3), 'lock_waits': totals['lock_waits']})
+            elapsed = time.perf_counter() - start
+            print(f"   🗑️  batch {totals['batches']}: {rows:,} rows in {seconds:.2f} s "
+                  f"({totals['rows']:,} total, {totals['rows'] / elapsed if elapsed else 0:,.0f} rows/s)")
+            if rows < batch_rows:
+                break
+            time.sleep(self.entry['sleep_ms'] / 1000)
+
+        print(f"   ✅ {totals['rows']:,} rows in {totals['batches']} batches, {time.perf_counter() - start:.1f} s, "
+              f"{totals['lock_waits']} lock wait(s)")
+        return totals
+
+    def purge(self):
+        """Purge the table; returns {'method', 'rows', 'batches', 'lock_waits', 'cutoff'}."""
+        cutoff = self.cutoff()
+        print(f"\n📋 {self.entry['database']}.{self.entry['table']}: {self.entry['column']} < {cutoff} ({self.entry['days']} days)")
+        partitions = self.expired_partitions(cutoff)
+        if partitions is not None:
+            if not partitions:
+                print("   ✅ No partition has expired yet")
+                summary = {'method': 'drop_partition', 'rows': 0, 'batches': 0, 'lock_waits': 0}
+            else:
+                summary = self.drop_partitions(partitions)
+        else:
+            summary = self.delete_rows(cutoff)
+        summary['cutoff'] = cutoff
+        return summary
+
+
+def purge(policy_path, selection=None, dry_run=False, local=False, metrics_path=None):
+    """Apply a retention policy file; returns {"db.table": summary}."""
+    try:
+        entries = load_policy(policy_path, selection)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        exit(1)
+    if not entries:
+        print("❌ No policy entries selected")
+        exit(1)
+
+    print(f"🧹 Retention Purge{' (dry run)' if dry_run else ''}")
+    print("=" * 60)
+    metrics_file = open(metrics_path, 'a') if metrics_path else None
+    summaries = {}
+    failed = []
+    try:
+        for database_name in dict.fromkeys(entry['database'] for entry in entries):
+            db = DatabaseConnection(**(get_local_config(database_name) if local else get_staging_config(database_name)))
+            if not db.connect():
+                failed.append(database_name)
+                continue
+            try:
+                for entry in (entry for entry in entries if entry['database'] == database_name):
+                    key = f"{database_name}.{entry['table']}"
+                    try:
+                        summaries[key] = RetentionPurger(db, entry, dry_run, metrics_file).purge()
+                    except mysql_connector.Error as e:
+                        db.connection.rollback()
+                        print(f"   ❌ {e}")
+                        failed.append(key)
+            finally:
+                db.close()
+    finally:
+        if metrics_file:
+            metrics_file.close()
+
+    print("-" * 70)
+    for key, summary in summaries.items():
+        print(f"{'🔍' if dry_run else '✅'} {key:<45} {summary['rows']:>12,} rows  {summary['method']}")
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
+        exit(1)
+    return summaries
+
+
+def main():
+    args = sys.argv[1:]
+    metrics_path = None
+    if '--metrics' in args:
+        position = args.index('--metrics')
+        metrics_path = args[position + 1]
+        del args[position:position + 2]
+    dry_run = '--dry-run' in args
+    local = '--local' in args
+    args = [arg for arg in args if not arg.startswith('--')]
+
+    if not args:
+        print("Usage: python retention_purge.py <policy.json> [<db>[.<table>] ...] [--dry-run] [--local] [--metrics FILE]")
+        exit(1)
+
+    purge(args[0], args[1:] or None, dry_run, local, metrics_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Parallel Schema Exporter
+Regenerates the MYSQL/<env>/<db>/seed*.sql files from a live server instead
+of running mysqldump by hand. Every base table of the requested schemas is
+listed with one information_schema query, and SHOW CREATE TABLE is fetched
+concurrently over a small pool of MySQLQueryTool connections (one per
+worker thread).
+
+The dump files keep mysqldump's layout, which get_seed_index and the rest of
+the tooling read, but they are canonical. Tables are sorted by name, and
+there is no "Dump completed on" timestamp. With --no-auto-increment the
+table-level AUTO_INCREMENT=n counters are dropped as well. Re-exporting an
+unchanged schema therefore rewrites nothing. A file is replaced atomically,
+and only when its content changed.
+
+Usage: python schema_exporter.py MYSQL/<env> [<db> ...] [--no-auto-increment] [--workers N]
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from mysql_query import MySQLQueryTool
+
+
+DEFAULT_WORKERS = int(os.getenv("SCHEMA_EXPORT_WORKERS", "8"))
+
+TABLE_AUTO_INCREMENT_PATTERN = re.compile(r'(\)[^()]*?)\s+AUTO_INCREMENT=\d+')
+
+DUMP_HEADER = """/*!40101 SET @OLD_CHARACTER_SET_CLIENT=@@CHARACTER_SET_CLIENT */;
+/*!40101 SET @OLD_CHARACTER_SET_RESULTS=@@CHARACTER_SET_RESULTS */;
+/*!40101 SET @OLD_COLLATION_CONNECTION=@@COLLATION_CONNECTION */;
+/*!50503 SET NAMES utf8mb4 */;
+/*!40103 SET @OLD_TIME_ZONE=@@TIME_ZONE */;
+/*!40103 SET TIME_ZONE='+00:00' */;
+/*!40014 SET @OLD_UNIQUE_CHECKS=@@UNIQUE_CHECKS, UNIQUE_CHECKS=0 */;
+/*!40014 SET @OLD_FOREIGN_KEY_CHECKS=@@FOREIGN_KEY_CHECKS, FOREIGN_KEY_CHECKS=0 */;
+/*!40101 SET @OLD_SQL_MODE=@@SQL_MODE, SQL_MODE='NO_AUTO_VALUE_ON_ZERO' */;
+/*!40111 SET @OLD_SQL_NOTES=@@SQL_NOTES, SQL_NOTES=0 */;
+"""
+
+DUMP_FOOTER = """/*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;
+
+/*!40101 SET SQL_MODE=@OLD_SQL_MODE */;
+/*!40014 SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS */;
+/*!40014 SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS */;
+/*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */;
+/*!40101 SET CHARACTER_SET_RESULTS=@OLD_CHARACTER_SET_RESULTS */;
+/*!40101 SET COLLATION_CONNECTION=@OLD_COLLATION_CONNECTION */;
+/*!40111 SET SQL_NOTES=@OLD_SQL_NOTES */;
+"""
+
+
+def strip_auto_increment(create_statement):
+    """Remove the table option AUTO_INCREMENT=n (column AUTO_INCREMENT attributes stay)."""
+    return TABLE_AUTO_INCREMENT_PATTERN.sub(r'\1', create_statement, count=1)
+
+
+def render_dump(schema, create_database, tables, host='', server_version=''):
+    """
+    Render a schema dump in mysqldump's layout.
+
+    Args:
+        create_database: SHOW CREATE DATABASE statement
+        tables: (table name, CREATE TABLE statement) pairs
+    """
+    # mysqldump adds the versioned IF NOT EXISTS to SHOW CREATE DATABASE's output
+    create_database = re.sub(r'^CREATE DATABASE\s+', 'CREATE DATABASE /*!32312 IF NOT EXISTS*/ ', create_database)
+
+    lines = [
+        "-- Schema export by schema_exporter.py",
+        "--",
+        f"-- Host: {host}    Database: {schema}",
+        "-- ------------------------------------------------------",
+        f"-- Server version\t{server_version}",
+        "",
+        DUMP_HEADER,
+        "--",
+        f"-- Current Database: `{schema}`",
+        "--",
+        "",
+        f"{create_database};",
+        "",
+        f"USE `{schema}`;",
+    ]
+    for table_name, create_statement in sorted(tables):
+        lines += [
+            "",
+            "--",
+            f"-- Table structure for table `{table_name}`",
+            "--",
+            "",
+            f"DROP TABLE IF EXISTS `{table_name}`;",
+            "/*!40101 SET @saved_cs_client     = @@character_set_client */;",
+            "/*!50503 SET character_set_client = utf8mb4 */;",
+            f"{create_statement};",
+            "/*!40101 SET character_set_client = @saved_cs_client */;",
+        ]
+    lines += [
+        "",
+        "--",
+        f"-- Dumping events for database '{schema}'",
+        "--",
+        "",
+        "--",
+        f"-- Dumping routines for database '{schema}'",
+        "--",
+        DUMP_FOOTER,
+    ]
+    return "\n".join(lines)
+
+
+class SchemaExporter:
+    """Fetches CREATE statements of whole schemas over a pool of MySQLQueryTool connections."""
+
+    def __init__(self, connection_config, workers=DEFAULT_WORKERS):
+        self.connection_config = connection_config
+        self.workers = workers
+        self.local = threading.local()
+        self.tools = []
+        self.lock = threading.Lock()
+
+    def tool(self):
+        """This thread's connection, opened on first use."""
+        tool = getattr(self.local, 'tool', None)
+        if tool is None:
+            tool = MySQLQueryTool(**self.connection_config)
+            if not tool.connect():
+                raise ConnectionError(f"Could not connect to {self.connection_config['host']}")
+            self.local.tool = tool
+            with self.lock:
+                self.tools.append(tool)
+        return tool
+
+    def export(self, schemas, no_auto_increment=False):
+        """
+        Fetch every base table of the schemas.
+
+        Returns:
+            dict: schema -> dump content
+        """
+        main_tool = self.tool()
+        tables = main_tool.list_tables(schemas)
+        server_version = main_tool.get_server_version()
+        create_databases = {schema: main_tool.fetch_create_database(schema) for schema in schemas}
+
+        def fetch(task):
+            schema, table_name = task
+            create_statement = self.tool().fetch_create_table(schema, table_name)
+            return schema, table_name, strip_auto_increment(create_statement) if no_auto_increment else create_statement
+
+        tasks = [(schema, table_name) for schema in schemas for table_name in tables[schema]]
+        statements = {schema: [] for schema in schemas}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for schema, table_name, create_statement in executor.map(fetch, tasks):
+                statements[schema].append((table_name, create_statement))
+
+        return {
+            schema: render_dump(schema, create_databases[schema], statements[schema], self.connection_config['host'], server_version)
+            for schema in schemas
+        }
+
+    def close(self):
+        for tool in self.tools:
+            tool.close()
+        self.tools = []
+
+
+def seed_path_for(directory):
+    """The directory's existing seed file if it has exactly one, else seed.sql."""
+    seed_files = sorted(glob.glob(os.path.join(directory, 'seed*.sql')))
+    return seed_files[0] if len(seed_files) == 1 else os.path.join(directory, 'seed.sql')
+
+
+def write_if_changed(path, content):
+    """Atomically replace path with content unless it already holds it; returns True if written."""
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temporary_path, path)
+    return True
+
+
+def export_environment(environment_directory, schemas=None, no_auto_increment=False, workers=None):
+    """Regenerate the seed files of an MYSQL/<env> directory (default: every schema it already has)."""
+    from ddl_validator import get_staging_config
+
+    workers = workers or DEFAULT_WORKERS
+    environment_directory = os.path.abspath(environment_directory)
+    schemas = schemas or sorted(
+        name for name in os.listdir(environment_directory) if os.path.isdir(os.path.join(environment_directory, name))
+    )
+    if not schemas:
+        print(f"❌ No schemas given and none found under {environment_directory}")
+        exit(1)
+
+    connection_config = get_staging_config(schemas[0])
+    del connection_config['database']
+
+    print("📤 Schema Export")
+    print("=" * 60)
+    start = time.perf_counter()
+    exporter = SchemaExporter(connection_config, workers)
+    try:
+        dumps = exporter.export(schemas, no_auto_increment)
+    except ConnectionError as e:
+        print(f"❌ {e}")
+        exit(1)
+    finally:
+        exporter.close()
+    elapsed = time.perf_counter() - start
+
+    table_count = 0
+    for schema, content in dumps.items():
+        path = seed_path_for(os.path.join(environment_directory, schema))
+        tables = content.count("\n-- Table structure for table ")
+        table_count += tables
+        status = "updated" if write_if_changed(path, content) else "unchanged"
+        print(f"   {'📝' if status == 'updated' else '✅'} {os.path.relpath(path)}: {tables} tables, {status}")
+
+    print(f"\n{table_count} tables from {len(dumps)} schema(s) in {elapsed:.2f} s with {workers} connection(s)")
+
+
+def main():
+    args = sys.argv[1:]
+    workers = DEFAULT_WORKERS
+    if '--workers' in args:
+        position = args.index('--workers')
+        workers = int(args[position + 1])
+        del args[position:position + 2]
+    no_auto_increment = '--no-auto-increment' in args
+    args = [arg for arg in args if not arg.startswith('--')]
+
+    if not args:
+        print("Usage: python schema_exporter.py MYSQL/<env> [<db> ...] [--no-auto-increment] [--workers N]")
+        exit(1)
+
+    export_environment(args[0], args[1:], no_auto_increment, workers)
+
+
+if __name__ == "__main__":
+    main()
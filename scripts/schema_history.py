@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Versioned Schema History
+Answers "what did table X look like at V137" without replaying migrations by
+hand. The V{n}__*.sql files of a database directory are replayed once
+through SchemaModel, either from an empty schema or from the seed files with
+--from-seed. After every version, only the tables that version touched are
+serialized.
+
+Table states are immutable nodes, stored once per distinct content and
+shared by every version in which the table is unchanged. Each table keeps its
+own sorted list of (version, node) changes. Recording a version therefore
+costs O(tables it changed). A table at any version is one binary search in
+its list, and a full schema is one search per table, with nothing replayed.
+
+Everything goes into one binary file laid out for mmap:
+
+    header | versions | tables (sorted by name) | histories | node index | strings and node JSON
+
+A reader maps the file and decodes only the entries and nodes a query
+touches.
+
+Usage:
+    python schema_history.py build MYSQL/<env>/<db> [--output FILE] [--from-seed]
+    python schema_history.py show FILE <table> [--version N]
+    python schema_history.py log FILE <table>
+    python schema_history.py schema FILE [--version N]
+"""
+
+import os
+import sys
+import glob
+import mmap
+import json
+import struct
+from bisect import bisect_right
+from schema_model import SchemaModel, TableModel
+from sql_ddl_parser import MigrationFileValidator, SQLDDLParser
+
+
+MAGIC = b'SCHHIST1'
+# magic, version count, table count, node count, then the offsets of the sections
+HEADER = struct.Struct('<8sIIIQQQQQ')
+VERSION_ENTRY = struct.Struct('<IQI')      # version number, name offset, name length
+TABLE_ENTRY = struct.Struct('<QIQI')       # name offset, name length, history offset, history length
+HISTORY_ENTRY = struct.Struct('<Ii')       # version index, node id (-1: table absent)
+NODE_ENTRY = struct.Struct('<QI')          # JSON offset, JSON length
+ABSENT = -1
+
+
+def migration_files(directory):
+    """(version, path) of the directory's V{n}__*.sql files in version order."""
+    validator = MigrationFileValidator()
+    files = []
+    for path in glob.glob(os.path.join(directory, '*.sql')):
+        match = validator.migration_pattern.match(os.path.basename(path))
+        if match:
+            files.append((int(match.group(1)), path))
+    return sorted(files)
+
+
+class HistoryBuilder:
+    """Records table nodes version by version; identical table states share one node."""
+
+    def __init__(self):
+        self.versions = []        # (version number, name)
+        self.nodes = []           # encoded node JSON
+        self.node_ids = {}        # encoded node JSON -> node id
+        self.current = {}         # table -> node id in the latest version
+        self.histories = {}       # table -> [(version index, node id)]
+
+    def node_for(self, table):
+        if table is None:
+            return ABSENT
+        encoded = json.dumps(table.to_dict(), separators=(',', ':')).encode('utf-8')
+        node_id = self.node_ids.get(encoded)
+        if node_id is None:
+            node_id = self.node_ids[encoded] = len(self.nodes)
+            self.nodes.append(encoded)
+        return node_id
+
+    def record(self, version, name, schema, tables):
+        """Add a version in which only `tables` may have changed."""
+        version_index = len(self.versions)
+        self.versions.append((version, name))
+        changed = 0
+        for table_name in tables:
+            node_id = self.node_for(schema.tables.get(table_name))
+            if self.current.get(table_name, ABSENT) != node_id:
+                self.current[table_name] = node_id
+                self.histories.setdefault(table_name, []).append((version_index, node_id))
+                changed += 1
+        return changed
+
+    def to_bytes(self):
+        strings = bytearray()
+
+        def add_string(data):
+            offset = len(strings)
+            strings.extend(data)
+            return offset, len(data)
+
+        versions = bytearray()
+        for version, name in self.versions:
+            versions += VERSION_ENTRY.pack(version, *add_string(name.encode('utf-8')))
+
+        table_names = sorted(self.histories, key=lambda table_name: table_name.encode('utf-8'))
+        tables = bytearray()
+        histories = bytearray()
+        for table_name in table_names:
+            history = self.histories[table_name]
+            tables += TABLE_ENTRY.pack(*add_string(table_name.encode('utf-8')), len(histories) // HISTORY_ENTRY.size, len(history))
+            for version_index, node_id in history:
+                histories += HISTORY_ENTRY.pack(version_index, node_id)
+
+        nodes = bytearray()
+        for encoded in self.nodes:
+            nodes += NODE_ENTRY.pack(*add_string(encoded))
+
+        versions_offset = HEADER.size
+        tables_offset = versions_offset + len(versions)
+        histories_offset = tables_offset + len(tables)
+        nodes_offset = histories_offset + len(histories)
+        strings_offset = nodes_offset + len(nodes)
+        header = HEADER.pack(MAGIC, len(self.versions), len(table_names), len(self.nodes),
+                             versions_offset, tables_offset, histories_offset, nodes_offset, strings_offset)
+        return bytes(header + versions + tables + histories + nodes + strings)
+
+
+class SchemaHistory:
+    """Read-only, memory-mapped view of a schema history file."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.version_count, self.table_count, self.node_count, self.versions_offset, self.tables_offset,
+         self.histories_offset, self.nodes_offset, self.strings_offset) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a schema history file")
+        self.version_numbers = [self.version(index)[0] for index in range(self.version_count)]
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def string(self, offset, length):
+        start = self.strings_offset + offset
+        return self.data[start:start + length]
+
+    def version(self, index):
+        """(version number, file name) of the index-th recorded version."""
+        number, name_offset, name_length = VERSION_ENTRY.unpack_from(self.data, self.versions_offset + index * VERSION_ENTRY.size)
+        return number, self.string(name_offset, name_length).decode('utf-8')
+
+    def version_index(self, version=None):
+        """Index of the latest recorded version <= version (default: the last); KeyError before the first."""
+        if version is None:
+            return self.version_count - 1
+        index = bisect_right(self.version_numbers, version) - 1
+        if index < 0:
+            raise KeyError(f"No version at or before {version}")
+        return index
+
+    def table_entry(self, index):
+        name_offset, name_length, history_offset, history_length = TABLE_ENTRY.unpack_from(
+            self.data, self.tables_offset + index * TABLE_ENTRY.size
+        )
+        return self.string(name_offset, name_length), history_offset, history_length
+
+    def find_table(self, table_name):
+        """(history offset, history length) of a table by binary search over the sorted names, or None."""
+        wanted = table_name.encode('utf-8')
+        low, high = 0, self.table_count
+        while low < high:
+            middle = (low + high) // 2
+            name, history_offset, history_length = self.table_entry(middle)
+            if name == wanted:
+                return history_offset, history_length
+            if name < wanted:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def history_entry(self, history_offset, position):
+        return HISTORY_ENTRY.unpack_from(self.data, self.histories_offset + (history_offset + position) * HISTORY_ENTRY.size)
+
+    def node_at(self, history_offset, history_length, version_index):
+        """Node id of a table at a version index: the last change at or before it."""
+        low, high = 0, history_length
+        while low < high:
+            middle = (low + high) // 2
+            if self.history_entry(history_offset, middle)[0] <= version_index:
+                low = middle + 1
+            else:
+                high = middle
+        return self.history_entry(history_offset, low - 1)[1] if low else ABSENT
+
+    def node(self, node_id):
+        offset, length = NODE_ENTRY.unpack_from(self.data, self.nodes_offset + node_id * NODE_ENTRY.size)
+        return TableModel.from_dict(json.loads(self.string(offset, length)))
+
+    def table_at(self, table_name, version=None):
+        """TableModel of the table at the version (default: latest), or None if it didn't exist."""
+        entry = self.find_table(table_name)
+        if entry is None:
+            return None
+        node_id = self.node_at(*entry, self.version_index(version))
+        return None if node_id == ABSENT else self.node(node_id)
+
+    def schema_at(self, version=None):
+        """Full SchemaModel at the version (default: latest)."""
+        version_index = self.version_index(version)
+        schema = SchemaModel()
+        for index in range(self.table_count):
+            name, history_offset, history_length = self.table_entry(index)
+            node_id = self.node_at(history_offset, history_length, version_index)
+            if node_id != ABSENT:
+                schema.tables[name.decode('utf-8')] = self.node(node_id)
+        return schema
+
+    def table_log(self, table_name):
+        """[(version number, file name, TableModel or None)] for every version that changed the table."""
+        entry = self.find_table(table_name)
+        if entry is None:
+            return []
+        history_offset, history_length = entry
+        log = []
+        for position in range(history_length):
+            version_index, node_id = self.history_entry(history_offset, position)
+            log.append(self.version(version_index) + (None if node_id == ABSENT else self.node(node_id),))
+        return log
+
+
+def build_history(directory, output_path=None, from_seed=False):
+    """Replay a database directory's migrations into a history file; returns its path."""
+    database_name = os.path.basename(os.path.abspath(directory))
+    output_path = output_path or f"{database_name}.schema-history"
+    migrations = migration_files(directory)
+
+    print("🗂️  Schema History")
+    print("=" * 60)
+    seed_files = sorted(glob.glob(os.path.join(directory, 'seed*.sql'))) if from_seed else []
+    schema = SchemaModel.from_files(seed_files, database_name) if seed_files else SchemaModel(database_name)
+    builder = HistoryBuilder()
+    builder.record(0, 'seed' if seed_files else 'empty', schema, list(schema.tables))
+
+    for version, path in migrations:
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        parser = SQLDDLParser()
+        parser.parse_sql_file(content, path)
+        operations = parser.get_operations()
+
+        # Tables the operations name, plus tables whose foreign keys follow renamed columns
+        touched = {operation['table'] for operation in operations}
+        touched |= {referencing for table_name in list(touched) for referencing, _ in schema.referencing_foreign_keys(table_name)}
+        problems = [problem for _, operation_problems in schema.apply_operations(operations) for problem in operation_problems]
+        changed = builder.record(version, os.path.basename(path), schema, sorted(touched))
+        print(f"   V{version}: {len(operations)} operation(s), {changed} table(s) changed"
+              + (f", ⚠️  {len(problems)} problem(s)" if problems else ''))
+        for problem in problems:
+            print(f"      {problem}")
+
+    data = builder.to_bytes()
+    temporary_path = f"{output_path}.tmp"
+    with open(temporary_path, 'wb') as f:
+        f.write(data)
+    os.replace(temporary_path, output_path)
+
+    print("-" * 70)
+    print(f"✅ {len(builder.versions)} versions, {len(builder.histories)} tables, {len(builder.nodes)} distinct table states "
+          f"({len(data) / 1024:,.1f} KB) -> {output_path}")
+    return output_path
+
+
+def render_table(table):
+    """CREATE TABLE-like rendering of a TableModel."""
+    lines = []
+    for column in table.columns.values():
+        parts = [f"`{column['COLUMN_NAME']}` {column['COLUMN_TYPE']}"]
+        if column.get('IS_NULLABLE') == 'NO':
+            parts.append('NOT NULL')
+        if 'COLUMN_DEFAULT' in column:
+            parts.append(f"DEFAULT {column['COLUMN_DEFAULT']}")
+        # DEFAULT_GENERATED is information_schema's marker for expression defaults, not DDL
+        extra = column.get('EXTRA', '').replace('DEFAULT_GENERATED', '').strip()
+        if extra:
+            parts.append(extra.upper())
+        lines.append(' '.join(parts))
+    if table.primary_key:
+        lines.append(f"PRIMARY KEY ({', '.join(f'`{column}`' for column in table.primary_key)})")
+    for index in table.indexes.values():
+        lines.append(f"{'UNIQUE ' if index['unique'] else ''}KEY `{index['name']}` ({', '.join(index['parts'])})")
+    for foreign_key in table.foreign_keys.values():
+        lines.append(f"CONSTRAINT `{foreign_key['name']}` FOREIGN KEY ({', '.join(foreign_key['columns'])}) "
+                     f"REFERENCES `{foreign_key['referenced_table']}` ({', '.join(foreign_key['referenced_columns'])})")
+    body = ',\n'.join(f"  {line}" for line in lines)
+    return f"CREATE TABLE `{table.name}` (\n{body}\n) {table.options}".rstrip()
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for option in ('--output', '--version'):
+        if option in args:
+            position = args.index(option)
+            options[option] = args[position + 1]
+            del args[position:position + 2]
+    from_seed = '--from-seed' in args
+    args = [arg for arg in args if not arg.startswith('--')]
+    version = int(options['--version']) if '--version' in options else None
+
+    action = args[0] if args else None
+    if action == 'build' and len(args) == 2:
+        build_history(args[1], options.get('--output'), from_seed)
+    elif action in ('show', 'log', 'schema') and len(args) == (2 if action == 'schema' else 3):
+        try:
+            with SchemaHistory(args[1]) as history:
+                if action == 'show':
+                    table = history.table_at(args[2], version)
+                    print(render_table(table) + ';' if table else f"❌ {args[2]} does not exist at that version")
+                elif action == 'log':
+                    for number, name, table in history.table_log(args[2]):
+                        print(f"V{number:<6} {name:<50} {'dropped' if table is None else f'{len(table.columns)} columns, {len(table.indexes)} indexes'}")
+                else:
+                    schema = history.schema_at(version)
+                    for table_name in sorted(schema.tables):
+                        print(f"{table_name:<45} {len(schema.tables[table_name].columns):>4} columns")
+        except (ValueError, KeyError) as e:
+            print(f"❌ {e}")
+            exit(1)
+    else:
+        print("Usage: python schema_history.py build MYSQL/<env>/<db> [--output FILE] [--from-seed]")
+        print("       python schema_history.py show FILE <table> [--version N]")
+        print("       python schema_history.py log FILE <table>")
+        print("       python schema_history.py schema FILE [--version N]")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
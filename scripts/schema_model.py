@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Simulated Schema Model
+In-memory model of a database built from the CREATE TABLE statements of its
+seed*.sql files. Parsed migration operations (SQLDDLParser.get_operations())
+are applied to it to find the changes MySQL would reject - adding a column
+that already exists, dropping a missing index, a foreign key to a missing
+table, and so on - without a database server.
+"""
+
+import re
+import copy
+from seed_index import get_seed_index
+from sql_ddl_parser import SQLDDLParser
+
+
+def find_closing_paren(text, open_index):
+    """Return the index of the parenthesis closing text[open_index], skipping quoted strings."""
+    depth = 0
+    quote_char = None
+    escaped = False
+    for i in range(open_index, len(text)):
+        char = text[i]
+        if escaped:
+            escaped = False
+        elif quote_char:
+            # Backslash escapes apply inside '...' and "...", not inside identifiers
+            if char == '\\' and quote_char != '`':
+                escaped = True
+            elif char == quote_char:
+                quote_char = None
+        elif char in ("'", '"', '`'):
+            quote_char = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def strip_index_column(column):
+    """`name`(10) DESC -> name"""
+    return re.sub(r'\s*\(\d+\)|\s+(?:ASC|DESC)$', '', column.strip(), flags=re.IGNORECASE).strip('`"')
+
+
+class TableModel:
+    """Columns, indexes, primary key and foreign keys of one table."""
+
+    def __init__(self, name):
+        self.name = name
+        self.columns = {}         # lowercased name -> column attributes (as SQLDDLParser.parse_column_definition)
+        self.indexes = {}         # lowercased name -> {'name', 'columns', 'parts', 'unique'}
+        self.primary_key = []
+        self.foreign_keys = {}    # lowercased name -> {'name', 'columns', 'referenced_table', 'referenced_columns'}
+        self.options = ''         # everything after the column list: ENGINE, CHARSET, PARTITION BY ...
+
+    @classmethod
+    def from_create_statement(cls, statement, parser=None):
+        """Build a table model from a CREATE TABLE statement."""
+        parser = parser or SQLDDLParser()
+        name_match = re.search(r'CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?[`"]?(\w+)[`"]?', statement, re.IGNORECASE)
+        table = cls(name_match.group(1) if name_match else 'unknown_table')
+
+        open_index = statement.find('(', name_match.end() if name_match else 0)
+        close_index = find_closing_paren(statement, open_index) if open_index >= 0 else -1
+        if close_index < 0:
+            return table
+
+        table.options = statement[close_index + 1:].strip().rstrip(';').strip()
+        columns, indexes, constraints = parser.parse_table_definition(statement[open_index + 1:close_index])
+
+        for column in columns:
+            table.columns[column['COLUMN_NAME'].lower()] = column
+        for index in indexes:
+            table.add_index(index['name'], index['columns'])
+        for constraint in constraints:
+            if constraint['type'] == 'PRIMARY_KEY':
+                table.primary_key = [strip_index_column(column) for column in constraint['columns']]
+            elif constraint['type'] == 'UNIQUE':
+                table.add_index(constraint['name'], constraint['columns'], unique=True)
+            elif constraint['type'] == 'FOREIGN_KEY':
+                table.add_foreign_key(constraint)
+
+        return table
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'columns': self.columns,
+            'indexes': self.indexes,
+            'primary_key': self.primary_key,
+            'foreign_keys': self.foreign_keys,
+            'options': self.options
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        table = cls(data['name'])
+        table.columns = data['columns']
+        table.indexes = data['indexes']
+        table.primary_key = data['primary_key']
+        table.foreign_keys = data['foreign_keys']
+        table.options = data['options']
+        return table
+
+    def has_column(self, column_name):
+        return column_name.lower() in self.columns
+
+    def add_index(self, name, columns, unique=False):
+        self.indexes[name.lower()] = {
+            'name': name,
+            'columns': [strip_index_column(column) for column in columns],
+            'parts': [column.strip() for column in columns],   # as written, with prefix lengths and ASC/DESC
+            'unique': unique
+        }
+
+    def next_foreign_key_name(self):
+        """<table>_ibfk_<n>, the name MySQL gives a foreign key declared without one."""
+        prefix = f"{self.name.lower()}_ibfk_"
+        numbers = [int(key[len(prefix):]) for key in self.foreign_keys if key.startswith(prefix) and key[len(prefix):].isdigit()]
+        return f"{self.name}_ibfk_{max(numbers, default=0) + 1}"
+
+    def add_foreign_key(self, details):
+        name = details['name'] or self.next_foreign_key_name()
+        self.foreign_keys[name.lower()] = {
+            'name': name,
+            'columns': list(details.get('columns', [])),
+            'referenced_table': details.get('referenced_table'),
+            'referenced_columns': list(details.get('referenced_columns', []))
+        }
+
+    def index_covers(self, columns, exclude=None):
+        """True if the primary key or an index (other than `exclude`) starts with `columns`."""
+        wanted = [column.lower() for column in columns]
+        candidates = [self.primary_key] + [
+            index['columns'] for key, index in self.indexes.items() if key != (exclude or '').lower()
+        ]
+        return any([column.lower() for column in candidate[:len(wanted)]] == wanted for candidate in candidates)
+
+
+class SchemaModel:
+    """Simulated schema: tables keyed by name, updated by applying parsed operations."""
+
+    def __init__(self, database=None):
+        self.database = database
+        self.tables = {}
+
+    @classmethod
+    def from_sql(cls, sql_content, database=None):
+        """Build a schema from the CREATE TABLE statements of a SQL file's content."""
+        schema = cls(database)
+        schema.load_sql(sql_content)
+        return schema
+
+    @classmethod
+    def from_files(cls, file_paths, database=None):
+        """Build a schema from several SQL files (e.g. a directory's seed*.sql files)."""
+        schema = cls(database)
+        for file_path in file_paths:
+            with open(file_path, encoding='utf-8') as f:
+                schema.load_sql(f.read())
+        return schema
+
+    def load_sql(self, sql_content):
+        parser = SQLDDLParser()
+        index = get_seed_index(sql_content)
+        for table_name in index.table_names():
+            table = TableModel.from_create_statement(index.get_definition(table_name), parser)
+            self.tables[table.name] = table
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def referencing_foreign_keys(self, table_name):
+        """Return (table, foreign key) pairs of other tables that reference table_name."""
+        return [
+            (table.name, foreign_key)
+            for table in self.tables.values() if table.name != table_name
+            for foreign_key in table.foreign_keys.values() if foreign_key['referenced_table'] == table_name
+        ]
+
+    def apply_operations(self, operations):
+        """Apply operations in order; returns a list of (operation, problems)."""
+        return [(operation, self.apply_operation(operation)) for operation in operations]
+
+    def apply_operation(self, operation):
+        """
+        Apply one parsed operation to the schema.
+
+        Returns:
+            list: Problems MySQL would report for this operation (empty if it applies cleanly)
+        """
+        command = operation['command']
+        table_name = operation['table']
+        statement = operation.get('full_statement', '')
+
+        if command == 'CREATE_TABLE':
+            return self.apply_create_table(table_name, statement)
+        if command == 'DROP_TABLE':
+            return self.apply_drop_table(table_name, statement)
+        if command == 'ALTER_TABLE':
+            table = self.tables.get(table_name)
+            if table is None:
+                return [f"Table '{table_name}' does not exist"]
+            handler = {
+                'COLUMN': self.apply_column_operation,
+                'INDEX': self.apply_index_operation,
+                'PRIMARY_KEY': self.apply_primary_key_operation,
+                'FOREIGN_KEY': self.apply_foreign_key_operation
+            }.get(operation['target_type'])
+            if handler is None:
+                # UNKNOWN clauses are not simulated
+                return []
+            return handler(table, operation)
+        if command == 'CREATE_INDEX':
+            table = self.tables.get(table_name)
+            if table is None:
+                return [f"Table '{table_name}' does not exist"]
+            if operation['index_name'].lower() in table.indexes:
+                return [f"Duplicate index '{operation['index_name']}' on '{table_name}'"]
+            problems = [f"Column '{column}' does not exist in '{table_name}'"
+                        for column in operation['columns'] if not table.has_column(strip_index_column(column))]
+            table.add_index(operation['index_name'], operation['columns'], unique=bool(re.match(r'CREATE\s+UNIQUE', statement, re.IGNORECASE)))
+            return problems
+        return []
+
+    def apply_create_table(self, table_name, statement):
+        problems = []
+        if table_name in self.tables:
+            if re.search(r'IF\s+NOT\s+EXISTS', statement, re.IGNORECASE):
+                return []
+            problems.append(f"Table '{table_name}' already exists")
+
+        table = TableModel.from_create_statement(statement)
+        for foreign_key in table.foreign_keys.values():
+            referenced_table = foreign_key['referenced_table']
+            if referenced_table != table_name and referenced_table not in self.tables:
+                problems.append(f"Foreign key '{foreign_key['name']}' references missing table '{referenced_table}'")
+
+        self.tables[table_name] = table
+        return problems
+
+    def apply_drop_table(self, table_name, statement):
+        if table_name not in self.tables:
+            if re.search(r'IF\s+EXISTS', statement, re.IGNORECASE):
+                return []
+            return [f"Table '{table_name}' does not exist"]
+
+        problems = [
+            f"Table '{table_name}' is referenced by foreign key '{foreign_key['name']}' on '{referencing_table}'"
+            for referencing_table, foreign_key in self.referencing_foreign_keys(table_name)
+        ]
+        del self.tables[table_name]
+        return problems
+
+    def apply_column_operation(self, table, operation):
+        alter_op = operation['operation']
+        column_name = operation['target']
+        details = operation['details']
+
+        if alter_op == 'ADD':
+            if table.has_column(column_name):
+                return [f"Duplicate column '{column_name}' in '{table.name}'"]
+            table.columns[column_name.lower()] = dict(details)
+            return []
+
+        if alter_op == 'DROP':
+            if not table.has_column(column_name):
+                return [f"Column '{column_name}' does not exist in '{table.name}'"]
+            problems = [
+                f"Column '{column_name}' is used by foreign key '{foreign_key['name']}'"
+                for foreign_key in table.foreign_keys.values()
+                if column_name.lower() in [column.lower() for column in foreign_key['columns']]
+            ]
+            del table.columns[column_name.lower()]
+            # MySQL removes the column from indexes and drops indexes left empty
+            for key in list(table.indexes):
+                index = table.indexes[key]
+                index['columns'] = [column for column in index['columns'] if column.lower() != column_name.lower()]
+                if not index['columns']:
+                    del table.indexes[key]
+            table.primary_key = [column for column in table.primary_key if column.lower() != column_name.lower()]
+            return problems
+
+        if alter_op == 'MODIFY':
+            if not table.has_column(column_name):
+                return [f"Column '{column_name}' does not exist in '{table.name}'"]
+            table.columns[column_name.lower()] = dict(details)
+            return []
+
+        if alter_op == 'CHANGE':
+            old_name_match = re.match(r'CHANGE\s+(?:COLUMN\s+)?[`"]?(\w+)[`"]?', operation.get('clause', ''), re.IGNORECASE)
+            old_name = old_name_match.group(1) if old_name_match else column_name
+            if not table.has_column(old_name):
+                return [f"Column '{old_name}' does not exist in '{table.name}'"]
+            if old_name.lower() != column_name.lower() and table.has_column(column_name):
+                return [f"Duplicate column '{column_name}' in '{table.name}'"]
+            del table.columns[old_name.lower()]
+            table.columns[column_name.lower()] = dict(details)
+            if old_name.lower() != column_name.lower():
+                self.rename_column_references(table, old_name, column_name)
+            return []
+
+        return []
+
+    def rename_column_references(self, table, old_name, new_name):
+        """Follow a CHANGE COLUMN rename in the table's keys and in foreign keys pointing at it."""
+        def rename(columns):
+            return [new_name if column.lower() == old_name.lower() else column for column in columns]
+
+        table.primary_key = rename(table.primary_key)
+        for index in table.indexes.values():
+            index['columns'] = rename(index['columns'])
+        for foreign_key in table.foreign_keys.values():
+            foreign_key['columns'] = rename(foreign_key['columns'])
+        for _, foreign_key in self.referencing_foreign_keys(table.name):
+            foreign_key['referenced_columns'] = rename(foreign_key['referenced_columns'])
+
+    def apply_index_operation(self, table, operation):
+        alter_op = operation['operation']
+        index_name = operation['target']
+
+        if alter_op == 'ADD':
+            if index_name.lower() in table.indexes:
+                return [f"Duplicate index '{index_name}' on '{table.name}'"]
+            columns = operation['details'].get('columns', [])
+            problems = [f"Column '{strip_index_column(column)}' does not exist in '{table.name}'"
+                        for column in columns if not table.has_column(strip_index_column(column))]
+            table.add_index(index_name, columns, unique=bool(re.match(r'ADD\s+UNIQUE', operation.get('clause', ''), re.IGNORECASE)))
+            return problems
+
+        if alter_op == 'DROP':
+            if index_name.lower() not in table.indexes:
+                return [f"Index '{index_name}' does not exist on '{table.name}'"]
+            # MySQL refuses to drop the only index backing a foreign key
+            index_columns = [column.lower() for column in table.indexes[index_name.lower()]['columns']]
+            problems = [
+                f"Index '{index_name}' is needed by foreign key '{foreign_key['name']}'"
+                for foreign_key in table.foreign_keys.values()
+                if index_columns[:len(foreign_key['columns'])] == [column.lower() for column in foreign_key['columns']]
+                and not table.index_covers(foreign_key['columns'], exclude=index_name)
+            ]
+            del table.indexes[index_name.lower()]
+            return problems
+
+        return []
+
+    def apply_primary_key_operation(self, table, operation):
+        if operation['operation'] == 'ADD':
+            if table.primary_key:
+                return [f"Table '{table.name}' already has a primary key"]
+            columns = operation['details'].get('columns', [])
+            problems = [f"Column '{strip_index_column(column)}' does not exist in '{table.name}'"
+                        for column in columns if not table.has_column(strip_index_column(column))]
+            table.primary_key = [strip_index_column(column) for column in columns]
+            return problems
+
+        if operation['operation'] == 'DROP':
+            if not table.primary_key:
+                return [f"Table '{table.name}' has no primary key"]
+            table.primary_key = []
+            return []
+
+        return []
+
+    def apply_foreign_key_operation(self, table, operation):
+        details = operation['details']
+        constraint_name = operation['target']
+
+        if operation['operation'] == 'ADD':
+            if not details.get('referenced_table'):
+                clause = operation.get('clause') or operation['full_statement']
+                return [f"Foreign key clause on '{table.name}' not understood, not applied: {clause}"]
+            constraint_name = constraint_name or table.next_foreign_key_name()
+            if constraint_name.lower() in table.foreign_keys:
+                return [f"Duplicate foreign key '{constraint_name}' on '{table.name}'"]
+            problems = [f"Column '{column}' does not exist in '{table.name}'"
+                        for column in details.get('columns', []) if not table.has_column(column)]
+            referenced = self.tables.get(details.get('referenced_table'))
+            if referenced is None:
+                problems.append(f"Foreign key '{constraint_name}' references missing table '{details.get('referenced_table')}'")
+            else:
+                problems.extend(f"Referenced column '{column}' does not exist in '{referenced.name}'"
+                                for column in details.get('referenced_columns', []) if not referenced.has_column(column))
+            if details.get('columns') and not table.index_covers(details['columns']):
+                # MySQL creates an index for the foreign key columns when none exists
+                table.add_index(details.get('index_name') or constraint_name, details['columns'])
+            table.add_foreign_key(dict(details, name=constraint_name))
+            return problems
+
+        if operation['operation'] == 'DROP':
+            if constraint_name.lower() not in table.foreign_keys:
+                return [f"Foreign key '{constraint_name}' does not exist on '{table.name}'"]
+            del table.foreign_keys[constraint_name.lower()]
+            return []
+
+        return []
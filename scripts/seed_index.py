@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Seed File Table Index
+Builds, in one pass over a seed/mysqldump file, an index of every CREATE TABLE
+block: table name, character and byte offsets, and 1-based line range. Table
+bodies are then a dict lookup plus a slice instead of a rescan of the file.
+Indexes are cached per file content, so every caller that looks at the same
+content shares one index.
+"""
+
+import re
+import sys
+from bisect import bisect_right
+from functools import lru_cache
+
+
+CREATE_TABLE_LINE_PATTERN = re.compile(
+    r'\s*CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?'
+    r'(?:[`"]?[A-Za-z0-9_$]+[`"]?\.)?[`"]?([A-Za-z0-9_$]+)[`"]?',
+    re.IGNORECASE
+)
+
+
+class TableBlock:
+    """Location of one CREATE TABLE statement inside a file."""
+    __slots__ = ('name', 'start', 'end', 'byte_start', 'byte_end', 'start_line', 'end_line')
+
+    def __init__(self, name, start, end, byte_start, byte_end, start_line, end_line):
+        self.name = name
+        self.start = start              # character offsets into the decoded content
+        self.end = end
+        self.byte_start = byte_start    # byte offsets into the UTF-8 encoded file
+        self.byte_end = byte_end
+        self.start_line = start_line    # 1-based, inclusive
+        self.end_line = end_line
+
+    def __repr__(self):
+        return f"TableBlock({self.name!r}, lines {self.start_line}-{self.end_line})"
+
+
+class SeedIndex:
+    """One-pass index of the CREATE TABLE blocks in a SQL file."""
+
+    def __init__(self, content):
+        self.content = content
+        self.blocks = {}
+        self._start_lines = []
+        self._ordered_blocks = []
+        self._build()
+
+    def _build(self):
+        offset = 0
+        byte_offset = 0
+        current = None  # [name, start, byte_start, start_line]
+
+        for line_number, line in enumerate(self.content.splitlines(keepends=True), 1):
+            line_bytes = len(line.encode('utf-8')) if not line.isascii() else len(line)
+
+            if current is None:
+                match = CREATE_TABLE_LINE_PATTERN.match(line)
+                if match:
+                    current = [match.group(1), offset, byte_offset, line_number]
+
+            # A CREATE TABLE statement ends on the first line that ends with ';'
+            if current is not None and line.rstrip().endswith(';'):
+                name, start, byte_start, start_line = current
+                end = offset + len(line.rstrip('\r\n'))
+                byte_end = byte_offset + len(line.rstrip('\r\n').encode('utf-8'))
+                self._add_block(TableBlock(name, start, end, byte_start, byte_end, start_line, line_number))
+                current = None
+
+            offset += len(line)
+            byte_offset += line_bytes
+
+        if current is not None:
+            # Unterminated statement at end of file
+            name, start, byte_start, start_line = current
+            end = len(self.content.rstrip('\r\n'))
+            byte_end = byte_offset - (len(self.content) - end)
+            self._add_block(TableBlock(name, start, end, byte_start, byte_end, start_line, line_number))
+
+    def _add_block(self, block):
+        # Like MySQL, a later definition of the same table replaces the earlier one
+        self.blocks[block.name] = block
+        self._start_lines.append(block.start_line)
+        self._ordered_blocks.append(block)
+
+    def get(self, table_name):
+        """Return the TableBlock for a table, or None."""
+        return self.blocks.get(table_name)
+
+    def get_definition(self, table_name):
+        """Return the full CREATE TABLE statement for a table, or None."""
+        block = self.blocks.get(table_name)
+        if block is None:
+            return None
+        return self.content[block.start:block.end]
+
+    def table_names(self):
+        """Return table names in file order."""
+        return list(self.blocks)
+
+    def table_at_line(self, line_number):
+        """Return the name of the table whose CREATE TABLE block contains a 1-based line, or None."""
+        index = bisect_right(self._start_lines, line_number) - 1
+        if index >= 0 and line_number <= self._ordered_blocks[index].end_line:
+            return self._ordered_blocks[index].name
+        return None
+
+    def __contains__(self, table_name):
+        return table_name in self.blocks
+
+    def __len__(self):
+        return len(self.blocks)
+
+
+@lru_cache(maxsize=16)
+def get_seed_index(content):
+    """Return the (cached) SeedIndex for a file's content."""
+    return SeedIndex(content)
+
+
+def main():
+    """Print the table index of one or more SQL files."""
+    if len(sys.argv) < 2:
+        print("Usage: python seed_index.py <file.sql> [file.sql ...]")
+        exit(1)
+
+    for file_path in sys.argv[1:]:
+        with open(file_path, encoding='utf-8') as f:
+            index = get_seed_index(f.read())
+
+        print(f"\n📄 {file_path}: {len(index)} tables")
+        print("-" * 70)
+        for table_name in index.table_names():
+            block = index.get(table_name)
+            print(f"  {table_name:<45} lines {block.start_line:>6}-{block.end_line:<6} bytes {block.byte_start}-{block.byte_end}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Seed and Chunk Loader
+Loads seed*.sql dumps and data_dumper.py chunk files (.sql.gz) into a local
+MySQL stand-in much faster than piping them through the mysql client.
+
+- Files are streamed line by line and split into statements with
+  SQLStatementSplitter, never read whole.
+- Schema statements (DROP/CREATE TABLE, the dump's SET header and footer) run
+  first, in file order, on one connection.
+- INSERT data is grouped per table: a pre-pass records the byte ranges of
+  each table's INSERT statements (chunk files are recognised by name and not
+  pre-scanned). Consecutive single-row INSERTs of a table are merged into
+  multi-row statements, and each worker commits every few MB instead of
+  every statement.
+- Worker sessions disable UNIQUE_CHECKS and FOREIGN_KEY_CHECKS the way the
+  dump header does and restore the saved values at the end (--keep-checks
+  leaves them on).
+- Tables are loaded in parallel: a table starts once every table it
+  references has been loaded (fk_graph.py), so the order follows the foreign
+  key graph even with the checks on.
+
+Connection settings come from LOCAL_DB_HOST, LOCAL_DB_USER, LOCAL_DB_PASSWORD
+and LOCAL_DB_PORT (environment or config.env).
+
+Usage: python seed_loader.py <file or dir> [...] [--database NAME] [--workers N] [--keep-checks]
+"""
+
+import os
+import re
+import sys
+import glob
+import gzip
+import json
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from sql_ddl_parser import SQLStatementSplitter
+
+
+DEFAULT_WORKERS = int(os.getenv("SEED_LOAD_WORKERS", "4"))
+
+# Merged INSERT statements stay below max_allowed_packet; workers commit after this much data
+MAX_BATCH_BYTES = 4 * 1024 * 1024
+COMMIT_BYTES = 16 * 1024 * 1024
+
+INSERT_PATTERN = re.compile(r'^(?:INSERT(?:\s+IGNORE)?|REPLACE)\s+INTO\s+`?(\w+)`?(?:\s*\.\s*`?(\w+)`?)?\s*(?:\([^)]*\)\s*)?VALUES\s*', re.IGNORECASE)
+SKIPPED_STATEMENT_PATTERN = re.compile(
+    r'^(?:LOCK\s+TABLES|UNLOCK\s+TABLES|CREATE\s+DATABASE|USE\s|/\*!\d+\s+ALTER\s+TABLE\s+\S+\s+(?:DISABLE|ENABLE)\s+KEYS)',
+    re.IGNORECASE
+)
+CREATE_TABLE_NAME_PATTERN = re.compile(r'^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?', re.IGNORECASE)
+CHUNK_FILE_PATTERN = re.compile(r'^(\w+)\.(\w+)\.(\d+)\.sql(?:\.gz)?$')
+
+SESSION_SETUP = [
+    "SET NAMES utf8mb4",
+    "SET @OLD_SQL_MODE=@@SQL_MODE, SQL_MODE='NO_AUTO_VALUE_ON_ZERO'",
+    "SET @OLD_TIME_ZONE=@@TIME_ZONE, TIME_ZONE='+00:00'",
+    "SET autocommit=0",
+]
+SESSION_RESTORE = [
+    "SET SQL_MODE=@OLD_SQL_MODE",
+    "SET TIME_ZONE=@OLD_TIME_ZONE",
+    "SET autocommit=1",
+]
+CHECKS_SETUP = [
+    "SET @OLD_UNIQUE_CHECKS=@@UNIQUE_CHECKS, UNIQUE_CHECKS=0",
+    "SET @OLD_FOREIGN_KEY_CHECKS=@@FOREIGN_KEY_CHECKS, FOREIGN_KEY_CHECKS=0",
+]
+CHECKS_RESTORE = [
+    "SET FOREIGN_KEY_CHECKS=@OLD_FOREIGN_KEY_CHECKS",
+    "SET UNIQUE_CHECKS=@OLD_UNIQUE_CHECKS",
+]
+
+
+def open_binary(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+class LoadUnit:
+    """INSERT statements of one table: a byte range of a file, or statements kept in memory."""
+
+    __slots__ = ('path', 'table', 'start', 'end', 'statements', 'bytes')
+
+    def __init__(self, path, table, start=None, end=None, statements=None):
+        self.path = path
+        self.table = table
+        self.start = start          # None: the whole file
+        self.end = end
+        self.statements = statements
+        self.bytes = (end - start) if end is not None else (os.path.getsize(path) if statements is None else sum(len(s) for s in statements))
+
+    def iter_statements(self):
+        if self.statements is not None:
+            yield from self.statements
+            return
+
+        with open_binary(self.path) as f:
+            if self.start:
+                f.seek(self.start)
+            splitter = SQLStatementSplitter()
+            offset = self.start or 0
+            for raw in f:
+                yield from splitter.feed(raw.decode('utf-8', 'replace'))
+                offset += len(raw)
+                if self.end is not None and offset >= self.end:
+                    break
+            statement = splitter.finish()
+            if statement:
+                yield statement
+
+
+def scan_file(path):
+    """
+    Split a dump file into schema statements (kept in order) and per-table INSERT units.
+    INSERT runs are recorded as byte ranges between statement boundaries, not kept.
+    """
+    chunk_match = CHUNK_FILE_PATTERN.match(os.path.basename(path))
+    if chunk_match:
+        return [], [LoadUnit(path, chunk_match.group(2))]
+
+    schema_statements = []
+    units = []
+
+    def classify(statements, start, end):
+        matches = [INSERT_PATTERN.match(statement) for statement in statements]
+        tables = {match.group(2) or match.group(1) for match in matches if match}
+        if all(matches) and len(tables) == 1:
+            table_name = tables.pop()
+            last = units[-1] if units else None
+            if last and last.statements is None and last.table == table_name and last.end == start:
+                last.end = end
+                last.bytes = end - last.start
+            else:
+                units.append(LoadUnit(path, table_name, start, end))
+            return
+        for statement, match in zip(statements, matches):
+            if match:
+                units.append(LoadUnit(path, match.group(2) or match.group(1), statements=[statement]))
+            elif not SKIPPED_STATEMENT_PATTERN.match(statement):
+                schema_statements.append(statement)
+
+    with open_binary(path) as f:
+        splitter = SQLStatementSplitter()
+        offset = 0
+        boundary = 0
+        pending = []
+        for raw in f:
+            pending.extend(splitter.feed(raw.decode('utf-8', 'replace')))
+            offset += len(raw)
+            if splitter.is_clean():
+                if pending:
+                    classify(pending, boundary, offset)
+                    pending = []
+                boundary = offset
+        statement = splitter.finish()
+        if statement:
+            pending.append(statement)
+        if pending:
+            classify(pending, boundary, offset)
+
+    return schema_statements, units
+
+
+def batch_inserts(statements, max_bytes=MAX_BATCH_BYTES):
+    """Merge consecutive INSERTs with the same table and column list into multi-row statements."""
+    prefix = None
+    values = []
+    size = 0
+    for statement in statements:
+        match = INSERT_PATTERN.match(statement)
+        if not match or 'ON DUPLICATE KEY' in statement[-500:].upper():
+            if values:
+                yield prefix + ','.join(values)
+                prefix, values, size = None, [], 0
+            yield statement
+            continue
+
+        statement_prefix = statement[:match.end()]
+        statement_values = statement[match.end():]
+        if values and (statement_prefix != prefix or size + len(statement_values) > max_bytes):
+            yield prefix + ','.join(values)
+            values, size = [], 0
+        prefix = statement_prefix
+        values.append(statement_values)
+        size += len(statement_values) + 1
+    if values:
+        yield prefix + ','.join(values)
+
+
+def collect_inputs(paths):
+    """Expand directories into their seed files and chunk files (migrations are skipped)."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path, 'seed*.sql')))
+            files += sorted(
+                file_path for file_path in glob.glob(os.path.join(path, '*.sql*'))
+                if CHUNK_FILE_PATTERN.match(os.path.basename(file_path))
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def guess_database(paths, files):
+    """The database named by a dump's metadata.json, chunk file names, or the MYSQL/<env>/<db> directory."""
+    for path in paths:
+        metadata_path = os.path.join(path, 'metadata.json')
+        if os.path.isdir(path) and os.path.exists(metadata_path):
+            with open(metadata_path) as f:
+                return json.load(f)['database']
+    for file_path in files:
+        chunk_match = CHUNK_FILE_PATTERN.match(os.path.basename(file_path))
+        if chunk_match:
+            return chunk_match.group(1)
+    first = paths[0]
+    return os.path.basename(os.path.abspath(first if os.path.isdir(first) else os.path.dirname(first)))
+
+
+def build_foreign_key_graph(schema_statements, db):
+    """Foreign keys from the dump's CREATE TABLE statements plus those already in the target database."""
+    from fk_graph import ForeignKeyGraph
+
+    operations = []
+    for statement in schema_statements:
+        match = CREATE_TABLE_NAME_PATTERN.match(statement)
+        if match:
+            operations.append({'command': 'CREATE_TABLE', 'table': match.group(1), 'full_statement': statement})
+    graph = ForeignKeyGraph.from_operations(operations)
+
+    db.cursor.execute("""
+        SELECT table_name AS table_name, referenced_table_name AS referenced_table
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE table_schema = %s AND referenced_table_name IS NOT NULL
+    """, (db.database,))
+    for row in db.cursor.fetchall():
+        graph.add_reference(row['table_name'], row['referenced_table'])
+    return graph
+
+
+class TableScheduler:
+    """Releases tables for loading once every table they reference has finished."""
+
+    def __init__(self, units, graph):
+        self.units = {}
+        for unit in units:
+            self.units.setdefault(unit.table, []).append(unit)
+        tables = list(self.units)
+        for table_name in tables:
+            graph.add_table(table_name)
+
+        cycle = graph.find_cycle(tables)
+        if cycle:
+            print(f"ℹ️  Foreign key cycle ({' -> '.join(cycle)}); loading without dependency order")
+        self.waiting_on = {
+            table_name: set() if cycle else {
+                referenced for referenced in graph.references.get(table_name, ()) if referenced in self.units
+            }
+            for table_name in tables
+        }
+        self.dependents = {table_name: [] for table_name in tables}
+        for table_name, referenced_tables in self.waiting_on.items():
+            for referenced in referenced_tables:
+                self.dependents[referenced].append(table_name)
+        self.remaining = {table_name: len(table_units) for table_name, table_units in self.units.items()}
+
+    def ready(self, tables=None):
+        """Units of the given (default: all) tables with nothing left to wait for, biggest table first."""
+        tables = [table_name for table_name in (tables if tables is not None else self.units) if not self.waiting_on[table_name]]
+        tables.sort(key=lambda table_name: sum(unit.bytes for unit in self.units[table_name]), reverse=True)
+        return [unit for table_name in tables for unit in self.units[table_name]]
+
+    def unit_done(self, unit):
+        """Record a finished unit; returns the units released by it."""
+        self.remaining[unit.table] -= 1
+        if self.remaining[unit.table]:
+            return []
+        released = []
+        for dependent in self.dependents[unit.table]:
+            self.waiting_on[dependent].discard(unit.table)
+            if not self.waiting_on[dependent]:
+                released.append(dependent)
+        return self.ready(released)
+
+
+class SeedLoader:
+    """Loads schema statements and INSERT units into one database over a pool of connections."""
+
+    def __init__(self, connection_config, workers=DEFAULT_WORKERS, keep_checks=False):
+        self.connection_config = connection_config
+        self.workers = workers
+        self.keep_checks = keep_checks
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def session_statements(self, restore=False):
+        if restore:
+            return ([] if self.keep_checks else CHECKS_RESTORE) + SESSION_RESTORE
+        return SESSION_SETUP + ([] if self.keep_checks else CHECKS_SETUP)
+
+    def connection(self):
+        """This thread's connection, opened and prepared on first use."""
+        from ddl_validator import DatabaseConnection
+
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = DatabaseConnection(**self.connection_config)
+            if not db.connect():
+                raise ConnectionError(f"Could not connect to {self.connection_config['host']}")
+            for statement in self.session_statements():
+                db.cursor.execute(statement)
+            self.local.db = db
+            with self.lock:
+                self.connections.append(db)
+        return db
+
+    def load_unit(self, unit):
+        """Execute one unit's INSERTs in batches; returns (rows, bytes)."""
+        db = self.connection()
+        rows = 0
+        loaded_bytes = 0
+        uncommitted = 0
+        for statement in batch_inserts(unit.iter_statements()):
+            db.cursor.execute(statement)
+            rows += max(db.cursor.rowcount, 0)
+            loaded_bytes += len(statement)
+            uncommitted += len(statement)
+            if uncommitted >= COMMIT_BYTES:
+                db.connection.commit()
+                uncommitted = 0
+        db.connection.commit()
+        return rows, loaded_bytes
+
+    def load(self, schema_statements, units):
+        """Run the schema statements, then the units in foreign key order; returns {table: rows}."""
+        db = self.connection()
+        for statement in schema_statements:
+            db.cursor.execute(statement)
+        db.connection.commit()
+        if schema_statements:
+            print(f"🏗️  {len(schema_statements)} schema statements executed")
+
+        scheduler = TableScheduler(units, build_foreign_key_graph(schema_statements, db))
+        table_rows = {table_name: 0 for table_name in scheduler.units}
+        totals = {'rows': 0, 'bytes': 0}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = {executor.submit(self.load_unit, unit): unit for unit in scheduler.ready()}
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    unit = running.pop(future)
+                    rows, loaded_bytes = future.result()
+                    table_rows[unit.table] += rows
+                    totals['rows'] += rows
+                    totals['bytes'] += loaded_bytes
+                    released = scheduler.unit_done(unit)
+                    if not scheduler.remaining[unit.table]:
+                        print(f"   ✅ {unit.table}: {table_rows[unit.table]:,} rows")
+                    for released_unit in released:
+                        running[executor.submit(self.load_unit, released_unit)] = released_unit
+
+        elapsed = time.perf_counter() - start
+        print("-" * 70)
+        print(f"✅ {totals['rows']:,} rows into {len(table_rows)} tables in {elapsed:.1f} s "
+              f"({totals['rows'] / elapsed if elapsed else 0:,.0f} rows/s, "
+              f"{totals['bytes'] / 1e6 / elapsed if elapsed else 0:,.1f} MB/s, {self.workers} worker(s))")
+        return table_rows
+
+    def close(self):
+        for db in self.connections:
+            try:
+                for statement in self.session_statements(restore=True):
+                    db.cursor.execute(statement)
+            finally:
+                db.close()
+        self.connections = []
+
+
+def check_dump_row_counts(paths, table_rows):
+    """Compare loaded rows with the row counts in a data_dumper metadata.json."""
+    for path in paths:
+        metadata_path = os.path.join(path, 'metadata.json')
+        if not (os.path.isdir(path) and os.path.exists(metadata_path)):
+            continue
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+        for table_name, table in metadata['tables'].items():
+            expected = sum(chunk['rows'] for chunk in table['chunks'])
+            if table_name in table_rows and table_rows[table_name] != expected:
+                print(f"⚠️  {table_name}: loaded {table_rows[table_name]:,} rows, dump has {expected:,}")
+
+
+def load_files(paths, database_name=None, workers=DEFAULT_WORKERS, keep_checks=False):
+    """Load seed files, chunk files or directories of them into the local database."""
+    from ddl_validator import get_local_config, mysql_connector
+    from mysql_query import MySQLQueryTool
+
+    files = collect_inputs(paths)
+    if not files:
+        print("❌ No seed or chunk files found")
+        exit(1)
+    database_name = database_name or guess_database(paths, files)
+
+    print("📥 Seed Loader")
+    print("=" * 60)
+    start = time.perf_counter()
+    schema_statements = []
+    units = []
+    for file_path in files:
+        file_schema_statements, file_units = scan_file(file_path)
+        schema_statements += file_schema_statements
+        units += file_units
+    print(f"📋 {len(files)} file(s): {len(schema_statements)} schema statements, "
+          f"{len(units)} data range(s) over {len({unit.table for unit in units})} tables "
+          f"(scanned in {time.perf_counter() - start:.1f} s)")
+
+    connection_config = get_local_config(database_name)
+    server = MySQLQueryTool(connection_config['host'], connection_config['user'], connection_config['password'], connection_config['port'])
+    if not server.connect():
+        exit(1)
+    try:
+        server.cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database_name}`")
+    finally:
+        server.close()
+
+    loader = SeedLoader(connection_config, workers, keep_checks)
+    try:
+        table_rows = loader.load(schema_statements, units)
+    except ConnectionError as e:
+        print(f"❌ {e}")
+        exit(1)
+    except mysql_connector.Error as e:
+        print(f"❌ Load stopped: {e} (rows committed before the error are kept)")
+        exit(1)
+    finally:
+        loader.close()
+    check_dump_row_counts(paths, table_rows)
+    return table_rows
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for option in ('--database', '--workers'):
+        if option in args:
+            position = args.index(option)
+            options[option] = args[position + 1]
+            del args[position:position + 2]
+    keep_checks = '--keep-checks' in args
+    args = [arg for arg in args if not arg.startswith('--')]
+
+    if not args:
+        print("Usage: python seed_loader.py <file or dir> [...] [--database NAME] [--workers N] [--keep-checks]")
+        exit(1)
+
+    load_files(args, options.get('--database'), int(options.get('--workers', DEFAULT_WORKERS)), keep_checks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""
+Slow Query Log Index Advisor
+Streams MySQL slow-query or general query logs and suggests the indexes the
+logged queries are missing, checked against the schema parsed from a
+directory's seed*.sql files.
+
+Logs are read line by line through generators (gzip too), and only one
+aggregate per distinct query digest is kept, so memory stays flat however
+large the log is. Each query is fingerprinted (literals replaced with ?,
+IN lists and multi-row VALUES collapsed) into a digest. For the sample
+query of every digest, the WHERE equality columns, then one range column
+or the ORDER BY columns, are proposed as a composite index. The selected
+columns are appended when that makes the index covering. Proposals an
+existing index already serves are dropped, and proposals that are a prefix
+of another proposal are folded into it. Ranking is by the total query time
+the digests spent.
+
+With --emit the proposals are written as a V{n}/U{n} migration pair, which
+is replayed against the simulated schema before it is written.
+
+Usage: python slow_log_advisor.py <slow.log|general.log[.gz]> MYSQL/<env>/<db> [--top N] [--emit]
+"""
+
+import os
+import re
+import sys
+import glob
+import gzip
+import hashlib
+from schema_model import SchemaModel
+from sql_ddl_parser import SQLDDLParser
+
+
+# Composite indexes wider than this cost more to maintain than they usually save
+MAX_INDEX_COLUMNS = int(os.getenv("ADVISOR_MAX_INDEX_COLUMNS", "5"))
+
+SLOW_LOG_HEADER_PATTERN = re.compile(r'^# (?:Time|User@Host):')
+SLOW_LOG_METRICS_PATTERN = re.compile(r'(\w+):\s+([\d.]+)')
+GENERAL_LOG_LINE_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2}T\S+|\d{6}\s+[\d:]+)?\s+(\d+)\s+(Query|Execute|Init DB|Connect|Quit|Prepare|Close stmt)\t?(.*)$')
+USE_PATTERN = re.compile(r'^use\s+`?(\w+)`?;\s*$', re.IGNORECASE)
+SET_TIMESTAMP_PATTERN = re.compile(r'^SET\s+timestamp\s*=\s*\d+;\s*$', re.IGNORECASE)
+
+ANALYZABLE_PATTERN = re.compile(r'^\s*(SELECT|UPDATE|DELETE)\b', re.IGNORECASE)
+IDENTIFIER = r'`?(\w+)`?(?:\s*\.\s*`?(\w+)`?)?'
+TABLE_REFERENCE_PATTERN = re.compile(
+    rf'\b(?:FROM|JOIN|UPDATE)\s+{IDENTIFIER}(?:\s+(?:AS\s+)?`?(?!(?:WHERE|SET|JOIN|INNER|LEFT|RIGHT|CROSS|STRAIGHT_JOIN|ON|USING|ORDER|GROUP|LIMIT|HAVING|FORCE|USE|IGNORE|FOR|UNION|LOCK)\b)(\w+)`?)?',
+    re.IGNORECASE
+)
+CLAUSE_END_PATTERN = r'(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bHAVING\b|\bFOR\s+UPDATE\b|\bUNION\b|$)'
+WHERE_PATTERN = re.compile(rf'\bWHERE\b(.*?){CLAUSE_END_PATTERN}', re.IGNORECASE | re.DOTALL)
+ORDER_BY_PATTERN = re.compile(r'\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|\bFOR\s+UPDATE\b|$)', re.IGNORECASE | re.DOTALL)
+GROUP_BY_PATTERN = re.compile(r'\bGROUP\s+BY\b(.*?)(?=\bHAVING\b|\bORDER\s+BY\b|\bLIMIT\b|$)', re.IGNORECASE | re.DOTALL)
+SELECT_LIST_PATTERN = re.compile(r'^\s*SELECT\s+(?:DISTINCT\s+|SQL_\w+\s+)*(.*?)\s+FROM\b', re.IGNORECASE | re.DOTALL)
+COLUMN_REFERENCE = r'(?:`?(\w+)`?\s*\.\s*)?`?(\w+)`?'
+EQUALITY_PREDICATE_PATTERN = re.compile(rf'^{COLUMN_REFERENCE}\s*(?:=|<=>|\bIN\s*\(|\bIS\s+NULL\b)', re.IGNORECASE)
+RANGE_PREDICATE_PATTERN = re.compile(rf"^{COLUMN_REFERENCE}\s*(?:[<>]=?|\bBETWEEN\b|\bLIKE\s+'[^%_])", re.IGNORECASE)
+JOIN_PREDICATE_PATTERN = re.compile(rf'^{COLUMN_REFERENCE}\s*=\s*{COLUMN_REFERENCE}\s*$')
+INDEXABLE_TYPE_EXCLUDE = ('text', 'blob', 'json', 'geometry')
+
+# Fingerprinting runs once per logged statement; keep the patterns compiled
+COMMENT_PATTERN = re.compile(r'/\*.*?\*/|--[^\n]*', re.DOTALL)
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+NUMBER_LITERAL_PATTERN = re.compile(r'\b-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b|\b0x[0-9a-f]+\b', re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+IN_LIST_PATTERN = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)')
+VALUES_LIST_PATTERN = re.compile(r'\bvalues\s*\(.*\)(?:\s*,\s*\(.*\))*')
+
+
+def open_log(path):
+    """Open a log for line-by-line reading; .gz files are decompressed on the fly."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, encoding='utf-8', errors='replace')
+
+
+def iter_slow_log(lines):
+    """Yield one entry per statement of a slow query log."""
+    metrics = {}
+    database = None
+    statement = []
+
+    def entry():
+        query = ' '.join(statement).strip()
+        return {
+            'query': query, 'database': database,
+            'query_time': float(metrics.get('Query_time', 0)), 'lock_time': float(metrics.get('Lock_time', 0)),
+            'rows_sent': int(float(metrics.get('Rows_sent', 0))), 'rows_examined': int(float(metrics.get('Rows_examined', 0)))
+        }
+
+    for line in lines:
+        line = line.rstrip('\n')
+        if line.startswith('#'):
+            if statement and (SLOW_LOG_HEADER_PATTERN.match(line) or line.startswith('# Query_time:')):
+                yield entry()
+                statement = []
+                metrics = {}
+            if line.startswith('# Query_time:'):
+                metrics = dict(SLOW_LOG_METRICS_PATTERN.findall(line))
+            continue
+
+        use_match = USE_PATTERN.match(line)
+        if use_match and not statement:
+            database = use_match.group(1)
+        elif SET_TIMESTAMP_PATTERN.match(line) and not statement:
+            continue
+        elif line.strip() and metrics:
+            statement.append(line.strip())
+
+    if statement:
+        yield entry()
+
+
+def iter_general_log(lines):
+    """Yield one entry per Query/Execute line of a general query log (statements may span lines)."""
+    databases = {}    # connection id -> current database
+    current = None
+
+    for line in lines:
+        line = line.rstrip('\n')
+        match = GENERAL_LOG_LINE_PATTERN.match(line)
+        if not match:
+            # Continuation of a multi-line statement (header lines of the file never follow a Query)
+            if current is not None:
+                current['query'] += ' ' + line.strip()
+            continue
+
+        if current is not None:
+            yield current
+            current = None
+
+        connection_id, command, argument = match.group(2), match.group(3), match.group(4).strip()
+        if command == 'Init DB':
+            databases[connection_id] = argument.strip('`')
+        elif command == 'Connect':
+            connect_match = re.search(r'\bon\s+(\w+)', argument)
+            if connect_match:
+                databases[connection_id] = connect_match.group(1)
+        elif command in ('Query', 'Execute'):
+            use_match = USE_PATTERN.match(argument if argument.endswith(';') else argument + ';')
+            if use_match:
+                databases[connection_id] = use_match.group(1)
+            else:
+                current = {'query': argument, 'database': databases.get(connection_id), 'query_time': None,
+                           'lock_time': None, 'rows_sent': None, 'rows_examined': None}
+
+    if current is not None:
+        yield current
+
+
+def iter_log(path):
+    """Yield the statements of a slow or general query log, detecting the format from its first lines."""
+    with open_log(path) as f:
+        head = [line for _, line in zip(range(20), f)]
+    is_slow_log = any(line.startswith('# Query_time:') or line.startswith('# User@Host:') for line in head)
+
+    with open_log(path) as f:
+        yield from (iter_slow_log(f) if is_slow_log else iter_general_log(f))
+
+
+def fingerprint(query):
+    """Normalize a statement so queries differing only in literals share one digest."""
+    query = COMMENT_PATTERN.sub(' ', query)
+    query = STRING_LITERAL_PATTERN.sub('?', query)
+    query = NUMBER_LITERAL_PATTERN.sub('?', query)
+    query = WHITESPACE_PATTERN.sub(' ', query).strip().rstrip(';').strip().lower()
+    query = IN_LIST_PATTERN.sub('in (?+)', query)
+    return VALUES_LIST_PATTERN.sub('values (?+)', query)
+
+
+class DigestStats:
+    """Aggregated statistics of one query digest."""
+
+    __slots__ = ('digest', 'fingerprint', 'database', 'count', 'total_time', 'max_time', 'rows_examined', 'sample', 'sample_time')
+
+    def __init__(self, digest, fingerprint_text, database):
+        self.digest = digest
+        self.fingerprint = fingerprint_text
+        self.database = database
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows_examined = 0
+        self.sample = None
+        self.sample_time = -1.0
+
+    def add(self, entry):
+        query_time = entry['query_time'] or 0.0
+        self.count += 1
+        self.total_time += query_time
+        self.max_time = max(self.max_time, query_time)
+        self.rows_examined += entry['rows_examined'] or 0
+        # Keep the slowest instance as the sample; its literals are the ones that hurt
+        if query_time > self.sample_time:
+            self.sample = entry['query']
+            self.sample_time = query_time
+
+
+def aggregate_digests(entries, database=None):
+    """Group log entries by digest; entries of other databases are skipped when database is given."""
+    digests = {}
+    for entry in entries:
+        if database and entry['database'] and entry['database'] != database:
+            continue
+        if not ANALYZABLE_PATTERN.match(entry['query']):
+            continue
+        fingerprint_text = fingerprint(entry['query'])
+        digest = hashlib.md5(fingerprint_text.encode('utf-8')).hexdigest()[:16]
+        stats = digests.get(digest)
+        if stats is None:
+            stats = digests[digest] = DigestStats(digest, fingerprint_text, entry['database'])
+        stats.add(entry)
+    return digests
+
+
+def split_top_level(text, separator_pattern):
+    """Split text on a separator regex, ignoring separators inside parentheses or quotes."""
+    parts = []
+    depth = 0
+    quote_char = None
+    escaped = False
+    start = 0
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if escaped:
+            escaped = False
+        elif quote_char:
+            if char == '\\' and quote_char != '`':
+                escaped = True
+            elif char == quote_char:
+                quote_char = None
+        elif char in ("'", '"', '`'):
+            quote_char = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0:
+            match = separator_pattern.match(text, i)
+            # Keyword separators (AND, OR) must start a word
+            if match and (i == 0 or not match.group(0)[0].isalnum() or not (text[i - 1].isalnum() or text[i - 1] == '_')):
+                parts.append(text[start:i])
+                start = i = match.end()
+                continue
+        i += 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+AND_PATTERN = re.compile(r'AND\b', re.IGNORECASE)
+OR_PATTERN = re.compile(r'OR\b', re.IGNORECASE)
+COMMA_PATTERN = re.compile(r',')
+
+
+class QueryShape:
+    """Per-table equality, range, ordering and selected columns of one statement."""
+
+    def __init__(self, query, schema):
+        self.schema = schema
+        self.aliases = {}   # alias or table name -> table name
+        self.equality = {}  # table -> [columns]
+        self.range = {}     # table -> [columns]
+        self.order = {}     # table -> [columns]
+        self.selected = {}  # table -> [columns], or None for SELECT *
+        self.parse(query)
+
+    def resolve(self, qualifier, column):
+        """Map a (possibly qualified) column reference to its table, or None."""
+        if qualifier:
+            table_name = self.aliases.get(qualifier.lower())
+            table = self.schema.tables.get(table_name) if table_name else None
+            return table_name if table and table.has_column(column) else None
+        owners = {table_name for table_name in self.aliases.values() if table_name in self.schema.tables and self.schema.tables[table_name].has_column(column)}
+        return owners.pop() if len(owners) == 1 else None
+
+    def add(self, columns_by_table, table_name, column):
+        columns = columns_by_table.setdefault(table_name, [])
+        column = self.schema.tables[table_name].columns[column.lower()]['COLUMN_NAME']
+        if column not in columns:
+            columns.append(column)
+
+    def parse(self, query):
+        query = re.sub(r'\s+', ' ', query).strip().rstrip(';')
+        for match in TABLE_REFERENCE_PATTERN.finditer(query):
+            # schema.table references put the table name in the second group
+            table_name = match.group(2) or match.group(1)
+            if table_name in self.schema.tables:
+                self.aliases[table_name.lower()] = table_name
+                if match.group(3):
+                    self.aliases[match.group(3).lower()] = table_name
+
+        where_match = WHERE_PATTERN.search(query)
+        predicates = split_top_level(where_match.group(1), AND_PATTERN) if where_match else []
+        # ON conditions of joins are predicates too
+        for on_match in re.finditer(r'\bON\b(.*?)(?=\b(?:INNER|LEFT|RIGHT|CROSS|JOIN|WHERE|GROUP|ORDER|LIMIT)\b|$)', query, re.IGNORECASE):
+            predicates.extend(split_top_level(on_match.group(1), AND_PATTERN))
+
+        for predicate in predicates:
+            predicate = predicate.strip('() ') if predicate.startswith('(') and predicate.endswith(')') and predicate.count('(') == 1 else predicate
+            # A top-level OR cannot use one composite index
+            if len(split_top_level(predicate, OR_PATTERN)) > 1:
+                continue
+            join_match = JOIN_PREDICATE_PATTERN.match(predicate)
+            if join_match:
+                # Join columns are equality lookups on whichever side is read second; index both
+                for qualifier, column in (join_match.group(1, 2), join_match.group(3, 4)):
+                    table_name = self.resolve(qualifier, column)
+                    if table_name:
+                        self.add(self.equality, table_name, column)
+                continue
+            for pattern, target in ((EQUALITY_PREDICATE_PATTERN, self.equality), (RANGE_PREDICATE_PATTERN, self.range)):
+                match = pattern.match(predicate)
+                if match:
+                    table_name = self.resolve(match.group(1), match.group(2))
+                    if table_name:
+                        self.add(target, table_name, match.group(2))
+                    break
+
+        for pattern in (GROUP_BY_PATTERN, ORDER_BY_PATTERN):
+            match = pattern.search(query)
+            if not match:
+                continue
+            items = split_top_level(match.group(1), COMMA_PATTERN)
+            descending = sum(1 for item in items if item.split()[-1].upper() == 'DESC')
+            # Mixed ASC/DESC only avoids the sort with a matching descending index; skip it
+            if 0 < descending < len(items):
+                continue
+            for item in items:
+                item_match = re.match(rf'^{COLUMN_REFERENCE}(?:\s+(?:ASC|DESC))?$', item, re.IGNORECASE)
+                table_name = self.resolve(item_match.group(1), item_match.group(2)) if item_match else None
+                if table_name:
+                    self.add(self.order, table_name, item_match.group(2))
+            # GROUP BY decides the order rows are read in; a different ORDER BY sorts afterwards anyway
+            break
+
+        select_match = SELECT_LIST_PATTERN.match(query)
+        if select_match:
+            for item in split_top_level(select_match.group(1), COMMA_PATTERN):
+                if item == '*' or item.endswith('.*'):
+                    for table_name in (set(self.aliases.values()) if item == '*' else {self.aliases.get(item[:-2].strip('`').lower())}):
+                        self.selected[table_name] = None
+                    continue
+                item_match = re.match(rf'^{COLUMN_REFERENCE}(?:\s+(?:AS\s+)?`?\w+`?)?$', item, re.IGNORECASE)
+                table_name = self.resolve(item_match.group(1), item_match.group(2)) if item_match else None
+                if table_name and self.selected.get(table_name, []) is not None:
+                    self.add(self.selected, table_name, item_match.group(2))
+                elif not item_match and not re.match(r'^COUNT\(\s*(?:\*|\d)\s*\)', item, re.IGNORECASE):
+                    # Expressions over columns we cannot attribute: no covering index
+                    for table_name in set(self.aliases.values()):
+                        self.selected[table_name] = None
+
+    def tables(self):
+        return sorted(set(self.equality) | set(self.range) | set(self.order))
+
+
+def propose_index(shape, table):
+    """
+    Return (key columns, covering columns) for one table of a query shape, or None.
+    Key columns: equality columns, then one range column or the ORDER BY/GROUP BY columns.
+    """
+    equality = shape.equality.get(table.name, [])
+    range_columns = [column for column in shape.range.get(table.name, []) if column not in equality]
+    order = [column for column in shape.order.get(table.name, []) if column not in equality]
+
+    key = list(equality)
+    if order and (not range_columns or order[0] == range_columns[0]):
+        key += order
+    elif range_columns:
+        key.append(range_columns[0])
+
+    key = [column for column in key if not column_type_excluded(table, column)]
+    # Secondary indexes end with the primary key already: (country, id) is (country)
+    primary_key = [column.lower() for column in table.primary_key]
+    for length in range(min(len(primary_key), len(key) - 1), 0, -1):
+        if [column.lower() for column in key[-length:]] == primary_key[:length]:
+            key = key[:-length]
+            break
+    key = key[:MAX_INDEX_COLUMNS]
+    if not key:
+        return None
+
+    covering = []
+    selected = shape.selected.get(table.name, [])
+    if selected is not None:
+        # Secondary indexes carry the primary key already
+        extra = [column for column in selected + range_columns if column not in key and column not in table.primary_key]
+        extra = list(dict.fromkeys(extra))
+        if len(key) + len(extra) <= MAX_INDEX_COLUMNS and not any(column_type_excluded(table, column) for column in extra):
+            covering = extra
+    return key, covering
+
+
+def column_type_excluded(table, column):
+    column_type = (table.columns.get(column.lower(), {}).get('COLUMN_TYPE') or '').lower()
+    return any(excluded in column_type for excluded in INDEXABLE_TYPE_EXCLUDE)
+
+
+def index_name_for(columns):
+    name = 'idx_' + '_'.join(column.lower() for column in columns)
+    return name if len(name) <= 64 else name[:55] + '_' + hashlib.md5(name.encode()).hexdigest()[:8]
+
+
+class IndexAdvisor:
+    """Turns digest statistics into ranked index proposals for one schema."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.proposals = {}   # (table, columns) -> {'table', 'key', 'covering', 'digests', 'total_time', 'count'}
+        self.served = []      # (digest, table, existing index)
+
+    def existing_index(self, table, columns):
+        """Name of the primary key or index that already starts with these columns, or None."""
+        wanted = [column.lower() for column in columns]
+        if [column.lower() for column in table.primary_key[:len(wanted)]] == wanted:
+            return 'PRIMARY'
+        for index in table.indexes.values():
+            if [column.lower() for column in index['columns'][:len(wanted)]] == wanted:
+                return index['name']
+        return None
+
+    def add_digest(self, stats):
+        shape = QueryShape(stats.sample, self.schema)
+        for table_name in shape.tables():
+            table = self.schema.tables[table_name]
+            proposal = propose_index(shape, table)
+            if not proposal:
+                continue
+            key, covering = proposal
+            existing = self.existing_index(table, key + covering) or self.existing_index(table, key)
+            if existing:
+                self.served.append((stats, table_name, existing))
+                continue
+            columns = tuple(key + covering)
+            entry = self.proposals.setdefault((table_name, columns), {
+                'table': table_name, 'key': key, 'covering': covering, 'digests': [], 'total_time': 0.0, 'count': 0
+            })
+            entry['digests'].append(stats)
+            entry['total_time'] += stats.total_time
+            entry['count'] += stats.count
+
+    def ranked(self):
+        """Proposals with prefixes folded into longer proposals of the same table, slowest first."""
+        proposals = sorted(self.proposals.values(), key=lambda entry: len(entry['key']) + len(entry['covering']), reverse=True)
+        kept = []
+        for proposal in proposals:
+            columns = [column.lower() for column in proposal['key'] + proposal['covering']]
+            target = next((
+                other for other in kept
+                if other['table'] == proposal['table']
+                and [column.lower() for column in (other['key'] + other['covering'])[:len(columns)]] == columns
+            ), None)
+            if target:
+                target['digests'].extend(proposal['digests'])
+                target['total_time'] += proposal['total_time']
+                target['count'] += proposal['count']
+            else:
+                kept.append(proposal)
+        return sorted(kept, key=lambda entry: (entry['total_time'], entry['count']), reverse=True)
+
+
+def render_migration_pair(proposals):
+    """Return (migration statements, rollback statements) adding and dropping the proposed indexes."""
+    by_table = {}
+    for proposal in proposals:
+        by_table.setdefault(proposal['table'], []).append(proposal)
+
+    migration = []
+    rollback = []
+    for table_name, table_proposals in by_table.items():
+        adds = []
+        drops = []
+        for proposal in table_proposals:
+            columns = proposal['key'] + proposal['covering']
+            name = index_name_for(columns)
+            adds.append(f"ADD INDEX `{name}` ({', '.join(f'`{column}`' for column in columns)})")
+            drops.append(f"DROP INDEX `{name}`")
+        migration.append(f"ALTER TABLE `{table_name}`\n  " + ",\n  ".join(adds) + ";")
+        rollback.append(f"ALTER TABLE `{table_name}`\n  " + ",\n  ".join(drops) + ";")
+    return migration, rollback
+
+
+def check_migration_applies(schema, migration_statements, rollback_statements, database):
+    """Replay the generated pair on a copy of the schema; returns the problems found."""
+    simulated = schema.copy()
+    problems = []
+    for statements in (migration_statements, rollback_statements):
+        parser = SQLDDLParser()
+        parser.parse_sql_file("\n\n".join(statements), f"{database}/generated.sql")
+        for operation in parser.get_operations():
+            problems.extend(simulated.apply_operation(operation))
+    return problems
+
+
+def print_advice(digests, advisor, proposals, top):
+    total_time = sum(stats.total_time for stats in digests.values())
+    print(f"{sum(stats.count for stats in digests.values()):,} statements, {len(digests):,} digests, {total_time:,.1f} s total")
+    if digests and not total_time:
+        print("ℹ️  No query times in this log (general log); ranking by statement count")
+
+    print("\n📋 Slowest digests:" if total_time else "\n📋 Most frequent digests:")
+    for stats in sorted(digests.values(), key=lambda stats: (stats.total_time, stats.count), reverse=True)[:top]:
+        print(f"   {stats.count:>8,} x  {stats.total_time:>10,.2f} s  (max {stats.max_time:.2f} s)  {stats.digest}")
+        print(f"      {stats.fingerprint[:120]}")
+
+    if advisor.served:
+        print("\n✅ Already served by an existing index:")
+        for stats, table_name, index_name in advisor.served[:top]:
+            print(f"   {stats.digest} -> {table_name}.{index_name}")
+
+    print("\n💡 Proposed indexes:")
+    if not proposals:
+        print("   None")
+    for proposal in proposals[:top]:
+        covering = f" + covering ({', '.join(proposal['covering'])})" if proposal['covering'] else ""
+        print(f"   {proposal['table']} ({', '.join(proposal['key'])}){covering}")
+        print(f"      {len(proposal['digests'])} digest(s), {proposal['count']:,} statements, {proposal['total_time']:,.2f} s")
+
+
+def advise(log_path, directory, top=10, emit=False):
+    """
+    Stream a query log and print index proposals for the database directory.
+
+    Returns:
+        list: the ranked proposals
+    """
+    directory = os.path.abspath(directory)
+    database_name = os.path.basename(directory)
+    schema = SchemaModel.from_files(sorted(glob.glob(os.path.join(directory, 'seed*.sql'))), database_name)
+
+    print("🐢 Slow Query Index Advisor")
+    print("=" * 60)
+    print(f"Schema: {database_name} ({len(schema.tables)} tables from seed files)")
+
+    digests = aggregate_digests(iter_log(log_path), database_name)
+    advisor = IndexAdvisor(schema)
+    for stats in digests.values():
+        advisor.add_digest(stats)
+    proposals = advisor.ranked()
+    print_advice(digests, advisor, proposals, top)
+
+    if emit and proposals:
+        from index_report import write_migration_pair
+
+        migration, rollback = render_migration_pair(proposals[:top])
+        problems = check_migration_applies(schema, migration, rollback, database_name)
+        if problems:
+            print("\n❌ Generated migration does not apply to the seed schema:")
+            for problem in problems:
+                print(f"   - {problem}")
+            exit(1)
+        migration_path, rollback_path = write_migration_pair(directory, 'add_advised_indexes', migration, rollback)
+        print(f"\n📝 Wrote {os.path.basename(migration_path)} and {os.path.basename(rollback_path)}")
+
+    return proposals
+
+
+def main():
+    args = sys.argv[1:]
+    top = 10
+    if '--top' in args:
+        position = args.index('--top')
+        top = int(args[position + 1])
+        del args[position:position + 2]
+    emit = '--emit' in args
+    args = [arg for arg in args if not arg.startswith('--')]
+
+    if len(args) != 2:
+        print("Usage: python slow_log_advisor.py <slow.log|general.log[.gz]> MYSQL/<env>/<db> [--top N] [--emit]")
+        exit(1)
+
+    advise(args[0], args[1], top, emit)
+
+
+if __name__ == "__main__":
+    main()
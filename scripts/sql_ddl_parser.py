@@ -5,12 +5,17 @@ Fetches newly added files from GitHub PR and parses SQL DDL commands
 to extract CREATE/ALTER operations with detailed analysis.
 """
 
-import requests
 import os
-import json
-from dotenv import load_dotenv
 import re
 import base64
+from ddl_operations import Statement, CreateTable, DropTable, CreateIndex, make_alter_operation
+from change_source import GitHubChangeSource
+
+# Parenthesised key part list; allows one nested level for prefix lengths: (`a`(10), `b`)
+KEY_PARTS = r'\(((?:[^()]|\([^()]*\))+)\)'
+# [CONSTRAINT [name]] FOREIGN KEY [index_name] (columns) REFERENCES [db.]table (columns)
+FOREIGN_KEY_CLAUSE = (r'(?:CONSTRAINT(?:\s+[`"]?(\w+)[`"]?)?\s+)?FOREIGN\s+KEY\s*(?:[`"]?(\w+)[`"]?\s*)?\(([^)]+)\)\s*'
+                      r'REFERENCES\s+(?:[`"]?\w+[`"]?\s*\.\s*)?[`"]?(\w+)[`"]?\s*\(([^)]+)\)')
 
 
 def fetch_github_files_data():
@@ -20,60 +25,13 @@ def fetch_github_files_data():
     Returns:
         dict: Files data from GitHub API
     """
-    # Check environment and load appropriate configuration
-    github_actions = os.getenv("GITHUB_ACTIONS")
+    from dotenv import load_dotenv
     
-    if github_actions == "true":
-        print("🔄 Running in GitHub Actions environment")
-        
-        # GitHub Actions environment
-        event_path = os.getenv("GITHUB_EVENT_PATH")
-        if not event_path or not os.path.exists(event_path):
-            print("❌ GITHUB_EVENT_PATH not found!")
-            raise ValueError("GITHUB_EVENT_PATH not found!")
-        
-        with open(event_path) as f:
-            event = json.load(f)
-            pr_number = os.getenv("GITHUB_PR")
-    else:
-        print("🔄 Running in local environment")
-        print("🔐 Using config.env for database credentials")
-        
+    if os.getenv("GITHUB_ACTIONS") != "true":
         # Load from config.env file for local development
         load_dotenv('config.env')
-        
-        # Local environment
-        pr_number = os.getenv("GITHUB_PR_NUMBER")
-        if not pr_number:
-            print("❌ GITHUB_PR_NUMBER not found in config.env!")
-            raise ValueError("GITHUB_PR_NUMBER not found in config.env!")
-    
-    repo_full = os.getenv("GITHUB_REPOSITORY")
-    token = os.getenv("GITHUB_TOKEN")
-    
-    if not repo_full or not token:
-        print("❌ Missing GitHub configuration:")
-        if not repo_full:
-            print("  - GITHUB_REPOSITORY")
-        if not token:
-            print("  - GITHUB_TOKEN")
-        raise ValueError("Missing GitHub configuration")
-    
-    # Fetch and parse migration files
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "Authorization": f"token {token}"
-    }
     
-    files_url = f"https://api.github.com/repos/{repo_full}/pulls/{pr_number}/files"
-    files_response = requests.get(files_url, headers=headers)
-    
-    if files_response.status_code != 200:
-        print(f"❌ Error fetching PR files: {files_response.status_code}")
-        raise ConnectionError(f"Error fetching PR files: {files_response.status_code}")
-    
-    files_data = files_response.json()
-    return files_data
+    return GitHubChangeSource.from_environment().get_files_data()
 
 class MigrationFileValidator:
     """Validates migration and rollback file pairs from GitHub PR."""
@@ -230,6 +188,167 @@ def extract_file_content_from_patch(patch):
     return '\n'.join(content_lines)
 
 
+SPLITTER_SPECIAL_PATTERN = re.compile(r"['\"`;#/-]")
+SPLITTER_QUOTE_PATTERNS = {"'": re.compile(r"['\\]"), '"': re.compile(r'["\\]'), '`': re.compile(r'`')}
+
+
+class SQLStatementSplitter:
+    """
+    Incremental form of split_sql_statements for streaming large dump files:
+    feed() takes the content piece by piece (whole lines, so that two-character
+    tokens such as -- and doubled quotes are never cut) and yields each statement
+    as soon as its semicolon is read.
+    """
+
+    def __init__(self):
+        self.current = []
+        self.quote = None            # open quote character
+        self.quote_closing = False   # quote char was the last character of the previous piece
+        self.escape_pending = False  # backslash was the last character of the previous piece
+        self.comment = None          # 'line', 'block' or 'versioned' when a comment spans pieces
+
+    def is_clean(self):
+        """True between statements: nothing but whitespace is pending."""
+        return self.quote is None and self.comment in (None, 'line') and not any(piece.strip() for piece in self.current)
+
+    def feed(self, text):
+        i = 0
+        length = len(text)
+        append = self.current.append
+
+        while i < length:
+            if self.quote_closing:
+                self.quote_closing = False
+                if text[i] == self.quote:
+                    # Doubled quote is an escaped quote
+                    append(text[i])
+                    i += 1
+                else:
+                    self.quote = None
+                continue
+
+            if self.escape_pending:
+                self.escape_pending = False
+                append(text[i])
+                i += 1
+                continue
+
+            if self.quote:
+                match = SPLITTER_QUOTE_PATTERNS[self.quote].search(text, i)
+                if not match:
+                    append(text[i:])
+                    break
+                end = match.start()
+                if text[end] == '\\':
+                    if end + 1 < length:
+                        append(text[i:end + 2])
+                        i = end + 2
+                    else:
+                        append(text[i:])
+                        self.escape_pending = True
+                        i = length
+                    continue
+                append(text[i:end + 1])
+                i = end + 1
+                if i == length:
+                    self.quote_closing = True
+                elif text[i] == self.quote:
+                    append(text[i])
+                    i += 1
+                else:
+                    self.quote = None
+                continue
+
+            if self.comment == 'line':
+                end = text.find('\n', i)
+                if end == -1:
+                    break
+                self.comment = None
+                i = end
+                continue
+
+            if self.comment:
+                end = text.find('*/', i)
+                stop = length if end == -1 else end + 2
+                if self.comment == 'versioned':
+                    append(text[i:stop])
+                if end != -1:
+                    self.comment = None
+                i = stop
+                continue
+
+            match = SPLITTER_SPECIAL_PATTERN.search(text, i)
+            if not match:
+                append(text[i:])
+                break
+            position = match.start()
+            char = text[position]
+            if position > i:
+                append(text[i:position])
+
+            if char in ("'", '"', '`'):
+                # Quoted strings and identifiers
+                append(char)
+                self.quote = char
+                i = position + 1
+            elif char == '#' or (char == '-' and text.startswith('--', position)
+                                 and (position + 2 >= length or text[position + 2] in ' \t\r\n')):
+                # Line comments; the newline itself is kept
+                self.comment = 'line'
+                i = position
+            elif char == '/' and text.startswith('/*', position):
+                # Block comments (versioned ones are part of the statement)
+                self.comment = 'versioned' if text.startswith('/*!', position) else 'block'
+                i = position
+                end = text.find('*/', position + 2)
+                stop = length if end == -1 else end + 2
+                if self.comment == 'versioned':
+                    append(text[position:stop])
+                if end != -1:
+                    self.comment = None
+                i = stop
+            elif char == ';':
+                statement = ''.join(self.current).strip()
+                if statement:
+                    yield statement
+                self.current = []
+                append = self.current.append
+                i = position + 1
+            else:
+                append(char)
+                i = position + 1
+
+    def finish(self):
+        """Return the final statement if the content did not end with a semicolon."""
+        statement = ''.join(self.current).strip()
+        self.current = []
+        return statement or None
+
+
+def iter_sql_statements(lines):
+    """Yield the statements of an iterable of lines (e.g. an open file) one at a time."""
+    splitter = SQLStatementSplitter()
+    for line in lines:
+        yield from splitter.feed(line)
+    statement = splitter.finish()
+    if statement:
+        yield statement
+
+
+def split_sql_statements(sql_content):
+    """
+    Split SQL content into individual statements.
+
+    Semicolons inside quotes, backticks and comments are ignored. Plain comments
+    are dropped, while MySQL versioned comments (/*!40101 ... */) are kept since
+    the server executes them.
+
+    Returns:
+        list: Statement strings without the trailing semicolon
+    """
+    return list(iter_sql_statements([sql_content]))
+
+
 class SQLDDLParser:
     def __init__(self):
         self.ddl_operations = []
@@ -252,14 +371,8 @@ class SQLDDLParser:
             # Try to extract the table name using regex
             table_name_match = re.search(r'CREATE\s+TABLE\s+[`"]?(\w+)[`"]?', full_statement, re.IGNORECASE)
             table_name = table_name_match.group(1) if table_name_match else "unknown_table"
-            operation = {
-                'type': 'CREATE',
-                'command': 'CREATE_TABLE',
-                'database': database_name,
-                'table': table_name,
-                'full_statement': full_statement.strip().replace(';', '')
-            }
-            self.ddl_operations.append(operation)
+            statement = Statement(full_statement.strip().replace(';', ''), match.start())
+            self.ddl_operations.append(CreateTable(database_name, table_name, statement))
     
     
     def parse_alter_table(self, sql_content, database_name):
@@ -276,19 +389,10 @@ class SQLDDLParser:
             # Parse the specific ALTER operation
             alter_operations = self.parse_alter_operations(alter_clause)
             
+            # All clauses share the one statement object
+            statement = Statement(match.group(0).strip(), match.start())
             for alter_op in alter_operations:
-                operation = {
-                    'type': 'ALTER',
-                    'command': 'ALTER_TABLE',
-                    'database': database_name,
-                    'table': table_name,
-                    'operation': alter_op['operation'],
-                    'target': alter_op['target'],
-                    'target_type': alter_op['target_type'],
-                    'details': alter_op['details'],
-                    'full_statement': match.group(0).strip()
-                }
-                
+                operation = make_alter_operation(database_name, table_name, statement, alter_op)
                 self.ddl_operations.append(operation)
     
     def parse_table_definition(self, definition):
@@ -305,41 +409,57 @@ class SQLDDLParser:
             if not part:
                 continue
                 
-            # Check if it's a column definition
-            if self.is_column_definition(part):
-                column_info = self.parse_column_definition(part)
-                columns.append(column_info)
-            
-            # Check if it's an index
-            elif re.match(r'(?:KEY|INDEX)\s+', part, re.IGNORECASE):
-                index_info = self.parse_index_definition(part)
-                indexes.append(index_info)
-            
             # Check if it's a primary key
-            elif re.match(r'PRIMARY\s+KEY', part, re.IGNORECASE):
+            if re.match(r'PRIMARY\s+KEY', part, re.IGNORECASE):
                 constraint_info = self.parse_primary_key_definition(part)
                 constraints.append(constraint_info)
             
             # Check if it's a foreign key
-            elif re.match(r'(?:CONSTRAINT\s+\w+\s+)?FOREIGN\s+KEY', part, re.IGNORECASE):
+            elif re.match(r'(?:CONSTRAINT(?:\s+[`"]?\w+[`"]?)?\s+)?FOREIGN\s+KEY', part, re.IGNORECASE):
                 constraint_info = self.parse_foreign_key_definition(part)
                 constraints.append(constraint_info)
             
             # Check if it's a unique constraint
-            elif re.match(r'UNIQUE\s+(?:KEY\s+)?', part, re.IGNORECASE):
-                constraint_info = self.parse_unique_constraint_definition(part)
+            elif re.match(r'(?:CONSTRAINT\s+[`"]?\w+[`"]?\s+)?UNIQUE\b', part, re.IGNORECASE):
+                constraint_info = self.parse_unique_constraint_definition(re.sub(r'^CONSTRAINT\s+[`"]?\w+[`"]?\s+', '', part, flags=re.IGNORECASE))
                 constraints.append(constraint_info)
+            
+            # Check if it's an index (FULLTEXT/SPATIAL indexes are recorded as plain indexes)
+            elif re.match(r'(?:(?:FULLTEXT|SPATIAL)\s+)?(?:KEY|INDEX)\b', part, re.IGNORECASE):
+                index_info = self.parse_index_definition(re.sub(r'^(?:FULLTEXT|SPATIAL)\s+', '', part, flags=re.IGNORECASE))
+                indexes.append(index_info)
+            
+            # CHECK constraints are not modelled
+            elif re.match(r'(?:CONSTRAINT\s+[`"]?\w+[`"]?\s+)?CHECK\b', part, re.IGNORECASE):
+                continue
+            
+            # Keyed forms are matched first since they also look like "<name> <type>"
+            elif self.is_column_definition(part):
+                column_info = self.parse_column_definition(part)
+                columns.append(column_info)
         
         return columns, indexes, constraints
     
     def split_table_definition(self, definition):
-        """Split table definition by commas, respecting parentheses."""
+        """Split table definition by commas, respecting parentheses and quoted strings."""
         parts = []
         current_part = ""
         paren_count = 0
+        quote_char = None
+        escaped = False
         
         for char in definition:
-            if char == '(':
+            if escaped:
+                escaped = False
+            elif quote_char:
+                # Inside '...', "..." or `...`: commas and parentheses are literal
+                if char == '\\' and quote_char != '`':
+                    escaped = True
+                elif char == quote_char:
+                    quote_char = None
+            elif char in ("'", '"', '`'):
+                quote_char = char
+            elif char == '(':
                 paren_count += 1
             elif char == ')':
                 paren_count -= 1
@@ -406,6 +526,15 @@ class SQLDDLParser:
             if comment_match:
                 attrs['COLUMN_COMMENT'] = comment_match.group(1)
 
+            # Check for an explicit character set / collation (outside the comment)
+            uncommented = attributes[:comment_match.start()] + attributes[comment_match.end():] if comment_match else attributes
+            charset_match = re.search(r'\b(?:CHARACTER\s+SET|CHARSET)\s+[`\'"]?(\w+)', uncommented, re.IGNORECASE)
+            if charset_match:
+                attrs['CHARACTER_SET_NAME'] = charset_match.group(1).lower()
+            collation_match = re.search(r'\bCOLLATE\s+[`\'"]?(\w+)', uncommented, re.IGNORECASE)
+            if collation_match:
+                attrs['COLLATION_NAME'] = collation_match.group(1).lower()
+
             
             return attrs
         
@@ -415,11 +544,11 @@ class SQLDDLParser:
     def parse_index_definition(self, part):
         """Parse index definition."""
         # KEY index_name (columns)
-        match = re.match(r'(?:KEY|INDEX)\s+(?:[`"]?(\w+)[`"]?\s+)?\(([^)]+)\)', part, re.IGNORECASE)
+        match = re.match(r'(?:KEY|INDEX)\s+(?:[`"]?(\w+)[`"]?\s+)?' + KEY_PARTS, part, re.IGNORECASE)
         
         if match:
             index_name = match.group(1) or 'unnamed_index'
-            columns = [col.strip().strip('`"') for col in match.group(2).split(',')]
+            columns = [col.strip().replace('`', '').replace('"', '') for col in match.group(2).split(',')]
             
             return {
                 'name': index_name,
@@ -432,10 +561,10 @@ class SQLDDLParser:
     
     def parse_primary_key_definition(self, part):
         """Parse primary key definition."""
-        match = re.match(r'PRIMARY\s+KEY\s+\(([^)]+)\)', part, re.IGNORECASE)
+        match = re.match(r'PRIMARY\s+KEY\s+' + KEY_PARTS, part, re.IGNORECASE)
         
         if match:
-            columns = [col.strip().strip('`"') for col in match.group(1).split(',')]
+            columns = [col.strip().replace('`', '').replace('"', '') for col in match.group(1).split(',')]
             
             return {
                 'type': 'PRIMARY_KEY',
@@ -448,17 +577,19 @@ class SQLDDLParser:
     def parse_foreign_key_definition(self, part):
         """Parse foreign key definition."""
         # CONSTRAINT name FOREIGN KEY (columns) REFERENCES table(columns)
-        match = re.match(r'(?:CONSTRAINT\s+[`"]?(\w+)[`"]?\s+)?FOREIGN\s+KEY\s+\(([^)]+)\)\s+REFERENCES\s+[`"]?(\w+)[`"]?\s*\(([^)]+)\)', part, re.IGNORECASE)
+        match = re.match(FOREIGN_KEY_CLAUSE, part, re.IGNORECASE)
         
         if match:
-            constraint_name = match.group(1) or 'unnamed_fk'
-            local_columns = [col.strip().strip('`"') for col in match.group(2).split(',')]
-            referenced_table = match.group(3)
-            referenced_columns = [col.strip().strip('`"') for col in match.group(4).split(',')]
+            # An unnamed key gets MySQL's <table>_ibfk_<n> when it is added to the table model
+            constraint_name = match.group(1) or ''
+            local_columns = [col.strip().replace('`', '').replace('"', '') for col in match.group(3).split(',')]
+            referenced_table = match.group(4)
+            referenced_columns = [col.strip().replace('`', '').replace('"', '') for col in match.group(5).split(',')]
             
             return {
                 'type': 'FOREIGN_KEY',
                 'name': constraint_name,
+                'index_name': match.group(2),
                 'columns': local_columns,
                 'referenced_table': referenced_table,
                 'referenced_columns': referenced_columns,
@@ -469,11 +600,11 @@ class SQLDDLParser:
     
     def parse_unique_constraint_definition(self, part):
         """Parse unique constraint definition."""
-        match = re.match(r'UNIQUE\s+(?:KEY\s+[`"]?(\w+)[`"]?\s+)?\(([^)]+)\)', part, re.IGNORECASE)
+        match = re.match(r'UNIQUE\s+(?:KEY\s+[`"]?(\w+)[`"]?\s+)?' + KEY_PARTS, part, re.IGNORECASE)
         
         if match:
             constraint_name = match.group(1) or 'unnamed_unique'
-            columns = [col.strip().strip('`"') for col in match.group(2).split(',')]
+            columns = [col.strip().replace('`', '').replace('"', '') for col in match.group(2).split(',')]
             
             return {
                 'type': 'UNIQUE',
@@ -496,54 +627,63 @@ class SQLDDLParser:
             if not part:
                 continue
             
-            # ADD COLUMN
-            if re.match(r'ADD\s+(?:COLUMN\s+)?', part, re.IGNORECASE):
-                op = self.parse_add_column(part)
+            # ADD PRIMARY KEY
+            if re.match(r'ADD\s+PRIMARY\s+KEY', part, re.IGNORECASE):
+                op = self.parse_add_primary_key(part)
                 operations.append(op)
             
-            # DROP COLUMN
-            elif re.match(r'DROP\s+(?:COLUMN\s+)?', part, re.IGNORECASE):
-                op = self.parse_drop_column(part)
+            # DROP PRIMARY KEY
+            elif re.match(r'DROP\s+PRIMARY\s+KEY', part, re.IGNORECASE):
+                op = self.parse_drop_primary_key(part)
                 operations.append(op)
             
-            # MODIFY COLUMN
-            elif re.match(r'MODIFY\s+(?:COLUMN\s+)?', part, re.IGNORECASE):
-                op = self.parse_modify_column(part)
+            # ADD FOREIGN KEY
+            elif re.match(r'ADD\s+(?:CONSTRAINT(?:\s+[`"]?\w+[`"]?)?\s+)?FOREIGN\s+KEY', part, re.IGNORECASE):
+                op = self.parse_add_foreign_key(part)
                 operations.append(op)
             
-            # CHANGE COLUMN
-            elif re.match(r'CHANGE\s+(?:COLUMN\s+)?', part, re.IGNORECASE):
-                op = self.parse_change_column(part)
+            # DROP FOREIGN KEY
+            elif re.match(r'DROP\s+FOREIGN\s+KEY', part, re.IGNORECASE):
+                op = self.parse_drop_foreign_key(part)
                 operations.append(op)
             
-            # ADD INDEX
-            elif re.match(r'ADD\s+(?:INDEX|KEY)', part, re.IGNORECASE):
+            # ADD INDEX (also UNIQUE / FULLTEXT / SPATIAL keys)
+            elif re.match(r'ADD\s+(?:CONSTRAINT\s+[`"]?\w+[`"]?\s+)?(?:UNIQUE|FULLTEXT|SPATIAL|INDEX|KEY)\b', part, re.IGNORECASE):
                 op = self.parse_add_index(part)
                 operations.append(op)
             
             # DROP INDEX
-            elif re.match(r'DROP\s+(?:INDEX|KEY)', part, re.IGNORECASE):
+            elif re.match(r'DROP\s+(?:INDEX|KEY)\b', part, re.IGNORECASE):
                 op = self.parse_drop_index(part)
                 operations.append(op)
             
-            # ADD PRIMARY KEY
-            elif re.match(r'ADD\s+PRIMARY\s+KEY', part, re.IGNORECASE):
-                op = self.parse_add_primary_key(part)
+            # ADD/DROP CHECK constraint (not modelled, but must not be read as a column)
+            elif re.match(r'(?:ADD\s+(?:CONSTRAINT\s+[`"]?\w+[`"]?\s+)?CHECK|DROP\s+(?:CHECK|CONSTRAINT))\b', part, re.IGNORECASE):
+                operations.append({
+                    'operation': 'UNKNOWN',
+                    'target': 'unknown',
+                    'target_type': 'unknown',
+                    'details': {'raw': part}
+                })
+            
+            # ADD COLUMN (checked after the keyed ADD forms, which share the prefix)
+            elif re.match(r'ADD\s+(?:COLUMN\s+)?', part, re.IGNORECASE):
+                op = self.parse_add_column(part)
                 operations.append(op)
             
-            # DROP PRIMARY KEY
-            elif re.match(r'DROP\s+PRIMARY\s+KEY', part, re.IGNORECASE):
-                op = self.parse_drop_primary_key(part)
+            # DROP COLUMN
+            elif re.match(r'DROP\s+(?:COLUMN\s+)?', part, re.IGNORECASE):
+                op = self.parse_drop_column(part)
                 operations.append(op)
             
-            # ADD FOREIGN KEY
-            elif re.match(r'ADD\s+(?:CONSTRAINT\s+\w+\s+)?FOREIGN\s+KEY', part, re.IGNORECASE):
-                op = self.parse_add_foreign_key(part)
+            # MODIFY COLUMN
+            elif re.match(r'MODIFY\s+(?:COLUMN\s+)?', part, re.IGNORECASE):
+                op = self.parse_modify_column(part)
                 operations.append(op)
             
-            # DROP FOREIGN KEY
-            elif re.match(r'DROP\s+FOREIGN\s+KEY', part, re.IGNORECASE):
-                op = self.parse_drop_foreign_key(part)
+            # CHANGE COLUMN
+            elif re.match(r'CHANGE\s+(?:COLUMN\s+)?', part, re.IGNORECASE):
+                op = self.parse_change_column(part)
                 operations.append(op)
             
             else:
@@ -554,6 +694,9 @@ class SQLDDLParser:
                     'target_type': 'unknown',
                     'details': {'raw': part}
                 })
+            
+            # Keep the clause text so callers can re-emit it (e.g. when merging ALTERs)
+            operations[-1]['clause'] = part
         
         return operations
     
@@ -623,10 +766,17 @@ class SQLDDLParser:
     
     def parse_add_index(self, part):
         """Parse ADD INDEX operation."""
-        match = re.match(r'ADD\s+(?:INDEX|KEY)\s+(?:[`"]?(\w+)[`"]?\s+)?\(([^)]+)\)', part, re.IGNORECASE)
+        # The keywords may be followed directly by the key parts (ADD UNIQUE(a)), so they
+        # must not be read as the index name
+        match = re.match(
+            r'ADD\s+(?:CONSTRAINT\s+[`"]?(\w+)[`"]?\s+)?(?:(?:UNIQUE|FULLTEXT|SPATIAL)\b\s*)?(?:(?:INDEX|KEY)\b\s*)?'
+            r'(?:(?!(?:INDEX|KEY|USING)\b)[`"]?(\w+)[`"]?\s*)?(?:USING\s+\w+\s*)?' + KEY_PARTS,
+            part, re.IGNORECASE
+        )
         if match:
-            index_name = match.group(1) or 'unnamed_index'
-            columns = [col.strip().strip('`"') for col in match.group(2).split(',')]
+            columns = [col.strip().replace('`', '').replace('"', '') for col in match.group(3).split(',')]
+            # Without an index name MySQL uses the constraint name, then the first column
+            index_name = match.group(2) or match.group(1) or re.match(r'\w+', columns[0]).group(0)
             
             return {
                 'operation': 'ADD',
@@ -657,9 +807,9 @@ class SQLDDLParser:
     
     def parse_add_primary_key(self, part):
         """Parse ADD PRIMARY KEY operation."""
-        match = re.match(r'ADD\s+PRIMARY\s+KEY\s+\(([^)]+)\)', part, re.IGNORECASE)
+        match = re.match(r'ADD\s+PRIMARY\s+KEY\s+' + KEY_PARTS, part, re.IGNORECASE)
         if match:
-            columns = [col.strip().strip('`"') for col in match.group(1).split(',')]
+            columns = [col.strip().replace('`', '').replace('"', '') for col in match.group(1).split(',')]
             
             return {
                 'operation': 'ADD',
@@ -681,12 +831,13 @@ class SQLDDLParser:
     
     def parse_add_foreign_key(self, part):
         """Parse ADD FOREIGN KEY operation."""
-        match = re.match(r'ADD\s+(?:CONSTRAINT\s+[`"]?(\w+)[`"]?\s+)?FOREIGN\s+KEY\s+\(([^)]+)\)\s+REFERENCES\s+[`"]?(\w+)[`"]?\s*\(([^)]+)\)', part, re.IGNORECASE)
+        match = re.match(r'ADD\s+' + FOREIGN_KEY_CLAUSE, part, re.IGNORECASE)
         if match:
-            constraint_name = match.group(1) or 'unnamed_fk'
-            local_columns = [col.strip().strip('`"') for col in match.group(2).split(',')]
-            referenced_table = match.group(3)
-            referenced_columns = [col.strip().strip('`"') for col in match.group(4).split(',')]
+            # Unnamed: SchemaModel names it <table>_ibfk_<n>, which depends on the keys already there
+            constraint_name = match.group(1) or ''
+            local_columns = [col.strip().replace('`', '').replace('"', '') for col in match.group(3).split(',')]
+            referenced_table = match.group(4)
+            referenced_columns = [col.strip().replace('`', '').replace('"', '') for col in match.group(5).split(',')]
             
             return {
                 'operation': 'ADD',
@@ -694,6 +845,7 @@ class SQLDDLParser:
                 'target_type': 'FOREIGN_KEY',
                 'details': {
                     'name': constraint_name,
+                    'index_name': match.group(2),
                     'columns': local_columns,
                     'referenced_table': referenced_table,
                     'referenced_columns': referenced_columns
@@ -718,8 +870,9 @@ class SQLDDLParser:
         return {'operation': 'DROP', 'target': 'unknown', 'target_type': 'FOREIGN_KEY', 'details': {}}
     
     def parse_sql_file(self, file_content, file_path):
-        """Parse SQL file content and extract DDL operations."""
+        """Parse SQL file content and extract DDL operations (appended in file order)."""
         database_name = self.extract_database_name(file_path)
+        first = len(self.ddl_operations)
         
         # Clean up the SQL content
         # sql_content = self.clean_sql_content(file_content)
@@ -733,6 +886,10 @@ class SQLDDLParser:
         
         # Parse other DDL statements if needed (CREATE INDEX, DROP TABLE, etc.)
         self.parse_other_ddl(sql_content, database_name)
+
+        # The passes above append by statement kind; restore file order (stable, so a
+        # statement's clauses keep their order)
+        self.ddl_operations[first:] = sorted(self.ddl_operations[first:], key=lambda operation: operation.position)
     
     def clean_sql_content(self, content):
         """Clean SQL content by removing comments and normalizing whitespace."""
@@ -756,15 +913,8 @@ class SQLDDLParser:
         for match in matches:
             table_name = match.group(1)
             
-            operation = {
-                'type': 'DROP',
-                'command': 'DROP_TABLE',
-                'database': database_name,
-                'table': table_name,
-                'full_statement': match.group(0).strip()
-            }
-            
-            self.ddl_operations.append(operation)
+            statement = Statement(match.group(0).strip(), match.start())
+            self.ddl_operations.append(DropTable(database_name, table_name, statement))
         
         # CREATE INDEX
         create_index_pattern = r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+[`"]?(\w+)[`"]?\s+ON\s+[`"]?(\w+)[`"]?\s*\(([^)]+)\)'
@@ -773,22 +923,30 @@ class SQLDDLParser:
         for match in matches:
             index_name = match.group(1)
             table_name = match.group(2)
-            columns = [col.strip().strip('`"') for col in match.group(3).split(',')]
-            
-            operation = {
-                'type': 'CREATE',
-                'command': 'CREATE_INDEX',
-                'database': database_name,
-                'table': table_name,
-                'index_name': index_name,
-                'columns': columns,
-                'full_statement': match.group(0).strip()
-            }
+            columns = [col.strip().replace('`', '').replace('"', '') for col in match.group(3).split(',')]
             
+            statement = Statement(match.group(0).strip(), match.start())
+            operation = CreateIndex(database_name, table_name, statement, index_name=index_name, columns=columns)
             self.ddl_operations.append(operation)
+
+        # DROP INDEX ... ON ..., the same operation as ALTER TABLE ... DROP INDEX
+        drop_index_pattern = r'\bDROP\s+INDEX\s+[`"]?(\w+)[`"]?\s+ON\s+[`"]?(\w+)[`"]?[^;]*'
+        matches = re.finditer(drop_index_pattern, sql_content, re.IGNORECASE)
+
+        for match in matches:
+            clause = f"DROP INDEX {match.group(1)}"
+            alter_op = self.parse_drop_index(clause)
+            alter_op['clause'] = clause
+
+            statement = Statement(match.group(0).strip(), match.start())
+            self.ddl_operations.append(make_alter_operation(database_name, match.group(2), statement, alter_op))
     
     def get_operations(self):
-        """Get all parsed DDL operations."""
+        """Get all parsed DDL operations as dicts (legacy layout used by the validators)."""
+        return [operation.to_dict() for operation in self.ddl_operations]
+    
+    def get_typed_operations(self):
+        """Get all parsed DDL operations as typed ddl_operations objects."""
         return self.ddl_operations
     
     def print_operations_summary(self):
@@ -800,7 +958,7 @@ class SQLDDLParser:
         print(f"\n🔍 Found {len(self.ddl_operations)} DDL Operations:")
         print("=" * 80)
         
-        for i, op in enumerate(self.ddl_operations, 1):
+        for i, op in enumerate(self.get_operations(), 1):
             print(f"\n{i}. {op['type']} Operation:")
             print(f"   Command: {op['command']}")
             print(f"   Database: {op['database']}")
@@ -5,10 +5,8 @@ Fetches newly added files from GitHub PR and parses SQL DDL commands
 to extract CREATE/ALTER operations with detailed analysis.
 """
 
-import requests
 import os
 import json
-from dotenv import load_dotenv
 import re
 import base64
 
@@ -759,6 +757,8 @@ class SQLDDLParser:
 
 def main():
     """Main function to fetch and parse SQL files from GitHub PR."""
+    import requests
+    from dotenv import load_dotenv
     
     # Load environment variables
     try:
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Chunked Table Checksum
+Checks that a copy of a staging database (a restored dump, a replica, the
+local stand-in loaded by seed_loader.py) holds the same rows as staging,
+without pulling the rows over the network.
+
+Each table is walked in key order and cut into chunks. For every chunk both
+endpoints run, at the same time:
+
+    SELECT COUNT(*), BIT_XOR(CRC32(CONCAT_WS('#', <columns>, <NULL flags>)))
+
+Only chunks whose aggregates differ are bisected, recursively, until a few
+dozen rows are left; those rows are compared one by one. Chunk sizes adapt
+so each query takes about CHECKSUM_CHUNK_SECONDS, based on the rows per
+second seen so far.
+
+The chunking key comes from the schema parsed from the seed files. It is the
+primary key, or else a unique key whose columns are all NOT NULL
+(kafka_events has only UNIQUE KEY idx (id, created_at)). Tables with neither
+are compared as hash buckets, CRC32 of the row modulo N, using one grouped
+scan per side. Their differing rows are reported by checksum and count,
+since there is no key to name them.
+
+The source is staging (get_staging_config) and the target is the local
+database (LOCAL_DB_*, get_local_config). Both sessions run in UTC
+(data_dumper.set_session), so TIMESTAMP columns hash the same on servers in
+different time zones. Rows that change during the run show up as
+differences, so check a quiet source or a paused replica.
+
+Usage: python table_checksum.py MYSQL/<env>/<db> [<table> ...] [--workers N]
+"""
+
+import os
+import sys
+import glob
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ddl_validator import DatabaseConnection, get_local_config, get_staging_config, mysql_connector
+from data_dumper import quote_identifier, set_session
+from schema_model import SchemaModel
+
+
+DEFAULT_WORKERS = int(os.getenv("TABLE_CHECKSUM_WORKERS", "4"))
+TARGET_CHUNK_SECONDS = float(os.getenv("CHECKSUM_CHUNK_SECONDS", "0.5"))
+
+INITIAL_CHUNK_ROWS = 1000
+MIN_CHUNK_ROWS = 100
+MAX_CHUNK_ROWS = 1000000
+# Bisection stops and compares rows once a chunk is this small
+ROW_LEVEL_ROWS = 64
+# Keyless tables: most hash buckets per grouped scan, and most differing buckets compared row by row
+MAX_BUCKETS = 65536
+MAX_ROW_LEVEL_BUCKETS = 1000
+MAX_REPORTED_DIFFERENCES = 100
+
+
+def choose_chunk_key(table):
+    """(index name, key columns) of the table's primary key or a NOT NULL unique key, or None."""
+    if table.primary_key:
+        return 'PRIMARY', table.primary_key
+    for index in table.indexes.values():
+        # A prefix key can't return rows in full key order
+        if not index['unique'] or any('(' in part for part in index['parts']):
+            continue
+        if all(table.columns.get(column.lower(), {}).get('IS_NULLABLE') == 'NO' for column in index['columns']):
+            return index['name'], index['columns']
+    return None
+
+
+def row_checksum_expression(table):
+    """CRC32 of all columns; NULL flags are appended because CONCAT_WS skips NULLs."""
+    columns = [quote_identifier(column['COLUMN_NAME']) for column in table.columns.values()]
+    nullable = [quote_identifier(column['COLUMN_NAME']) for column in table.columns.values() if column.get('IS_NULLABLE') != 'NO']
+    parts = columns + ([f"CONCAT({', '.join(f'ISNULL({column})' for column in nullable)})"] if nullable else [])
+    return f"CRC32(CONCAT_WS('#', {', '.join(parts)}))"
+
+
+def range_condition(key_columns, lower, upper):
+    """WHERE condition and parameters for lower <= key < upper (None: unbounded)."""
+    quoted = [quote_identifier(column) for column in key_columns]
+    key = quoted[0] if len(quoted) == 1 else f"({', '.join(quoted)})"
+    placeholder = '%s' if len(quoted) == 1 else f"({', '.join(['%s'] * len(quoted))})"
+    conditions = []
+    params = []
+    if lower is not None:
+        conditions.append(f"{key} >= {placeholder}")
+        params.extend(lower)
+    if upper is not None:
+        conditions.append(f"{key} < {placeholder}")
+        params.extend(upper)
+    return ' AND '.join(conditions) or '1=1', params
+
+
+def fetch_all(db, query, params=()):
+    db.cursor.execute(query, params)
+    return db.cursor.fetchall()
+
+
+class TableChecksum:
+    """Compares one table on a source and a target connection."""
+
+    def __init__(self, table, source, target, executor):
+        self.table = table
+        self.source = source
+        self.target = target
+        self.executor = executor
+        self.name = quote_identifier(table.name)
+        self.crc = row_checksum_expression(table)
+        self.index_name, self.key_columns = choose_chunk_key(table) or (None, None)
+        self.result = {
+            'table': table.name,
+            'method': (f"key {self.index_name} ({', '.join(self.key_columns)})" if self.key_columns else 'hash buckets'),
+            'rows': 0,
+            'chunks': 0,
+            'mismatched_chunks': 0,
+            'different_rows': 0,
+            'differences': [],
+            'seconds': 0.0
+        }
+
+    def on_both(self, query, params=()):
+        """Run a query on both endpoints at once; returns (source rows, target rows, seconds)."""
+        start = time.perf_counter()
+        target_future = self.executor.submit(fetch_all, self.target, query, params)
+        source_rows = fetch_all(self.source, query, params)
+        target_rows = target_future.result()
+        return source_rows, target_rows, time.perf_counter() - start
+
+    def add_difference(self, kind, key=None, row_crc=None, count=1):
+        self.result['different_rows'] += count
+        if len(self.result['differences']) < MAX_REPORTED_DIFFERENCES:
+            self.result['differences'].append({'kind': kind, 'key': key, 'row_crc': row_crc, 'count': count})
+
+    def run(self):
+        start = time.perf_counter()
+        if self.key_columns:
+            self.run_key_chunks()
+        else:
+            self.run_hash_buckets()
+        self.result['seconds'] = time.perf_counter() - start
+        return self.result
+
+    # Tables with a key: PK-range chunks, bisected when they differ
+
+    def from_index(self):
+        return f"{self.name} FORCE INDEX ({quote_identifier(self.index_name)})"
+
+    def boundary_after(self, lower, upper, offset, db=None):
+        """Key of the row `offset` rows after lower (within upper), or None past the end."""
+        where, params = range_condition(self.key_columns, lower, upper)
+        order = ', '.join(quote_identifier(column) for column in self.key_columns)
+        rows = fetch_all(
+            db or self.source,
+            f"SELECT {order} FROM {self.from_index()} WHERE {where} ORDER BY {order} LIMIT %s, 1",
+            params + [offset]
+        )
+        return tuple(rows[0][column] for column in self.key_columns) if rows else None
+
+    def checksum_range(self, lower, upper):
+        """Returns (source aggregate, target aggregate, seconds) of the rows in [lower, upper)."""
+        where, params = range_condition(self.key_columns, lower, upper)
+        source_rows, target_rows, seconds = self.on_both(
+            f"SELECT COUNT(*) AS row_count, BIT_XOR({self.crc}) AS crc FROM {self.from_index()} WHERE {where}", params
+        )
+        return source_rows[0], target_rows[0], seconds
+
+    def run_key_chunks(self):
+        chunk_rows = INITIAL_CHUNK_ROWS
+        rate = None
+        lower = None
+        while True:
+            upper = self.boundary_after(lower, None, chunk_rows)
+            source, target, seconds = self.checksum_range(lower, upper)
+            self.result['chunks'] += 1
+            self.result['rows'] += source['row_count']
+            if (source['row_count'], int(source['crc'])) != (target['row_count'], int(target['crc'])):
+                self.result['mismatched_chunks'] += 1
+                self.bisect(lower, upper, source['row_count'], target['row_count'])
+
+            # Smoothed rows/s, so one slow or cached chunk doesn't swing the size
+            observed = max(source['row_count'], 1) / max(seconds, 0.001)
+            rate = observed if rate is None else 0.75 * rate + 0.25 * observed
+            chunk_rows = int(min(MAX_CHUNK_ROWS, max(MIN_CHUNK_ROWS, rate * TARGET_CHUNK_SECONDS)))
+
+            if upper is None:
+                return
+            lower = upper
+
+    def bisect(self, lower, upper, source_count, target_count):
+        """Narrow a differing range down to row level, checksumming only the halves that differ."""
+        rows = max(source_count, target_count)
+        if rows <= ROW_LEVEL_ROWS:
+            self.compare_rows(lower, upper)
+            return
+
+        # Split at the median key of whichever side has more rows in the range
+        middle = self.boundary_after(lower, upper, rows // 2, self.source if source_count >= target_count else self.target)
+        if middle is None or middle == lower:
+            self.compare_rows(lower, upper)
+            return
+
+        for low, high in ((lower, middle), (middle, upper)):
+            source, target, _ = self.checksum_range(low, high)
+            if (source['row_count'], int(source['crc'])) != (target['row_count'], int(target['crc'])):
+                self.bisect(low, high, source['row_count'], target['row_count'])
+
+    def compare_rows(self, lower, upper):
+        where, params = range_condition(self.key_columns, lower, upper)
+        key = ', '.join(quote_identifier(column) for column in self.key_columns)
+        source_rows, target_rows, _ = self.on_both(
+            f"SELECT {key}, {self.crc} AS row_crc FROM {self.from_index()} WHERE {where} ORDER BY {key}", params
+        )
+        source = {tuple(row[column] for column in self.key_columns): int(row['row_crc']) for row in source_rows}
+        target = {tuple(row[column] for column in self.key_columns): int(row['row_crc']) for row in target_rows}
+        for row_key, row_crc in source.items():
+            if row_key not in target:
+                self.add_difference('missing', row_key, row_crc)
+            elif target[row_key] != row_crc:
+                self.add_difference('changed', row_key, row_crc)
+        for row_key, row_crc in target.items():
+            if row_key not in source:
+                self.add_difference('extra', row_key, row_crc)
+
+    # Keyless tables: hash buckets in one grouped scan, then row checksums of the differing buckets
+
+    def run_hash_buckets(self):
+        estimated_rows = fetch_all(self.source, """
+            SELECT table_rows AS table_rows FROM information_schema.TABLES
+            WHERE table_schema = %s AND table_name = %s
+        """, (self.source.database, self.table.name))
+        estimated_rows = int(estimated_rows[0]['table_rows'] or 0) if estimated_rows else 0
+        buckets = max(1, min(MAX_BUCKETS, estimated_rows // ROW_LEVEL_ROWS + 1))
+
+        source_rows, target_rows, _ = self.on_both(
+            f"SELECT {self.crc} % {buckets} AS bucket, COUNT(*) AS row_count, BIT_XOR({self.crc}) AS crc "
+            f"FROM {self.name} GROUP BY bucket"
+        )
+        source = {int(row['bucket']): (row['row_count'], int(row['crc'])) for row in source_rows}
+        target = {int(row['bucket']): (row['row_count'], int(row['crc'])) for row in target_rows}
+        self.result['chunks'] = buckets
+        self.result['rows'] = sum(row_count for row_count, _ in source.values())
+        mismatched = sorted(bucket for bucket in set(source) | set(target) if source.get(bucket) != target.get(bucket))
+        self.result['mismatched_chunks'] = len(mismatched)
+        if not mismatched:
+            return
+        if len(mismatched) > MAX_ROW_LEVEL_BUCKETS:
+            # Too different to be worth listing; report the row count gap only
+            source_count = sum(source.get(bucket, (0, 0))[0] for bucket in mismatched)
+            target_count = sum(target.get(bucket, (0, 0))[0] for bucket in mismatched)
+            self.add_difference('buckets', count=max(source_count, target_count))
+            return
+
+        source_rows, target_rows, _ = self.on_both(
+            f"SELECT {self.crc} AS row_crc, COUNT(*) AS row_count FROM {self.name} "
+            f"WHERE {self.crc} % {buckets} IN ({', '.join(['%s'] * len(mismatched))}) GROUP BY row_crc",
+            mismatched
+        )
+        source = {int(row['row_crc']): row['row_count'] for row in source_rows}
+        target = {int(row['row_crc']): row['row_count'] for row in target_rows}
+        for row_crc in sorted(set(source) | set(target)):
+            surplus = source.get(row_crc, 0) - target.get(row_crc, 0)
+            if surplus > 0:
+                self.add_difference('missing', row_crc=row_crc, count=surplus)
+            elif surplus < 0:
+                self.add_difference('extra', row_crc=row_crc, count=-surplus)
+
+
+def print_results(results):
+    print("-" * 70)
+    for result in results:
+        icon = '❌' if result['different_rows'] else '✅'
+        print(f"{icon} {result['table']:<40} {result['rows']:>12,} rows {result['chunks']:>6} chunks "
+              f"{result['seconds']:>6.1f} s  {result['method']}")
+        for difference in result['differences'][:10]:
+            label = f"key {difference['key']}" if difference['key'] is not None else f"crc {difference['row_crc']}"
+            count = f" x{difference['count']}" if difference['count'] > 1 else ''
+            print(f"      {difference['kind']:<8} {label}{count}")
+        hidden = result['different_rows'] - sum(difference['count'] for difference in result['differences'][:10])
+        if hidden > 0:
+            print(f"      ... {hidden:,} more")
+
+    different = [result for result in results if result['different_rows']]
+    print("-" * 70)
+    if different:
+        print(f"❌ {len(different)} of {len(results)} tables differ "
+              f"({sum(result['different_rows'] for result in different):,} rows)")
+    else:
+        print(f"✅ All {len(results)} tables match ({sum(result['rows'] for result in results):,} rows)")
+
+
+def checksum_database(directory, tables=None, workers=DEFAULT_WORKERS):
+    """Compare the tables of MYSQL/<env>/<db> (default: all in its seed files) between staging and the local copy."""
+    database_name = os.path.basename(os.path.abspath(directory))
+    seed_files = sorted(glob.glob(os.path.join(directory, 'seed*.sql')))
+    if not seed_files:
+        print(f"❌ No seed*.sql files in {directory}")
+        exit(1)
+    schema = SchemaModel.from_files(seed_files, database_name)
+    tables = tables or sorted(schema.tables)
+    missing = sorted(set(tables) - set(schema.tables))
+    if missing:
+        print(f"❌ Tables not in the seed files: {', '.join(missing)}")
+        exit(1)
+
+    source_config = get_staging_config(database_name)
+    target_config = get_local_config(database_name)
+
+    print("🔍 Chunked Table Checksum")
+    print("=" * 60)
+    pending = queue.Queue()
+    for table_name in tables:
+        pending.put(table_name)
+    results = []
+    errors = []
+    lock = threading.Lock()
+    workers = max(1, min(workers, len(tables)))
+
+    def work(executor):
+        source = DatabaseConnection(**source_config)
+        target = DatabaseConnection(**target_config)
+        try:
+            if not (source.connect() and target.connect()):
+                errors.append("Could not connect to both endpoints")
+                return
+            # TIMESTAMPs are hashed as rendered, so both sides must render them in one time zone
+            set_session(source)
+            set_session(target)
+            while not errors:
+                try:
+                    table_name = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    result = TableChecksum(schema.tables[table_name], source, target, executor).run()
+                except mysql_connector.Error as e:
+                    errors.append(f"{table_name}: {e}")
+                    return
+                with lock:
+                    results.append(result)
+                    print(f"   {'❌' if result['different_rows'] else '✅'} {table_name} "
+                          f"({len(results)}/{len(tables)}, {result['seconds']:.1f} s)")
+        finally:
+            source.close()
+            target.close()
+
+    # Worker threads query the source; the executor runs the matching target queries alongside
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        threads = [threading.Thread(target=work, args=(executor,)) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        for error in errors:
+            print(f"❌ {error}")
+        exit(1)
+
+    results.sort(key=lambda result: result['table'])
+    print_results(results)
+    return results
+
+
+def main():
+    args = sys.argv[1:]
+    workers = DEFAULT_WORKERS
+    if '--workers' in args:
+        position = args.index('--workers')
+        workers = int(args[position + 1])
+        del args[position:position + 2]
+
+    if not args:
+        print("Usage: python table_checksum.py MYSQL/<env>/<db> [<table> ...] [--workers N]")
+        exit(1)
+
+    results = checksum_database(args[0], args[1:] or None, workers)
+    if any(result['different_rows'] for result in results):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Unified Diff Engine
+Parses unified-diff patches (as returned by the GitHub PR files API or
+`git diff`) into hunks using their @@ -a,b +c,d @@ headers, tracks the old
+and new line number of every patch line, and rebuilds the post-patch file
+from the pre-patch content in a single linear pass.
+"""
+
+import re
+
+
+HUNK_HEADER_PATTERN = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@(.*)$')
+
+
+class PatchLine:
+    """One line of a hunk with its position in the old and new file."""
+    __slots__ = ('tag', 'text', 'old_line', 'new_line')
+
+    def __init__(self, tag, text, old_line, new_line):
+        self.tag = tag              # ' ' context, '-' removed, '+' added
+        self.text = text
+        self.old_line = old_line    # 1-based line in the old file (None for added lines)
+        self.new_line = new_line    # 1-based line in the new file (None for removed lines)
+
+    @property
+    def original_line(self):
+        return self.tag + self.text
+
+
+class Hunk:
+    """A single @@ -a,b +c,d @@ hunk."""
+
+    def __init__(self, old_start, old_count, new_start, new_count, header):
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_start = new_start
+        self.new_count = new_count
+        self.header = header
+        self.lines = []
+
+    def old_range(self):
+        """Return the (first, last) old-file lines covered by this hunk."""
+        return self.old_start, self.old_start + self.old_count - 1
+
+    def new_range(self):
+        """Return the (first, last) new-file lines covered by this hunk."""
+        return self.new_start, self.new_start + self.new_count - 1
+
+
+def parse_hunks(patch):
+    """
+    Parse a unified diff into hunks.
+
+    File headers (diff --git, index, ---/+++) outside hunks are skipped. Inside
+    a hunk the line counts from the header decide where it ends, so content
+    lines that themselves start with '---' or '+++' are handled correctly.
+
+    Returns:
+        list: Hunk objects in patch order
+    """
+    hunks = []
+    if not patch:
+        return hunks
+
+    hunk = None
+    old_remaining = new_remaining = 0
+    old_line = new_line = 0
+
+    for line in patch.split('\n'):
+        if old_remaining == 0 and new_remaining == 0:
+            match = HUNK_HEADER_PATTERN.match(line)
+            if match:
+                old_start = int(match.group(1))
+                old_count = int(match.group(2)) if match.group(2) is not None else 1
+                new_start = int(match.group(3))
+                new_count = int(match.group(4)) if match.group(4) is not None else 1
+                hunk = Hunk(old_start, old_count, new_start, new_count, line)
+                hunks.append(hunk)
+                old_remaining, new_remaining = old_count, new_count
+                old_line, new_line = old_start, new_start
+            # Anything else between hunks is file-level metadata
+            continue
+
+        if line.startswith('\\'):
+            # "\ No newline at end of file"
+            continue
+
+        tag = line[:1]
+        if tag == '+':
+            hunk.lines.append(PatchLine('+', line[1:], None, new_line))
+            new_line += 1
+            new_remaining -= 1
+        elif tag == '-':
+            hunk.lines.append(PatchLine('-', line[1:], old_line, None))
+            old_line += 1
+            old_remaining -= 1
+        else:
+            # Context line (some tools strip the leading space of empty context lines)
+            hunk.lines.append(PatchLine(' ', line[1:], old_line, new_line))
+            old_line += 1
+            new_line += 1
+            old_remaining -= 1
+            new_remaining -= 1
+
+    return hunks
+
+
+def apply_hunks(old_content, hunks):
+    """
+    Rebuild the post-patch file from the pre-patch content.
+
+    Returns:
+        str: The new file content
+
+    Raises:
+        ValueError: If the patch does not apply (overlapping hunks or context mismatch)
+    """
+    old_lines = old_content.split('\n') if old_content else []
+    new_lines = []
+    cursor = 0  # 0-based index of the next unconsumed old line
+
+    for hunk in hunks:
+        # A hunk with no old lines inserts after line old_start
+        start = hunk.old_start if hunk.old_count == 0 else hunk.old_start - 1
+        if start < cursor or start > len(old_lines):
+            raise ValueError(f"Hunk {hunk.header} does not apply at old line {hunk.old_start}")
+
+        new_lines.extend(old_lines[cursor:start])
+        cursor = start
+
+        for patch_line in hunk.lines:
+            if patch_line.tag == '+':
+                new_lines.append(patch_line.text)
+                continue
+
+            if cursor >= len(old_lines) or old_lines[cursor].rstrip('\r') != patch_line.text.rstrip('\r'):
+                raise ValueError(f"Patch context mismatch at old line {cursor + 1}: {patch_line.text!r}")
+            if patch_line.tag == ' ':
+                new_lines.append(old_lines[cursor])
+            cursor += 1
+
+    new_lines.extend(old_lines[cursor:])
+    return '\n'.join(new_lines)
+
+
+def apply_patch(old_content, patch):
+    """Apply a unified-diff patch to the pre-patch file content."""
+    return apply_hunks(old_content, parse_hunks(patch))
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+DDL Validation Server
+Long-running mode of ddl_validator.py. Keeps pooled staging connections and an
+in-memory schema snapshot per database, and validates migrations posted to it
+over a local HTTP port or Unix socket:
+
+    POST /validate  {"path": "MYSQL/<env>/<db>/V1__x.sql", "sql": "..."}
+    GET  /health
+
+and returns the same summary ddl_validator.main prints, plus the validator's
+log. A snapshot is reloaded when a fingerprint of information_schema.TABLES
+(table names, CREATE_TIME and UPDATE_TIME) changes on staging; the
+fingerprint is polled at most once per poll interval.
+
+Clients: set DDL_VALIDATOR_SERVER=http://127.0.0.1:8765 (or unix:/path/to.sock)
+before running ddl_validator.py, or use `ddltool validate --server ...`.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import socket
+import threading
+import http.client
+import socketserver
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ddl_validator import (
+    DatabaseConnection, DDLValidator, ThreadLocalOutput, get_staging_config, validate_operations,
+    check_foreign_key_order, mysql_connector
+)
+from sql_ddl_parser import SQLDDLParser
+
+
+class SchemaSnapshot:
+    """In-memory copy of the catalog of one staging database."""
+
+    def __init__(self, database, fingerprint, table_types, columns, indexes, primary_keys):
+        self.database = database
+        self.fingerprint = fingerprint
+        self.table_types = table_types        # {table: table_type}
+        self.columns = columns                # {table: {column_name_lower: column definition row}}
+        self.indexes = indexes                # {table: set of lowercased index names}
+        self.primary_keys = primary_keys      # {table: [column, ...]}
+        self.create_statements = {}           # filled lazily by SHOW CREATE TABLE
+        self.loaded_at = time.time()
+
+    @staticmethod
+    def fetch_fingerprint(db):
+        """Return {table: (table_type, create_time, update_time)} for the database."""
+        try:
+            # MySQL 8 caches TABLES statistics for 24h by default; read them fresh
+            db.cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+        except mysql_connector.Error:
+            pass  # MySQL 5.7 has no statistics cache
+
+        db.cursor.execute("""
+            SELECT table_name as table_name, table_type as table_type,
+                   create_time as create_time, update_time as update_time
+            FROM information_schema.tables
+            WHERE table_schema = %s
+        """, (db.database,))
+        return {
+            row['table_name']: (row['table_type'], row['create_time'], row['update_time'])
+            for row in db.cursor.fetchall()
+        }
+
+    @classmethod
+    def load(cls, db, fingerprint):
+        """Load the whole catalog of the database in three queries."""
+        columns = {}
+        db.cursor.execute("""
+            SELECT table_name as table_name, column_name as column_name,
+                   column_type, is_nullable, column_default, extra, column_comment
+            FROM information_schema.columns
+            WHERE table_schema = %s
+        """, (db.database,))
+        for row in db.cursor.fetchall():
+            table_name = row.pop('table_name')
+            column_name = row.pop('column_name')
+            # The remaining keys are exactly what DatabaseConnection.get_column_definition returns
+            columns.setdefault(table_name, {})[column_name.lower()] = row
+
+        indexes = {}
+        db.cursor.execute("""
+            SELECT DISTINCT table_name as table_name, index_name as index_name
+            FROM information_schema.statistics
+            WHERE table_schema = %s
+        """, (db.database,))
+        for row in db.cursor.fetchall():
+            indexes.setdefault(row['table_name'], set()).add(row['index_name'].lower())
+
+        primary_keys = {}
+        db.cursor.execute("""
+            SELECT table_name as table_name, column_name as column_name
+            FROM information_schema.KEY_COLUMN_USAGE
+            WHERE table_schema = %s AND constraint_name = 'PRIMARY'
+            ORDER BY table_name, ordinal_position
+        """, (db.database,))
+        for row in db.cursor.fetchall():
+            primary_keys.setdefault(row['table_name'], []).append(row['column_name'])
+
+        table_types = {table_name: values[0] for table_name, values in fingerprint.items()}
+        return cls(db.database, fingerprint, table_types, columns, indexes, primary_keys)
+
+
+class CachedDatabaseConnection(DatabaseConnection):
+    """DatabaseConnection whose catalog lookups are answered from a SchemaSnapshot."""
+
+    def __init__(self, host, user, password, database, port=3306):
+        super().__init__(host, user, password, database, port)
+        self.snapshot = None
+
+    def ensure_connected(self):
+        """Reconnect if the pooled connection was dropped by the server."""
+        try:
+            self.connection.ping(reconnect=True, attempts=2, delay=1)
+            self.cursor = self.connection.cursor(dictionary=True)
+            return True
+        except mysql_connector.Error as e:
+            print(f"❌ Lost connection to staging database {self.database}: {e}")
+            return False
+
+    def table_exists(self, table_name):
+        return table_name in self.snapshot.table_types
+
+    def get_table_names(self):
+        return sorted(name for name, table_type in self.snapshot.table_types.items() if table_type == 'BASE TABLE')
+
+    def column_exists(self, table_name, column_name):
+        return column_name.lower() in self.snapshot.columns.get(table_name, {})
+
+    def get_column_definition(self, table_name, column_name):
+        column = self.snapshot.columns.get(table_name, {}).get(column_name.lower())
+        return dict(column) if column is not None else None
+
+    def index_exists(self, table_name, index_name):
+        return index_name.lower() in self.snapshot.indexes.get(table_name, set())
+
+    def get_primary_key_columns(self, table_name):
+        return list(self.snapshot.primary_keys.get(table_name, []))
+
+    def get_show_create_table(self, table_name):
+        create_statement = self.snapshot.create_statements.get(table_name)
+        if create_statement is None:
+            create_statement = super().get_show_create_table(table_name)
+            if create_statement:
+                self.snapshot.create_statements[table_name] = create_statement
+        return create_statement
+
+
+class DatabasePool:
+    """Pooled connections and the cached schema snapshot of one staging database."""
+
+    def __init__(self, staging_config, poll_interval=2.0):
+        self.staging_config = staging_config
+        self.poll_interval = poll_interval
+        self.idle_connections = queue.LifoQueue()
+        self.snapshot = None
+        self.last_poll = 0.0
+        self.snapshot_loads = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Return a connected CachedDatabaseConnection, or None if staging is unreachable."""
+        while True:
+            try:
+                db = self.idle_connections.get_nowait()
+            except queue.Empty:
+                break
+            if db.ensure_connected():
+                return db
+            db.close()
+
+        db = CachedDatabaseConnection(**self.staging_config)
+        return db if db.connect() else None
+
+    def release(self, db):
+        self.idle_connections.put(db)
+
+    def get_snapshot(self, db):
+        """Return the current snapshot, reloading it if the staging schema changed."""
+        with self.lock:
+            now = time.monotonic()
+            if self.snapshot is None or now - self.last_poll >= self.poll_interval:
+                fingerprint = SchemaSnapshot.fetch_fingerprint(db)
+                self.last_poll = now
+                if self.snapshot is None or fingerprint != self.snapshot.fingerprint:
+                    if self.snapshot is not None:
+                        print(f"🔄 Staging schema of {db.database} changed; reloading snapshot")
+                    self.snapshot = SchemaSnapshot.load(db, fingerprint)
+                    self.snapshot_loads += 1
+            return self.snapshot
+
+    def close(self):
+        while not self.idle_connections.empty():
+            self.idle_connections.get_nowait().close()
+
+
+class ValidationService:
+    """Validates migrations against staging using pooled connections and cached snapshots."""
+
+    def __init__(self, poll_interval=2.0):
+        self.poll_interval = poll_interval
+        self.pools = {}
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.request_count = 0
+
+    def get_pool(self, database_name):
+        with self.lock:
+            if database_name not in self.pools:
+                self.pools[database_name] = DatabasePool(get_staging_config(database_name), self.poll_interval)
+            return self.pools[database_name]
+
+    def validate(self, path, sql):
+        """Validate a migration's SQL; returns the summary that ddl_validator.main prints."""
+        start = time.perf_counter()
+        with self.lock:
+            self.request_count += 1
+
+        parser = SQLDDLParser()
+        parser.parse_sql_file(sql, path)
+        operations = parser.get_operations()
+        database_name = parser.extract_database_name(path)
+        print(f"\n🔍 Found {len(operations)} DDL operations to verify against staging database {database_name}")
+
+        result = {
+            'path': path,
+            'database': database_name,
+            'status': 'FAILED',
+            'error': None,
+            'operations': len(operations),
+            'summary': []
+        }
+
+        pool = self.get_pool(database_name)
+        db = pool.acquire()
+        if db is None:
+            result['error'] = f"Could not connect to staging database {database_name}"
+            return result
+
+        try:
+            db.snapshot = pool.get_snapshot(db)
+            result['summary'] = validate_operations(DDLValidator(db), operations) + check_foreign_key_order(operations, sql)
+            result['status'] = 'FAILED' if any(entry['status'] == 'FAILED' for entry in result['summary']) else 'PASSED'
+        except mysql_connector.Error as e:
+            result['error'] = f"Staging query failed: {e}"
+        finally:
+            pool.release(db)
+
+        result['seconds'] = round(time.perf_counter() - start, 4)
+        return result
+
+    def health(self):
+        return {
+            'status': 'OK',
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'requests': self.request_count,
+            'databases': {
+                name: {
+                    'snapshot_loaded_at': pool.snapshot.loaded_at if pool.snapshot else None,
+                    'snapshot_loads': pool.snapshot_loads,
+                    'tables': len(pool.snapshot.table_types) if pool.snapshot else 0,
+                    'idle_connections': pool.idle_connections.qsize()
+                }
+                for name, pool in self.pools.items()
+            }
+        }
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
+
+
+class ValidationRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler for /validate and /health."""
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, self.server.service.health())
+        else:
+            self.send_json(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/validate':
+            self.send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+            path, sql = request['path'], request['sql']
+        except (ValueError, KeyError) as e:
+            self.send_json(400, {'error': f"Invalid request: {e}"})
+            return
+
+        with self.server.output.capture() as log:
+            try:
+                result = self.server.service.validate(path, sql)
+            except SystemExit:
+                # get_staging_config exits when credentials are missing
+                result = {'path': path, 'status': 'FAILED', 'error': 'Staging configuration missing', 'summary': []}
+            except Exception as e:
+                result = {'path': path, 'status': 'FAILED', 'error': f"Validation error: {e}", 'summary': []}
+        result['log'] = log.getvalue()
+
+        self.server.output.stream.write(f"{result['status']}: {path} ({result.get('seconds', 0) * 1000:.0f} ms)\n")
+        self.send_json(200, result)
+
+    def send_json(self, status_code, payload):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix-socket'
+
+    def log_message(self, format, *args):
+        self.server.output.stream.write(f"{self.address_string()} - {format % args}\n")
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP over a Unix domain socket."""
+    daemon_threads = True
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """http.client connection over a Unix domain socket."""
+
+    def __init__(self, socket_path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def open_connection(address, timeout):
+    """Open an HTTP connection for http://host:port or unix:/path addresses."""
+    if address.startswith('unix:'):
+        return UnixHTTPConnection(address[len('unix:'):], timeout=timeout)
+    parsed = urlparse(address)
+    return http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+
+
+def request_validation(address, path, sql, timeout=600):
+    """Send a migration to the validation server and return its result dict."""
+    connection = open_connection(address, timeout)
+    try:
+        connection.request('POST', '/validate', body=json.dumps({'path': path, 'sql': sql}),
+                           headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+    finally:
+        connection.close()
+
+    if response.status != 200:
+        raise ValueError(payload.get('error', f"HTTP {response.status}"))
+    return payload
+
+
+def serve(host='127.0.0.1', port=8765, socket_path=None, poll_interval=2.0):
+    """Run the validation server until interrupted."""
+    output = ThreadLocalOutput(sys.stdout)
+    sys.stdout = output
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, ValidationRequestHandler)
+        address = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), ValidationRequestHandler)
+        address = f"http://{host}:{server.server_address[1]}"
+
+    server.service = ValidationService(poll_interval)
+    server.output = output
+
+    print("🔍 DDL Validation Server")
+    print("=" * 60)
+    print(f"Listening on {address} (schema poll interval {poll_interval}s)")
+    print(f"Clients: DDL_VALIDATOR_SERVER={address}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        server.server_close()
+        server.service.close()
+        sys.stdout = output.stream
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    """Start the server: python validation_server.py [--host H] [--port P] [--socket PATH] [--poll-interval S]."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='DDL validation server')
+    parser.add_argument('--host', default='127.0.0.1', help='HTTP host (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='HTTP port (default: 8765)')
+    parser.add_argument('--socket', help='Listen on this Unix socket instead of HTTP')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between staging schema change checks')
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.socket, args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Migration Watch Mode
+Watches MYSQL/<env>/<db>/ directories while migrations are being written and
+revalidates on every save without touching staging: the seed*.sql files are
+loaded once into a simulated schema (schema_model.py), each V{n}__*.sql file
+is parsed once and re-parsed only when it changes, and only the tables the
+edit touches are replayed against the simulated schema.
+
+Uses inotify on Linux and falls back to polling file modification times
+elsewhere (or with --poll).
+
+Usage: python watch_migrations.py MYSQL/<env>/<db> [MYSQL/<env>/<db> ...] [--poll] [--once]
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import select
+import struct
+from schema_model import SchemaModel
+from sql_ddl_parser import SQLDDLParser
+
+
+MIGRATION_FILE_PATTERN = re.compile(r'^V(\d+)__(.+)\.sql$')
+SEED_FILE_PATTERN = re.compile(r'^seed.*\.sql$', re.IGNORECASE)
+
+
+class DirectoryState:
+    """Parsed seeds, parsed migrations and simulated schema of one MYSQL/<env>/<db>/ directory."""
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self.database = os.path.basename(self.directory)
+        self.base_schema = SchemaModel(self.database)
+        self.schema = SchemaModel(self.database)
+        self.migrations = {}   # path -> {'version', 'operations', 'tables'}
+        self.problems = {}     # (migration path, table) -> [(operation, problems)]
+
+    def seed_files(self):
+        return sorted(path for path in glob.glob(os.path.join(self.directory, '*.sql'))
+                      if SEED_FILE_PATTERN.match(os.path.basename(path)))
+
+    def migration_files(self):
+        return [path for path in glob.glob(os.path.join(self.directory, '*.sql'))
+                if MIGRATION_FILE_PATTERN.match(os.path.basename(path))]
+
+    def ordered_migrations(self):
+        return sorted(self.migrations.items(), key=lambda item: (item[1]['version'], item[0]))
+
+    def all_tables(self):
+        tables = set(self.base_schema.tables)
+        for migration in self.migrations.values():
+            tables |= migration['tables']
+        return tables
+
+    def parse_migration(self, path):
+        """Parse one migration file into operations in file order."""
+        with open(path, encoding='utf-8') as f:
+            file_content = f.read()
+
+        # The parser expects MYSQL/<env>/<db>/<file> paths to derive the database name
+        parser = SQLDDLParser()
+        parser.parse_sql_file(file_content, f"{self.database}/{os.path.basename(path)}")
+        operations = parser.get_operations()
+
+        return {
+            'version': int(MIGRATION_FILE_PATTERN.match(os.path.basename(path)).group(1)),
+            'operations': operations,
+            'tables': {operation['table'] for operation in operations}
+        }
+
+    def load_all(self):
+        """Load the seed files and every migration, then replay everything."""
+        self.base_schema = SchemaModel.from_files(self.seed_files(), self.database)
+        self.migrations = {path: self.parse_migration(path) for path in self.migration_files()}
+        self.schema = self.base_schema.copy()
+        self.problems = {}
+        self.replay_tables(self.all_tables())
+
+    def replay_tables(self, tables):
+        """
+        Reset the given tables to their seed state and replay every migration's
+        operations on them in version order. Other tables keep their simulated
+        final state, so cross-table checks (foreign keys) see the whole schema.
+        """
+        for table_name in tables:
+            self.schema.tables.pop(table_name, None)
+            if table_name in self.base_schema.tables:
+                self.schema.tables[table_name] = self.base_schema.tables[table_name].copy()
+        for key in [key for key in self.problems if key[1] in tables]:
+            del self.problems[key]
+
+        for path, migration in self.ordered_migrations():
+            for operation in migration['operations']:
+                if operation['table'] in tables:
+                    problems = self.schema.apply_operation(operation)
+                    if problems:
+                        self.problems.setdefault((path, operation['table']), []).append((operation, problems))
+
+    def handle_change(self, path):
+        """
+        Update state after a file in the directory changed.
+
+        Returns:
+            tuple: (description, affected tables, parse seconds, replay seconds) or None if irrelevant
+        """
+        basename = os.path.basename(path)
+
+        if SEED_FILE_PATTERN.match(basename):
+            start = time.perf_counter()
+            self.load_all()
+            return f"seed {basename} reloaded", self.all_tables(), time.perf_counter() - start, 0.0
+
+        if not MIGRATION_FILE_PATTERN.match(basename):
+            return None
+
+        previous = self.migrations.pop(path, None)
+        affected_tables = set(previous['tables']) if previous else set()
+
+        start = time.perf_counter()
+        if os.path.exists(path):
+            self.migrations[path] = self.parse_migration(path)
+            affected_tables |= self.migrations[path]['tables']
+            description = f"{basename} parsed ({len(self.migrations[path]['operations'])} operations)"
+        else:
+            description = f"{basename} removed"
+        parse_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.replay_tables(affected_tables)
+        return description, affected_tables, parse_seconds, time.perf_counter() - start
+
+
+class InotifyWatcher:
+    """Waits for file changes with Linux inotify (through ctypes, no extra dependency)."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_DELETE = 0x00000200
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directories):
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.watch_directories = {}
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO | self.IN_DELETE
+        for directory in directories:
+            watch_descriptor = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), mask)
+            if watch_descriptor < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self.watch_directories[watch_descriptor] = directory
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith('linux')
+
+    def read_events(self):
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            watch_descriptor, mask, cookie, name_length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += name_length
+            if name.endswith('.sql') and watch_descriptor in self.watch_directories:
+                changed.add(os.path.join(self.watch_directories[watch_descriptor], name))
+        return changed
+
+    def wait(self, debounce=0.05):
+        """Block until .sql files change; returns the changed paths."""
+        changed = set()
+        while not changed:
+            select.select([self.fd], [], [])
+            changed |= self.read_events()
+        # Editors often write a file in several steps; collect the burst
+        while select.select([self.fd], [], [], debounce)[0]:
+            changed |= self.read_events()
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Waits for file changes by polling modification times."""
+
+    def __init__(self, directories, interval=0.5):
+        self.directories = directories
+        self.interval = interval
+        self.mtimes = self.scan()
+
+    def scan(self):
+        mtimes = {}
+        for directory in self.directories:
+            for path in glob.glob(os.path.join(directory, '*.sql')):
+                try:
+                    mtimes[path] = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    pass
+        return mtimes
+
+    def wait(self):
+        while True:
+            time.sleep(self.interval)
+            mtimes = self.scan()
+            changed = {path for path in set(mtimes) | set(self.mtimes) if mtimes.get(path) != self.mtimes.get(path)}
+            self.mtimes = mtimes
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+def expand_directories(paths):
+    """Accept MYSQL/<env>/<db> directories, or parents of them (MYSQL/, MYSQL/<env>)."""
+    directories = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if glob.glob(os.path.join(path, '*.sql')):
+            directories.append(path)
+        else:
+            directories.extend(sorted(
+                os.path.dirname(sql_file) for sql_file in glob.glob(os.path.join(path, '**', '*.sql'), recursive=True)
+            ))
+    return sorted(set(directories))
+
+
+def print_table_results(state, tables):
+    """Print the validation status of each table touched by migrations."""
+    for table_name in sorted(tables):
+        table_problems = [(path, entry) for (path, table), entries in state.problems.items() if table == table_name for entry in entries]
+        if not table_problems:
+            if any(table_name in migration['tables'] for migration in state.migrations.values()):
+                print(f"   ✅ {table_name}")
+            continue
+        for path, (operation, problems) in table_problems:
+            target = f" {operation.get('operation', '')} {operation.get('target', '')}" if operation['command'] == 'ALTER_TABLE' else ''
+            for problem in problems:
+                print(f"   ❌ {table_name}: {os.path.basename(path)} {operation['command']}{target}: {problem}")
+
+
+def print_totals(states):
+    problem_count = sum(len(problems) for state in states for entries in state.problems.values() for _, problems in entries)
+    if problem_count:
+        print(f"⚠️  {problem_count} problem(s) outstanding")
+    else:
+        print("✅ All migrations apply cleanly to the simulated schema")
+
+
+def watch(paths, use_polling=False, run_once=False):
+    """Validate the given directories, then revalidate incrementally on every change."""
+    directories = expand_directories(paths)
+    if not directories:
+        print("❌ No directories with .sql files found")
+        exit(1)
+
+    print("👀 Migration Watch Mode")
+    print("=" * 60)
+
+    states = {}
+    for directory in directories:
+        start = time.perf_counter()
+        state = DirectoryState(directory)
+        state.load_all()
+        states[directory] = state
+        print(f"\n📁 {directory}")
+        print(f"   {len(state.base_schema.tables)} seed tables, {len(state.migrations)} migrations "
+              f"loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
+        print_table_results(state, state.all_tables())
+    print_totals(states.values())
+
+    if run_once:
+        exit(1 if any(state.problems for state in states.values()) else 0)
+
+    if not use_polling and InotifyWatcher.available():
+        watcher = InotifyWatcher(directories)
+        print("\n🔔 Watching with inotify (Ctrl+C to stop)")
+    else:
+        watcher = PollingWatcher(directories)
+        print(f"\n🔁 Watching by polling every {watcher.interval}s (Ctrl+C to stop)")
+
+    try:
+        while True:
+            for path in sorted(watcher.wait()):
+                state = states.get(os.path.dirname(path))
+                result = state.handle_change(path) if state else None
+                if result is None:
+                    continue
+                description, tables, parse_seconds, replay_seconds = result
+                print("-" * 70)
+                print(f"🔄 {description}: parse {parse_seconds * 1000:.1f} ms, "
+                      f"revalidated {len(tables)} table(s) in {replay_seconds * 1000:.1f} ms")
+                print_table_results(state, tables)
+                print_totals(states.values())
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+
+    if not args:
+        print("Usage: python watch_migrations.py MYSQL/<env>/<db> [MYSQL/<env>/<db> ...] [--poll] [--once]")
+        exit(1)
+
+    watch(args, use_polling='--poll' in sys.argv, run_once='--once' in sys.argv)
+
+
+if __name__ == "__main__":
+    main()